@@ -0,0 +1,30 @@
+"""cria indice (seller_id, sku, movimentado_em) no historico de estoque
+
+Revision ID: 2c8f7e3a9b61
+Revises: e6b4c1a9d305
+Create Date: 2026-10-19 16:57:12.340118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c8f7e3a9b61'
+down_revision: Union[str, None] = 'e6b4c1a9d305'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE_NAME = "pc_estoque_historico"
+INDEX_NAME = "idx_historico_estoque_seller_id_sku_movimentado_em"
+
+def upgrade() -> None:
+    print("--> CRIANDO ÍNDICE (seller_id, sku, movimentado_em) NO HISTÓRICO DE ESTOQUE <--")
+    # Criado na tabela particionada, o índice é propagado para as partições existentes e futuras
+    op.create_index(INDEX_NAME, TABLE_NAME, ["seller_id", "sku", "movimentado_em"], unique=False)
+
+
+def downgrade() -> None:
+    print("--> REMOVENDO ÍNDICE (seller_id, sku, movimentado_em) DO HISTÓRICO DE ESTOQUE <--")
+    op.drop_index(INDEX_NAME, table_name=TABLE_NAME)
@@ -0,0 +1,29 @@
+"""adiciona coluna version na tabela de estoque
+
+Revision ID: 3b9d2c7e41f0
+Revises: f4ab75a0e25a
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d2c7e41f0'
+down_revision: Union[str, None] = 'f4ab75a0e25a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE_NAME = "pc_estoque"
+
+def upgrade() -> None:
+    print("--> ADICIONANDO COLUNA DE VERSAO (version) PARA CONCORRENCIA OTIMISTA <--")
+    op.add_column(TABLE_NAME, sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    print("--> REMOVENDO COLUNA DE VERSAO (version) <--")
+    op.drop_column(TABLE_NAME, 'version')
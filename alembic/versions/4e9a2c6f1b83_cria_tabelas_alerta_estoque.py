@@ -0,0 +1,49 @@
+"""cria tabelas de alerta de estoque baixo e indice por updated_at
+
+Revision ID: 4e9a2c6f1b83
+Revises: 7f1d3b5e8c42
+Create Date: 2026-10-19 19:12:48.204517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e9a2c6f1b83'
+down_revision: Union[str, None] = '7f1d3b5e8c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE_NAME = "pc_estoque_alerta"
+CONTROLE_TABLE_NAME = "pc_estoque_alerta_controle"
+ESTOQUE_TABLE_NAME = "pc_estoque"
+INDEX_NAME = "idx_estoque_updated_at"
+
+def upgrade() -> None:
+    print("--> CRIANDO TABELAS DE ALERTA DE ESTOQUE BAIXO <--")
+    op.create_table(
+        TABLE_NAME,
+        sa.Column('seller_id', sa.String(), nullable=False),
+        sa.Column('sku', sa.String(), nullable=False),
+        sa.Column('quantidade', sa.Integer(), nullable=False),
+        sa.Column('alertado_em', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('seller_id', 'sku'),
+    )
+    op.create_table(
+        CONTROLE_TABLE_NAME,
+        sa.Column('nome', sa.String(), nullable=False),
+        sa.Column('processado_ate', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('limite', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('nome'),
+    )
+    op.create_index(INDEX_NAME, ESTOQUE_TABLE_NAME, ["updated_at"], unique=False)
+
+
+def downgrade() -> None:
+    print("--> REMOVENDO TABELAS DE ALERTA DE ESTOQUE BAIXO <--")
+    op.drop_index(INDEX_NAME, table_name=ESTOQUE_TABLE_NAME)
+    op.drop_table(CONTROLE_TABLE_NAME)
+    op.drop_table(TABLE_NAME)
@@ -0,0 +1,38 @@
+"""cria tabela de outbox do historico de estoque
+
+Revision ID: 5d2f8b0c7a14
+Revises: c47a9e2b1d58
+Create Date: 2026-10-19 12:05:18.774203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2f8b0c7a14'
+down_revision: Union[str, None] = 'c47a9e2b1d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE_NAME = "pc_estoque_historico_outbox"
+
+def upgrade() -> None:
+    print("--> CRIANDO TABELA DE OUTBOX DO HISTÓRICO DE ESTOQUE <--")
+    op.create_table(
+        TABLE_NAME,
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('seller_id', sa.String(), nullable=False),
+        sa.Column('sku', sa.String(), nullable=False),
+        sa.Column('quantidade_anterior', sa.Integer(), nullable=False),
+        sa.Column('quantidade_nova', sa.Integer(), nullable=False),
+        sa.Column('tipo_movimentacao', sa.String(length=20), nullable=False),
+        sa.Column('movimentado_em', sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    print("--> REMOVENDO TABELA DE OUTBOX DO HISTÓRICO DE ESTOQUE <--")
+    op.drop_table(TABLE_NAME)
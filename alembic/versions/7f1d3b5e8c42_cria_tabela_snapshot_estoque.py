@@ -0,0 +1,39 @@
+"""cria tabela de snapshots do estoque
+
+Revision ID: 7f1d3b5e8c42
+Revises: 2c8f7e3a9b61
+Create Date: 2026-10-19 18:06:33.915274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f1d3b5e8c42'
+down_revision: Union[str, None] = '2c8f7e3a9b61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE_NAME = "pc_estoque_snapshot"
+
+def upgrade() -> None:
+    print("--> CRIANDO TABELA DE SNAPSHOTS DO ESTOQUE <--")
+    op.create_table(
+        TABLE_NAME,
+        sa.Column('seller_id', sa.String(), nullable=False),
+        sa.Column('tirado_em', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('sku', sa.String(), nullable=False),
+        sa.Column('quantidade', sa.Integer(), nullable=False),
+        # A chave começa por (seller_id, tirado_em): a consulta de posição lê o snapshot de um vendedor
+        sa.PrimaryKeyConstraint('seller_id', 'tirado_em', 'sku'),
+    )
+    op.create_index("idx_estoque_snapshot_tirado_em", TABLE_NAME, ["tirado_em"], unique=False)
+
+
+def downgrade() -> None:
+    print("--> REMOVENDO TABELA DE SNAPSHOTS DO ESTOQUE <--")
+    op.drop_index("idx_estoque_snapshot_tirado_em", table_name=TABLE_NAME)
+    op.drop_table(TABLE_NAME)
@@ -0,0 +1,56 @@
+"""cria tabela de reservas de estoque
+
+Revision ID: 8e1f5a6c2d93
+Revises: 3b9d2c7e41f0
+Create Date: 2026-10-19 10:03:27.551920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e1f5a6c2d93'
+down_revision: Union[str, None] = '3b9d2c7e41f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE_NAME = "pc_estoque_reserva"
+ESTOQUE_TABLE_NAME = "pc_estoque"
+
+def upgrade() -> None:
+    print("--> CRIANDO TABELA DE RESERVAS E CONTADOR quantidade_reservada <--")
+    op.add_column(
+        ESTOQUE_TABLE_NAME,
+        sa.Column('quantidade_reservada', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+    op.create_table(
+        TABLE_NAME,
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('seller_id', sa.String(), nullable=False, index=True),
+        sa.Column('sku', sa.String(), nullable=False, index=True),
+        sa.Column('quantidade', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('expira_em', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+    # Apenas reservas ativas interessam à varredura de expiração
+    op.create_index(
+        "idx_reserva_estoque_ativa_expira_em",
+        TABLE_NAME,
+        ["expira_em"],
+        unique=False,
+        postgresql_where=sa.text("status = 'ATIVA'"),
+    )
+
+
+def downgrade() -> None:
+    print("--> REMOVENDO TABELA DE RESERVAS E CONTADOR quantidade_reservada <--")
+    op.drop_index("idx_reserva_estoque_ativa_expira_em", table_name=TABLE_NAME)
+    op.drop_table(TABLE_NAME)
+    op.drop_column(ESTOQUE_TABLE_NAME, 'quantidade_reservada')
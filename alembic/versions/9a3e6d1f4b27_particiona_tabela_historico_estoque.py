@@ -0,0 +1,112 @@
+"""particiona a tabela de historico de estoque por mes
+
+Revision ID: 9a3e6d1f4b27
+Revises: 5d2f8b0c7a14
+Create Date: 2026-10-19 14:32:07.512890
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3e6d1f4b27'
+down_revision: Union[str, None] = '5d2f8b0c7a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE_NAME = "pc_estoque_historico"
+OLD_TABLE_NAME = "pc_estoque_historico_legado"
+SEQUENCE_NAME = "pc_estoque_historico_id_seq"
+DEFAULT_PARTITION_NAME = "pc_estoque_historico_default"
+
+# Meses futuros criados já na migração; depois disso o worker mantém a janela
+FUTURE_MONTHS = 3
+
+COLUMNS = (
+    "id, seller_id, sku, quantidade_anterior, quantidade_nova, tipo_movimentacao, "
+    "movimentado_em, created_at, updated_at"
+)
+
+INDEXES = (
+    ("ix_pc_estoque_historico_seller_id", ["seller_id"]),
+    ("ix_pc_estoque_historico_sku", ["sku"]),
+    ("ix_pc_estoque_historico_movimentado_em", ["movimentado_em"]),
+    ("idx_historico_estoque_seller_id_movimentado_em", ["seller_id", "movimentado_em"]),
+)
+
+
+def _create_table(primary_key: list[str], **table_kwargs) -> sa.Table:
+    return op.create_table(
+        TABLE_NAME,
+        sa.Column('id', sa.Integer(), nullable=False, server_default=sa.text(f"nextval('{SEQUENCE_NAME}')")),
+        sa.Column('seller_id', sa.String(), nullable=False),
+        sa.Column('sku', sa.String(), nullable=False),
+        sa.Column('quantidade_anterior', sa.Integer(), nullable=False),
+        sa.Column('quantidade_nova', sa.Integer(), nullable=False),
+        sa.Column('tipo_movimentacao', sa.String(length=20), nullable=False),
+        sa.Column('movimentado_em', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint(*primary_key, name=f"{TABLE_NAME}_pkey"),
+        **table_kwargs,
+    )
+
+
+def _move_rows(source: str):
+    # A sequência do id passa para a tabela nova, preservando os ids existentes
+    op.execute(f"INSERT INTO {TABLE_NAME} ({COLUMNS}) SELECT {COLUMNS} FROM {source}")
+    op.execute(f"ALTER SEQUENCE {SEQUENCE_NAME} OWNED BY {TABLE_NAME}.id")
+    op.execute(f"DROP TABLE {source}")
+    for name, columns in INDEXES:
+        op.create_index(name, TABLE_NAME, columns, unique=False)
+
+
+def upgrade() -> None:
+    print("--> PARTICIONANDO A TABELA DE HISTÓRICO DE ESTOQUE POR MÊS <--")
+    op.rename_table(TABLE_NAME, OLD_TABLE_NAME)
+    op.execute(f"ALTER TABLE {OLD_TABLE_NAME} RENAME CONSTRAINT {TABLE_NAME}_pkey TO {OLD_TABLE_NAME}_pkey")
+
+    _create_table(["id", "movimentado_em"], postgresql_partition_by="RANGE (movimentado_em)")
+
+    # Uma partição por mês (em UTC), do primeiro registro existente até FUTURE_MONTHS à frente
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            mes timestamp := date_trunc(
+                'month', coalesce((SELECT min(movimentado_em) FROM {OLD_TABLE_NAME}), now()) AT TIME ZONE 'UTC'
+            );
+            ultimo timestamp := date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{FUTURE_MONTHS} months';
+        BEGIN
+            WHILE mes <= ultimo LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF {TABLE_NAME} FOR VALUES FROM (%L) TO (%L)',
+                    '{TABLE_NAME}_p' || to_char(mes, 'YYYYMM'),
+                    to_char(mes, 'YYYY-MM-DD') || ' 00:00:00+00',
+                    to_char(mes + interval '1 month', 'YYYY-MM-DD') || ' 00:00:00+00'
+                );
+                mes := mes + interval '1 month';
+            END LOOP;
+        END $$;
+        """
+    )
+    # Rede de segurança caso o worker não crie a partição de um mês a tempo; ao criá-la, o worker
+    # move para ela as linhas do mês que caíram aqui (HistoricoEstoqueRepository.create_partitions)
+    op.execute(f"CREATE TABLE {DEFAULT_PARTITION_NAME} PARTITION OF {TABLE_NAME} DEFAULT")
+
+    _move_rows(OLD_TABLE_NAME)
+
+
+def downgrade() -> None:
+    print("--> REVERTENDO O PARTICIONAMENTO DA TABELA DE HISTÓRICO DE ESTOQUE <--")
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name=TABLE_NAME)
+    op.rename_table(TABLE_NAME, OLD_TABLE_NAME)
+    op.execute(f"ALTER TABLE {OLD_TABLE_NAME} RENAME CONSTRAINT {TABLE_NAME}_pkey TO {OLD_TABLE_NAME}_pkey")
+
+    _create_table(["id"])
+
+    _move_rows(OLD_TABLE_NAME)
@@ -0,0 +1,47 @@
+"""cria tabela de limites de estoque baixo por vendedor e sku
+
+Revision ID: b8d3f1a7c520
+Revises: 4e9a2c6f1b83
+Create Date: 2026-10-19 20:03:17.648231
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d3f1a7c520'
+down_revision: Union[str, None] = '4e9a2c6f1b83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE_NAME = "pc_estoque_limite"
+ESTOQUE_TABLE_NAME = "pc_estoque"
+INDEX_NAME = "idx_estoque_seller_id_quantidade"
+
+def upgrade() -> None:
+    print("--> CRIANDO TABELA DE LIMITES DE ESTOQUE BAIXO <--")
+    op.create_table(
+        TABLE_NAME,
+        sa.Column('seller_id', sa.String(), nullable=False),
+        # sku vazio: limite de todos os SKUs do vendedor
+        sa.Column('sku', sa.String(), nullable=False, server_default=''),
+        sa.Column('limite', sa.Integer(), nullable=True),
+        sa.Column('atualizado_em', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('seller_id', 'sku'),
+    )
+    op.create_index(
+        INDEX_NAME,
+        ESTOQUE_TABLE_NAME,
+        ["seller_id", "quantidade"],
+        unique=False,
+        postgresql_include=["sku", "updated_at"],
+    )
+
+
+def downgrade() -> None:
+    print("--> REMOVENDO TABELA DE LIMITES DE ESTOQUE BAIXO <--")
+    op.drop_index(INDEX_NAME, table_name=ESTOQUE_TABLE_NAME)
+    op.drop_table(TABLE_NAME)
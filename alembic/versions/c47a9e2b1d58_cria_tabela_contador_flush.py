@@ -0,0 +1,38 @@
+"""cria tabela de consolidações do contador quente
+
+Revision ID: c47a9e2b1d58
+Revises: 8e1f5a6c2d93
+Create Date: 2026-10-19 11:12:40.308214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47a9e2b1d58'
+down_revision: Union[str, None] = '8e1f5a6c2d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE_NAME = "pc_estoque_contador_flush"
+
+def upgrade() -> None:
+    print("--> CRIANDO TABELA DE CONSOLIDAÇÕES DO CONTADOR QUENTE <--")
+    op.create_table(
+        TABLE_NAME,
+        sa.Column('flush_id', sa.String(length=36), primary_key=True),
+        sa.Column('seller_id', sa.String(), nullable=False),
+        sa.Column('sku', sa.String(), nullable=False),
+        sa.Column('delta', sa.Integer(), nullable=False),
+        sa.Column('aplicado_em', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("idx_contador_flush_aplicado_em", TABLE_NAME, ["aplicado_em"], unique=False)
+
+
+def downgrade() -> None:
+    print("--> REMOVENDO TABELA DE CONSOLIDAÇÕES DO CONTADOR QUENTE <--")
+    op.drop_index("idx_contador_flush_aplicado_em", table_name=TABLE_NAME)
+    op.drop_table(TABLE_NAME)
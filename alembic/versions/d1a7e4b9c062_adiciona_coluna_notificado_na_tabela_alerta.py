@@ -0,0 +1,40 @@
+"""adiciona coluna notificado na tabela de alertas de estoque baixo
+
+Revision ID: d1a7e4b9c062
+Revises: b8d3f1a7c520
+Create Date: 2026-10-19 21:04:52.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1a7e4b9c062'
+down_revision: Union[str, None] = 'b8d3f1a7c520'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE_NAME = "pc_estoque_alerta"
+INDEX_NAME = "idx_estoque_alerta_pendente"
+
+def upgrade() -> None:
+    print("--> ADICIONANDO COLUNA NOTIFICADO NA TABELA DE ALERTAS <--")
+    # Alertas já existentes foram notificados (ou descartados) pela versão anterior
+    op.add_column(TABLE_NAME, sa.Column('notificado', sa.Boolean(), nullable=False, server_default=sa.true()))
+    op.alter_column(TABLE_NAME, 'notificado', server_default=sa.false())
+    op.create_index(
+        INDEX_NAME,
+        TABLE_NAME,
+        ["seller_id", "sku"],
+        unique=False,
+        postgresql_where=sa.text("NOT notificado"),
+    )
+
+
+def downgrade() -> None:
+    print("--> REMOVENDO COLUNA NOTIFICADO DA TABELA DE ALERTAS <--")
+    op.drop_index(INDEX_NAME, table_name=TABLE_NAME)
+    op.drop_column(TABLE_NAME, 'notificado')
@@ -0,0 +1,51 @@
+"""cria tabelas de resumo por hora e por dia do historico de estoque
+
+Revision ID: e6b4c1a9d305
+Revises: 9a3e6d1f4b27
+Create Date: 2026-10-19 15:48:41.209637
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b4c1a9d305'
+down_revision: Union[str, None] = '9a3e6d1f4b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RESUMO_TABLE_NAMES = ("pc_estoque_historico_resumo_hora", "pc_estoque_historico_resumo_dia")
+CONTROLE_TABLE_NAME = "pc_estoque_historico_resumo_controle"
+
+def upgrade() -> None:
+    print("--> CRIANDO TABELAS DE RESUMO DO HISTÓRICO DE ESTOQUE <--")
+    for table_name in RESUMO_TABLE_NAMES:
+        op.create_table(
+            table_name,
+            sa.Column('seller_id', sa.String(), nullable=False),
+            sa.Column('periodo', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('sku', sa.String(), nullable=False),
+            sa.Column('tipo_movimentacao', sa.String(length=20), nullable=False),
+            sa.Column('movimentacoes', sa.Integer(), nullable=False),
+            sa.Column('delta_liquido', sa.BigInteger(), nullable=False),
+            sa.Column('quantidade_minima', sa.Integer(), nullable=False),
+            sa.Column('quantidade_maxima', sa.Integer(), nullable=False),
+            # A chave começa por seller_id e periodo: os relatórios leem um intervalo de um vendedor
+            sa.PrimaryKeyConstraint('seller_id', 'periodo', 'sku', 'tipo_movimentacao'),
+        )
+
+    op.create_table(
+        CONTROLE_TABLE_NAME,
+        sa.Column('nome', sa.String(), primary_key=True),
+        sa.Column('processado_ate', sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    print("--> REMOVENDO TABELAS DE RESUMO DO HISTÓRICO DE ESTOQUE <--")
+    op.drop_table(CONTROLE_TABLE_NAME)
+    for table_name in reversed(RESUMO_TABLE_NAMES):
+        op.drop_table(table_name)
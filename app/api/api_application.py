@@ -2,21 +2,30 @@ from contextlib import asynccontextmanager
 import asyncio
 from fastapi import APIRouter, FastAPI
 
+from app.common.tracing import configure_tracing
 from app.settings import ApiSettings
 
 from .common.error_handlers import add_error_handlers
 from .common.routers.health_check_routers import add_health_check_router
+from .common.routers.metrics_routers import add_metrics_router
 from .middlewares.configure_middlewares import configure_middlewares
 
 
 def create_app(settings: ApiSettings, router: APIRouter) -> FastAPI:
+    configure_tracing(settings)
+
     @asynccontextmanager
     async def _lifespan(_app: FastAPI):
         # Qualquer ação necessária na inicialização
-        ...
+        # O container é atribuído à aplicação depois de create_app (ver api_main)
+        container = getattr(_app, "container", None)
+        openid_adapter = container.keycloak_adapter() if container is not None else None
+        if openid_adapter is not None:
+            await openid_adapter.start()
         yield
         # Limpando a bagunça antes de terminar
-        ...
+        if openid_adapter is not None:
+            await openid_adapter.aclose()
 
     app = FastAPI(
         lifespan=_lifespan,
@@ -38,5 +47,7 @@ def create_app(settings: ApiSettings, router: APIRouter) -> FastAPI:
     app.include_router(router)
     
     add_health_check_router(app, prefix=settings.health_check_base_path)
+    if settings.metrics_path:
+        add_metrics_router(app, path=settings.metrics_path)
 
     return app
@@ -4,12 +4,16 @@
 
 from typing import TYPE_CHECKING, Annotated
 
+from asgi_correlation_id import correlation_id
 from dependency_injector.wiring import Provide, inject
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
 
 from app.api.common.injector import get_seller_id
+from app.api.common.request_timing import FASE_AUTH, medir_fase
+from app.common.context import AppContext, AppContextScope, set_context
 from app.common.exceptions import ForbiddenException, UnauthorizedException
+from app.common.tracing import start_span
 from app.container import Container
 from app.integrations.auth.keycloak_adapter import OAuthException
 
@@ -30,18 +34,29 @@ async def do_auth(
     Responsável por fazer a autenticação com algum IDP OpenId.
     """
 
-    try:
-        info_token = await openid_adapter.validate_token(token)
-    except OAuthException as exception:
-        # XXX Poderíamos especializar as exceções
-        raise UnauthorizedException from exception
-
-    # Nossa autorização (permissão):
-    # O usuário pode operar com o seller informado?
-    if sellers := info_token.get("sellers", None):
-        sellers = sellers.split(",")
-    else:
-        sellers = []
-
-    if seller_id not in sellers:
-        raise ForbiddenException([{"message": "não autorizado para trabalhar com este seller"}])
\ No newline at end of file
+    with start_span("auth.do_auth"), medir_fase(FASE_AUTH):
+        try:
+            token_info = await openid_adapter.get_token_info(token)
+        except OAuthException as exception:
+            # XXX Poderíamos especializar as exceções
+            raise UnauthorizedException from exception
+
+        # Nossa autorização (permissão):
+        # O usuário pode operar com o seller informado?
+        # Os sellers do token já vêm separados (e em cache junto com o token)
+        if seller_id not in token_info.sellers:
+            raise ForbiddenException([{"message": "não autorizado para trabalhar com este seller"}])
+
+        claims = token_info.claims
+        # model_construct: os valores já estão tipados, e validar o frozenset percorreria
+        # todos os sellers do token a cada requisição
+        set_context(
+            AppContext.model_construct(
+                tenant=seller_id,
+                azp=claims.get("azp"),
+                sub=claims.get("sub"),
+                trace_id=correlation_id.get(),
+                scope=AppContextScope.SELLER,
+                sellers=token_info.sellers,
+            )
+        )
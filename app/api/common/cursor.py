@@ -0,0 +1,44 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from app.api.common.schemas.response import ErrorDetail
+from app.common.exceptions import BadRequestException
+
+QUERY_CURSOR = "_cursor"
+
+
+def build_cursor(movimentado_em: datetime, id: int) -> str:
+    """
+    Monta o cursor opaco de paginação por chave a partir do último registro da página.
+    """
+    raw = json.dumps([movimentado_em.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def parse_cursor(cursor: str | None) -> tuple[datetime, int] | None:
+    """
+    Extrai (movimentado_em, id) do cursor recebido.
+    Retorna None quando o cursor não foi informado (primeira página).
+    """
+    if not cursor:
+        return None
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        movimentado_em, id = json.loads(raw)
+        if not isinstance(id, int):
+            raise ValueError(id)
+        return datetime.fromisoformat(movimentado_em), id
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        details = [
+            ErrorDetail(
+                message="Parâmetro '_cursor' deve conter o cursor retornado pela API",
+                location="query",
+                slug="invalid_cursor",
+                field=QUERY_CURSOR,
+                ctx={"value": cursor},
+            )
+        ]
+        raise BadRequestException(details=details)
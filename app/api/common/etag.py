@@ -0,0 +1,39 @@
+from app.api.common.schemas.response import ErrorDetail
+from app.common.exceptions import BadRequestException
+
+HEADER_ETAG = "ETag"
+HEADER_IF_MATCH = "If-Match"
+
+
+def build_etag(version: int) -> str:
+    """
+    Monta o ETag forte a partir da versão do registro.
+    """
+    return f'"{version}"'
+
+
+def parse_if_match(if_match: str | None) -> int | None:
+    """
+    Extrai a versão esperada do header If-Match.
+    Retorna None quando o header não foi informado ou é "*" (qualquer versão).
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    value = value.strip('"')
+
+    if not value.isdigit():
+        details = [
+            ErrorDetail(
+                message="Header 'If-Match' deve conter o ETag retornado pela API",
+                location="header",
+                slug="invalid_if_match_header",
+                field=HEADER_IF_MATCH,
+                ctx={"value": if_match},
+            )
+        ]
+        raise BadRequestException(details=details)
+    return int(value)
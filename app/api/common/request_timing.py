@@ -0,0 +1,101 @@
+"""
+Tempo gasto em cada fase de uma requisição (autenticação, serviço e serialização), usado no
+log de requisições lentas (ver SlowRequestMiddleware).
+"""
+
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from fastapi.routing import APIRoute
+
+FASE_AUTH = "auth"
+FASE_SERVICO = "service"
+FASE_SERIALIZACAO = "serialization"
+
+
+@dataclass
+class RequestTiming:
+    inicio: float = field(default_factory=time.perf_counter)
+    fases: dict[str, float] = field(default_factory=dict)
+    fim_endpoint: float | None = None
+    # Fase em medição: chamadas aninhadas da mesma fase não são somadas duas vezes
+    fase_ativa: str | None = None
+
+
+_request_timing: ContextVar[RequestTiming | None] = ContextVar("request_timing", default=None)
+
+
+def iniciar_request_timing() -> RequestTiming:
+    timing = RequestTiming()
+    _request_timing.set(timing)
+    return timing
+
+
+def get_request_timing() -> RequestTiming | None:
+    return _request_timing.get()
+
+
+@contextmanager
+def medir_fase(nome: str):
+    """
+    Soma o tempo do bloco à fase `nome` da requisição corrente. Fora de uma requisição
+    (ex.: no worker), não faz nada.
+    """
+    timing = _request_timing.get()
+    if timing is None or timing.fase_ativa == nome:
+        yield
+        return
+    anterior, timing.fase_ativa = timing.fase_ativa, nome
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.fases[nome] = timing.fases.get(nome, 0.0) + time.perf_counter() - inicio
+        timing.fase_ativa = anterior
+
+
+def _medir_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    if getattr(endpoint, "_request_timing", False):
+        return endpoint
+
+    def _fim():
+        if (timing := _request_timing.get()) is not None:
+            timing.fim_endpoint = time.perf_counter()
+
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            try:
+                with medir_fase(FASE_SERVICO):
+                    return await endpoint(*args, **kwargs)
+            finally:
+                _fim()
+
+    else:
+
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            try:
+                with medir_fase(FASE_SERVICO):
+                    return endpoint(*args, **kwargs)
+            finally:
+                _fim()
+
+    setattr(wrapper, "_request_timing", True)
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """
+    Rota que mede a execução do endpoint como a fase de serviço da requisição; o que vem
+    depois, até o início da resposta, é a serialização.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        super().__init__(path, _medir_endpoint(endpoint), **kwargs)
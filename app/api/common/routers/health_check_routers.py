@@ -4,6 +4,7 @@ from dependency_injector.wiring import Provide, inject
 from fastapi import APIRouter, Depends, FastAPI
 from starlette import status
 
+from app.api.common.request_timing import TimedRoute
 from app.container import Container
 
 if TYPE_CHECKING:
@@ -11,7 +12,7 @@ if TYPE_CHECKING:
 
 
 def add_health_check_router(app: FastAPI, prefix: str = "/api") -> None:
-    health_router = APIRouter(prefix=prefix, tags=["Saúde da Aplicação"])
+    health_router = APIRouter(prefix=prefix, tags=["Saúde da Aplicação"], route_class=TimedRoute)
 
     @health_router.get(
         "/ping",
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, FastAPI, Response
+
+from app.api.common.request_timing import TimedRoute
+from app.common.metrics import render_metrics
+
+
+def add_metrics_router(app: FastAPI, path: str = "/metrics") -> None:
+    metrics_router = APIRouter(tags=["Saúde da Aplicação"], route_class=TimedRoute)
+
+    @metrics_router.get(
+        path,
+        operation_id="get_metrics",
+        name="Métricas da aplicação",
+        description="Métricas da aplicação no formato do Prometheus",
+        include_in_schema=False,
+    )
+    async def metrics():
+        content, media_type = render_metrics()
+        return Response(content=content, media_type=media_type)
+
+    app.include_router(metrics_router)
@@ -36,6 +36,28 @@ class NavigationLinks(BaseModel):
             current=f"{request_path}?_offset={offset}&_limit={limit}{query_params}",
         )
 
+    @classmethod
+    def build_keyset(
+        cls,
+        request_path: str | None,
+        limit: int,
+        cursor: str | None = None,
+        next_cursor: str | None = None,
+        filters: str | None = None,
+    ):
+        """
+        Links para paginação por chave (_cursor). Como o cursor só avança,
+        `previous` aponta para a primeira página.
+        """
+        filters = f"&{filters}" if filters else ""
+        request_path = request_path or ""
+        first = f"{request_path}?_limit={limit}{filters}"
+        return cls(
+            previous=first,
+            next=f"{first}&_cursor={next_cursor}" if next_cursor else None,
+            current=f"{first}&_cursor={cursor}" if cursor else first,
+        )
+
 
 __all__ = [
     "NavigationLinks",
@@ -3,21 +3,32 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 
+from app.api.common.etag import HEADER_ETAG
 from app.api.common.trace import get_trace_id
 
 from ...settings import ApiSettings
+from .metrics_middleware import MetricsMiddleware
+from .slow_request_middleware import SlowRequestMiddleware
+from .tracing_middleware import TracingMiddleware
 
 HEADER_X_REQUEST_ID = "X-Request-ID"
 
 
 def configure_middlewares(app: FastAPI, settings: ApiSettings) -> None:
+    # Primeiro, para ficarem dentro do CorrelationIdMiddleware e já encontrarem o X-Request-ID
+    app.add_middleware(TracingMiddleware)
+    app.add_middleware(
+        SlowRequestMiddleware,
+        threshold_ms=settings.slow_request_ms,
+        sample_ratio=settings.slow_request_sample_ratio,
+    )
     app.add_middleware(
         CORSMiddleware,  # type: ignore[attr-defined]
         allow_origins=settings.cors_origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
-        expose_headers=[HEADER_X_REQUEST_ID],
+        expose_headers=[HEADER_X_REQUEST_ID, HEADER_ETAG],
     )
     app.add_middleware(
         CorrelationIdMiddleware,
@@ -27,3 +38,6 @@ def configure_middlewares(app: FastAPI, settings: ApiSettings) -> None:
     )
 
     app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+    # Por último, para ser o mais externo e medir a requisição inteira
+    app.add_middleware(MetricsMiddleware)
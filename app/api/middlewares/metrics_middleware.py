@@ -0,0 +1,40 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.common.metrics import HTTP_REQUEST_DURATION
+
+# Rota usada para as requisições que não casaram com nenhuma rota (evita um label por URL)
+ROTA_DESCONHECIDA = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Registra a duração das requisições HTTP por método, rota (o template, ex.: /estoque/{sku}) e status.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        inicio = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # O roteador grava a rota encontrada no próprio scope
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"], getattr(route, "path", ROTA_DESCONHECIDA), str(status)
+            ).observe(time.perf_counter() - inicio)
@@ -0,0 +1,67 @@
+import random
+import time
+from typing import Callable
+
+from asgi_correlation_id import correlation_id
+from pclogging import LoggingBuilder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.common.request_timing import FASE_AUTH, FASE_SERIALIZACAO, FASE_SERVICO, iniciar_request_timing
+
+logger = LoggingBuilder.get_logger(__name__)
+
+
+class SlowRequestMiddleware:
+    """
+    Loga as requisições que passam de `threshold_ms`, com o tempo de cada fase (auth, service e
+    serialization). Só uma amostra (`sample_ratio`) das requisições lentas é logada.
+
+    As fases de serviço e serialização só são separadas nas rotas declaradas com
+    `route_class=TimedRoute`; nas demais, o log traz apenas o tempo total e o de auth.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        threshold_ms: int,
+        sample_ratio: float = 1.0,
+        random_func: Callable[[], float] = random.random,
+    ):
+        self.app = app
+        self.threshold = threshold_ms / 1000
+        self.sample_ratio = sample_ratio
+        self.random_func = random_func
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.threshold <= 0 or self.sample_ratio <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        timing = iniciar_request_timing()
+        status = 500
+        inicio_resposta: float | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, inicio_resposta
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                inicio_resposta = time.perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            total = time.perf_counter() - timing.inicio
+            if total >= self.threshold and self.random_func() < self.sample_ratio:
+                if timing.fim_endpoint is not None and inicio_resposta is not None:
+                    timing.fases[FASE_SERIALIZACAO] = inicio_resposta - timing.fim_endpoint
+                route = getattr(scope.get("route"), "path", scope["path"])
+                fases = ", ".join(
+                    f"{fase}={timing.fases[fase] * 1000:.1f}ms"
+                    for fase in (FASE_AUTH, FASE_SERVICO, FASE_SERIALIZACAO)
+                    if fase in timing.fases
+                )
+                logger.warning(
+                    f"Requisição lenta: {scope['method']} {route} {status} em {total * 1000:.1f}ms "
+                    f"({fases or 'sem fases medidas'}) request_id={correlation_id.get()}"
+                )
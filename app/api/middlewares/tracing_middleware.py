@@ -0,0 +1,47 @@
+from opentelemetry.propagate import extract
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.common.tracing import tracer, tracing_habilitado
+
+
+class TracingMiddleware:
+    """
+    Abre o span raiz de cada requisição HTTP (continuando o trace do header `traceparent`, se houver);
+    os spans da autenticação, dos serviços, dos repositórios e do Redis ficam abaixo dele.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracing_habilitado():
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        carrier = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with tracer.start_as_current_span(
+            method,
+            context=extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={"http.request.method": method, "url.path": scope["path"]},
+        ) as span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # O roteador grava a rota encontrada no próprio scope
+                if (route := getattr(scope.get("route"), "path", None)) is not None:
+                    span.update_name(f"{method} {route}")
+                    span.set_attribute("http.route", route)
+                span.set_attribute("http.response.status_code", status)
+                if status >= 500:
+                    span.set_status(Status(StatusCode.ERROR))
@@ -0,0 +1,114 @@
+from dependency_injector.wiring import Provide, inject
+from fastapi import APIRouter, Depends, status
+from pclogging import LoggingBuilder
+
+from app.api.common.auth_handler import do_auth
+from app.api.common.dependencies import get_required_seller_id
+from app.api.common.request_timing import TimedRoute
+from app.api.common.schemas import ListResponse
+from app.api.v2.schemas.alerta_estoque_schema import EstoqueBaixoResponse, LimiteEstoqueUpdate
+from app.container import Container
+from app.services.alerta_estoque_service import AlertaEstoqueService
+
+router = APIRouter(
+    prefix="/estoque_baixo",
+    tags=["Estoque Baixo"],
+    dependencies=[Depends(do_auth)],
+    route_class=TimedRoute,
+)
+
+logger = LoggingBuilder.get_logger(__name__)
+
+
+@router.get(
+    "",
+    response_model=ListResponse[EstoqueBaixoResponse],
+    status_code=status.HTTP_200_OK,
+    summary="Lista os itens com estoque baixo",
+)
+@inject
+async def list_estoque_baixo_v2(
+    seller_id: str = Depends(get_required_seller_id),
+    alerta_estoque_service: AlertaEstoqueService = Depends(Provide[Container.alerta_estoque_service]),
+):
+    """
+    Lista os SKUs do vendedor com quantidade igual ou abaixo do limite de estoque baixo,
+    da menor quantidade para a maior.
+
+    O limite de cada SKU é o definido para ele, o definido para o vendedor ou o padrão da aplicação.
+    """
+    logger.info(f"Listando estoque baixo para seller_id={seller_id}")
+    itens = await alerta_estoque_service.listar_estoque_baixo(seller_id)
+    return ListResponse[EstoqueBaixoResponse](results=itens)
+
+
+@router.put(
+    "/limite",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Define o limite de estoque baixo do vendedor",
+)
+@inject
+async def definir_limite_seller_v2(
+    limite: LimiteEstoqueUpdate,
+    seller_id: str = Depends(get_required_seller_id),
+    alerta_estoque_service: AlertaEstoqueService = Depends(Provide[Container.alerta_estoque_service]),
+):
+    """
+    Define o limite de estoque baixo de todos os SKUs do vendedor que não têm limite próprio.
+    """
+    await alerta_estoque_service.definir_limite(seller_id, limite.limite)
+    return None
+
+
+@router.delete(
+    "/limite",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Remove o limite de estoque baixo do vendedor",
+)
+@inject
+async def remover_limite_seller_v2(
+    seller_id: str = Depends(get_required_seller_id),
+    alerta_estoque_service: AlertaEstoqueService = Depends(Provide[Container.alerta_estoque_service]),
+):
+    """
+    Remove o limite do vendedor; volta a valer o padrão da aplicação.
+    """
+    await alerta_estoque_service.remover_limite(seller_id)
+    return None
+
+
+@router.put(
+    "/limite/{sku}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Define o limite de estoque baixo de um SKU",
+)
+@inject
+async def definir_limite_sku_v2(
+    sku: str,
+    limite: LimiteEstoqueUpdate,
+    seller_id: str = Depends(get_required_seller_id),
+    alerta_estoque_service: AlertaEstoqueService = Depends(Provide[Container.alerta_estoque_service]),
+):
+    """
+    Define o limite de estoque baixo de um SKU, com precedência sobre o do vendedor.
+    """
+    await alerta_estoque_service.definir_limite(seller_id, limite.limite, sku)
+    return None
+
+
+@router.delete(
+    "/limite/{sku}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Remove o limite de estoque baixo de um SKU",
+)
+@inject
+async def remover_limite_sku_v2(
+    sku: str,
+    seller_id: str = Depends(get_required_seller_id),
+    alerta_estoque_service: AlertaEstoqueService = Depends(Provide[Container.alerta_estoque_service]),
+):
+    """
+    Remove o limite do SKU; volta a valer o do vendedor ou o padrão da aplicação.
+    """
+    await alerta_estoque_service.remover_limite(seller_id, sku)
+    return None
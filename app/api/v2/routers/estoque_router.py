@@ -2,19 +2,27 @@ import json
 from typing import Optional
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from pclogging import LoggingBuilder
 
 from app.api.common.auth_handler import do_auth
 from app.api.common.dependencies import get_required_seller_id
+from app.api.common.etag import HEADER_ETAG, HEADER_IF_MATCH, build_etag, parse_if_match
+from app.api.common.request_timing import TimedRoute
 from app.api.common.schemas import ListResponse, Paginator
 from app.api.common.schemas.pagination import get_request_pagination
-from app.api.v2.schemas.estoque_schema import EstoqueCreateV2, EstoqueResponseV2, EstoqueUpdateV2
+from app.api.v2.schemas.estoque_schema import EstoqueBaixaV2, EstoqueCreateV2, EstoqueResponseV2, EstoqueUpdateV2
 from app.container import Container
 from app.models.estoque_model import Estoque
 from app.services import EstoqueServices
+from app.services.contador_quente_service import ContadorQuenteService
 
-router = APIRouter(prefix="/estoque", tags=["Estoque V2"], dependencies=[Depends(do_auth)])
+router = APIRouter(
+    prefix="/estoque",
+    tags=["Estoque V2"],
+    dependencies=[Depends(do_auth)],
+    route_class=TimedRoute,
+)
 
 logger = LoggingBuilder.get_logger(__name__)
 
@@ -65,6 +73,7 @@ async def list_estoque_v2(
 @inject
 async def list_estoque_by_seller_and_sku_v2(
     sku: str,
+    response: Response,
     seller_id: str = Depends(get_required_seller_id),
     estoque_service: EstoqueServices = Depends(Provide[Container.estoque_service]),
 ):
@@ -72,7 +81,8 @@ async def list_estoque_by_seller_and_sku_v2(
     Busca um item de estoque específico por SKU para um vendedor.
 
     Recupera os detalhes de um único item de estoque com base no seu SKU e no
-    `seller_id` do usuário autenticado.
+    `seller_id` do usuário autenticado. A versão do registro é devolvida no
+    header `ETag`, para ser reenviada no `If-Match` do PATCH.
 
     Args:
         sku (str): O SKU (Stock Keeping Unit) do produto a ser buscado.
@@ -94,6 +104,7 @@ async def list_estoque_by_seller_and_sku_v2(
     if estoque is None:
         logger.warning(f"Estoque não encontrado para seller_id={seller_id}, sku={sku}")
         raise HTTPException(status_code=404, detail="Estoque não encontrado")
+    response.headers[HEADER_ETAG] = build_etag(estoque.version)
     return estoque
 
 
@@ -144,6 +155,10 @@ async def create_estoque_v2(
 async def update_estoque_by_seller_and_sku_v2(
     sku: str,
     estoque_update: EstoqueUpdateV2,
+    response: Response,
+    if_match: Optional[str] = Header(
+        None, alias=HEADER_IF_MATCH, description="ETag obtido no GET; a atualização só ocorre se a versão for a mesma"
+    ),
     seller_id: str = Depends(get_required_seller_id),
     estoque_service: EstoqueServices = Depends(Provide[Container.estoque_service]),
 ):
@@ -151,24 +166,33 @@ async def update_estoque_by_seller_and_sku_v2(
     Atualiza a quantidade de um item de estoque existente.
 
     Modifica a quantidade de um produto específico no estoque, identificado
-    pelo seu SKU e pelo `seller_id` do usuário autenticado.
+    pelo seu SKU e pelo `seller_id` do usuário autenticado. Quando o header
+    `If-Match` é informado, a atualização só é aplicada se a versão do registro
+    ainda for a mesma do `ETag` obtido anteriormente.
 
     Args:
         sku (str): O SKU do item de estoque a ser atualizado.
         estoque_update (EstoqueUpdateV2): O corpo da requisição com a nova `quantidade`.
+        if_match (Optional[str]): ETag da versão sobre a qual a alteração foi feita.
         seller_id (str): O ID do vendedor, extraído do cabeçalho da requisição.
 
     Returns:
-        EstoqueResponseV2: O objeto de estoque com a quantidade atualizada.
+        EstoqueResponseV2: O objeto de estoque com a quantidade atualizada e o novo `ETag`.
 
     Raises:
         HTTPException (404 Not Found): Se o item de estoque não for encontrado.
+        HTTPException (409 Conflict): Se o estoque continuar sendo alterado concorrentemente.
+        HTTPException (412 Precondition Failed): Se a versão do `If-Match` estiver desatualizada.
     """
     logger.info(f"Atualizando estoque para seller_id={seller_id}, sku={sku}, nova quantidade={estoque_update.quantidade}")
-    result = await estoque_service.update(seller_id, sku, estoque_update.quantidade)
+    expected_version = parse_if_match(if_match)
+    result = await estoque_service.update(
+        seller_id, sku, estoque_update.quantidade, expected_version=expected_version
+    )
     if result is None:
         logger.warning(f"Estoque não encontrado para update - seller_id={seller_id}, sku={sku}")
         raise HTTPException(status_code=404, detail="Estoque não encontrado")
+    response.headers[HEADER_ETAG] = build_etag(result.version)
     logger.info(f"Estoque atualizado para seller_id={seller_id}, sku={sku}")
     return result
 
@@ -205,3 +229,92 @@ async def delete_estoque_by_seller_and_sku_v2(
         raise HTTPException(status_code=404, detail="Estoque não encontrado")
     logger.info(f"Estoque deletado para seller_id={seller_id}, sku={sku}")
     return None
+
+@router.post(
+    "/{sku}/baixa",
+    response_model=EstoqueResponseV2,
+    status_code=status.HTTP_200_OK,
+    summary="Baixa unidades de um item do estoque",
+)
+@inject
+async def baixar_estoque_by_seller_and_sku_v2(
+    sku: str,
+    baixa: EstoqueBaixaV2,
+    seller_id: str = Depends(get_required_seller_id),
+    estoque_service: EstoqueServices = Depends(Provide[Container.estoque_service]),
+):
+    """
+    Baixa unidades de um item de estoque, se houver disponível suficiente.
+
+    A verificação e a baixa são atômicas; requisições concorrentes nunca deixam o
+    disponível negativo. SKUs em modo contador quente são baixados no Redis e
+    consolidados no banco pelo worker.
+
+    Args:
+        sku (str): O SKU do item de estoque.
+        baixa (EstoqueBaixaV2): O corpo da requisição com a `quantidade` a baixar.
+        seller_id (str): O ID do vendedor, extraído do cabeçalho da requisição.
+
+    Returns:
+        EstoqueResponseV2: O objeto de estoque com a quantidade após a baixa.
+
+    Raises:
+        HTTPException (404 Not Found): Se o item de estoque não for encontrado.
+        HTTPException (409 Conflict): Se não houver quantidade disponível suficiente.
+    """
+    logger.info(f"Baixando estoque para seller_id={seller_id}, sku={sku}, quantidade={baixa.quantidade}")
+    return await estoque_service.baixar(seller_id, sku, baixa.quantidade)
+
+@router.put(
+    "/{sku}/contador_quente",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Ativa o modo contador quente para um item do estoque",
+)
+@inject
+async def ativar_contador_quente_v2(
+    sku: str,
+    seller_id: str = Depends(get_required_seller_id),
+    contador_quente_service: ContadorQuenteService = Depends(Provide[Container.contador_quente_service]),
+):
+    """
+    Ativa o modo contador quente, para SKUs com alto volume de baixas (ex.: promoções relâmpago).
+
+    As baixas passam a ser feitas no Redis e consolidadas periodicamente no banco.
+    Enquanto o modo estiver ativo, a quantidade não pode ser ajustada pelo PATCH.
+
+    Args:
+        sku (str): O SKU do item de estoque.
+        seller_id (str): O ID do vendedor, extraído do cabeçalho da requisição.
+
+    Raises:
+        HTTPException (400 Bad Request): Se o modo contador quente estiver desabilitado na aplicação.
+        HTTPException (404 Not Found): Se o item de estoque não for encontrado.
+    """
+    logger.info(f"Ativando contador quente para seller_id={seller_id}, sku={sku}")
+    await contador_quente_service.ativar(seller_id, sku)
+    return None
+
+@router.delete(
+    "/{sku}/contador_quente",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Desativa o modo contador quente para um item do estoque",
+)
+@inject
+async def desativar_contador_quente_v2(
+    sku: str,
+    seller_id: str = Depends(get_required_seller_id),
+    contador_quente_service: ContadorQuenteService = Depends(Provide[Container.contador_quente_service]),
+):
+    """
+    Consolida as baixas pendentes e desativa o modo contador quente.
+
+    Args:
+        sku (str): O SKU do item de estoque.
+        seller_id (str): O ID do vendedor, extraído do cabeçalho da requisição.
+
+    Raises:
+        HTTPException (409 Conflict): Se as baixas continuarem chegando durante a consolidação.
+    """
+    logger.info(f"Desativando contador quente para seller_id={seller_id}, sku={sku}")
+    await contador_quente_service.desativar(seller_id, sku)
+    return None
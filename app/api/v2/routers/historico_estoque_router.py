@@ -1,18 +1,182 @@
+from datetime import datetime
+from typing import AsyncIterator
+from urllib.parse import urlencode
+
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from pclogging import LoggingBuilder
 
 from app.api.common.auth_handler import do_auth
+from app.api.common.cursor import build_cursor, parse_cursor
 from app.api.common.dependencies import get_required_seller_id
-from app.api.common.schemas import ListResponse
-from app.api.v2.schemas.historico_estoque_schema import HistoricoEstoqueResponse
+from app.api.common.request_timing import TimedRoute
+from app.api.common.schemas import ListMeta, ListResponse, NavigationLinks, PageResponse
+from app.api.common.schemas.pagination import PAGE_MAX_LIMIT
+from app.api.v2.schemas.historico_estoque_schema import (
+    HistoricoEstoqueResponse,
+    PosicaoEstoqueResponse,
+    ResumoHistoricoEstoqueResponse,
+)
 from app.container import Container
-from app.services.historico_estoque_service import HistoricoEstoqueService
+from app.models.historico_estoque_model import HistoricoEstoque, TipoMovimentacaoEnum
+from app.services.historico_estoque_service import HistoricoEstoqueService, periodo_diario, periodo_semanal
 
-router = APIRouter(prefix="/historico_estoque", tags=["Histórico de Estoque"], dependencies=[Depends(do_auth)])
+router = APIRouter(
+    prefix="/historico_estoque",
+    tags=["Histórico de Estoque"],
+    dependencies=[Depends(do_auth)],
+    route_class=TimedRoute,
+)
 
 logger = LoggingBuilder.get_logger(__name__)
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+LIMIT_QUERY = Query(50, ge=1, le=PAGE_MAX_LIMIT, description="Quantidade de registros a serem retornados.")
+CURSOR_QUERY = Query(None, description="Cursor da próxima página, retornado em meta.links.next.")
+SKU_QUERY = Query(None, description="Filtra as movimentações de um SKU.")
+TIPO_QUERY = Query(None, description="Filtra as movimentações de um tipo.")
+END_QUERY = Query(None, description="Fim do período (inclusivo). Sem fuso, é tratado como UTC; padrão: agora.")
+
+
+async def _listar_pagina(
+    request: Request,
+    historico_estoque_service: HistoricoEstoqueService,
+    seller_id: str,
+    periodo: tuple[datetime, datetime],
+    limit: int,
+    cursor: str | None,
+    sku: str | None,
+    tipo_movimentacao: TipoMovimentacaoEnum | None,
+    link_params: dict[str, str] | None = None,
+) -> ListResponse[HistoricoEstoqueResponse]:
+    start_date, end_date = periodo
+    # Um registro a mais indica se há próxima página
+    historico = await historico_estoque_service.get_pagina(
+        seller_id,
+        start_date,
+        end_date,
+        limit + 1,
+        after=parse_cursor(cursor),
+        sku=sku,
+        tipo_movimentacao=tipo_movimentacao,
+    )
+    # Só a primeira página vazia indica que não há histórico; as seguintes são o fim da listagem
+    if not historico and cursor is None:
+        logger.warning(f"Nenhum histórico encontrado para seller_id={seller_id} em {request.url.path}")
+        raise HTTPException(status_code=404, detail="Nenhum histórico encontrado")
+
+    results = historico[:limit]
+    next_cursor = build_cursor(*results[-1].chave_paginacao) if len(historico) > limit else None
+    filters = {
+        **(link_params or {}),
+        "sku": sku,
+        "tipo_movimentacao": tipo_movimentacao.value if tipo_movimentacao else None,
+    }
+    links = NavigationLinks.build_keyset(
+        request_path=request.url.path,
+        limit=limit,
+        cursor=cursor,
+        next_cursor=next_cursor,
+        filters=urlencode({key: value for key, value in filters.items() if value is not None}),
+    )
+    return ListResponse[HistoricoEstoqueResponse](
+        results=results,
+        meta=ListMeta(page=PageResponse(limit=limit, offset=None, count=len(results)), links=links),
+    )
+
+
+async def _to_ndjson(historico: AsyncIterator[HistoricoEstoque]) -> AsyncIterator[str]:
+    async for movimentacao in historico:
+        yield HistoricoEstoqueResponse.model_validate(movimentacao).model_dump_json() + "\n"
+
+
+@router.get(
+    "",
+    response_model=ListResponse[HistoricoEstoqueResponse],
+    status_code=status.HTTP_200_OK,
+    summary="Lista o histórico do estoque em um período",
+)
+@inject
+async def list_historico_estoque_periodo_v2(
+    request: Request,
+    start: datetime = Query(..., description="Início do período (inclusivo). Sem fuso, é tratado como UTC."),
+    end: datetime | None = END_QUERY,
+    seller_id: str = Depends(get_required_seller_id),
+    _limit: int = LIMIT_QUERY,
+    _cursor: str | None = CURSOR_QUERY,
+    sku: str | None = SKU_QUERY,
+    tipo_movimentacao: TipoMovimentacaoEnum | None = TIPO_QUERY,
+    historico_estoque_service: HistoricoEstoqueService = Depends(Provide[Container.historico_estoque_service]),
+):
+    """
+    Recupera as movimentações de estoque de um período arbitrário.
+
+    Retorna, paginadas da mais recente para a mais antiga, as movimentações do
+    `seller_id` entre `start` e `end`, opcionalmente de um único SKU. O período
+    é limitado pela configuração `historico_consulta_max_dias`.
+
+    Args:
+        start (datetime): Início do período.
+        end (datetime | None): Fim do período; o momento atual se omitido.
+        seller_id (str): O ID do vendedor, extraído automaticamente do
+                         cabeçalho da requisição.
+        _limit (int): Quantidade de registros por página.
+        _cursor (str | None): Cursor da página, ausente na primeira.
+        sku (str | None): Filtro opcional por SKU.
+        tipo_movimentacao (TipoMovimentacaoEnum | None): Filtro opcional por tipo.
+
+    Returns:
+        ListResponse[HistoricoEstoqueResponse]: A página de movimentações e os
+                                                links de navegação.
+
+    Raises:
+        HTTPException (400 Bad Request): Se o período for inválido ou longo demais.
+        HTTPException (404 Not Found): Se nenhum registro de histórico for
+                                       encontrado no período (na primeira página).
+    """
+    logger.info(f"Consultando histórico de estoque de {start} a {end} para seller_id={seller_id}, sku={sku}")
+    periodo = historico_estoque_service.periodo_consulta(start, end)
+    # O período segue fixo nos links, para que as próximas páginas não avancem o fim
+    return await _listar_pagina(
+        request,
+        historico_estoque_service,
+        seller_id,
+        periodo,
+        _limit,
+        _cursor,
+        sku,
+        tipo_movimentacao,
+        link_params={"start": periodo[0].isoformat(), "end": periodo[1].isoformat()},
+    )
+
+@router.get(
+    "/stream",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    summary="Transmite o histórico do estoque de um período em NDJSON",
+)
+@inject
+async def stream_historico_estoque_periodo_v2(
+    start: datetime = Query(..., description="Início do período (inclusivo). Sem fuso, é tratado como UTC."),
+    end: datetime | None = END_QUERY,
+    seller_id: str = Depends(get_required_seller_id),
+    sku: str | None = SKU_QUERY,
+    tipo_movimentacao: TipoMovimentacaoEnum | None = TIPO_QUERY,
+    historico_estoque_service: HistoricoEstoqueService = Depends(Provide[Container.historico_estoque_service]),
+):
+    """
+    Transmite as movimentações de estoque de um período, uma por linha (NDJSON).
+    O período é limitado pela configuração `historico_consulta_max_dias`.
+    """
+    logger.info(f"Transmitindo histórico de estoque de {start} a {end} para seller_id={seller_id}, sku={sku}")
+    start_date, end_date = historico_estoque_service.periodo_consulta(start, end)
+    historico = historico_estoque_service.iter_movimentacoes(
+        seller_id, start_date, end_date, sku=sku, tipo_movimentacao=tipo_movimentacao
+    )
+    return StreamingResponse(_to_ndjson(historico), media_type=NDJSON_MEDIA_TYPE)
+
 @router.get(
     "/semana",
     response_model=ListResponse[HistoricoEstoqueResponse],
@@ -21,34 +185,68 @@ logger = LoggingBuilder.get_logger(__name__)
 )
 @inject
 async def list_historico_estoque_semana_v2(
+    request: Request,
     seller_id: str = Depends(get_required_seller_id),
+    _limit: int = LIMIT_QUERY,
+    _cursor: str | None = CURSOR_QUERY,
+    sku: str | None = SKU_QUERY,
+    tipo_movimentacao: TipoMovimentacaoEnum | None = TIPO_QUERY,
     historico_estoque_service: HistoricoEstoqueService = Depends(Provide[Container.historico_estoque_service]),
 ):
     """
     Recupera o relatório de movimentações de estoque da última semana.
 
-    Este endpoint retorna uma lista de todas as movimentações de estoque
-    (entradas, saídas, ajustes) registradas nos últimos 7 dias para o `seller_id` informado.
+    Este endpoint retorna, paginadas da mais recente para a mais antiga, as
+    movimentações de estoque registradas nos últimos 7 dias para o `seller_id`
+    informado. A próxima página é obtida com o `_cursor` de `meta.links.next`.
 
     Args:
         seller_id (str): O ID do vendedor, extraído automaticamente do
                          cabeçalho da requisição.
+        _limit (int): Quantidade de registros por página.
+        _cursor (str | None): Cursor da página, ausente na primeira.
+        sku (str | None): Filtro opcional por SKU.
+        tipo_movimentacao (TipoMovimentacaoEnum | None): Filtro opcional por tipo.
 
     Returns:
-        ListResponse[HistoricoEstoqueResponse]: Um objeto de resposta contendo a
-                                                lista de movimentações de estoque
-                                                e o total de registros.
+        ListResponse[HistoricoEstoqueResponse]: A página de movimentações e os
+                                                links de navegação.
 
     Raises:
         HTTPException (404 Not Found): Se nenhum registro de histórico for
-                                       encontrado para o vendedor no período.
-    """ 
+                                       encontrado para o vendedor no período
+                                       (na primeira página).
+    """
     logger.info(f"Gerando histórico de estoque da semana para seller_id={seller_id}")
-    historico = await historico_estoque_service.get_relatorio_semanal(seller_id)
-    if not historico:
-        logger.warning(f"Nenhum histórico encontrado para seller_id={seller_id} na última semana")
-        raise HTTPException(status_code=404, detail="Nenhum histórico encontrado")
-    return ListResponse[HistoricoEstoqueResponse](results=historico, total=len(historico))
+    return await _listar_pagina(
+        request, historico_estoque_service, seller_id, periodo_semanal(), _limit, _cursor, sku, tipo_movimentacao
+    )
+
+@router.get(
+    "/semana/stream",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    summary="Transmite o histórico do estoque da última semana em NDJSON",
+)
+@inject
+async def stream_historico_estoque_semana_v2(
+    seller_id: str = Depends(get_required_seller_id),
+    sku: str | None = SKU_QUERY,
+    tipo_movimentacao: TipoMovimentacaoEnum | None = TIPO_QUERY,
+    historico_estoque_service: HistoricoEstoqueService = Depends(Provide[Container.historico_estoque_service]),
+):
+    """
+    Transmite todas as movimentações de estoque da última semana, uma por linha (NDJSON).
+
+    As movimentações são lidas do banco em lotes e enviadas à medida que chegam,
+    sem montar a resposta inteira em memória.
+    """
+    logger.info(f"Transmitindo histórico de estoque da semana para seller_id={seller_id}")
+    start_date, end_date = periodo_semanal()
+    historico = historico_estoque_service.iter_movimentacoes(
+        seller_id, start_date, end_date, sku=sku, tipo_movimentacao=tipo_movimentacao
+    )
+    return StreamingResponse(_to_ndjson(historico), media_type=NDJSON_MEDIA_TYPE)
 
 @router.get(
     "/dia",
@@ -58,32 +256,146 @@ async def list_historico_estoque_semana_v2(
 )
 @inject
 async def list_historico_estoque_dia_v2(
+    request: Request,
     seller_id: str = Depends(get_required_seller_id),
+    _limit: int = LIMIT_QUERY,
+    _cursor: str | None = CURSOR_QUERY,
+    sku: str | None = SKU_QUERY,
+    tipo_movimentacao: TipoMovimentacaoEnum | None = TIPO_QUERY,
     historico_estoque_service: HistoricoEstoqueService = Depends(Provide[Container.historico_estoque_service]),
 ):
     """
     Recupera o relatório de movimentações de estoque do dia corrente.
 
-    Este endpoint retorna uma lista de todas as movimentações de estoque
-    (entradas, saídas, ajustes) registradas para o `seller_id` informado 
-    desde a meia-noite (00:00) do dia atual.
+    Este endpoint retorna, paginadas da mais recente para a mais antiga, as
+    movimentações de estoque registradas para o `seller_id` informado desde a
+    meia-noite (00:00 UTC) do dia atual. A próxima página é obtida com o
+    `_cursor` de `meta.links.next`.
 
     Args:
         seller_id (str): O ID do vendedor, extraído automaticamente do
                          cabeçalho da requisição.
+        _limit (int): Quantidade de registros por página.
+        _cursor (str | None): Cursor da página, ausente na primeira.
+        sku (str | None): Filtro opcional por SKU.
+        tipo_movimentacao (TipoMovimentacaoEnum | None): Filtro opcional por tipo.
 
     Returns:
-        ListResponse[HistoricoEstoqueResponse]: Um objeto de resposta contendo a
-                                                lista de movimentações de estoque
-                                                e o total de registros.
+        ListResponse[HistoricoEstoqueResponse]: A página de movimentações e os
+                                                links de navegação.
 
     Raises:
         HTTPException (404 Not Found): Se nenhum registro de histórico for
-                                       encontrado para o vendedor no dia.
+                                       encontrado para o vendedor no dia
+                                       (na primeira página).
     """
     logger.info(f"Gerando histórico de estoque do dia para seller_id={seller_id}")
-    historico = await historico_estoque_service.get_relatorio_diario(seller_id)
-    if not historico:
-        logger.warning(f"Nenhum histórico encontrado para seller_id={seller_id} no dia de hoje")
+    return await _listar_pagina(
+        request, historico_estoque_service, seller_id, periodo_diario(), _limit, _cursor, sku, tipo_movimentacao
+    )
+
+@router.get(
+    "/dia/stream",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    summary="Transmite o histórico do estoque do dia corrente em NDJSON",
+)
+@inject
+async def stream_historico_estoque_dia_v2(
+    seller_id: str = Depends(get_required_seller_id),
+    sku: str | None = SKU_QUERY,
+    tipo_movimentacao: TipoMovimentacaoEnum | None = TIPO_QUERY,
+    historico_estoque_service: HistoricoEstoqueService = Depends(Provide[Container.historico_estoque_service]),
+):
+    """
+    Transmite todas as movimentações de estoque do dia corrente, uma por linha (NDJSON).
+    """
+    logger.info(f"Transmitindo histórico de estoque do dia para seller_id={seller_id}")
+    start_date, end_date = periodo_diario()
+    historico = historico_estoque_service.iter_movimentacoes(
+        seller_id, start_date, end_date, sku=sku, tipo_movimentacao=tipo_movimentacao
+    )
+    return StreamingResponse(_to_ndjson(historico), media_type=NDJSON_MEDIA_TYPE)
+
+@router.get(
+    "/resumo/semana",
+    response_model=ListResponse[ResumoHistoricoEstoqueResponse],
+    status_code=status.HTTP_200_OK,
+    summary="Resume, por dia e SKU, as movimentações da última semana",
+)
+@inject
+async def list_resumo_historico_estoque_semana_v2(
+    seller_id: str = Depends(get_required_seller_id),
+    historico_estoque_service: HistoricoEstoqueService = Depends(Provide[Container.historico_estoque_service]),
+):
+    """
+    Recupera o resumo diário das movimentações de estoque dos últimos 7 dias.
+
+    Lê as tabelas de resumo mantidas pelo worker, em vez das movimentações individuais:
+    uma linha por dia (UTC) e SKU com o total de movimentações, a contagem por tipo,
+    a variação líquida e as quantidades mínima e máxima registradas. Movimentações
+    dos últimos minutos podem ainda não estar refletidas.
+
+    Raises:
+        HTTPException (404 Not Found): Se nenhum resumo for encontrado para o vendedor no período.
+    """
+    logger.info(f"Gerando resumo do histórico de estoque da semana para seller_id={seller_id}")
+    resumos = await historico_estoque_service.get_resumo_semanal(seller_id)
+    if not resumos:
+        logger.warning(f"Nenhum resumo encontrado para seller_id={seller_id} na última semana")
+        raise HTTPException(status_code=404, detail="Nenhum histórico encontrado")
+    return ListResponse[ResumoHistoricoEstoqueResponse](results=resumos)
+
+@router.get(
+    "/resumo/dia",
+    response_model=ListResponse[ResumoHistoricoEstoqueResponse],
+    status_code=status.HTTP_200_OK,
+    summary="Resume, por hora e SKU, as movimentações do dia corrente",
+)
+@inject
+async def list_resumo_historico_estoque_dia_v2(
+    seller_id: str = Depends(get_required_seller_id),
+    historico_estoque_service: HistoricoEstoqueService = Depends(Provide[Container.historico_estoque_service]),
+):
+    """
+    Recupera o resumo por hora das movimentações de estoque do dia corrente (UTC).
+
+    Raises:
+        HTTPException (404 Not Found): Se nenhum resumo for encontrado para o vendedor no dia.
+    """
+    logger.info(f"Gerando resumo do histórico de estoque do dia para seller_id={seller_id}")
+    resumos = await historico_estoque_service.get_resumo_diario(seller_id)
+    if not resumos:
+        logger.warning(f"Nenhum resumo encontrado para seller_id={seller_id} no dia de hoje")
+        raise HTTPException(status_code=404, detail="Nenhum histórico encontrado")
+    return ListResponse[ResumoHistoricoEstoqueResponse](results=resumos)
+
+
+@router.get(
+    "/posicao",
+    response_model=ListResponse[PosicaoEstoqueResponse],
+    status_code=status.HTTP_200_OK,
+    summary="Reconstrói a quantidade dos SKUs em um instante passado",
+)
+@inject
+async def get_posicao_estoque_v2(
+    as_of: datetime = Query(..., description="Instante consultado. Sem fuso, é tratado como UTC."),
+    sku: str | None = SKU_QUERY,
+    seller_id: str = Depends(get_required_seller_id),
+    historico_estoque_service: HistoricoEstoqueService = Depends(Provide[Container.historico_estoque_service]),
+):
+    """
+    Retorna a quantidade de cada SKU do vendedor (ou de um SKU) no instante `as_of`.
+
+    A posição parte do snapshot diário mais recente até o instante e aplica as
+    movimentações posteriores a ele; SKUs excluídos até o instante não aparecem.
+
+    Raises:
+        HTTPException (404 Not Found): Se o vendedor não tinha estoque no instante.
+    """
+    logger.info(f"Reconstruindo posição do estoque em {as_of} para seller_id={seller_id}, sku={sku}")
+    posicoes = await historico_estoque_service.get_posicao(seller_id, as_of, sku)
+    if not posicoes:
+        logger.warning(f"Nenhuma posição encontrada para seller_id={seller_id} em {as_of}")
         raise HTTPException(status_code=404, detail="Nenhum histórico encontrado")
-    return ListResponse[HistoricoEstoqueResponse](results=historico, total=len(historico))
\ No newline at end of file
+    return ListResponse[PosicaoEstoqueResponse](results=posicoes)
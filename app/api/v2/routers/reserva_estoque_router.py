@@ -0,0 +1,141 @@
+from dependency_injector.wiring import Provide, inject
+from fastapi import APIRouter, Depends, status
+from pclogging import LoggingBuilder
+
+from app.api.common.auth_handler import do_auth
+from app.api.common.dependencies import get_required_seller_id
+from app.api.common.request_timing import TimedRoute
+from app.api.v2.schemas.reserva_estoque_schema import ReservaEstoqueCreate, ReservaEstoqueResponse
+from app.container import Container
+from app.services.reserva_estoque_service import ReservaEstoqueService
+
+router = APIRouter(
+    prefix="/reserva_estoque",
+    tags=["Reserva de Estoque"],
+    dependencies=[Depends(do_auth)],
+    route_class=TimedRoute,
+)
+
+logger = LoggingBuilder.get_logger(__name__)
+
+
+@router.post(
+    "",
+    response_model=ReservaEstoqueResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Reserva unidades de um item do estoque",
+)
+@inject
+async def create_reserva_estoque_v2(
+    reserva: ReservaEstoqueCreate,
+    seller_id: str = Depends(get_required_seller_id),
+    reserva_estoque_service: ReservaEstoqueService = Depends(Provide[Container.reserva_estoque_service]),
+):
+    """
+    Reserva unidades de um SKU por tempo limitado.
+
+    As unidades deixam de compor o disponível para venda, mas a `quantidade`
+    do estoque só é baixada quando a reserva é confirmada. Reservas não
+    confirmadas dentro do prazo são liberadas automaticamente.
+
+    Args:
+        reserva (ReservaEstoqueCreate): `sku`, `quantidade` e, opcionalmente, `ttl_seconds`.
+        seller_id (str): O ID do vendedor, extraído do cabeçalho da requisição.
+
+    Returns:
+        ReservaEstoqueResponse: A reserva criada, com sua data de expiração.
+
+    Raises:
+        HTTPException (404 Not Found): Se o item de estoque não existir.
+        HTTPException (409 Conflict): Se não houver quantidade disponível suficiente.
+    """
+    logger.info(f"Criando reserva para seller_id={seller_id}, dados={reserva.model_dump(exclude_unset=True)}")
+    return await reserva_estoque_service.reserve(seller_id, reserva.sku, reserva.quantidade, reserva.ttl_seconds)
+
+
+@router.get(
+    "/{reserva_id}",
+    response_model=ReservaEstoqueResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Busca uma reserva de estoque",
+)
+@inject
+async def get_reserva_estoque_v2(
+    reserva_id: int,
+    seller_id: str = Depends(get_required_seller_id),
+    reserva_estoque_service: ReservaEstoqueService = Depends(Provide[Container.reserva_estoque_service]),
+):
+    """
+    Busca uma reserva de estoque do vendedor.
+
+    Args:
+        reserva_id (int): Identificador da reserva.
+        seller_id (str): O ID do vendedor, extraído do cabeçalho da requisição.
+
+    Returns:
+        ReservaEstoqueResponse: A reserva encontrada.
+
+    Raises:
+        HTTPException (404 Not Found): Se a reserva não existir para o vendedor.
+    """
+    return await reserva_estoque_service.get(seller_id, reserva_id)
+
+
+@router.post(
+    "/{reserva_id}/confirmar",
+    response_model=ReservaEstoqueResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Confirma uma reserva, baixando o estoque",
+)
+@inject
+async def confirm_reserva_estoque_v2(
+    reserva_id: int,
+    seller_id: str = Depends(get_required_seller_id),
+    reserva_estoque_service: ReservaEstoqueService = Depends(Provide[Container.reserva_estoque_service]),
+):
+    """
+    Confirma uma reserva ativa, baixando definitivamente a quantidade reservada.
+
+    Args:
+        reserva_id (int): Identificador da reserva.
+        seller_id (str): O ID do vendedor, extraído do cabeçalho da requisição.
+
+    Returns:
+        ReservaEstoqueResponse: A reserva confirmada.
+
+    Raises:
+        HTTPException (404 Not Found): Se a reserva não existir para o vendedor.
+        HTTPException (409 Conflict): Se a reserva já foi confirmada, liberada ou expirou.
+    """
+    logger.info(f"Confirmando reserva {reserva_id} para seller_id={seller_id}")
+    return await reserva_estoque_service.confirm(seller_id, reserva_id)
+
+
+@router.post(
+    "/{reserva_id}/liberar",
+    response_model=ReservaEstoqueResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Libera uma reserva, devolvendo as unidades ao disponível",
+)
+@inject
+async def release_reserva_estoque_v2(
+    reserva_id: int,
+    seller_id: str = Depends(get_required_seller_id),
+    reserva_estoque_service: ReservaEstoqueService = Depends(Provide[Container.reserva_estoque_service]),
+):
+    """
+    Libera uma reserva ativa sem alterar a quantidade do estoque.
+
+    Args:
+        reserva_id (int): Identificador da reserva.
+        seller_id (str): O ID do vendedor, extraído do cabeçalho da requisição.
+
+    Returns:
+        ReservaEstoqueResponse: A reserva liberada.
+
+    Raises:
+        HTTPException (404 Not Found): Se a reserva não existir para o vendedor.
+        HTTPException (409 Conflict): Se a reserva já foi confirmada, liberada ou expirou.
+    """
+    logger.info(f"Liberando reserva {reserva_id} para seller_id={seller_id}")
+    return await reserva_estoque_service.release(seller_id, reserva_id)
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from pydantic import ConfigDict, Field
+
+from app.api.common.schemas import SchemaType
+
+
+class LimiteEstoqueUpdate(SchemaType):
+    """Limite de estoque baixo"""
+
+    limite: int = Field(..., ge=0, description="Quantidade igual ou abaixo da qual o estoque é considerado baixo")
+
+
+class EstoqueBaixoResponse(SchemaType):
+    """Schema de resposta para um SKU com estoque baixo."""
+
+    sku: str = Field(..., description="SKU do Produto")
+    quantidade: int = Field(..., description="Quantidade atual")
+    limite: int = Field(..., description="Limite de estoque baixo aplicado ao SKU")
+    updated_at: datetime = Field(..., description="Data da última alteração do estoque")
+
+    model_config = ConfigDict(from_attributes=True)
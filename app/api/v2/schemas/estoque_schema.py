@@ -1,4 +1,4 @@
-from pydantic import Field
+from pydantic import Field, computed_field
 
 from app.api.common.schemas import ResponseEntity, SchemaType
 from app.models.estoque_model import Estoque
@@ -10,6 +10,13 @@ class EstoqueSchema(SchemaType):
 
 class EstoqueResponseV2(EstoqueSchema, ResponseEntity):
     """Resposta adicionando"""
+    version: int | None = Field(None, description="Versão do registro, a mesma enviada no header ETag")
+    quantidade_reservada: int = Field(0, description="Unidades retidas por reservas ativas")
+
+    @computed_field(description="Quantidade disponível para venda (quantidade - quantidade_reservada)")
+    @property
+    def quantidade_disponivel(self) -> int:
+        return max(self.quantidade - self.quantidade_reservada, 0)
 
 class EstoqueCreateV2(EstoqueSchema):
     """Schema para criação de Estoques"""
@@ -19,4 +26,8 @@ class EstoqueCreateV2(EstoqueSchema):
 
 class EstoqueUpdateV2(SchemaType):
     """Permite apenas a atualização da quantidade"""
-    quantidade: int = Field(..., ge=0, description="Quantidade deve ser maior ou igual a zero")
\ No newline at end of file
+    quantidade: int = Field(..., ge=0, description="Quantidade deve ser maior ou igual a zero")
+
+class EstoqueBaixaV2(SchemaType):
+    """Quantidade a baixar do estoque"""
+    quantidade: int = Field(..., gt=0, description="Quantidade a baixar, maior que zero")
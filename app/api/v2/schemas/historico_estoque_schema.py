@@ -16,4 +16,31 @@ class HistoricoEstoqueResponse(ResponseEntity, SchemaType):
     tipo_movimentacao: TipoMovimentacaoEnum = Field(..., description="Tipo da movimentação")
     movimentado_em: datetime = Field(..., description="Data e hora da movimentação")
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ResumoHistoricoEstoqueResponse(SchemaType):
+    """Schema de resposta para o resumo das movimentações de um SKU em um período."""
+
+    sku: str = Field(..., description="SKU do Produto")
+    periodo: datetime = Field(..., description="Início do período agregado (UTC)")
+    movimentacoes: int = Field(..., description="Total de movimentações no período")
+    movimentacoes_por_tipo: dict[TipoMovimentacaoEnum, int] = Field(
+        ..., description="Total de movimentações no período por tipo"
+    )
+    delta_liquido: int = Field(..., description="Variação líquida da quantidade no período")
+    quantidade_minima: int | None = Field(None, description="Menor quantidade registrada no período")
+    quantidade_maxima: int | None = Field(None, description="Maior quantidade registrada no período")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PosicaoEstoqueResponse(SchemaType):
+    """Schema de resposta para a quantidade de um SKU em um instante passado."""
+
+    sku: str = Field(..., description="SKU do Produto")
+    quantidade: int = Field(..., description="Quantidade no instante consultado")
+    movimentado_em: datetime = Field(..., description="Data da última movimentação (ou do snapshot) até o instante")
+    tipo_movimentacao: TipoMovimentacaoEnum | None = Field(None, description="Tipo da última movimentação")
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from pydantic import ConfigDict, Field
+
+from app.api.common.schemas import ResponseEntity, SchemaType
+from app.models.reserva_estoque_model import StatusReservaEnum
+
+
+class ReservaEstoqueCreate(SchemaType):
+    """Schema para criação de reservas de estoque"""
+
+    sku: str = Field(..., min_length=1, description="sku não pode ser vazio")
+    quantidade: int = Field(..., gt=0, description="Quantidade a reservar, maior que zero")
+    ttl_seconds: int | None = Field(None, ge=1, description="Validade da reserva em segundos")
+
+
+class ReservaEstoqueResponse(ResponseEntity, SchemaType):
+    """Schema de resposta para uma reserva de estoque."""
+
+    seller_id: str = Field(..., description="ID do Vendedor")
+    sku: str = Field(..., description="SKU do Produto")
+    quantidade: int = Field(..., description="Quantidade reservada")
+    status: StatusReservaEnum = Field(..., description="Situação da reserva")
+    expira_em: datetime = Field(..., description="Data e hora de expiração da reserva")
+
+    model_config = ConfigDict(from_attributes=True)
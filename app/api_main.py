@@ -38,6 +38,8 @@ def init() -> FastAPI:
     container.wire(modules=["app.api.common.routers.health_check_routers"])
     container.wire(modules=["app.api.v2.routers.estoque_router"])
     container.wire(modules=["app.api.v2.routers.historico_estoque_router"])
+    container.wire(modules=["app.api.v2.routers.reserva_estoque_router"])
+    container.wire(modules=["app.api.v2.routers.alerta_estoque_router"])
 
 
     # Outros middlewares podem ser adicionados aqui se necessário
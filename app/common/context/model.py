@@ -14,3 +14,4 @@ class AppContext(BaseModel):
     sub: str | None = None
     trace_id: str | None = None
     scope: AppContextScope | None = None
+    sellers: frozenset[str] = frozenset()
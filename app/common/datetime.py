@@ -1,4 +1,4 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 
 
 def utcnow() -> datetime:
@@ -6,3 +6,14 @@ def utcnow() -> datetime:
     # Trunca os microssegundos mantendo somente milissegundos
     # O mongodb não armazena microssegundos
     return now.replace(microsecond=(now.microsecond // 1000) * 1000)
+
+
+def month_start(value: datetime | date) -> date:
+    """Retorna o primeiro dia do mês de `value`."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    """Soma (ou subtrai) meses a uma data de início de mês."""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
@@ -21,6 +21,7 @@ class ErrorCodes(Enum):
     FORBIDDEN = ErrorInfo("FORBIDDEN", "Forbidden", HTTPStatus.FORBIDDEN)
     NOT_FOUND = ErrorInfo("NOT_FOUND", "Not found", HTTPStatus.NOT_FOUND)
     CONFLICT = ErrorInfo("CONFLICT", "Conflict", HTTPStatus.CONFLICT)
+    PRECONDITION_FAILED = ErrorInfo("PRECONDITION_FAILED", "Precondition Failed", HTTPStatus.PRECONDITION_FAILED)
     UNPROCESSABLE_ENTITY = ErrorInfo("UNPROCESSABLE_ENTITY", "Unprocessable Entity", HTTPStatus.UNPROCESSABLE_ENTITY)
     SERVER_ERROR = ErrorInfo("INTERNAL_SERVER_ERROR", "Internal Server Error", HTTPStatus.INTERNAL_SERVER_ERROR)
 
@@ -3,6 +3,7 @@ from .bad_request_exception import BadRequestException
 from .conflict_exception import ConflictException
 from .forbidden_exception import ForbiddenException
 from .not_found_exception import NotFoundException
+from .precondition_failed_exception import PreconditionFailedException
 from .unauthorized_exception import UnauthorizedException
 
 __all__ = [
@@ -12,4 +13,5 @@ __all__ = [
     "UnauthorizedException",
     "NotFoundException",
     "ConflictException",
+    "PreconditionFailedException",
 ]
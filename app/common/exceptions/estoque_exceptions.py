@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 
-from app.common.exceptions import BadRequestException, NotFoundException
+from app.common.exceptions import BadRequestException, ConflictException, NotFoundException, PreconditionFailedException
 
 if TYPE_CHECKING:
     from app.api.common.schemas.response import ErrorDetail
@@ -25,18 +25,163 @@ class EstoqueNotFoundException(NotFoundException):
 
 
 class EstoqueBadRequestException(BadRequestException):
-    def __init__(self, message: str, field: str = None, value=None, details: list["ErrorDetail"] | None = None):
+    def __init__(
+        self,
+        message: str,
+        field: str = None,
+        value=None,
+        details: list["ErrorDetail"] | None = None,
+        location: str = "body",
+    ):
         if details is None:
             from app.api.common.schemas.response import ErrorDetail
 
             details = [
                 ErrorDetail(
                     message=message,
-                    location= "body",
+                    location=location,
                     slug="estoque_invalido",
                     field=field,
                     ctx={"value": value} if value is not None else {},
                 )
             ]
         super().__init__(details=details)
-        self.detail = details 
\ No newline at end of file
+        self.detail = details
+
+
+class EstoqueVersionConflictException(ConflictException):
+    def __init__(self, seller_id: str, sku: str, details: list["ErrorDetail"] | None = None):
+        if details is None:
+            from app.api.common.schemas.response import ErrorDetail
+
+            details = [
+                ErrorDetail(
+                    message="Estoque alterado por outra requisição. Tente novamente.",
+                    location="body",
+                    slug="estoque_conflito_versao",
+                    field="sku",
+                    ctx={"seller_id": seller_id, "sku": sku},
+                )
+            ]
+        super().__init__(details=details)
+
+
+class EstoquePreconditionFailedException(PreconditionFailedException):
+    def __init__(
+        self,
+        seller_id: str,
+        sku: str,
+        expected_version: int,
+        current_version: int,
+        details: list["ErrorDetail"] | None = None,
+    ):
+        if details is None:
+            from app.api.common.schemas.response import ErrorDetail
+
+            details = [
+                ErrorDetail(
+                    message="A versão informada no If-Match não corresponde à versão atual do estoque.",
+                    location="header",
+                    slug="estoque_versao_divergente",
+                    field="If-Match",
+                    ctx={
+                        "seller_id": seller_id,
+                        "sku": sku,
+                        "expected_version": expected_version,
+                        "current_version": current_version,
+                    },
+                )
+            ]
+        super().__init__(details=details)
+
+
+class EstoqueIndisponivelException(ConflictException):
+    def __init__(self, seller_id: str, sku: str, quantidade: int, details: list["ErrorDetail"] | None = None):
+        if details is None:
+            from app.api.common.schemas.response import ErrorDetail
+
+            details = [
+                ErrorDetail(
+                    message="Quantidade disponível insuficiente.",
+                    location="body",
+                    slug="estoque_indisponivel",
+                    field="quantidade",
+                    ctx={"seller_id": seller_id, "sku": sku, "quantidade": quantidade},
+                )
+            ]
+        super().__init__(details=details)
+
+
+class EstoqueReservadoException(ConflictException):
+    def __init__(
+        self,
+        seller_id: str,
+        sku: str,
+        quantidade_reservada: int,
+        message: str,
+        details: list["ErrorDetail"] | None = None,
+    ):
+        if details is None:
+            from app.api.common.schemas.response import ErrorDetail
+
+            details = [
+                ErrorDetail(
+                    message=message,
+                    location="body",
+                    slug="estoque_reservado",
+                    field="quantidade",
+                    ctx={"seller_id": seller_id, "sku": sku, "quantidade_reservada": quantidade_reservada},
+                )
+            ]
+        super().__init__(details=details)
+
+
+class EstoqueContadorQuenteException(ConflictException):
+    def __init__(self, seller_id: str, sku: str, message: str, details: list["ErrorDetail"] | None = None):
+        if details is None:
+            from app.api.common.schemas.response import ErrorDetail
+
+            details = [
+                ErrorDetail(
+                    message=message,
+                    location="path",
+                    slug="estoque_contador_quente",
+                    field="sku",
+                    ctx={"seller_id": seller_id, "sku": sku},
+                )
+            ]
+        super().__init__(details=details)
+
+
+class ReservaNotFoundException(NotFoundException):
+    def __init__(self, seller_id: str, reserva_id: int, details: list["ErrorDetail"] | None = None):
+        if details is None:
+            from app.api.common.schemas.response import ErrorDetail
+
+            details = [
+                ErrorDetail(
+                    message="Reserva de estoque não encontrada.",
+                    location="path",
+                    slug="reserva_nao_encontrada",
+                    field="reserva_id",
+                    ctx={"seller_id": seller_id, "reserva_id": reserva_id},
+                )
+            ]
+        super().__init__(details=details)
+
+
+class ReservaNaoAtivaException(ConflictException):
+    def __init__(self, reserva_id: int, status: str, details: list["ErrorDetail"] | None = None):
+        if details is None:
+            from app.api.common.schemas.response import ErrorDetail
+
+            details = [
+                ErrorDetail(
+                    message="A reserva não está mais ativa.",
+                    location="path",
+                    slug="reserva_nao_ativa",
+                    field="reserva_id",
+                    ctx={"reserva_id": reserva_id, "status": status},
+                )
+            ]
+        super().__init__(details=details)
@@ -0,0 +1,106 @@
+"""
+Métricas da aplicação no formato do Prometheus.
+
+A API as expõe em `/metrics` (ver `metrics_path` em ApiSettings) e o worker em um servidor
+HTTP próprio (ver `worker_metrics_port` em WorkerSettings).
+"""
+
+import functools
+import time
+from typing import Awaitable, Callable, ParamSpec, TypeVar
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+# Buckets (em segundos) para operações rápidas: Redis, consultas e cache
+BUCKETS_RAPIDOS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# Buckets (em segundos) para jobs do worker, que podem levar minutos
+BUCKETS_JOBS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# ----- API -----
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Duração das requisições HTTP por rota",
+    ["method", "route", "status"],
+)
+
+# ----- Banco de dados -----
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Duração dos métodos dos repositórios",
+    ["repository", "method"],
+    buckets=BUCKETS_RAPIDOS,
+)
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out_connections", "Conexões do pool em uso")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow_connections", "Conexões abertas além do tamanho do pool")
+
+# ----- Redis -----
+REDIS_OPERATION_DURATION = Histogram(
+    "redis_operation_duration_seconds",
+    "Duração das operações no Redis",
+    ["operation"],
+    buckets=BUCKETS_RAPIDOS,
+)
+REDIS_CACHE_LOOKUPS = Counter(
+    "redis_cache_lookups_total",
+    "Leituras de chaves no Redis, por resultado (hit ou miss)",
+    ["operation", "result"],
+)
+
+# ----- Autenticação -----
+AUTH_TOKEN_CACHE_LOOKUPS = Counter(
+    "auth_token_cache_lookups_total",
+    "Consultas ao cache de tokens validados, por resultado (hit ou miss)",
+    ["result"],
+)
+
+# ----- Worker -----
+WORKER_JOB_DURATION = Histogram(
+    "worker_job_duration_seconds",
+    "Duração das execuções dos jobs do worker",
+    ["tipo", "result"],
+    buckets=BUCKETS_JOBS,
+)
+
+HIT = "hit"
+MISS = "miss"
+
+
+def medir_repositorio(repository: str, method: str):
+    """
+    Decorator que registra a duração de um método assíncrono de repositório, inclusive quando falha.
+    """
+    histogram = DB_QUERY_DURATION.labels(repository, method)
+
+    def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            inicio = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - inicio)
+
+        return wrapper
+
+    return decorator
+
+
+def registrar_pool(pool) -> None:
+    """
+    Passa a reportar as conexões em uso e excedentes do pool do SQLAlchemy.
+    Pools sem esses contadores (ex.: NullPool) são ignorados.
+    """
+    if hasattr(pool, "checkedout"):
+        DB_POOL_CHECKED_OUT.set_function(pool.checkedout)
+    if hasattr(pool, "overflow"):
+        DB_POOL_OVERFLOW.set_function(lambda: max(pool.overflow(), 0))
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Retorna as métricas no formato texto do Prometheus e o seu content type.
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
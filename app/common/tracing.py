@@ -0,0 +1,137 @@
+"""
+Tracing opcional com OpenTelemetry.
+
+Desligado por padrão (`tracing_exporter = "none"`): os pontos instrumentados só verificam uma flag.
+Ligado, cada requisição vira um trace com spans para a autenticação, os serviços, os repositórios,
+o Redis e as buscas de chaves no IDP, todos com o X-Request-ID da requisição.
+
+O SDK e os exportadores não fazem parte das dependências básicas:
+    pip install opentelemetry-sdk                          # console e file
+    pip install opentelemetry-exporter-otlp-proto-http     # otlp
+"""
+
+import functools
+import inspect
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Awaitable, Callable, ParamSpec, TypeVar
+
+from asgi_correlation_id import correlation_id
+from opentelemetry import trace
+from pclogging import LoggingBuilder
+
+if TYPE_CHECKING:
+    from app.settings import AppSettings
+
+logger = LoggingBuilder.get_logger(__name__)
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+EXPORTER_NONE = "none"
+EXPORTER_CONSOLE = "console"
+EXPORTER_FILE = "file"
+EXPORTER_OTLP = "otlp"
+
+# Atributo com o X-Request-ID da requisição, presente em todos os spans
+ATTR_REQUEST_ID = "http.request.header.x-request-id"
+
+tracer = trace.get_tracer("pc-estoque")
+
+_habilitado = False
+
+
+def tracing_habilitado() -> bool:
+    return _habilitado
+
+
+def start_span(name: str, **attributes):
+    """
+    Context manager de um span filho do span corrente, ou um nullcontext com o tracing desligado.
+    """
+    if not _habilitado:
+        return nullcontext()
+    return tracer.start_as_current_span(name, attributes=attributes or None)
+
+
+def traced(name: str, **attributes):
+    """
+    Decorator que executa a função assíncrona dentro de um span.
+    """
+
+    def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            if not _habilitado:
+                return await func(*args, **kwargs)
+            with tracer.start_as_current_span(name, attributes=attributes or None):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def trace_methods(prefix: str | None = None, **attributes):
+    """
+    Decorator de classe que cria um span `<prefixo>.<método>` para cada método assíncrono público.
+    """
+
+    def decorator(cls):
+        for name, method in list(vars(cls).items()):
+            if not name.startswith("_") and inspect.iscoroutinefunction(method):
+                setattr(cls, name, traced(f"{prefix or cls.__name__}.{name}", **attributes)(method))
+        return cls
+
+    return decorator
+
+
+def configure_tracing(settings: "AppSettings") -> bool:
+    """
+    Instala o TracerProvider com o exportador configurado. Retorna False (tracing desligado)
+    se o exportador for "none" ou se o SDK não estiver instalado.
+    """
+    global _habilitado
+
+    if settings.tracing_exporter == EXPORTER_NONE:
+        return False
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import SpanProcessor, TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    except ImportError:
+        logger.warning("Tracing configurado, mas o opentelemetry-sdk não está instalado; seguindo sem tracing.")
+        return False
+
+    class RequestIdSpanProcessor(SpanProcessor):
+        """Marca cada span com o X-Request-ID da requisição em andamento."""
+
+        def on_start(self, span, parent_context=None):
+            if request_id := correlation_id.get():
+                span.set_attribute(ATTR_REQUEST_ID, request_id)
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.app_name, "service.version": settings.version}),
+        sampler=ParentBased(TraceIdRatioBased(settings.tracing_sample_ratio)),
+    )
+    provider.add_span_processor(RequestIdSpanProcessor())
+    provider.add_span_processor(BatchSpanProcessor(_build_exporter(settings)))
+    trace.set_tracer_provider(provider)
+    _habilitado = True
+    logger.info(f"Tracing habilitado com o exportador '{settings.tracing_exporter}'.")
+    return True
+
+
+def _build_exporter(settings: "AppSettings"):
+    if settings.tracing_exporter == EXPORTER_OTLP:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint)
+
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+    if settings.tracing_exporter == EXPORTER_FILE:
+        # Um span por linha, em JSON, para análise offline
+        out = open(settings.tracing_file_path, "a", encoding="utf-8")  # noqa: SIM115 - aberto enquanto o processo roda
+        return ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+    return ConsoleSpanExporter()
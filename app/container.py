@@ -3,10 +3,20 @@ from dependency_injector import containers, providers
 from app.integrations.auth.keycloak_adapter import KeycloakAdapter
 from app.integrations.database.sqlalchemy_client import SQLAlchemyClient
 from app.integrations.kv_db.redis_asyncio_adapter import RedisAsyncioAdapter
+from app.integrations.kv_db.redis_hot_counter import RedisHotCounter
+from app.integrations.kv_db.redis_job_queue import RedisJobQueue
+from app.integrations.notifications.notification_dispatcher import NotificationDispatcher
+from app.integrations.notifications.notification_sink import LogNotificationSink
 from app.repositories import EstoqueRepository
+from app.repositories.alerta_estoque_repository import AlertaEstoqueRepository
+from app.repositories.contador_quente_repository import ContadorQuenteRepository
 from app.repositories.historico_estoque_repository import HistoricoEstoqueRepository
+from app.repositories.reserva_estoque_repository import ReservaEstoqueRepository
 from app.services import EstoqueServices, HealthCheckService
+from app.services.alerta_estoque_service import AlertaEstoqueService
+from app.services.contador_quente_service import ContadorQuenteService
 from app.services.historico_estoque_service import HistoricoEstoqueService
+from app.services.reserva_estoque_service import ReservaEstoqueService
 from app.settings import AppSettings
 
 
@@ -16,17 +26,44 @@ class Container(containers.DeclarativeContainer):
     settings = providers.Singleton(AppSettings)
 
     # Integrações
-    sql_client = providers.Singleton(SQLAlchemyClient, config.app_db_url)
+    sql_client = providers.Singleton(
+        SQLAlchemyClient,
+        config.app_db_url,
+        prepared_statement_cache_size=config.app_db_prepared_statement_cache_size,
+        slow_query_ms=settings.provided.app_db_slow_query_ms,
+    )
 
     # Keycloak Adapter
-    keycloak_adapter = providers.Singleton(KeycloakAdapter, config.app_openid_wellknown)
+    keycloak_adapter = providers.Singleton(
+        KeycloakAdapter,
+        config.app_openid_wellknown,
+        token_cache_size=settings.provided.auth_token_cache_size,
+        jwks_ttl_seconds=settings.provided.auth_jwks_ttl_seconds,
+        jwks_refetch_min_seconds=settings.provided.auth_jwks_refetch_min_seconds,
+    )
 
     # Redis Adapter
     redis_adapter = providers.Singleton(RedisAsyncioAdapter, config.app_redis_url)
+    hot_counter = providers.Singleton(RedisHotCounter, redis_adapter=redis_adapter)
+    job_queue = providers.Singleton(RedisJobQueue, redis_adapter=redis_adapter)
+
+    # Notificações de estoque baixo
+    notification_sink = providers.Singleton(LogNotificationSink)
+    notification_dispatcher = providers.Singleton(
+        NotificationDispatcher,
+        sink=notification_sink,
+        concorrencia=settings.provided.notificacao_concorrencia,
+        max_tentativas=settings.provided.notificacao_max_tentativas,
+        backoff_segundos=settings.provided.notificacao_backoff_segundos,
+        itens_por_digest=settings.provided.notificacao_itens_por_digest,
+    )
 
     # Repositórios
     estoque_repository = providers.Singleton(EstoqueRepository, sql_client=sql_client)
     historico_estoque_repository = providers.Singleton(HistoricoEstoqueRepository, sql_client=sql_client) 
+    reserva_estoque_repository = providers.Singleton(ReservaEstoqueRepository, sql_client=sql_client)
+    contador_quente_repository = providers.Singleton(ContadorQuenteRepository, sql_client=sql_client)
+    alerta_estoque_repository = providers.Singleton(AlertaEstoqueRepository, sql_client=sql_client)
 
 
     # Serviços
@@ -38,9 +75,30 @@ class Container(containers.DeclarativeContainer):
         repository=estoque_repository,
         redis_adapter=redis_adapter,
         historico_repository=historico_estoque_repository,
-        settings=settings
+        settings=settings,
+        hot_counter=hot_counter
     )
     historico_estoque_service = providers.Singleton(
         HistoricoEstoqueService,
-        historico_repository=historico_estoque_repository
+        historico_repository=historico_estoque_repository,
+        settings=settings
+    )
+    reserva_estoque_service = providers.Singleton(
+        ReservaEstoqueService,
+        repository=reserva_estoque_repository,
+        estoque_service=estoque_service,
+        settings=settings
+    )
+    contador_quente_service = providers.Singleton(
+        ContadorQuenteService,
+        repository=contador_quente_repository,
+        hot_counter=hot_counter,
+        estoque_service=estoque_service,
+        settings=settings
+    )
+    alerta_estoque_service = providers.Singleton(
+        AlertaEstoqueService,
+        repository=alerta_estoque_repository,
+        notification_dispatcher=notification_dispatcher,
+        settings=settings
     )
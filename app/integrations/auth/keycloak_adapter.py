@@ -1,5 +1,18 @@
+import asyncio
+import hashlib
+import time
+from contextlib import suppress
+from dataclasses import dataclass
+
 import httpx
 import jwt
+from pclogging import LoggingBuilder
+
+from app.common.metrics import AUTH_TOKEN_CACHE_LOOKUPS, HIT, MISS
+from app.common.tracing import traced
+from app.integrations.cache.ttl_cache import TTLCache
+
+logger = LoggingBuilder.get_logger(__name__)
 
 
 # ----- Exceções -----
@@ -12,49 +25,158 @@ class TokenExpiredException(OAuthException):
 class InvalidTokenException(OAuthException):
     """Token inválido"""
 
+@dataclass(frozen=True)
+class TokenInfo:
+    """Claims de um token validado e os sellers em que ele pode operar."""
+
+    claims: dict
+    sellers: frozenset[str]
+
+    @classmethod
+    def from_claims(cls, claims: dict) -> "TokenInfo":
+        sellers = claims.get("sellers", None)
+        return cls(claims=claims, sellers=frozenset(sellers.split(",")) if sellers else frozenset())
+
+
 class KeycloakAdapter:
-    def __init__(self, well_known_url: str):
+    """
+    Valida tokens emitidos pelo Keycloak (ou outro IDP OpenID).
+
+    Os claims de um token válido ficam em cache, pelo hash do token, até o seu `exp`:
+    o mesmo token reapresentado não passa de novo pela verificação da assinatura.
+    As chaves públicas já convertidas em PyJWK também ficam em cache, por kid.
+
+    O well-known e as chaves (JWKS) são carregados em `start()`, na subida da aplicação,
+    e as chaves são renovadas a cada `jwks_ttl_seconds`. Um token com kid desconhecido
+    (chave rotacionada no IDP) força uma nova busca, no máximo uma a cada
+    `jwks_refetch_min_seconds`.
+    """
+
+    def __init__(
+        self,
+        well_known_url: str,
+        token_cache_size: int = 10_000,
+        jwks_ttl_seconds: int = 600,
+        jwks_refetch_min_seconds: int = 30,
+    ):
         self.well_known_url = str(well_known_url)
+        self.jwks_ttl_seconds = jwks_ttl_seconds
+        self.jwks_refetch_min_seconds = jwks_refetch_min_seconds
         self._well_known: dict | None = None
         self._public_keys: list[dict] | None = None
+        self._public_keys_loaded_at = 0.0
+        self._keys_lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+        self._http_client: httpx.AsyncClient | None = None
+        self._jwks: dict[tuple[str, str], jwt.PyJWK] = {}
+        self._token_cache: TTLCache[bytes, TokenInfo] = TTLCache(token_cache_size)
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(timeout=5)
+        return self._http_client
 
-    def get_well_known(self) -> dict:
+    async def start(self):
+        """
+        Carrega o well-known e as chaves e inicia a renovação periódica das chaves.
+        Se o IDP estiver indisponível, as chaves são carregadas no primeiro token validado.
+        """
+        try:
+            await self.refresh_public_keys()
+        except Exception as e:
+            logger.error(f"Erro ao carregar as chaves públicas do IDP: {e}")
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def aclose(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._refresh_task
+            self._refresh_task = None
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.jwks_ttl_seconds)
+            try:
+                await self.refresh_public_keys()
+            except Exception as e:
+                logger.warning(f"Erro ao renovar as chaves públicas do IDP; mantendo as atuais: {e}")
+
+    async def get_well_known(self) -> dict:
         if self._well_known is None:
-            self._well_known = self._load_well_known()
+            self._well_known = await self._load_well_known()
         return self._well_known
 
-    def _load_well_known(self):
+    @traced("keycloak.well_known")
+    async def _load_well_known(self) -> dict:
+        """
+        Busca o well-known no IDP. Uma falha é lançada como OAuthException e nada fica em
+        cache, então a próxima chamada tenta de novo.
+        """
         try:
-            with httpx.Client() as http_client:
-                response = http_client.get(self.well_known_url, timeout=5)
-                response.raise_for_status()
-                wk = response.json()
-            return wk
+            response = await self.http_client.get(self.well_known_url, timeout=5)
+            response.raise_for_status()
+            return response.json()
         except httpx.HTTPStatusError as e:
-            print(f"Erro HTTP ao carregar well-known: {e.response.status_code} - {e.response.text}")
+            logger.error(f"Erro HTTP ao carregar well-known: {e.response.status_code} - {e.response.text}")
+            raise OAuthException("Falha ao carregar o well-known do IDP") from e
         except httpx.RequestError as e:
-            print(f"Erro de conexão ao carregar well-known: {str(e)}")
+            logger.error(f"Erro de conexão ao carregar well-known: {e}")
+            raise OAuthException("Falha ao carregar o well-known do IDP") from e
         except Exception as e:
-            print(f"Erro inesperado: {str(e)}")
+            logger.error(f"Erro inesperado ao carregar well-known: {e}")
+            raise OAuthException("Falha ao carregar o well-known do IDP") from e
 
-    def get_authorization_endpoint(self):
-        well_known = self.get_well_known()
+    async def get_authorization_endpoint(self):
+        well_known = await self.get_well_known()
         authorization_endpoint = well_known["authorization_endpoint"]
         return authorization_endpoint
 
     async def get_public_keys(self):
-        if self._public_keys is None:
-            self._public_keys = await self._fetch_public_keys()
+        if self._public_keys is None or time.monotonic() - self._public_keys_loaded_at >= self.jwks_ttl_seconds:
+            await self.refresh_public_keys(min_interval_seconds=self.jwks_ttl_seconds)
         return self._public_keys
 
+    async def refresh_public_keys(self, min_interval_seconds: float = 0) -> bool:
+        """
+        Busca as chaves no IDP, a menos que a última busca tenha sido há menos de
+        `min_interval_seconds`. Chamadas simultâneas fazem uma única busca.
+
+        :return: True se as chaves foram buscadas.
+        """
+        async with self._keys_lock:
+            if (
+                self._public_keys is not None
+                and time.monotonic() - self._public_keys_loaded_at < min_interval_seconds
+            ):
+                return False
+            keys = await self._fetch_public_keys()
+            self._set_public_keys(keys)
+            return True
+
+    def _set_public_keys(self, keys: list[dict]):
+        if keys != self._public_keys:
+            anteriores = {key.get("kid") for key in self._public_keys or []}
+            if anteriores - {key.get("kid") for key in keys}:
+                # Chave removida no IDP: tokens assinados com ela deixam de valer
+                self._token_cache.clear()
+            self._jwks.clear()
+        self._public_keys = keys
+        self._public_keys_loaded_at = time.monotonic()
+
+    @traced("keycloak.jwks")
     async def _fetch_public_keys(self) -> list:
-        well_known = self.get_well_known()
+        well_known = await self.get_well_known()
         jwks_uri = well_known["jwks_uri"]
-        async with httpx.AsyncClient() as http_client:
-            jwks_response = await http_client.get(jwks_uri)
-            jwks_response.raise_for_status()
-            keys = jwks_response.json()["keys"]
-            return keys
+        jwks_response = await self.http_client.get(jwks_uri)
+        jwks_response.raise_for_status()
+        keys = jwks_response.json()["keys"]
+        return keys
 
     @staticmethod
     def get_token_header(token: str) -> dict:
@@ -68,33 +190,55 @@ class KeycloakAdapter:
         alg = header.get("alg")
         return kid, alg
 
+    @staticmethod
+    def _find_key(public_keys: list[dict], kid: str) -> dict | None:
+        return next((public_key for public_key in public_keys if public_key.get("kid") == kid), None)
+
     async def get_alg_key_for_kid(self, kid) -> dict:
-        public_keys = await self.get_public_keys()
-        key = next((public_key for public_key in public_keys if public_key.get("kid") == kid), None)
+        key = self._find_key(await self.get_public_keys(), kid)
+        # kid desconhecido: a chave pode ter sido rotacionada depois da última busca
+        if not key and await self.refresh_public_keys(min_interval_seconds=self.jwks_refetch_min_seconds):
+            key = self._find_key(await self.get_public_keys(), kid)
         if not key:
             raise InvalidTokenException(f"Chave '{kid}' não encontrada")
         return key
 
+    async def get_jwk(self, kid: str, alg: str) -> jwt.PyJWK:
+        jwk = self._jwks.get((kid, alg))
+        if jwk is None:
+            key = await self.get_alg_key_for_kid(kid)
+            jwk = self._jwks[(kid, alg)] = jwt.PyJWK(jwk_data=key, algorithm=alg)
+        return jwk
+
+    @staticmethod
+    def _token_cache_key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
     async def validate_token(self, token: str) -> dict:
+        return (await self.get_token_info(token)).claims
+
+    async def get_token_info(self, token: str) -> TokenInfo:
+        """
+        Valida o token e retorna os claims junto com os sellers já separados.
+        """
+        cache_key = self._token_cache_key(token)
+        if (token_info := self._token_cache.get(cache_key)) is not None:
+            AUTH_TOKEN_CACHE_LOOKUPS.labels(HIT).inc()
+            return token_info
+        AUTH_TOKEN_CACHE_LOOKUPS.labels(MISS).inc()
+
         try:
             # Obtendo o kid (key id) no cabeçalho
             kid, alg = self.get_header_info_from_token(token)
-            key = await self.get_alg_key_for_kid(kid)
-            
-            try:
+            jwt_key = await self.get_jwk(kid, alg)
+
             # Verificando o token
-                jwt_key = jwt.PyJWK(jwk_data=key, algorithm=alg)
-
-                info_token = jwt.decode(
-                    token,
-                    jwt_key,                # Chave pública a ser usada
-                    algorithms=[alg],       # Qual é o algoritmo
-                    options={"verify_aud": False},  # Vou validar desconsiderando a audiência
-                )
-                print("Token validado com sucesso")
-            except Exception as e:
-                print(f"Erro ao decodificar o token: {str(e)}")
-            return info_token
+            info_token = jwt.decode(
+                token,
+                jwt_key,                # Chave pública a ser usada
+                algorithms=[alg],       # Qual é o algoritmo
+                options={"verify_aud": False},  # Vou validar desconsiderando a audiência
+            )
 
         except jwt.ExpiredSignatureError as exception:
             raise TokenExpiredException("Token expirou") from exception
@@ -106,4 +250,10 @@ class KeycloakAdapter:
             raise
 
         except Exception as e:
-            raise OAuthException("Falha ao validar o token") from e
\ No newline at end of file
+            raise OAuthException("Falha ao validar o token") from e
+
+        token_info = TokenInfo.from_claims(info_token)
+        # Sem exp o token não expira, então não é guardado
+        if isinstance(exp := info_token.get("exp"), (int, float)):
+            self._token_cache.set(cache_key, token_info, exp)
+        return token_info
@@ -335,15 +335,10 @@ async def estoque_baixo(update: Update, context: ContextTypes.DEFAULT_TYPE):
         seller_id = get_user_seller(chat_id)
 
         container = get_configured_container()
-        estoque_service = container.estoque_service()
-
-        # Lista produtos com estoque baixo do seller
-        # Usar o threshold configurado nas settings
-        produtos_baixo = await estoque_service.repository.find_all_below_threshold(settings.low_stock_threshold)
+        alerta_estoque_service = container.alerta_estoque_service()
 
-        # Filtrar apenas produtos do seller autenticado
-        produtos_do_seller = [
-            p for p in produtos_baixo if p.seller_id == seller_id]
+        # Lista produtos com estoque baixo do seller, com o limite de cada SKU
+        produtos_do_seller = await alerta_estoque_service.listar_estoque_baixo(seller_id)
 
         if not produtos_do_seller:
             await update.message.reply_text("✅ Nenhum produto seu com estoque baixo encontrado!")
@@ -352,7 +347,7 @@ async def estoque_baixo(update: Update, context: ContextTypes.DEFAULT_TYPE):
         message = "⚠️ *Seus produtos com estoque baixo:*\n\n"
         for produto in produtos_do_seller:
             message += f"📦 SKU: `{produto.sku}`\n"
-            message += f"📊 Quantidade: {produto.quantidade}\n"
+            message += f"📊 Quantidade: {produto.quantidade} (limite: {produto.limite})\n"
             message += f"📅 Atualizado: {produto.updated_at.strftime('%d/%m/%Y %H:%M')}\n\n"
 
         await update.message.reply_text(message, parse_mode='Markdown')
@@ -408,16 +403,29 @@ async def listar(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 @require_authentication
 async def config(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Mostra as configurações atuais do sistema"""
+    """Mostra as configurações atuais do sistema e os limites de estoque baixo do seller"""
     try:
-        await update.message.reply_text(
+        chat_id = update.effective_chat.id
+        seller_id = get_user_seller(chat_id)
+
+        container = get_configured_container()
+        alerta_estoque_service = container.alerta_estoque_service()
+        limites = await alerta_estoque_service.listar_limites(seller_id)
+
+        message = (
             f"⚙️ **Configurações do Sistema:**\n\n"
-            f"📊 Limite de estoque baixo: **{settings.low_stock_threshold} unidades**\n"
+            f"📊 Limite de estoque baixo: **{limites.limite} unidades**\n"
             f"📱 Versão do sistema: **{settings.version}**\n"
             f"🏪 Nome da aplicação: **{settings.app_name}**\n\n"
-            f"💡 Produtos com quantidade ≤ {settings.low_stock_threshold} são considerados estoque baixo.",
-            parse_mode='Markdown'
         )
+        if limites.limites_sku:
+            message += "📦 SKUs com limite próprio:\n"
+            for sku, limite in sorted(limites.limites_sku.items()):
+                message += f"• `{sku}`: {limite} unidades\n"
+            message += "\n"
+        message += f"💡 Os demais produtos com quantidade ≤ {limites.limite} são considerados estoque baixo."
+
+        await update.message.reply_text(message, parse_mode='Markdown')
     except Exception as e:
         await update.message.reply_text(f"❌ Erro ao mostrar configurações: {str(e)}")
 
@@ -512,11 +520,12 @@ Este comando permite que você se identifique no sistema. Após a identificaçã
 **Uso:** `/estoque_baixo`
 
 **Descrição:** 
-Lista todos os seus produtos com estoque baixo (≤ {settings.low_stock_threshold} unidades).
+Lista todos os seus produtos com estoque baixo
+(≤ limite do produto ou do seller; padrão {settings.low_stock_threshold} unidades).
 
 **Retorna:**
 • SKU do produto
-• Quantidade atual
+• Quantidade atual e limite aplicado
 • Data da última atualização
 
 **💡 Dica:** Use este comando regularmente para controlar seu estoque!
@@ -547,7 +556,7 @@ Lista todos os seus produtos cadastrados no estoque (máximo 20 produtos).
 Mostra as configurações atuais do sistema.
 
 **Retorna:**
-• Limite de estoque baixo
+• Seu limite de estoque baixo e os SKUs com limite próprio
 • Versão do sistema
 • Nome da aplicação
 
@@ -1,19 +1,89 @@
+import re
+import time
 from contextlib import asynccontextmanager
 from typing import AsyncIterator
 
+from pclogging import LoggingBuilder
 from pydantic import PostgresDsn
-from sqlalchemy import delete, select
+from sqlalchemy import delete, event, select
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from app.common.metrics import registrar_pool
+
+logger = LoggingBuilder.get_logger(__name__)
+
 Base = declarative_base()
 
+# Quantidade de prepared statements mantidos por conexão do asyncpg
+DEFAULT_PREPARED_STATEMENT_CACHE_SIZE = 500
+
+# Tamanho máximo do SQL de uma consulta lenta no log
+SLOW_QUERY_MAX_SQL_LENGTH = 1000
+
 
 class SQLAlchemyClient:
-    def __init__(self, app_db_url: PostgresDsn):
+    def __init__(
+        self,
+        app_db_url: PostgresDsn,
+        prepared_statement_cache_size: int | None = None,
+        slow_query_ms: int = 0,
+    ):
         self.app_db_url = app_db_url
-        self.engine = create_async_engine(str(app_db_url))
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.engine = create_async_engine(
+            str(app_db_url), connect_args=self._build_connect_args(app_db_url, prepared_statement_cache_size)
+        )
         self.session_maker = sessionmaker(self.engine, expire_on_commit=False, class_=AsyncSession)
+        registrar_pool(self.engine.pool)
+        if self.slow_query_seconds > 0:
+            event.listen(self.engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(self.engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    @staticmethod
+    def _build_connect_args(app_db_url: PostgresDsn, prepared_statement_cache_size: int | None) -> dict:
+        """
+        O asyncpg prepara cada statement na primeira execução e o reaproveita na mesma conexão.
+        Como os repositórios reutilizam os mesmos statements, ampliamos o cache de prepared statements.
+        """
+        if make_url(str(app_db_url)).get_driver_name() != "asyncpg":
+            return {}
+        if prepared_statement_cache_size is None:
+            prepared_statement_cache_size = DEFAULT_PREPARED_STATEMENT_CACHE_SIZE
+        return {"prepared_statement_cache_size": prepared_statement_cache_size}
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # No contexto da execução: uma consulta que falha não deixa resto para a próxima
+        context._slow_query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duracao = time.perf_counter() - context._slow_query_start
+        if duracao >= self.slow_query_seconds:
+            logger.warning(
+                f"Consulta lenta em {duracao * 1000:.1f}ms: {self._resumir_sql(statement)} "
+                f"parâmetros={self._redigir_parametros(parameters, executemany)}"
+            )
+
+    @staticmethod
+    def _resumir_sql(statement: str) -> str:
+        sql = re.sub(r"\s+", " ", statement).strip()
+        if len(sql) > SLOW_QUERY_MAX_SQL_LENGTH:
+            sql = sql[:SLOW_QUERY_MAX_SQL_LENGTH] + "..."
+        return sql
+
+    @staticmethod
+    def _redigir_parametros(parameters, executemany: bool) -> str:
+        """
+        Descreve os parâmetros sem os valores (que podem ter dados de vendedores e produtos):
+        só os nomes, ou a quantidade quando são posicionais.
+        """
+        if executemany:
+            return f"<{len(parameters)} conjuntos>"
+        if isinstance(parameters, dict):
+            return "{" + ", ".join(f"{nome}=?" for nome in parameters) + "}"
+        return f"<{len(parameters or ())} posicionais>"
 
     def close(self):
         try:
@@ -48,4 +118,4 @@ class SQLAlchemyClient:
     @staticmethod
     def get_pk_fields(base_class) -> list[str]:
         pk_fields = [column.name for column in base_class.__table__.columns if column.primary_key]
-        return pk_fields
\ No newline at end of file
+        return pk_fields
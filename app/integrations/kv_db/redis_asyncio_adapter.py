@@ -1,12 +1,40 @@
 
 import json
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
 
 from pydantic import RedisDsn
 from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+from redis.exceptions import ResponseError
+
+from app.common.metrics import HIT, MISS, REDIS_CACHE_LOOKUPS, REDIS_OPERATION_DURATION
+from app.common.tracing import start_span
+
+
+@contextmanager
+def _medir(operation: str):
+    """Duração da operação no Redis e, com o tracing ligado, um span para ela."""
+    with start_span(f"redis.{operation}", **{"db.system": "redis", "db.operation": operation}):
+        with REDIS_OPERATION_DURATION.labels(operation).time():
+            yield
+
+
+class _ScriptMedido:
+    """Script Lua registrado, com cada execução medida como a operação `evalsha`."""
+
+    def __init__(self, script: AsyncScript):
+        self.script = script
+
+    async def __call__(self, keys: list | None = None, args: list | None = None, client: Redis | None = None):
+        with _medir("evalsha"):
+            return await self.script(keys=keys, args=args, client=client)
 
 
 class RedisAsyncioAdapter:
+    """
+    Adapter do Redis. As operações têm a duração medida (redis_operation_duration_seconds) e um span
+    próprio, exceto a leitura bloqueante dos streams, e as leituras de `get_str`/`get_json` contam hit/miss.
+    """
 
     def __init__(self, redis_url: RedisDsn):
         self.redis_url = str(redis_url)
@@ -16,14 +44,17 @@ class RedisAsyncioAdapter:
         await self.redis_client.aclose()
 
     async def exists(self, k: str) -> bool:
-        count = await self.redis_client.exists(k)
+        with _medir("exists"):
+            count = await self.redis_client.exists(k)
         ok = count > 0
         return ok
 
     async def get_str(self, key: str) -> str:
-        v = await self.redis_client.get(key)
+        with _medir("get"):
+            v = await self.redis_client.get(key)
         if v is not None:
             v = v.decode()
+        REDIS_CACHE_LOOKUPS.labels("get", HIT if v is not None else MISS).inc()
         return v
 
     async def set_str(self, k: str, v: any, expires_in_seconds: int | None = None):
@@ -34,7 +65,8 @@ class RedisAsyncioAdapter:
         if not isinstance(v, str):
             v = str(v)
 
-        await self.redis_client.set(k, v, expires_in_seconds)
+        with _medir("set"):
+            await self.redis_client.set(k, v, expires_in_seconds)
 
     async def get_json(self, key: str) -> dict | list | int | None:
         v = await self.get_str(key)
@@ -53,4 +85,103 @@ class RedisAsyncioAdapter:
         await self.set_str(key, v, expires_in_seconds)
 
     async def delete(self, key: str):
-        await self.redis_client.delete(key)
\ No newline at end of file
+        with _medir("delete"):
+            await self.redis_client.delete(key)
+
+    def register_script(self, script: str) -> _ScriptMedido:
+        """
+        Registra um script Lua; o objeto retornado é executado via EVALSHA
+        (com fallback automático para EVAL quando o script não está no servidor).
+        """
+        return _ScriptMedido(self.redis_client.register_script(script))
+
+    async def get_set_members(self, key: str) -> set[str]:
+        with _medir("smembers"):
+            members = await self.redis_client.smembers(key)
+        return {m.decode() for m in members}
+
+    async def get_hash(self, key: str) -> dict[str, str]:
+        with _medir("hgetall"):
+            v = await self.redis_client.hgetall(key)
+        return {field.decode(): value.decode() for field, value in v.items()}
+
+    async def sorted_set_add(self, key: str, member: str, score: float):
+        with _medir("zadd"):
+            await self.redis_client.zadd(key, {member: score})
+
+    async def set_if_absent(self, key: str, v: str, expires_in_seconds: int | None = None) -> bool:
+        """
+        Grava a chave somente se ela não existir (SET NX). Retorna True se gravou.
+        """
+        with _medir("set_nx"):
+            return bool(await self.redis_client.set(key, v, ex=expires_in_seconds, nx=True))
+
+    async def stream_add(self, stream: str, fields: dict[str, str], maxlen: int | None = None) -> str:
+        """
+        Adiciona uma mensagem ao stream, aparando-o aproximadamente em `maxlen` mensagens.
+        """
+        with _medir("xadd"):
+            message_id = await self.redis_client.xadd(stream, fields, maxlen=maxlen, approximate=True)
+        return message_id.decode() if isinstance(message_id, bytes) else message_id
+
+    async def stream_create_group(self, stream: str, group: str) -> bool:
+        """
+        Cria o consumer group (e o stream, se preciso) a partir do início do stream.
+        Retorna False se o grupo já existia.
+        """
+        try:
+            await self.redis_client.xgroup_create(stream, group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+            return False
+        return True
+
+    async def stream_read_group(
+        self, group: str, consumer: str, streams: list[str], count: int, block_ms: int | None = None
+    ) -> list[tuple[str, str, dict[str, str]]]:
+        """
+        Lê mensagens novas dos streams para o consumidor do grupo.
+
+        :return: Lista de (stream, id, campos).
+        """
+        response = await self.redis_client.xreadgroup(
+            group, consumer, {stream: ">" for stream in streams}, count=count, block=block_ms
+        )
+        if not response:
+            return []
+        # RESP2 devolve [[stream, mensagens], ...]; RESP3, {stream: mensagens}
+        items = response.items() if isinstance(response, dict) else response
+        return [
+            (self._decode(stream), self._decode(message_id), self._decode_fields(fields))
+            for stream, messages in items
+            for message_id, fields in messages
+        ]
+
+    async def stream_autoclaim(
+        self, stream: str, group: str, consumer: str, min_idle_ms: int, count: int
+    ) -> list[tuple[str, dict[str, str]]]:
+        """
+        Assume as mensagens pendentes há mais de `min_idle_ms` (de consumidores que caíram).
+
+        :return: Lista de (id, campos).
+        """
+        with _medir("xautoclaim"):
+            response = await self.redis_client.xautoclaim(stream, group, consumer, min_idle_ms, count=count)
+        return [
+            (self._decode(message_id), self._decode_fields(fields))
+            for message_id, fields in response[1]
+            if fields is not None
+        ]
+
+    async def stream_ack(self, stream: str, group: str, *message_ids: str) -> int:
+        with _medir("xack"):
+            return await self.redis_client.xack(stream, group, *message_ids)
+
+    @staticmethod
+    def _decode(v: bytes | str) -> str:
+        return v.decode() if isinstance(v, bytes) else v
+
+    @classmethod
+    def _decode_fields(cls, fields: dict) -> dict[str, str]:
+        return {cls._decode(field): cls._decode(value) for field, value in fields.items()}
@@ -0,0 +1,184 @@
+import json
+
+from .redis_asyncio_adapter import RedisAsyncioAdapter
+
+# Retornos do script de baixa (valores >= 0 são a nova quantidade)
+CONTADOR_INATIVO = -1
+SALDO_INSUFICIENTE = -2
+
+# Confere e baixa em uma única operação atômica no servidor.
+# O disponível considera a quantidade reservada conhecida na última consolidação. SKUs no modo
+# não aceitam novas reservas, então ela só pode ter diminuído (reservas liberadas ou expiradas).
+DECREMENT_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+local n = tonumber(ARGV[1])
+local quantidade = tonumber(redis.call('HGET', KEYS[1], 'quantidade'))
+local reservada = tonumber(redis.call('HGET', KEYS[1], 'reservada') or '0')
+if quantidade - reservada < n then
+    return -2
+end
+redis.call('HINCRBY', KEYS[1], 'pendente', -n)
+return redis.call('HINCRBY', KEYS[1], 'quantidade', -n)
+"""
+
+ENABLE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1],
+    'seller_id', ARGV[2], 'sku', ARGV[3], 'quantidade', ARGV[4], 'reservada', ARGV[5],
+    'pendente', 0, 'em_voo', 0, 'flush_id', '')
+redis.call('SADD', KEYS[2], ARGV[1])
+return 1
+"""
+
+# Move o delta pendente para "em voo" sob um flush_id. Se um flush anterior não foi
+# confirmado (worker caiu), devolve o mesmo flush_id e delta para ser reaplicado.
+CHECKPOINT_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {}
+end
+local em_voo = tonumber(redis.call('HGET', KEYS[1], 'em_voo') or '0')
+if em_voo ~= 0 then
+    return {redis.call('HGET', KEYS[1], 'flush_id'), tostring(em_voo)}
+end
+local pendente = tonumber(redis.call('HGET', KEYS[1], 'pendente') or '0')
+if pendente == 0 then
+    return {}
+end
+redis.call('HSET', KEYS[1], 'em_voo', pendente, 'pendente', 0, 'flush_id', ARGV[1])
+return {ARGV[1], tostring(pendente)}
+"""
+
+# Confirma o flush e rebaseia o contador no valor do banco somado ao que ainda está pendente.
+# Com flush_id vazio serve de reconciliação quando não há flush em voo.
+ACK_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+if redis.call('HGET', KEYS[1], 'flush_id') ~= ARGV[1] then
+    return 0
+end
+local pendente = tonumber(redis.call('HGET', KEYS[1], 'pendente') or '0')
+redis.call('HSET', KEYS[1],
+    'quantidade', tonumber(ARGV[2]) + pendente, 'reservada', ARGV[3], 'em_voo', 0, 'flush_id', '')
+return 1
+"""
+
+DISABLE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 and ARGV[2] ~= '1' then
+    local pendente = tonumber(redis.call('HGET', KEYS[1], 'pendente') or '0')
+    local em_voo = tonumber(redis.call('HGET', KEYS[1], 'em_voo') or '0')
+    if pendente ~= 0 or em_voo ~= 0 then
+        return 0
+    end
+end
+redis.call('DEL', KEYS[1])
+redis.call('SREM', KEYS[2], ARGV[1])
+return 1
+"""
+
+
+class RedisHotCounter:
+    """
+    Contadores de estoque no Redis para SKUs de alta concorrência (modo contador quente).
+
+    Cada SKU ativo é um hash com a quantidade corrente, a quantidade reservada, o delta
+    `pendente` (ainda não gravado no banco) e o delta `em_voo` (sendo gravado pelo worker).
+    Todas as transições são scripts Lua, portanto atômicas no servidor.
+    """
+
+    ACTIVE_SET_KEY = "estoque:quente"
+
+    def __init__(self, redis_adapter: RedisAsyncioAdapter):
+        self.redis_adapter = redis_adapter
+        self._decrement = redis_adapter.register_script(DECREMENT_SCRIPT)
+        self._enable = redis_adapter.register_script(ENABLE_SCRIPT)
+        self._checkpoint = redis_adapter.register_script(CHECKPOINT_SCRIPT)
+        self._ack = redis_adapter.register_script(ACK_SCRIPT)
+        self._disable = redis_adapter.register_script(DISABLE_SCRIPT)
+
+    @staticmethod
+    def _key(seller_id: str, sku: str) -> str:
+        return f"estoque:quente:{seller_id}:{sku}"
+
+    @staticmethod
+    def _member(seller_id: str, sku: str) -> str:
+        return json.dumps([seller_id, sku])
+
+    async def enable(self, seller_id: str, sku: str, quantidade: int, quantidade_reservada: int) -> bool:
+        """
+        Ativa o contador com a quantidade atual do banco. Retorna False se já estava ativo.
+        """
+        keys = [self._key(seller_id, sku), self.ACTIVE_SET_KEY]
+        args = [self._member(seller_id, sku), seller_id, sku, quantidade, quantidade_reservada]
+        return await self._enable(keys=keys, args=args) == 1
+
+    async def disable(self, seller_id: str, sku: str, force: bool = False) -> bool:
+        """
+        Desativa o contador. Sem `force`, só desativa se não houver delta a consolidar.
+        """
+        keys = [self._key(seller_id, sku), self.ACTIVE_SET_KEY]
+        args = [self._member(seller_id, sku), "1" if force else "0"]
+        return await self._disable(keys=keys, args=args) == 1
+
+    async def is_active(self, seller_id: str, sku: str) -> bool:
+        return await self.redis_adapter.exists(self._key(seller_id, sku))
+
+    async def get(self, seller_id: str, sku: str) -> dict[str, int] | None:
+        """
+        Retorna quantidade, reservada, pendente e em_voo do contador, ou None se inativo.
+        """
+        data = await self.redis_adapter.get_hash(self._key(seller_id, sku))
+        if not data:
+            return None
+        return {field: int(data.get(field) or 0) for field in ("quantidade", "reservada", "pendente", "em_voo")}
+
+    async def decrement(self, seller_id: str, sku: str, quantidade: int) -> int:
+        """
+        Baixa `quantidade` unidades se houver disponível.
+
+        :return: A nova quantidade, CONTADOR_INATIVO ou SALDO_INSUFICIENTE.
+        """
+        return int(await self._decrement(keys=[self._key(seller_id, sku)], args=[quantidade]))
+
+    async def checkpoint(self, seller_id: str, sku: str, flush_id: str) -> tuple[str, int] | None:
+        """
+        Separa o delta pendente para consolidação.
+
+        :return: (flush_id, delta) a gravar no banco ou None se não há nada a consolidar.
+                 O flush_id pode ser de uma consolidação anterior que não foi confirmada.
+        """
+        result = await self._checkpoint(keys=[self._key(seller_id, sku)], args=[flush_id])
+        if not result:
+            return None
+        pending_flush_id, delta = result
+        if isinstance(pending_flush_id, bytes):
+            pending_flush_id = pending_flush_id.decode()
+        return pending_flush_id, int(delta)
+
+    async def ack(self, seller_id: str, sku: str, flush_id: str, quantidade: int, quantidade_reservada: int) -> bool:
+        """
+        Confirma a consolidação `flush_id` e rebaseia o contador nos valores do banco.
+        """
+        keys = [self._key(seller_id, sku)]
+        return await self._ack(keys=keys, args=[flush_id, quantidade, quantidade_reservada]) == 1
+
+    async def reconcile(self, seller_id: str, sku: str, quantidade: int, quantidade_reservada: int) -> bool:
+        """
+        Rebaseia o contador nos valores do banco quando não há consolidação em voo,
+        incorporando alterações feitas por outros caminhos (ex.: reservas liberadas ou expiradas).
+        """
+        return await self.ack(seller_id, sku, "", quantidade, quantidade_reservada)
+
+    async def list_active(self) -> list[tuple[str, str]]:
+        """
+        Lista os pares (seller_id, sku) com contador ativo.
+        """
+        members = await self.redis_adapter.get_set_members(self.ACTIVE_SET_KEY)
+        return sorted(tuple(json.loads(member)) for member in members)
+
+
+__all__ = ["RedisHotCounter", "CONTADOR_INATIVO", "SALDO_INSUFICIENTE"]
@@ -0,0 +1,195 @@
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from .redis_asyncio_adapter import RedisAsyncioAdapter
+
+# Zera o tempo ocioso da mensagem (sem nova entrega) somente se ela ainda está pendente
+# com o consumidor que a executa; se outro worker já a assumiu, não a toma de volta
+HEARTBEAT_SCRIPT = """
+local pendente = redis.call('XPENDING', KEYS[1], ARGV[1], ARGV[3], ARGV[3], 1)
+if pendente[1] and pendente[1][2] == ARGV[2] then
+    redis.call('XCLAIM', KEYS[1], ARGV[1], ARGV[2], 0, ARGV[3], 'JUSTID')
+    return 1
+end
+return 0
+"""
+
+# Move para o stream os jobs adiados cujo horário já chegou, na mesma operação em que
+# os remove do sorted set, então cada um é reenfileirado uma única vez
+PROMOVER_SCRIPT = """
+local itens = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, item in ipairs(itens) do
+    local job = cjson.decode(item)
+    redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[3], '*', 'payload', job.payload, 'tentativas', job.tentativas)
+    redis.call('ZREM', KEYS[1], item)
+end
+return #itens
+"""
+
+
+@dataclass(frozen=True)
+class Job:
+    """
+    Mensagem lida de um stream de jobs. `tentativas` conta as execuções que já falharam.
+    """
+
+    id: str
+    tipo: str
+    payload: dict = field(default_factory=dict)
+    tentativas: int = 0
+
+
+class RedisJobQueue:
+    """
+    Fila de jobs do worker sobre Redis Streams, um stream por tipo de job.
+
+    Todos os workers consomem pelo mesmo consumer group, então cada mensagem é entregue
+    a um único worker. A mensagem só sai da lista de pendentes com o ack; se o worker cair
+    antes disso, outro worker a assume depois do tempo de visibilidade (claim_stale);
+    enquanto executa, o worker renova a mensagem (heartbeat) para que isso não aconteça.
+
+    Um job que falha espera no sorted set de adiados do tipo, com atraso exponencial a cada
+    tentativa, até ser devolvido ao stream (promover_adiados). Jobs que esgotam as
+    tentativas vão para o stream de falhas do tipo.
+    """
+
+    STREAM_PREFIX = "estoque:jobs"
+    GROUP = "pc-estoque-worker"
+
+    def __init__(
+        self,
+        redis_adapter: RedisAsyncioAdapter,
+        maxlen: int = 10000,
+        backoff_segundos: float = 5,
+        backoff_maximo_segundos: float = 300,
+    ):
+        self.redis_adapter = redis_adapter
+        self.maxlen = maxlen
+        self.backoff_segundos = backoff_segundos
+        self.backoff_maximo_segundos = backoff_maximo_segundos
+        self._heartbeat = redis_adapter.register_script(HEARTBEAT_SCRIPT)
+        self._promover = redis_adapter.register_script(PROMOVER_SCRIPT)
+
+    @classmethod
+    def stream(cls, tipo: str) -> str:
+        return f"{cls.STREAM_PREFIX}:{tipo}"
+
+    @classmethod
+    def dead_letter_stream(cls, tipo: str) -> str:
+        return f"{cls.STREAM_PREFIX}:{tipo}:falhas"
+
+    @classmethod
+    def delayed_key(cls, tipo: str) -> str:
+        return f"{cls.STREAM_PREFIX}:{tipo}:adiados"
+
+    @classmethod
+    def _tipo(cls, stream: str) -> str:
+        return stream.removeprefix(f"{cls.STREAM_PREFIX}:")
+
+    @staticmethod
+    def _to_job(tipo: str, message_id: str, fields: dict[str, str]) -> Job:
+        return Job(
+            id=message_id,
+            tipo=tipo,
+            payload=json.loads(fields.get("payload") or "{}"),
+            tentativas=int(fields.get("tentativas") or 0),
+        )
+
+    async def ensure_groups(self, tipos: list[str]):
+        """
+        Cria o consumer group de cada tipo, se ainda não existir.
+        """
+        for tipo in tipos:
+            await self.redis_adapter.stream_create_group(self.stream(tipo), self.GROUP)
+
+    async def enqueue(self, tipo: str, payload: dict | None = None, tentativas: int = 0) -> str:
+        fields = {"payload": json.dumps(payload or {}), "tentativas": str(tentativas)}
+        return await self.redis_adapter.stream_add(self.stream(tipo), fields, maxlen=self.maxlen)
+
+    async def enqueue_once(self, tipo: str, chave: str, ttl_seconds: int, payload: dict | None = None) -> str | None:
+        """
+        Enfileira o job só se nenhum worker já o enfileirou com a mesma `chave` nos últimos
+        `ttl_seconds`. Retorna o id da mensagem ou None se já estava enfileirado.
+        """
+        if not await self.redis_adapter.set_if_absent(f"{self.stream(tipo)}:agendado:{chave}", "1", ttl_seconds):
+            return None
+        return await self.enqueue(tipo, payload)
+
+    async def get_ultimo_agendamento(self, tipo: str) -> datetime | None:
+        """
+        Horário da agenda em que o job foi enfileirado pela última vez, ou None.
+        """
+        valor = await self.redis_adapter.get_str(f"{self.stream(tipo)}:ultimo_agendamento")
+        return datetime.fromisoformat(valor) if valor else None
+
+    async def set_ultimo_agendamento(self, tipo: str, horario: datetime):
+        await self.redis_adapter.set_str(f"{self.stream(tipo)}:ultimo_agendamento", horario.isoformat())
+
+    async def read(self, consumer: str, tipos: list[str], count: int, block_ms: int | None = None) -> list[Job]:
+        """
+        Lê até `count` jobs novos dos tipos informados, esperando até `block_ms` se não houver.
+        """
+        streams = [self.stream(tipo) for tipo in tipos]
+        messages = await self.redis_adapter.stream_read_group(self.GROUP, consumer, streams, count, block_ms)
+        return [self._to_job(self._tipo(stream), message_id, fields) for stream, message_id, fields in messages]
+
+    async def claim_stale(self, consumer: str, tipo: str, min_idle_ms: int, count: int) -> list[Job]:
+        """
+        Assume os jobs entregues a outro worker e não confirmados há mais de `min_idle_ms`.
+        """
+        messages = await self.redis_adapter.stream_autoclaim(
+            self.stream(tipo), self.GROUP, consumer, min_idle_ms, count
+        )
+        return [self._to_job(tipo, message_id, fields) for message_id, fields in messages]
+
+    async def ack(self, job: Job):
+        await self.redis_adapter.stream_ack(self.stream(job.tipo), self.GROUP, job.id)
+
+    async def heartbeat(self, consumer: str, job: Job) -> bool:
+        """
+        Zera o tempo ocioso do job pendente com `consumer` (XCLAIM JUSTID), para que outro
+        worker não o assuma enquanto ele executa.
+
+        :return: False se o job já não está pendente com `consumer`.
+        """
+        return await self._heartbeat(keys=[self.stream(job.tipo)], args=[self.GROUP, consumer, job.id]) == 1
+
+    def backoff(self, tentativas: int) -> float:
+        """
+        Espera antes da próxima execução de um job que já falhou `tentativas` vezes.
+        """
+        return min(self.backoff_maximo_segundos, self.backoff_segundos * 2 ** (tentativas - 1))
+
+    async def retry(self, job: Job, max_tentativas: int) -> bool:
+        """
+        Adia o job que falhou pelo backoff da tentativa ou, esgotadas as tentativas, move-o
+        para o stream de falhas. Em ambos os casos a mensagem original é confirmada.
+
+        :return: True se o job foi adiado para uma nova tentativa.
+        """
+        tentativas = job.tentativas + 1
+        reenfileirado = tentativas < max_tentativas
+        if reenfileirado:
+            # job_id deixa únicos os membros de jobs com o mesmo payload
+            item = json.dumps({"payload": json.dumps(job.payload), "tentativas": str(tentativas), "job_id": job.id})
+            disponivel_em = time.time() + self.backoff(tentativas)
+            await self.redis_adapter.sorted_set_add(self.delayed_key(job.tipo), item, disponivel_em)
+        else:
+            fields = {"payload": json.dumps(job.payload), "tentativas": str(tentativas), "job_id": job.id}
+            await self.redis_adapter.stream_add(self.dead_letter_stream(job.tipo), fields, maxlen=self.maxlen)
+        await self.ack(job)
+        return reenfileirado
+
+    async def promover_adiados(self, tipo: str, limite: int = 100) -> int:
+        """
+        Devolve ao stream até `limite` jobs adiados cujo backoff já terminou.
+
+        :return: Quantidade de jobs devolvidos.
+        """
+        keys = [self.delayed_key(tipo), self.stream(tipo)]
+        return int(await self._promover(keys=keys, args=[time.time(), limite, self.maxlen]))
+
+
+__all__ = ["Job", "RedisJobQueue"]
@@ -0,0 +1,79 @@
+import asyncio
+from contextlib import suppress
+from typing import Any, Awaitable, Callable
+
+from pclogging import LoggingBuilder
+
+from .redis_asyncio_adapter import RedisAsyncioAdapter
+
+logger = LoggingBuilder.get_logger(__name__)
+
+# Renova/libera somente se a lease ainda pertence a quem a adquiriu
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaseLostException(Exception):
+    """A lease expirou ou foi assumida por outro dono enquanto o trabalho executava."""
+
+
+class RedisLease:
+    """
+    Lease exclusiva com prazo, guardada em uma chave do Redis com o nome do dono.
+
+    Enquanto o dono a renova antes de expirar, ninguém mais a adquire; se o dono cair,
+    a lease expira em `ttl_seconds` e outra instância pode assumir.
+    """
+
+    def __init__(self, redis_adapter: RedisAsyncioAdapter, key: str, owner: str, ttl_seconds: int):
+        self.redis_adapter = redis_adapter
+        self.key = key
+        self.owner = owner
+        self.ttl_seconds = ttl_seconds
+        self._renew = redis_adapter.register_script(RENEW_SCRIPT)
+        self._release = redis_adapter.register_script(RELEASE_SCRIPT)
+
+    async def acquire(self) -> bool:
+        return await self.redis_adapter.set_if_absent(self.key, self.owner, self.ttl_seconds)
+
+    async def renew(self) -> bool:
+        return await self._renew(keys=[self.key], args=[self.owner, self.ttl_seconds]) == 1
+
+    async def release(self) -> bool:
+        return await self._release(keys=[self.key], args=[self.owner]) == 1
+
+    async def run_while_held(self, work: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Executa `work` com a lease já adquirida, renovando-a a cada terço do prazo, e a
+        libera ao final. Se a renovação falhar, `work` é cancelado e LeaseLostException
+        é lançada.
+        """
+        task = asyncio.ensure_future(work())
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=self.ttl_seconds / 3)
+                if done:
+                    return task.result()
+                if not await self.renew():
+                    raise LeaseLostException(f"Lease {self.key} perdida por {self.owner}")
+        finally:
+            if not task.done():
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+            with suppress(Exception):
+                await self.release()
+
+
+__all__ = ["RedisLease", "LeaseLostException"]
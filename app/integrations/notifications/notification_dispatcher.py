@@ -0,0 +1,81 @@
+import asyncio
+import random
+from itertools import batched
+
+from pclogging import LoggingBuilder
+
+from app.models.alerta_estoque_model import AlertaEstoque, DigestEstoqueBaixo
+
+from .notification_sink import NotificationSink
+
+logger = LoggingBuilder.get_logger(__name__)
+
+
+class NotificationDispatcher:
+    """
+    Agrupa os alertas de estoque baixo em um digest por vendedor e os entrega ao sink em
+    paralelo, com no máximo `concorrencia` envios ao mesmo tempo.
+
+    Um envio que falha é repetido até `max_tentativas` vezes, com espera exponencial a
+    partir de `backoff_segundos` (com jitter). A espera acontece fora do semáforo, então um
+    destino lento ou fora do ar não segura as vagas dos demais.
+    """
+
+    def __init__(
+        self,
+        sink: NotificationSink,
+        concorrencia: int = 32,
+        max_tentativas: int = 3,
+        backoff_segundos: float = 0.5,
+        itens_por_digest: int = 100,
+    ):
+        self.sink = sink
+        self.concorrencia = concorrencia
+        self.max_tentativas = max_tentativas
+        self.backoff_segundos = backoff_segundos
+        self.itens_por_digest = itens_por_digest
+
+    def agrupar(self, alertas: list[AlertaEstoque]) -> list[DigestEstoqueBaixo]:
+        """
+        Um digest por vendedor, dividido em partes de até `itens_por_digest` itens.
+        """
+        por_seller: dict[str, list[AlertaEstoque]] = {}
+        for alerta in alertas:
+            por_seller.setdefault(alerta.seller_id, []).append(alerta)
+        return [
+            DigestEstoqueBaixo(seller_id=seller_id, itens=list(parte))
+            for seller_id, itens in por_seller.items()
+            for parte in batched(itens, self.itens_por_digest)
+        ]
+
+    async def despachar(self, alertas: list[AlertaEstoque]) -> list[DigestEstoqueBaixo]:
+        """
+        Entrega os alertas agrupados por vendedor.
+
+        :return: Os digests que não foram entregues depois de todas as tentativas.
+        """
+        digests = self.agrupar(alertas)
+        semaforo = asyncio.Semaphore(self.concorrencia)
+        entregues = await asyncio.gather(*(self._enviar(digest, semaforo) for digest in digests))
+        falhas = [digest for digest, entregue in zip(digests, entregues) if not entregue]
+        if falhas:
+            logger.error(f"{len(falhas)} de {len(digests)} notificações de estoque baixo não foram entregues.")
+        return falhas
+
+    async def _enviar(self, digest: DigestEstoqueBaixo, semaforo: asyncio.Semaphore) -> bool:
+        for tentativa in range(1, self.max_tentativas + 1):
+            async with semaforo:
+                try:
+                    await self.sink.enviar(digest)
+                    return True
+                except Exception as e:
+                    logger.warning(
+                        f"Falha ao notificar o vendedor '{digest.seller_id}' "
+                        f"(tentativa {tentativa} de {self.max_tentativas}): {e}"
+                    )
+            if tentativa < self.max_tentativas:
+                await asyncio.sleep(self.backoff_segundos * 2 ** (tentativa - 1) * random.uniform(0.5, 1))
+        return False
+
+
+__all__ = ["NotificationDispatcher"]
@@ -0,0 +1,34 @@
+from abc import ABC, abstractmethod
+
+from pclogging import LoggingBuilder
+
+from app.models.alerta_estoque_model import DigestEstoqueBaixo
+
+logger = LoggingBuilder.get_logger(__name__)
+
+
+class NotificationSink(ABC):
+    """
+    Canal de entrega das notificações de estoque baixo (log, webhook, Telegram...).
+    Uma exceção em `enviar` indica falha de entrega; o envio é então repetido.
+    """
+
+    @abstractmethod
+    async def enviar(self, digest: DigestEstoqueBaixo):
+        """Entrega o digest de um vendedor."""
+
+
+class LogNotificationSink(NotificationSink):
+    """
+    Registra cada digest no log da aplicação.
+    """
+
+    async def enviar(self, digest: DigestEstoqueBaixo):
+        itens = ", ".join(f"'{item.sku}' ({item.quantidade} un.)" for item in digest.itens)
+        logger.warning(
+            f"ALERTA DE ESTOQUE BAIXO: {len(digest.itens)} produto(s) do vendedor '{digest.seller_id}' "
+            f"atingiram o limite: {itens}."
+        )
+
+
+__all__ = ["NotificationSink", "LogNotificationSink"]
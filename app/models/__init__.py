@@ -1,3 +1,4 @@
+from .alerta_estoque_model import AlertaEstoque, DigestEstoqueBaixo, EstoqueBaixo
 from .base import (
     AuditModel,
     IntModel,
@@ -10,17 +11,27 @@ from .base import (
 )
 from .estoque_model import Estoque
 from .historico_estoque_model import HistoricoEstoque, TipoMovimentacaoEnum
+from .posicao_estoque_model import PosicaoEstoque
 from .query import QueryModel
+from .reserva_estoque_model import ReservaEstoque, StatusReservaEnum
+from .resumo_historico_estoque_model import ResumoHistoricoEstoque
 
 __all__ = [
     "AuditModel",
     "PersistableEntity",
     "UuidModel",
     "UuidType",
+    "AlertaEstoque",
+    "DigestEstoqueBaixo",
+    "EstoqueBaixo",
     "Estoque",
     "HistoricoEstoque",
     "TipoMovimentacaoEnum",
+    "PosicaoEstoque",
     "QueryModel",
+    "ReservaEstoque",
+    "StatusReservaEnum",
+    "ResumoHistoricoEstoque",
     "IntModel",
     "UuidPersistableEntity",
     "SellerSkuUuidPersistableEntity",
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class AlertaEstoque(BaseModel):
+    """
+    SKU que entrou em estoque baixo e ainda não voltou para acima do limite.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    seller_id: str = Field(..., description="ID do Vendedor")
+    sku: str = Field(..., description="SKU do Produto")
+    quantidade: int = Field(..., description="Quantidade no momento do alerta")
+    alertado_em: datetime = Field(..., description="Data em que o alerta foi disparado")
+
+
+class EstoqueBaixo(BaseModel):
+    """
+    SKU com quantidade igual ou abaixo do limite de estoque baixo que vale para ele.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    seller_id: str = Field(..., description="ID do Vendedor")
+    sku: str = Field(..., description="SKU do Produto")
+    quantidade: int = Field(..., description="Quantidade atual")
+    limite: int = Field(..., description="Limite de estoque baixo do SKU, do vendedor ou o padrão da aplicação")
+    updated_at: datetime = Field(..., description="Data da última alteração do estoque")
+
+
+class LimitesEstoque(BaseModel):
+    """
+    Limites de estoque baixo que valem para os SKUs de um vendedor.
+    """
+
+    seller_id: str = Field(..., description="ID do Vendedor")
+    limite: int = Field(..., description="Limite do vendedor ou, se ele não definiu um, o padrão da aplicação")
+    limites_sku: dict[str, int] = Field(
+        default_factory=dict, description="SKUs com limite próprio, que prevalece sobre o do vendedor"
+    )
+
+
+class DigestEstoqueBaixo(BaseModel):
+    """
+    Alertas de estoque baixo de um vendedor, entregues juntos em uma única notificação.
+    """
+
+    seller_id: str = Field(..., description="ID do Vendedor")
+    itens: list[AlertaEstoque] = Field(..., description="SKUs que entraram em estoque baixo")
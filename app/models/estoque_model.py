@@ -1,6 +1,9 @@
+from pydantic import Field
+
 from app.models.base import SellerSkuIntPersistableEntity
 
 
 class Estoque(SellerSkuIntPersistableEntity):
     quantidade: int
-    
\ No newline at end of file
+    quantidade_reservada: int = Field(default=0, description="Unidades retidas por reservas ativas")
+    version: int = Field(default=1, description="Versão do registro, usada no controle de concorrência otimista")
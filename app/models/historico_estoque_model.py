@@ -1,4 +1,6 @@
 import enum
+from datetime import datetime
+from typing import cast
 
 from sqlalchemy import Column, DateTime
 from sqlalchemy import Enum as SAEnum
@@ -11,6 +13,9 @@ class TipoMovimentacaoEnum(str, enum.Enum):
     CRIACAO = "CRIACAO"
     ATUALIZACAO = "ATUALIZACAO"
     EXCLUSAO = "EXCLUSAO"
+    CONFIRMACAO_RESERVA = "CONFIRMACAO_RESERVA"
+    BAIXA = "BAIXA"
+    BAIXA_CONSOLIDADA = "BAIXA_CONSOLIDADA"
 
 class HistoricoEstoque(Base):
     __tablename__ = "pc_estoque_historico"
@@ -21,4 +26,9 @@ class HistoricoEstoque(Base):
     quantidade_anterior = Column(Integer, nullable=False)
     quantidade_nova = Column(Integer, nullable=False)
     movimentado_em = Column(DateTime, nullable=False)
-    tipo_movimentacao = Column(SAEnum(TipoMovimentacaoEnum), nullable=False)
\ No newline at end of file
+    tipo_movimentacao = Column(SAEnum(TipoMovimentacaoEnum), nullable=False)
+
+    @property
+    def chave_paginacao(self) -> tuple[datetime, int]:
+        """Chave (movimentado_em, id) da paginação por chave."""
+        return cast(datetime, self.movimentado_em), cast(int, self.id)
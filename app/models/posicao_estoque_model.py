@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from .historico_estoque_model import TipoMovimentacaoEnum
+
+
+class PosicaoEstoque(BaseModel):
+    """
+    Quantidade de um SKU em um instante passado, reconstruída a partir do histórico.
+    """
+
+    seller_id: str = Field(..., description="ID do Vendedor")
+    sku: str = Field(..., description="SKU do Produto")
+    quantidade: int = Field(..., description="Quantidade no instante consultado")
+    movimentado_em: datetime = Field(..., description="Data da última movimentação (ou do snapshot) até o instante")
+    tipo_movimentacao: TipoMovimentacaoEnum | None = Field(
+        None, description="Tipo da última movimentação; vazio quando a posição vem de um snapshot"
+    )
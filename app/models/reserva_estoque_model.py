@@ -0,0 +1,19 @@
+import enum
+from datetime import datetime
+
+from pydantic import Field
+
+from app.models.base import SellerSkuIntPersistableEntity
+
+
+class StatusReservaEnum(str, enum.Enum):
+    ATIVA = "ATIVA"
+    CONFIRMADA = "CONFIRMADA"
+    LIBERADA = "LIBERADA"
+    EXPIRADA = "EXPIRADA"
+
+
+class ReservaEstoque(SellerSkuIntPersistableEntity):
+    quantidade: int = Field(..., description="Quantidade reservada")
+    status: StatusReservaEnum = Field(default=StatusReservaEnum.ATIVA, description="Situação da reserva")
+    expira_em: datetime = Field(..., description="Data e hora em que a reserva expira se não for confirmada")
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from .historico_estoque_model import TipoMovimentacaoEnum
+
+
+class ResumoHistoricoEstoque(BaseModel):
+    """
+    Movimentações de um SKU agregadas em um período (hora ou dia, em UTC).
+    """
+
+    seller_id: str = Field(..., description="ID do Vendedor")
+    sku: str = Field(..., description="SKU do Produto")
+    periodo: datetime = Field(..., description="Início do período agregado")
+    movimentacoes: int = Field(0, description="Total de movimentações no período")
+    movimentacoes_por_tipo: dict[TipoMovimentacaoEnum, int] = Field(
+        default_factory=dict, description="Total de movimentações no período por tipo"
+    )
+    delta_liquido: int = Field(0, description="Soma de (quantidade_nova - quantidade_anterior) no período")
+    quantidade_minima: int | None = Field(None, description="Menor quantidade registrada no período")
+    quantidade_maxima: int | None = Field(None, description="Maior quantidade registrada no período")
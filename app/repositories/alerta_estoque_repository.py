@@ -0,0 +1,343 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Integer,
+    String,
+    and_,
+    bindparam,
+    delete,
+    exists,
+    func,
+    or_,
+    select,
+    true,
+    tuple_,
+    union,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import aliased
+
+from app.integrations.database.sqlalchemy_client import Base, SQLAlchemyClient
+from app.models.alerta_estoque_model import AlertaEstoque, EstoqueBaixo
+from app.models.estoque_model import Estoque
+
+from .base.sqlalchemy_crud_repository import SQLAlchemyCrudRepository
+from .estoque_repository import EstoqueBase
+
+ALERTA_CONTROLE_NOME = "estoque_baixo"
+
+# Valor de sku do limite que vale para todos os SKUs do vendedor
+LIMITE_SELLER = ""
+
+
+class AlertaEstoqueBase(Base):
+    """
+    Entidade SQLAlchemy para a tabela pc_estoque_alerta.
+
+    Um registro por SKU em estoque baixo já alertado. O registro sai da tabela quando o
+    estoque volta para acima do limite, permitindo um novo alerta na próxima queda.
+    `notificado` fica falso até a notificação ser entregue, então alertas cujo envio
+    falhou são notificados de novo na verificação seguinte.
+    """
+
+    __tablename__ = "pc_estoque_alerta"
+
+    seller_id = Column(String, primary_key=True)
+    sku = Column(String, primary_key=True)
+    quantidade = Column(Integer, nullable=False)
+    alertado_em = Column(DateTime(timezone=True), nullable=False)
+    notificado = Column(Boolean, nullable=False, server_default="false")
+
+
+class AlertaEstoqueControleBase(Base):
+    """
+    Entidade SQLAlchemy para a tabela pc_estoque_alerta_controle.
+    Guarda até onde as alterações do estoque já foram verificadas e com qual limite.
+    """
+
+    __tablename__ = "pc_estoque_alerta_controle"
+
+    nome = Column(String, primary_key=True)
+    processado_ate = Column(DateTime(timezone=True), nullable=False)
+    limite = Column(Integer, nullable=False)
+
+
+class LimiteEstoqueBase(Base):
+    """
+    Entidade SQLAlchemy para a tabela pc_estoque_limite.
+
+    Limite de estoque baixo de um SKU ou, com sku vazio, de todos os SKUs do vendedor.
+    Remover um limite grava `limite` nulo em vez de apagar o registro, para que a
+    verificação incremental enxergue a mudança pelo atualizado_em.
+    """
+
+    __tablename__ = "pc_estoque_limite"
+
+    seller_id = Column(String, primary_key=True)
+    sku = Column(String, primary_key=True, default=LIMITE_SELLER, server_default=LIMITE_SELLER)
+    limite = Column(Integer, nullable=True)
+    atualizado_em = Column(DateTime(timezone=True), nullable=False)
+
+
+def _com_limite(alvos):
+    """
+    Seleciona (seller_id, sku, quantidade, limite) de `alvos`, onde limite é o do SKU, o do
+    vendedor ou, na falta dos dois, o padrão da aplicação (b_limite).
+    """
+    limite_sku = aliased(LimiteEstoqueBase)
+    limite_seller = aliased(LimiteEstoqueBase)
+    limite = func.coalesce(limite_sku.limite, limite_seller.limite, bindparam("b_limite"))
+    return (
+        select(alvos.c.seller_id, alvos.c.sku, alvos.c.quantidade, limite.label("limite"))
+        .select_from(alvos)
+        .outerjoin(limite_sku, and_(limite_sku.seller_id == alvos.c.seller_id, limite_sku.sku == alvos.c.sku))
+        .outerjoin(
+            limite_seller, and_(limite_seller.seller_id == alvos.c.seller_id, limite_seller.sku == LIMITE_SELLER)
+        )
+    )
+
+
+class AlertaEstoqueRepository(SQLAlchemyCrudRepository[Estoque, EstoqueBase]):
+    """
+    Detecção incremental de estoque baixo: só os estoques alterados desde a última
+    verificação (updated_at), ou cujo limite mudou, são comparados ao limite.
+    """
+
+    def __init__(self, sql_client: SQLAlchemyClient):
+        super().__init__(sql_client=sql_client, model_class=Estoque, entity_base_class=EstoqueBase)
+
+    def _build_alvos(self, incremental: bool):
+        estoque = self.entity_base_class
+        if not incremental:
+            return estoque.__table__
+
+        limite = LimiteEstoqueBase
+        alterados = select(estoque.seller_id, estoque.sku, estoque.quantidade).where(
+            estoque.updated_at > bindparam("b_desde")
+        )
+        com_limite_alterado = (
+            select(estoque.seller_id, estoque.sku, estoque.quantidade)
+            .join(
+                limite,
+                and_(
+                    limite.seller_id == estoque.seller_id,
+                    or_(limite.sku == LIMITE_SELLER, limite.sku == estoque.sku),
+                ),
+            )
+            .where(limite.atualizado_em > bindparam("b_desde"))
+        )
+        return union(alterados, com_limite_alterado).subquery("alvos")
+
+    def _build_insert_alertas_statement(self, incremental: bool):
+        avaliados = _com_limite(self._build_alvos(incremental)).subquery("avaliados")
+        source = select(
+            avaliados.c.seller_id,
+            avaliados.c.sku,
+            avaliados.c.quantidade,
+            bindparam("b_agora", type_=DateTime(timezone=True)),
+        ).where(avaliados.c.quantidade <= avaliados.c.limite)
+
+        alerta = AlertaEstoqueBase
+        return (
+            insert(alerta)
+            .from_select(["seller_id", "sku", "quantidade", "alertado_em"], source)
+            .on_conflict_do_nothing(index_elements=["seller_id", "sku"])
+            .returning(alerta.seller_id, alerta.sku, alerta.quantidade, alerta.alertado_em)
+        )
+
+    def _build_delete_recuperados_statement(self, incremental: bool):
+        avaliados = _com_limite(self._build_alvos(incremental)).subquery("avaliados")
+        alerta = AlertaEstoqueBase
+        return delete(alerta).where(
+            alerta.seller_id == avaliados.c.seller_id,
+            alerta.sku == avaliados.c.sku,
+            avaliados.c.quantidade > avaliados.c.limite,
+        )
+
+    def _build_delete_orfaos_statement(self):
+        estoque = self.entity_base_class
+        alerta = AlertaEstoqueBase
+        return delete(alerta).where(~exists().where(estoque.seller_id == alerta.seller_id, estoque.sku == alerta.sku))
+
+    @staticmethod
+    def _build_set_controle_statement():
+        stmt = insert(AlertaEstoqueControleBase).values(
+            nome=ALERTA_CONTROLE_NOME, processado_ate=bindparam("b_agora"), limite=bindparam("b_limite")
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=["nome"],
+            set_={"processado_ate": stmt.excluded.processado_ate, "limite": stmt.excluded.limite},
+        )
+
+    @staticmethod
+    def _build_find_pendentes_statement():
+        alerta = AlertaEstoqueBase
+        return (
+            select(alerta.seller_id, alerta.sku, alerta.quantidade, alerta.alertado_em)
+            .where(~alerta.notificado)
+            .order_by(alerta.seller_id, alerta.sku)
+        )
+
+    @staticmethod
+    def _build_marcar_notificados_statement():
+        alerta = AlertaEstoqueBase
+        # alertado_em na chave: um alerta recriado depois da leitura continua pendente
+        chave = tuple_(alerta.seller_id, alerta.sku, alerta.alertado_em)
+        return update(alerta).where(chave.in_(bindparam("b_chaves", expanding=True))).values(notificado=true())
+
+    def _build_find_estoque_baixo_statement(self):
+        estoque = self.entity_base_class
+        limite = LimiteEstoqueBase
+        # Limite do vendedor resolvido uma única vez, para a busca ser um intervalo no
+        # índice (seller_id, quantidade)
+        limite_seller = func.coalesce(
+            select(limite.limite)
+            .where(limite.seller_id == bindparam("b_seller_id"), limite.sku == LIMITE_SELLER)
+            .scalar_subquery(),
+            bindparam("b_limite"),
+        )
+        sem_limite_proprio = select(
+            estoque.seller_id, estoque.sku, estoque.quantidade, limite_seller.label("limite"), estoque.updated_at
+        ).where(
+            estoque.seller_id == bindparam("b_seller_id"),
+            estoque.quantidade <= limite_seller,
+            ~exists().where(
+                limite.seller_id == estoque.seller_id, limite.sku == estoque.sku, limite.limite.is_not(None)
+            ),
+        )
+        com_limite_proprio = (
+            select(estoque.seller_id, estoque.sku, estoque.quantidade, limite.limite, estoque.updated_at)
+            .join(limite, and_(limite.seller_id == estoque.seller_id, limite.sku == estoque.sku))
+            .where(
+                limite.seller_id == bindparam("b_seller_id"),
+                limite.limite.is_not(None),
+                estoque.quantidade <= limite.limite,
+            )
+        )
+        consulta = union_all(sem_limite_proprio, com_limite_proprio).subquery()
+        return select(consulta).order_by(consulta.c.quantidade, consulta.c.sku)
+
+    @staticmethod
+    def _build_set_limite_statement():
+        stmt = insert(LimiteEstoqueBase).values(
+            seller_id=bindparam("b_seller_id"),
+            sku=bindparam("b_sku"),
+            limite=bindparam("b_limite"),
+            atualizado_em=bindparam("b_agora"),
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=["seller_id", "sku"],
+            set_={"limite": stmt.excluded.limite, "atualizado_em": stmt.excluded.atualizado_em},
+        )
+
+    async def get_controle(self) -> tuple[datetime, int] | None:
+        """
+        Retorna (processado_ate, limite) da última verificação, ou None se nunca houve uma.
+        """
+        stmt = select(AlertaEstoqueControleBase.processado_ate, AlertaEstoqueControleBase.limite).where(
+            AlertaEstoqueControleBase.nome == ALERTA_CONTROLE_NOME
+        )
+        async with self.sql_client.make_session() as session:
+            row = (await session.execute(stmt)).one_or_none()
+        return tuple(row) if row is not None else None
+
+    async def sincronizar_alertas(self, desde: datetime | None, limite: int, agora: datetime) -> list[AlertaEstoque]:
+        """
+        Atualiza, em uma transação, o estado dos alertas com os estoques alterados após `desde`
+        (todos, se None): registra os que caíram para o limite ou menos, remove os que voltaram
+        para acima dele ou deixaram de existir e marca a verificação como feita até `agora`.
+        `limite` é o padrão da aplicação, usado onde não há limite do SKU nem do vendedor.
+
+        :return: Os alertas novos, isto é, SKUs que não estavam alertados.
+        """
+        incremental = desde is not None
+        insert_stmt = self._get_cached_statement(
+            ("insert_alertas", incremental), lambda: self._build_insert_alertas_statement(incremental)
+        )
+        recuperados_stmt = self._get_cached_statement(
+            ("delete_recuperados", incremental), lambda: self._build_delete_recuperados_statement(incremental)
+        )
+        orfaos_stmt = self._get_cached_statement("delete_orfaos", self._build_delete_orfaos_statement)
+        controle_stmt = self._get_cached_statement("set_controle", self._build_set_controle_statement)
+
+        params = {"b_limite": limite, "b_agora": agora}
+        if incremental:
+            params["b_desde"] = desde
+        async with self.sql_client.make_session() as session:
+            async with session.begin():
+                novos = (await session.execute(insert_stmt, params)).mappings().all()
+                await session.execute(recuperados_stmt, params)
+                await session.execute(orfaos_stmt)
+                await session.execute(controle_stmt, params)
+        return [AlertaEstoque.model_validate(dict(row)) for row in novos]
+
+    async def find_alertas_pendentes(self) -> list[AlertaEstoque]:
+        """
+        Lista os alertas ainda não notificados: os novos e os que falharam antes.
+        """
+        stmt = self._get_cached_statement("find_pendentes", self._build_find_pendentes_statement)
+        async with self.sql_client.make_session() as session:
+            rows = (await session.execute(stmt)).mappings().all()
+        return [AlertaEstoque.model_validate(dict(row)) for row in rows]
+
+    async def marcar_notificados(self, alertas: list[AlertaEstoque]):
+        """
+        Marca os alertas como notificados.
+        """
+        if not alertas:
+            return
+        stmt = self._get_cached_statement("marcar_notificados", self._build_marcar_notificados_statement)
+        chaves = [(alerta.seller_id, alerta.sku, alerta.alertado_em) for alerta in alertas]
+        async with self.sql_client.make_session() as session:
+            async with session.begin():
+                await session.execute(stmt, {"b_chaves": chaves})
+
+    async def find_estoque_baixo(self, seller_id: str, limite_padrao: int) -> list[EstoqueBaixo]:
+        """
+        Lista os SKUs do vendedor com quantidade igual ou abaixo do seu limite, da menor
+        quantidade para a maior.
+        """
+        stmt = self._get_cached_statement("find_estoque_baixo", self._build_find_estoque_baixo_statement)
+        async with self.sql_client.make_session() as session:
+            rows = (await session.execute(stmt, {"b_seller_id": seller_id, "b_limite": limite_padrao})).mappings().all()
+        return [EstoqueBaixo.model_validate(dict(row)) for row in rows]
+
+    async def find_limites(self, seller_id: str) -> dict[str, int]:
+        """
+        Retorna os limites definidos para o vendedor, por SKU. O limite do próprio
+        vendedor, se houver, vem na chave LIMITE_SELLER.
+        """
+        stmt = self._get_cached_statement(
+            "find_limites",
+            lambda: select(LimiteEstoqueBase.sku, LimiteEstoqueBase.limite).where(
+                LimiteEstoqueBase.seller_id == bindparam("b_seller_id"), LimiteEstoqueBase.limite.is_not(None)
+            ),
+        )
+        async with self.sql_client.make_session() as session:
+            rows = (await session.execute(stmt, {"b_seller_id": seller_id})).all()
+        return {sku: limite for sku, limite in rows}
+
+    async def set_limite(self, seller_id: str, sku: str | None, limite: int | None, agora: datetime):
+        """
+        Define o limite de estoque baixo de um SKU ou, com `sku` None, do vendedor.
+        `limite` None remove o limite, voltando a valer o do vendedor ou o padrão.
+        """
+        stmt = self._get_cached_statement("set_limite", self._build_set_limite_statement)
+        params = {"b_seller_id": seller_id, "b_sku": sku or LIMITE_SELLER, "b_limite": limite, "b_agora": agora}
+        async with self.sql_client.make_session() as session:
+            async with session.begin():
+                await session.execute(stmt, params)
+
+
+__all__ = [
+    "AlertaEstoqueRepository",
+    "AlertaEstoqueBase",
+    "AlertaEstoqueControleBase",
+    "LimiteEstoqueBase",
+    "LIMITE_SELLER",
+]
@@ -1,7 +1,12 @@
+import inspect
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar
+from typing import Any, Callable, Generic, Hashable, TypeVar
+
+from sqlalchemy import bindparam
 
 from app.common.datetime import utcnow
+from app.common.metrics import medir_repositorio
+from app.common.tracing import traced
 from app.integrations.database.sqlalchemy_client import SQLAlchemyClient
 from app.models import Estoque, PersistableEntity, QueryModel
 
@@ -29,6 +34,53 @@ class SQLAlchemyCrudRepository(AsyncCrudRepository[T], Generic[T, B]):
         self.model_class = model_class
         self.entity_base_class = entity_base_class
         self.pk_fields = self.sql_client.get_pk_fields(self.entity_base_class)
+        self._statement_cache: dict[Hashable, Any] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Mede a duração de cada método assíncrono público do repositório (inclusive os herdados),
+        com o nome do repositório concreto, e o executa em um span (com o tracing ligado).
+        """
+        super().__init_subclass__(**kwargs)
+        for name in dir(cls):
+            if name.startswith("_"):
+                continue
+            method = getattr(cls, name)
+            if not inspect.iscoroutinefunction(method):
+                continue
+            method = traced(f"{cls.__name__}.{name}", **{"db.system": "postgresql"})(inspect.unwrap(method))
+            setattr(cls, name, medir_repositorio(cls.__name__, name)(method))
+
+    def _get_cached_statement(self, key: Hashable, builder: Callable[[], Any]):
+        """
+        Retorna um statement de formato fixo, construído uma única vez com parâmetros nomeados (bindparam).
+        Reaproveitar o mesmo objeto evita remontar a cadeia select()/where() e recalcular a chave
+        do cache de compilação do SQLAlchemy a cada chamada.
+        """
+        stmt = self._statement_cache.get(key)
+        if stmt is None:
+            stmt = self._statement_cache[key] = builder()
+        return stmt
+
+    def _build_find_by_seller_id_sku_statement(self):
+        stmt = self.sql_client.init_select_estoque(self.entity_base_class)
+        return stmt.where(self.entity_base_class.seller_id == bindparam("seller_id")).where(
+            self.entity_base_class.sku == bindparam("sku")
+        )
+
+    def _build_delete_by_seller_id_sku_statement(self):
+        stmt = self.sql_client.init_delete_estoque(self.entity_base_class)
+        return stmt.where(self.entity_base_class.seller_id == bindparam("seller_id")).where(
+            self.entity_base_class.sku == bindparam("sku")
+        )
+
+    def _build_find_statement(self, fields: tuple[str, ...], null_fields: tuple[str, ...] = ()):
+        stmt = self.sql_client.init_select_estoque(self.entity_base_class)
+        for field in fields:
+            stmt = stmt.where(getattr(self.entity_base_class, field) == bindparam(field))
+        for field in null_fields:
+            stmt = stmt.where(getattr(self.entity_base_class, field).is_(None))
+        return stmt.limit(bindparam("_limit")).offset(bindparam("_offset"))
 
     def to_base(self, model: T) -> B:
         model_dict = model.model_dump()
@@ -55,9 +107,8 @@ class SQLAlchemyCrudRepository(AsyncCrudRepository[T], Generic[T, B]):
         return created_model
 
     async def _find_base_by_seller_id_sku_on_session(self, seller_id: str, sku: str, session) -> B | None:
-        estoque = self.sql_client.init_select_estoque(self.entity_base_class)
-        estoque = estoque.where(self.entity_base_class.seller_id == seller_id).where(self.entity_base_class.sku == sku)
-        scalar = await session.execute(estoque)
+        stmt = self._get_cached_statement("find_by_seller_id_sku", self._build_find_by_seller_id_sku_statement)
+        scalar = await session.execute(stmt, {"seller_id": seller_id, "sku": sku})
         base = scalar.scalar_one_or_none()
         return base
 
@@ -75,47 +126,41 @@ class SQLAlchemyCrudRepository(AsyncCrudRepository[T], Generic[T, B]):
         return stmt
 
     async def find(self, filters: Q, limit: int = 20, offset: int = 0, sort: dict | None = None) -> list[T]:
-        def apply_operator(stmt, column, op, v):
-            if op == "$lt":
-                return stmt.where(column < v)
-            elif op == "$lte":
-                return stmt.where(column <= v)
-            elif op == "$gt":
-                return stmt.where(column > v)
-            elif op == "$gte":
-                return stmt.where(column >= v)
-            return stmt
+        if hasattr(filters, "to_query_dict") and callable(filters.to_query_dict):
+            filters_dict = filters.to_query_dict()
+        elif hasattr(filters, "dict") and callable(filters.dict):
+            filters_dict = filters.dict()
+        elif isinstance(filters, dict):
+            filters_dict = filters
+        else:
+            logger.error("O parâmetro filters deve ser conversível para dicionário.")
+            raise TypeError("O parâmetro filters deve ser conversível para dicionário.")
+
+        # O formato do statement depende apenas dos campos filtrados; os valores seguem como parâmetros.
+        # Filtros None viram IS NULL no próprio statement, já que "= NULL" nunca casa.
+        filters_dict = {field: value for field, value in filters_dict.items() if hasattr(self.entity_base_class, field)}
+        params = {field: value for field, value in filters_dict.items() if value is not None}
+        fields = tuple(sorted(params))
+        null_fields = tuple(sorted(filters_dict.keys() - params.keys()))
+        stmt = self._get_cached_statement(
+            ("find", fields, null_fields), lambda: self._build_find_statement(fields, null_fields)
+        )
+        params["_limit"] = limit
+        params["_offset"] = offset
 
         async with self.sql_client.make_session() as session:
-            stmt = self.sql_client.init_select_estoque(self.entity_base_class)
-            if hasattr(filters, "to_query_dict") and callable(filters.to_query_dict):
-                filters_dict = filters.to_query_dict()
-            elif hasattr(filters, "dict") and callable(filters.dict):
-                filters_dict = filters.dict()
-            elif isinstance(filters, dict):
-                filters_dict = filters
-            else:
-                logger.error("O parâmetro filters deve ser conversível para dicionário.")
-                raise TypeError("O parâmetro filters deve ser conversível para dicionário.")
-
-            for field, value in filters_dict.items():
-                if hasattr(self.entity_base_class, field):
-                    stmt = stmt.where(getattr(self.entity_base_class, field) == value)
-
-            stmt = stmt.limit(limit).offset(offset)
-            result = await session.execute(stmt)
+            result = await session.execute(stmt, params)
             bases = result.scalars().all()
             models = [model for base in bases if (model := self.to_model(base)) is not None]
             return models
-        
+
     async def delete_by_seller_id_and_sku(self, seller_id: str, sku: str) -> bool:
         async with self.sql_client.make_session() as session:
             async with session.begin():
-                stmt = self.sql_client.init_delete_estoque(self.entity_base_class)
-                stmt = stmt.where(self.entity_base_class.seller_id == seller_id).where(
-                    self.entity_base_class.sku == sku
+                stmt = self._get_cached_statement(
+                    "delete_by_seller_id_sku", self._build_delete_by_seller_id_sku_statement
                 )
-                result = await session.execute(stmt)
+                result = await session.execute(stmt, {"seller_id": seller_id, "sku": sku})
             deleted = result.rowcount > 0
             if deleted:
                 logger.info(f"Entidade deletada: seller_id={seller_id}, sku={sku}")
@@ -0,0 +1,125 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, bindparam, delete, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.common.exceptions.estoque_exceptions import EstoqueIndisponivelException
+from app.integrations.database.sqlalchemy_client import Base, SQLAlchemyClient
+from app.models.estoque_model import Estoque
+from app.models.historico_estoque_model import TipoMovimentacaoEnum
+
+from .base.sqlalchemy_crud_repository import SQLAlchemyCrudRepository
+from .estoque_repository import EstoqueBase
+from .historico_estoque_repository import HistoricoEstoqueBase
+
+
+class ContadorQuenteFlushBase(Base):
+    """
+    Entidade SQLAlchemy para a tabela pc_estoque_contador_flush.
+
+    Registra cada consolidação de contador quente aplicada ao banco. A chave é o flush_id
+    gerado no Redis, o que torna a reaplicação de um mesmo flush (após falha do worker) inócua.
+    """
+
+    __tablename__ = "pc_estoque_contador_flush"
+    __table_args__ = (Index("idx_contador_flush_aplicado_em", "aplicado_em"),)
+
+    flush_id = Column(String(36), primary_key=True)
+    seller_id = Column(String, nullable=False)
+    sku = Column(String, nullable=False)
+    delta = Column(Integer, nullable=False)
+    aplicado_em = Column(DateTime(timezone=True), nullable=False)
+
+
+class ContadorQuenteRepository(SQLAlchemyCrudRepository[Estoque, EstoqueBase]):
+    """
+    Consolidação, no pc_estoque, dos deltas acumulados pelos contadores quentes do Redis.
+    """
+
+    def __init__(self, sql_client: SQLAlchemyClient):
+        super().__init__(sql_client=sql_client, model_class=Estoque, entity_base_class=EstoqueBase)
+
+    @staticmethod
+    def _build_register_flush_statement():
+        return (
+            insert(ContadorQuenteFlushBase)
+            .values(
+                flush_id=bindparam("b_flush_id"),
+                seller_id=bindparam("b_seller_id"),
+                sku=bindparam("b_sku"),
+                delta=bindparam("b_delta"),
+                aplicado_em=bindparam("b_now"),
+            )
+            .on_conflict_do_nothing(index_elements=["flush_id"])
+            .returning(ContadorQuenteFlushBase.flush_id)
+        )
+
+    def _build_apply_delta_statement(self):
+        base = self.entity_base_class
+        return (
+            update(base)
+            .where(
+                base.seller_id == bindparam("b_seller_id"),
+                base.sku == bindparam("b_sku"),
+                base.quantidade + bindparam("b_delta") >= 0,
+            )
+            .values(
+                quantidade=base.quantidade + bindparam("b_delta"),
+                version=base.version + 1,
+                updated_at=bindparam("b_now"),
+            )
+            .returning(base)
+        )
+
+    async def apply_delta(
+        self, flush_id: str, seller_id: str, sku: str, delta: int, now: datetime
+    ) -> tuple[Estoque | None, bool]:
+        """
+        Aplica o delta de um flush ao estoque e grava um registro de histórico consolidado,
+        tudo na mesma transação do registro do flush_id.
+
+        :return: (estoque atual, aplicado). `aplicado` é False quando o flush_id já havia sido
+                 gravado anteriormente; nesse caso o estoque é apenas relido.
+        :raises EstoqueIndisponivelException: Se o delta deixaria a quantidade negativa; nada
+                 é gravado e o flush continua em voo.
+        """
+        params = {"b_flush_id": flush_id, "b_seller_id": seller_id, "b_sku": sku, "b_delta": delta, "b_now": now}
+        register_stmt = self._get_cached_statement("register_flush", self._build_register_flush_statement)
+        apply_stmt = self._get_cached_statement("apply_delta", self._build_apply_delta_statement)
+        async with self.sql_client.make_session() as session:
+            async with session.begin():
+                registered = (await session.execute(register_stmt, params)).scalar_one_or_none()
+                if registered is None:
+                    base = await self._find_base_by_seller_id_sku_on_session(seller_id, sku, session)
+                    return self.to_model(base), False
+
+                base = (await session.execute(apply_stmt, params)).scalar_one_or_none()
+                if base is None:
+                    atual = await self._find_base_by_seller_id_sku_on_session(seller_id, sku, session)
+                    if atual is not None:
+                        raise EstoqueIndisponivelException(seller_id=seller_id, sku=sku, quantidade=-delta)
+                else:
+                    session.add(
+                        HistoricoEstoqueBase(
+                            seller_id=seller_id,
+                            sku=sku,
+                            quantidade_anterior=base.quantidade - delta,
+                            quantidade_nova=base.quantidade,
+                            tipo_movimentacao=TipoMovimentacaoEnum.BAIXA_CONSOLIDADA.value,
+                            movimentado_em=now,
+                        )
+                    )
+        return self.to_model(base), True
+
+    async def purge_flushes(self, before: datetime) -> int:
+        """
+        Remove os registros de flush aplicados antes de `before`.
+        """
+        stmt = delete(ContadorQuenteFlushBase).where(ContadorQuenteFlushBase.aplicado_em < before)
+        async with self.sql_client.make_session() as session:
+            async with session.begin():
+                result = await session.execute(stmt)
+        return result.rowcount
+
+
+__all__ = ["ContadorQuenteRepository", "ContadorQuenteFlushBase"]
@@ -1,20 +1,32 @@
 from typing import Any, Dict, Optional, TypeVar
 
+from app.common.datetime import utcnow
 from app.integrations.database.sqlalchemy_client import SQLAlchemyClient
 from app.models.estoque_model import Estoque
+from app.models.historico_estoque_model import HistoricoEstoque, TipoMovimentacaoEnum
 
 from .base.sqlalchemy_crud_repository import SQLAlchemyCrudRepository
 from .base.sqlalchemy_entity_base import SellerIdSkuPersistableEntityBase
+from .historico_estoque_repository import HistoricoEstoqueRepository
 
 T = TypeVar("T", bound=Estoque)
 B = TypeVar("B", bound=SellerIdSkuPersistableEntityBase)
 
-from sqlalchemy import Column, Integer, select
+from sqlalchemy import Column, Index, Integer, bindparam, update
 
 
 class EstoqueBase(SellerIdSkuPersistableEntityBase):
     __tablename__ = "pc_estoque"
+    __table_args__ = (
+        # Detecção incremental de estoque baixo: o worker só lê o que mudou desde a última verificação
+        Index("idx_estoque_updated_at", "updated_at"),
+        # Estoque baixo de um vendedor: intervalo em quantidade, respondido só pelo índice
+        Index("idx_estoque_seller_id_quantidade", "seller_id", "quantidade", postgresql_include=["sku", "updated_at"]),
+    )
+
     quantidade = Column(Integer, nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    quantidade_reservada = Column(Integer, nullable=False, default=0, server_default="0")
 
 class EstoqueRepository(SQLAlchemyCrudRepository[Estoque, EstoqueBase]):
 
@@ -25,6 +37,19 @@ class EstoqueRepository(SQLAlchemyCrudRepository[Estoque, EstoqueBase]):
         """
         super().__init__(sql_client=sql_client, model_class=Estoque, entity_base_class=EstoqueBase)
 
+    async def create(self, model: Estoque, historico: HistoricoEstoque | None = None) -> Estoque:
+        """
+        Cria um estoque. Com `historico`, grava-o no outbox na mesma transação.
+        """
+        if historico is None:
+            return await super().create(model)
+
+        base = self.to_base(model)
+        async with self.sql_client.make_session() as session:
+            async with session.begin():
+                session.add(base)
+                HistoricoEstoqueRepository.stage_outbox(session, historico)
+        return self.to_model(base)
 
     async def find_by_seller_id_and_sku(self, seller_id: str, sku: str) -> Optional[Dict[str, Any]]:
         """
@@ -40,17 +65,116 @@ class EstoqueRepository(SQLAlchemyCrudRepository[Estoque, EstoqueBase]):
 
         return result
     
-    async def find_all_below_threshold(self, threshold: int) -> list[Estoque]:
+    def _build_update_quantidade_by_version_statement(self):
+        base = self.entity_base_class
+        return (
+            update(base)
+            .where(
+                base.seller_id == bindparam("b_seller_id"),
+                base.sku == bindparam("b_sku"),
+                base.version == bindparam("b_expected_version"),
+                # Reservas não alteram a versão: a nova quantidade ainda precisa cobrir o que está reservado
+                base.quantidade_reservada <= bindparam("b_quantidade"),
+            )
+            .values(
+                quantidade=bindparam("b_quantidade"),
+                version=base.version + 1,
+                updated_at=bindparam("b_updated_at"),
+            )
+            .returning(base)
+        )
+
+    async def update_quantidade_by_version(
+        self,
+        seller_id: str,
+        sku: str,
+        quantidade: int,
+        expected_version: int,
+        historico: HistoricoEstoque | None = None,
+    ) -> Estoque | None:
         """
-        Encontra todos os registros de estoque que estão abaixo ou no limite especificado.
+        Atualiza a quantidade somente se o registro ainda estiver na versão esperada
+        (UPDATE ... WHERE version = :v), incrementando a versão na mesma instrução.
+
+        :param seller_id: ID do vendedor.
+        :param sku: Código do produto.
+        :param quantidade: Nova quantidade.
+        :param expected_version: Versão lida antes da alteração.
+        :param historico: Se informado, é gravado no outbox na mesma transação da atualização.
+        :return: Estoque atualizado ou None se o registro não existe, foi alterado por outra requisição
+                 ou tem mais unidades reservadas que a nova quantidade.
         """
+        stmt = self._get_cached_statement(
+            "update_quantidade_by_version", self._build_update_quantidade_by_version_statement
+        )
+        params = {
+            "b_seller_id": seller_id,
+            "b_sku": sku,
+            "b_expected_version": expected_version,
+            "b_quantidade": quantidade,
+            "b_updated_at": utcnow(),
+        }
         async with self.sql_client.make_session() as session:
-            stmt = select(self.entity_base_class).where(
-                self.entity_base_class.quantidade <= threshold
+            async with session.begin():
+                result = await session.execute(stmt, params)
+                base = result.scalar_one_or_none()
+                if base is not None and historico is not None:
+                    HistoricoEstoqueRepository.stage_outbox(session, historico)
+        return self.to_model(base)
+
+    def _build_decrement_quantidade_statement(self):
+        base = self.entity_base_class
+        return (
+            update(base)
+            .where(
+                base.seller_id == bindparam("b_seller_id"),
+                base.sku == bindparam("b_sku"),
+                base.quantidade - base.quantidade_reservada >= bindparam("b_quantidade"),
             )
-            result = await session.execute(stmt)
-            entities = result.scalars().all()
-            return [Estoque.model_validate(entity) for entity in entities]
+            .values(
+                quantidade=base.quantidade - bindparam("b_quantidade"),
+                version=base.version + 1,
+                updated_at=bindparam("b_updated_at"),
+            )
+            .returning(base)
+        )
+
+    async def decrement_quantidade(
+        self, seller_id: str, sku: str, quantidade: int, registrar_historico: bool = False
+    ) -> Estoque | None:
+        """
+        Baixa a quantidade em uma única instrução, somente se houver disponível
+        (quantidade - quantidade_reservada) suficiente.
+
+        :param seller_id: ID do vendedor.
+        :param sku: Código do produto.
+        :param quantidade: Unidades a baixar.
+        :param registrar_historico: Grava a movimentação (BAIXA) no outbox na mesma transação.
+        :return: Estoque atualizado ou None se o registro não existe ou não há disponível suficiente.
+        """
+        stmt = self._get_cached_statement("decrement_quantidade", self._build_decrement_quantidade_statement)
+        now = utcnow()
+        params = {"b_seller_id": seller_id, "b_sku": sku, "b_quantidade": quantidade, "b_updated_at": now}
+        async with self.sql_client.make_session() as session:
+            async with session.begin():
+                result = await session.execute(stmt, params)
+                base = result.scalar_one_or_none()
+                if base is not None and registrar_historico:
+                    historico = HistoricoEstoque(
+                        seller_id=seller_id,
+                        sku=sku,
+                        quantidade_anterior=base.quantidade + quantidade,
+                        quantidade_nova=base.quantidade,
+                        tipo_movimentacao=TipoMovimentacaoEnum.BAIXA,
+                        movimentado_em=now,
+                    )
+                    HistoricoEstoqueRepository.stage_outbox(session, historico)
+        return self.to_model(base)
+
+    def _build_delete_by_seller_id_sku_statement(self):
+        # Um estoque com reservas ativas não pode ser removido
+        stmt = super()._build_delete_by_seller_id_sku_statement()
+        return stmt.where(self.entity_base_class.quantidade_reservada == 0)
 
     async def update_by_seller_id_and_sku(self, seller_id: str, sku: str, estoque_update: Estoque) -> Dict[str, Any]:
         """
@@ -64,15 +188,27 @@ class EstoqueRepository(SQLAlchemyCrudRepository[Estoque, EstoqueBase]):
         result = await super().update_by_seller_id_and_sku(seller_id, sku, estoque_update)
         return result
 
-    async def delete_by_seller_id_and_sku(self, seller_id: str, sku: str) -> None:
+    async def delete_by_seller_id_and_sku(
+        self, seller_id: str, sku: str, historico: HistoricoEstoque | None = None
+    ) -> bool:
         """
-        Remove um estoque da memória com base no ID.
+        Remove um estoque com base no seller_id + sku.
 
         :param seller_id: ID do vendedor.
         :param sku: Código do produto.
-        :return: None
+        :param historico: Se informado, é gravado no outbox na mesma transação da exclusão.
+        :return: True se o estoque foi removido; False se não existe ou tem reservas ativas.
         """
-        deleted = await super().delete_by_seller_id_and_sku(seller_id, sku)
+        if historico is None:
+            return await super().delete_by_seller_id_and_sku(seller_id, sku)
+
+        stmt = self._get_cached_statement("delete_by_seller_id_sku", self._build_delete_by_seller_id_sku_statement)
+        async with self.sql_client.make_session() as session:
+            async with session.begin():
+                result = await session.execute(stmt, {"seller_id": seller_id, "sku": sku})
+                deleted = result.rowcount > 0
+                if deleted:
+                    HistoricoEstoqueRepository.stage_outbox(session, historico)
         return deleted
 
 
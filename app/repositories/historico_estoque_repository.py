@@ -1,10 +1,35 @@
-from datetime import datetime
+import re
+from datetime import date, datetime
 from typing import List
 
-from sqlalchemy import Column, DateTime, Integer, String, select
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    bindparam,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    null,
+    or_,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import distinct_on
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from app.integrations.database.sqlalchemy_client import SQLAlchemyClient
-from app.models.historico_estoque_model import HistoricoEstoque
+from app.common.datetime import add_months
+from app.integrations.database.sqlalchemy_client import Base, SQLAlchemyClient
+from app.models.historico_estoque_model import HistoricoEstoque, TipoMovimentacaoEnum
+from app.models.posicao_estoque_model import PosicaoEstoque
+from app.models.resumo_historico_estoque_model import ResumoHistoricoEstoque
 from app.repositories.base.sqlalchemy_crud_repository import SQLAlchemyCrudRepository
 from app.repositories.base.sqlalchemy_entity_base import PersistableEntityBase
 
@@ -12,15 +37,159 @@ from app.repositories.base.sqlalchemy_entity_base import PersistableEntityBase
 class HistoricoEstoqueBase(PersistableEntityBase):
     """
     Entidade SQLAlchemy para a tabela pc_estoque_historico.
+
+    A tabela é particionada por mês em movimentado_em (pc_estoque_historico_pAAAAMM), por isso
+    a coluna faz parte da chave primária.
     """
     __tablename__ = "pc_estoque_historico"
+    __table_args__ = {"postgresql_partition_by": "RANGE (movimentado_em)"}
 
     seller_id = Column(String, nullable=False, index=True)
     sku = Column(String, nullable=False, index=True)
     quantidade_anterior = Column(Integer, nullable=False)
     quantidade_nova = Column(Integer, nullable=False)
     tipo_movimentacao = Column(String(20), nullable=False)
-    movimentado_em = Column(DateTime(timezone=True), nullable=False, index=True)
+    movimentado_em = Column(DateTime(timezone=True), primary_key=True, nullable=False, index=True)
+
+
+class HistoricoEstoqueOutboxBase(Base):
+    """
+    Entidade SQLAlchemy para a tabela pc_estoque_historico_outbox.
+
+    Registros de histórico gravados na mesma transação da alteração do estoque e
+    movidos em lote para pc_estoque_historico pelo worker.
+    """
+    __tablename__ = "pc_estoque_historico_outbox"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    seller_id = Column(String, nullable=False)
+    sku = Column(String, nullable=False)
+    quantidade_anterior = Column(Integer, nullable=False)
+    quantidade_nova = Column(Integer, nullable=False)
+    tipo_movimentacao = Column(String(20), nullable=False)
+    movimentado_em = Column(DateTime(timezone=True), nullable=False)
+
+
+class HistoricoResumoBase(Base):
+    """
+    Colunas comuns dos resumos do histórico: uma linha por seller_id, período, sku e tipo de movimentação.
+    """
+    __abstract__ = True
+
+    seller_id = Column(String, primary_key=True)
+    periodo = Column(DateTime(timezone=True), primary_key=True)
+    sku = Column(String, primary_key=True)
+    tipo_movimentacao = Column(String(20), primary_key=True)
+    movimentacoes = Column(Integer, nullable=False)
+    delta_liquido = Column(BigInteger, nullable=False)
+    quantidade_minima = Column(Integer, nullable=False)
+    quantidade_maxima = Column(Integer, nullable=False)
+
+
+class HistoricoResumoHoraBase(HistoricoResumoBase):
+    """
+    Entidade SQLAlchemy para a tabela pc_estoque_historico_resumo_hora (períodos de uma hora, em UTC).
+    """
+    __tablename__ = "pc_estoque_historico_resumo_hora"
+
+
+class HistoricoResumoDiaBase(HistoricoResumoBase):
+    """
+    Entidade SQLAlchemy para a tabela pc_estoque_historico_resumo_dia (períodos de um dia, em UTC).
+    """
+    __tablename__ = "pc_estoque_historico_resumo_dia"
+
+
+class HistoricoResumoControleBase(Base):
+    """
+    Entidade SQLAlchemy para a tabela pc_estoque_historico_resumo_controle.
+    Guarda até onde o histórico já foi resumido pelo worker.
+    """
+    __tablename__ = "pc_estoque_historico_resumo_controle"
+
+    nome = Column(String, primary_key=True)
+    processado_ate = Column(DateTime(timezone=True), nullable=False)
+
+
+class EstoqueSnapshotBase(Base):
+    """
+    Entidade SQLAlchemy para a tabela pc_estoque_snapshot.
+
+    Quantidade de cada SKU existente em `tirado_em`, derivada do histórico. Serve de ponto de
+    partida para as consultas de posição em um instante, que só percorrem o histórico posterior.
+    """
+    __tablename__ = "pc_estoque_snapshot"
+    __table_args__ = (Index("idx_estoque_snapshot_tirado_em", "tirado_em"),)
+
+    seller_id = Column(String, primary_key=True)
+    tirado_em = Column(DateTime(timezone=True), primary_key=True)
+    sku = Column(String, primary_key=True)
+    quantidade = Column(Integer, nullable=False)
+
+
+RESUMO_CONTROLE_NOME = "resumo"
+RESUMO_KEY_COLUMNS = ("seller_id", "periodo", "sku", "tipo_movimentacao")
+RESUMO_VALUE_COLUMNS = ("movimentacoes", "delta_liquido", "quantidade_minima", "quantidade_maxima")
+
+
+def _utc_trunc(field: str, column):
+    # Trunca em UTC, independentemente do TimeZone da sessão; as constantes são literais para
+    # que a mesma expressão possa ser repetida no GROUP BY
+    utc = literal_column("'UTC'")
+    return func.timezone(utc, func.date_trunc(literal_column(f"'{field}'"), func.timezone(utc, column)))
+
+
+def _upsert_resumo(resumo_class, source):
+    stmt = pg_insert(resumo_class).from_select(RESUMO_KEY_COLUMNS + RESUMO_VALUE_COLUMNS, source)
+    return stmt.on_conflict_do_update(
+        index_elements=list(RESUMO_KEY_COLUMNS),
+        set_={column: stmt.excluded[column] for column in RESUMO_VALUE_COLUMNS},
+    )
+
+
+def _agrupar_resumos(bases) -> List[ResumoHistoricoEstoque]:
+    """
+    Junta as linhas de cada tipo de movimentação em um resumo por sku e período, mantendo a ordem.
+    """
+    resumos: dict[tuple, ResumoHistoricoEstoque] = {}
+    for base in bases:
+        resumo = resumos.get((base.periodo, base.sku))
+        if resumo is None:
+            resumo = resumos[(base.periodo, base.sku)] = ResumoHistoricoEstoque(
+                seller_id=base.seller_id,
+                sku=base.sku,
+                periodo=base.periodo,
+                quantidade_minima=base.quantidade_minima,
+                quantidade_maxima=base.quantidade_maxima,
+            )
+        resumo.movimentacoes += base.movimentacoes
+        resumo.movimentacoes_por_tipo[TipoMovimentacaoEnum(base.tipo_movimentacao)] = base.movimentacoes
+        resumo.delta_liquido += base.delta_liquido
+        resumo.quantidade_minima = min(resumo.quantidade_minima, base.quantidade_minima)
+        resumo.quantidade_maxima = max(resumo.quantidade_maxima, base.quantidade_maxima)
+    return list(resumos.values())
+
+
+HISTORICO_COLUMNS = (
+    "seller_id", "sku", "quantidade_anterior", "quantidade_nova", "tipo_movimentacao", "movimentado_em"
+)
+
+HISTORICO_PARTITION_PREFIX = f"{HistoricoEstoqueBase.__tablename__}_p"
+HISTORICO_PARTITION_PATTERN = re.compile(rf"^{HISTORICO_PARTITION_PREFIX}(\d{{4}})(\d{{2}})$")
+# Recebe as linhas de meses sem partição (ver a migração 9a3e6d1f4b27)
+HISTORICO_DEFAULT_PARTITION = f"{HistoricoEstoqueBase.__tablename__}_default"
+
+DEFAULT_PARTITION_EXISTS_SQL = text("SELECT to_regclass(:name) IS NOT NULL")
+
+LIST_PARTITIONS_SQL = text(
+    """
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = :parent
+    """
+)
 
 
 class HistoricoEstoqueRepository(SQLAlchemyCrudRepository[HistoricoEstoque, HistoricoEstoqueBase]):
@@ -54,6 +223,417 @@ class HistoricoEstoqueRepository(SQLAlchemyCrudRepository[HistoricoEstoque, Hist
                 session.add(base)
         return self.to_model(base)
 
+    @staticmethod
+    def stage_outbox(session, historico: HistoricoEstoque):
+        """
+        Adiciona o histórico ao outbox na transação corrente da sessão, para que seja
+        gravado atomicamente com a alteração do estoque que o originou.
+        """
+        session.add(
+            HistoricoEstoqueOutboxBase(
+                seller_id=historico.seller_id,
+                sku=historico.sku,
+                quantidade_anterior=historico.quantidade_anterior,
+                quantidade_nova=historico.quantidade_nova,
+                tipo_movimentacao=TipoMovimentacaoEnum(historico.tipo_movimentacao).value,
+                movimentado_em=historico.movimentado_em,
+            )
+        )
+
+    def _build_move_from_outbox_statement(self):
+        outbox = HistoricoEstoqueOutboxBase.__table__
+        pending_ids = (
+            select(outbox.c.id)
+            .order_by(outbox.c.id)
+            .limit(bindparam("b_limit"))
+            .with_for_update(skip_locked=True)
+        )
+        moved = (
+            delete(outbox)
+            .where(outbox.c.id.in_(pending_ids.scalar_subquery()))
+            .returning(*[outbox.c[column] for column in HISTORICO_COLUMNS])
+            .cte("moved")
+        )
+        return insert(self.entity_base_class.__table__).from_select(
+            HISTORICO_COLUMNS,
+            select(*[moved.c[column] for column in HISTORICO_COLUMNS]),
+            include_defaults=False,
+        )
+
+    async def move_from_outbox(self, limit: int) -> int:
+        """
+        Move até `limit` registros do outbox para o histórico em uma única instrução
+        (DELETE ... RETURNING encadeado em INSERT ... SELECT), sem trafegar as linhas.
+
+        :return: Quantidade de registros movidos.
+        """
+        stmt = self._get_cached_statement("move_from_outbox", self._build_move_from_outbox_statement)
+        async with self.sql_client.make_session() as session:
+            async with session.begin():
+                result = await session.execute(stmt, {"b_limit": limit})
+        return result.rowcount
+
+    @staticmethod
+    def partition_name(month: date) -> str:
+        return f"{HISTORICO_PARTITION_PREFIX}{month:%Y%m}"
+
+    async def list_partitions(self) -> dict[date, str]:
+        """
+        Lista as partições mensais existentes, indexadas pelo mês que cobrem.
+        A partição default (linhas fora de qualquer mês criado) não é listada.
+        """
+        parent = self.entity_base_class.__tablename__
+        async with self.sql_client.make_session() as session:
+            result = await session.execute(LIST_PARTITIONS_SQL, {"parent": parent})
+            names = result.scalars().all()
+
+        partitions = {}
+        for name in names:
+            if match := HISTORICO_PARTITION_PATTERN.match(name):
+                partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+        return dict(sorted(partitions.items()))
+
+    async def create_partitions(self, months: List[date]) -> List[str]:
+        """
+        Cria as partições mensais que ainda não existem, cada uma em sua transação.
+        Os limites são em UTC: [primeiro dia do mês, primeiro dia do mês seguinte).
+
+        O Postgres não cria a partição de um mês que já tem linhas na partição default.
+        Por isso a default é desanexada, as linhas do mês passam para a partição nova
+        e a default é anexada de volta, tudo na mesma transação.
+
+        :return: Nomes das partições criadas.
+        """
+        existing = await self.list_partitions()
+        parent = self.entity_base_class.__tablename__
+        columns = ", ".join(column.name for column in self.entity_base_class.__table__.columns)
+        created = []
+        for month in months:
+            if month in existing:
+                continue
+            name = self.partition_name(month)
+            start, end = f"{month.isoformat()} 00:00:00+00", f"{add_months(month, 1).isoformat()} 00:00:00+00"
+            async with self.sql_client.make_session() as session:
+                async with session.begin():
+                    has_default = (
+                        await session.execute(DEFAULT_PARTITION_EXISTS_SQL, {"name": HISTORICO_DEFAULT_PARTITION})
+                    ).scalar()
+                    if has_default:
+                        await session.execute(
+                            text(f"ALTER TABLE {parent} DETACH PARTITION {HISTORICO_DEFAULT_PARTITION}")
+                        )
+                    await session.execute(
+                        text(
+                            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {parent} "
+                            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+                        )
+                    )
+                    if has_default:
+                        await session.execute(
+                            text(
+                                f"WITH movidos AS (DELETE FROM {HISTORICO_DEFAULT_PARTITION} "
+                                f"WHERE movimentado_em >= '{start}' AND movimentado_em < '{end}' "
+                                f"RETURNING {columns}) "
+                                f"INSERT INTO {name} ({columns}) SELECT {columns} FROM movidos"
+                            )
+                        )
+                        await session.execute(
+                            text(f"ALTER TABLE {parent} ATTACH PARTITION {HISTORICO_DEFAULT_PARTITION} DEFAULT")
+                        )
+            created.append(name)
+        return created
+
+    async def drop_partitions_before(self, month: date) -> List[str]:
+        """
+        Desanexa e remove as partições de meses anteriores a `month`. Apagar o histórico
+        antigo é um DROP TABLE por mês, sem DELETE linha a linha nem VACUUM posterior.
+
+        :return: Nomes das partições removidas.
+        """
+        parent = self.entity_base_class.__tablename__
+        dropped = []
+        for partition_month, name in (await self.list_partitions()).items():
+            if partition_month >= month:
+                break
+            async with self.sql_client.make_session() as session:
+                async with session.begin():
+                    await session.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {name}"))
+                    await session.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+        return dropped
+
+    def _build_refresh_resumo_hora_statement(self):
+        historico = self.entity_base_class
+        periodo = _utc_trunc("hour", historico.movimentado_em)
+        source = (
+            select(
+                historico.seller_id,
+                periodo,
+                historico.sku,
+                historico.tipo_movimentacao,
+                func.count(),
+                func.sum(historico.quantidade_nova - historico.quantidade_anterior),
+                func.min(historico.quantidade_nova),
+                func.max(historico.quantidade_nova),
+            )
+            .where(
+                historico.movimentado_em >= bindparam("b_inicio"),
+                historico.movimentado_em < bindparam("b_fim"),
+            )
+            .group_by(historico.seller_id, periodo, historico.sku, historico.tipo_movimentacao)
+        )
+        return _upsert_resumo(HistoricoResumoHoraBase, source)
+
+    @staticmethod
+    def _build_refresh_resumo_dia_statement():
+        hora = HistoricoResumoHoraBase
+        periodo = _utc_trunc("day", hora.periodo)
+        source = (
+            select(
+                hora.seller_id,
+                periodo,
+                hora.sku,
+                hora.tipo_movimentacao,
+                func.sum(hora.movimentacoes),
+                func.sum(hora.delta_liquido),
+                func.min(hora.quantidade_minima),
+                func.max(hora.quantidade_maxima),
+            )
+            .where(hora.periodo >= bindparam("b_dia_inicio"), hora.periodo < bindparam("b_fim"))
+            .group_by(hora.seller_id, periodo, hora.sku, hora.tipo_movimentacao)
+        )
+        return _upsert_resumo(HistoricoResumoDiaBase, source)
+
+    @staticmethod
+    def _build_set_resumo_processado_ate_statement():
+        stmt = pg_insert(HistoricoResumoControleBase).values(
+            nome=RESUMO_CONTROLE_NOME, processado_ate=bindparam("b_fim")
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=["nome"], set_={"processado_ate": stmt.excluded.processado_ate}
+        )
+
+    async def get_resumo_processado_ate(self) -> datetime | None:
+        """
+        Retorna até onde o histórico já foi resumido, ou None se nunca foi.
+        """
+        stmt = select(HistoricoResumoControleBase.processado_ate).where(
+            HistoricoResumoControleBase.nome == RESUMO_CONTROLE_NOME
+        )
+        async with self.sql_client.make_session() as session:
+            return (await session.execute(stmt)).scalar_one_or_none()
+
+    async def find_first_movimentado_em(self) -> datetime | None:
+        """
+        Retorna a data da movimentação mais antiga do histórico.
+        """
+        async with self.sql_client.make_session() as session:
+            return (await session.execute(select(func.min(self.entity_base_class.movimentado_em)))).scalar()
+
+    async def refresh_resumos(self, inicio: datetime, fim: datetime):
+        """
+        Recalcula, em uma transação, os resumos por hora das movimentações em [inicio, fim),
+        os resumos por dia dos dias que esse intervalo toca e a marca de processado até `fim`.
+        Os valores são substituídos (não somados), então reprocessar um intervalo é inócuo.
+        `inicio` deve estar no início de uma hora UTC.
+        """
+        dia_inicio = inicio.replace(hour=0, minute=0, second=0, microsecond=0)
+        params = {"b_inicio": inicio, "b_fim": fim, "b_dia_inicio": dia_inicio}
+        hora_stmt = self._get_cached_statement("refresh_resumo_hora", self._build_refresh_resumo_hora_statement)
+        dia_stmt = self._get_cached_statement("refresh_resumo_dia", self._build_refresh_resumo_dia_statement)
+        controle_stmt = self._get_cached_statement(
+            "set_resumo_processado_ate", self._build_set_resumo_processado_ate_statement
+        )
+        async with self.sql_client.make_session() as session:
+            async with session.begin():
+                await session.execute(hora_stmt, params)
+                await session.execute(dia_stmt, params)
+                await session.execute(controle_stmt, params)
+
+    @staticmethod
+    def _build_find_resumos_statement(resumo_class):
+        return (
+            select(resumo_class)
+            .where(
+                resumo_class.seller_id == bindparam("b_seller_id"),
+                resumo_class.periodo.between(bindparam("b_start"), bindparam("b_end")),
+            )
+            .order_by(resumo_class.periodo.desc(), resumo_class.sku)
+        )
+
+    async def _find_resumos(
+        self, resumo_class, start_date: datetime, end_date: datetime, seller_id: str
+    ) -> List[ResumoHistoricoEstoque]:
+        stmt = self._get_cached_statement(
+            ("find_resumos", resumo_class.__tablename__),
+            lambda: self._build_find_resumos_statement(resumo_class),
+        )
+        params = {"b_seller_id": seller_id, "b_start": start_date, "b_end": end_date}
+        async with self.sql_client.make_session() as session:
+            bases = (await session.execute(stmt, params)).scalars().all()
+        return _agrupar_resumos(bases)
+
+    async def find_resumos_por_hora(
+        self, start_date: datetime, end_date: datetime, seller_id: str
+    ) -> List[ResumoHistoricoEstoque]:
+        """
+        Busca os resumos por hora de um vendedor com início no período, do mais recente ao mais antigo.
+        """
+        return await self._find_resumos(HistoricoResumoHoraBase, start_date, end_date, seller_id)
+
+    async def find_resumos_por_dia(
+        self, start_date: datetime, end_date: datetime, seller_id: str
+    ) -> List[ResumoHistoricoEstoque]:
+        """
+        Busca os resumos por dia de um vendedor com início no período, do mais recente ao mais antigo.
+        """
+        return await self._find_resumos(HistoricoResumoDiaBase, start_date, end_date, seller_id)
+
+    def _build_ultimas_movimentacoes(self, com_snapshot: bool, por_seller: bool, com_sku: bool):
+        """
+        Última movimentação de cada (seller_id, sku) até b_as_of (DISTINCT ON), partindo do
+        snapshot b_snapshot_em quando houver. SKUs cuja última movimentação é uma exclusão
+        não existiam no instante e ficam de fora.
+        """
+        historico = self.entity_base_class
+        snapshot = EstoqueSnapshotBase
+        movimentos = select(
+            historico.seller_id,
+            historico.sku,
+            historico.movimentado_em,
+            historico.id,
+            historico.quantidade_nova.label("quantidade"),
+            historico.tipo_movimentacao,
+        ).where(historico.movimentado_em <= bindparam("b_as_of"))
+        partes = [movimentos]
+        if com_snapshot:
+            partes = [
+                select(
+                    snapshot.seller_id,
+                    snapshot.sku,
+                    snapshot.tirado_em.label("movimentado_em"),
+                    literal(0).label("id"),
+                    snapshot.quantidade,
+                    cast(null(), String(20)).label("tipo_movimentacao"),
+                ).where(snapshot.tirado_em == bindparam("b_snapshot_em")),
+                movimentos.where(historico.movimentado_em > bindparam("b_snapshot_em")),
+            ]
+        filtros = [("seller_id", por_seller), ("sku", com_sku)]
+        partes = [
+            parte.where(*[
+                parte.selected_columns[field] == bindparam(f"b_{field}") for field, ativo in filtros if ativo
+            ])
+            for parte in partes
+        ]
+
+        todos = union_all(*partes).subquery("movimentos") if com_snapshot else partes[0].subquery("movimentos")
+        ultimas = (
+            select(todos)
+            .ext(distinct_on(todos.c.seller_id, todos.c.sku))
+            .order_by(todos.c.seller_id, todos.c.sku, todos.c.movimentado_em.desc(), todos.c.id.desc())
+            .subquery("ultimas")
+        )
+        return select(ultimas).where(
+            or_(
+                ultimas.c.tipo_movimentacao.is_(None),
+                ultimas.c.tipo_movimentacao != TipoMovimentacaoEnum.EXCLUSAO.value,
+            )
+        ).order_by(ultimas.c.seller_id, ultimas.c.sku)
+
+    async def find_primeiro_snapshot_em(self) -> datetime | None:
+        """
+        Retorna o instante do snapshot mais antigo mantido.
+        """
+        async with self.sql_client.make_session() as session:
+            return (await session.execute(select(func.min(EstoqueSnapshotBase.tirado_em)))).scalar()
+
+    async def delete_snapshots_before(self, tirado_em: datetime) -> int:
+        """
+        Remove os snapshots anteriores a `tirado_em`.
+
+        :return: Quantidade de linhas removidas.
+        """
+        stmt = delete(EstoqueSnapshotBase).where(EstoqueSnapshotBase.tirado_em < tirado_em)
+        async with self.sql_client.make_session() as session:
+            async with session.begin():
+                result = await session.execute(stmt)
+        return result.rowcount
+
+    async def find_outbox_movimentado_em(self) -> datetime | None:
+        """
+        Retorna a data da movimentação mais antiga ainda no outbox, ou None se ele está vazio.
+        """
+        async with self.sql_client.make_session() as session:
+            return (await session.execute(select(func.min(HistoricoEstoqueOutboxBase.movimentado_em)))).scalar()
+
+    async def find_snapshot_em(self, as_of: datetime | None = None, seller_id: str | None = None) -> datetime | None:
+        """
+        Retorna o instante do snapshot mais recente até `as_of` (com itens do vendedor, se informado).
+        """
+        snapshot = EstoqueSnapshotBase
+        stmt = select(func.max(snapshot.tirado_em))
+        if as_of is not None:
+            stmt = stmt.where(snapshot.tirado_em <= as_of)
+        if seller_id is not None:
+            stmt = stmt.where(snapshot.seller_id == seller_id)
+        async with self.sql_client.make_session() as session:
+            return (await session.execute(stmt)).scalar()
+
+    async def find_posicoes_as_of(
+        self, seller_id: str, as_of: datetime, sku: str | None = None
+    ) -> List[PosicaoEstoque]:
+        """
+        Reconstrói a quantidade de cada SKU do vendedor (ou de um SKU) no instante `as_of`:
+        o snapshot mais recente até `as_of` sobreposto pelas movimentações posteriores a ele.
+        """
+        snapshot_em = await self.find_snapshot_em(as_of, seller_id)
+        com_snapshot, com_sku = snapshot_em is not None, sku is not None
+        stmt = self._get_cached_statement(
+            ("posicoes_as_of", com_snapshot, com_sku),
+            lambda: self._build_ultimas_movimentacoes(com_snapshot, por_seller=True, com_sku=com_sku),
+        )
+        params = {"b_seller_id": seller_id, "b_as_of": as_of, "b_snapshot_em": snapshot_em, "b_sku": sku}
+        async with self.sql_client.make_session() as session:
+            rows = (await session.execute(stmt, params)).mappings().all()
+        return [
+            PosicaoEstoque(
+                seller_id=row["seller_id"],
+                sku=row["sku"],
+                quantidade=row["quantidade"],
+                movimentado_em=row["movimentado_em"],
+                tipo_movimentacao=row["tipo_movimentacao"],
+            )
+            for row in rows
+        ]
+
+    def _build_create_snapshot_statement(self, com_snapshot: bool):
+        ultimas = self._build_ultimas_movimentacoes(com_snapshot, por_seller=False, com_sku=False).subquery()
+        return insert(EstoqueSnapshotBase).from_select(
+            ["seller_id", "sku", "tirado_em", "quantidade"],
+            select(
+                ultimas.c.seller_id,
+                ultimas.c.sku,
+                bindparam("b_as_of", type_=DateTime(timezone=True)),
+                ultimas.c.quantidade,
+            ),
+        )
+
+    async def create_snapshot(self, tirado_em: datetime, anterior: datetime | None = None) -> int:
+        """
+        Grava o snapshot de todos os SKUs em `tirado_em`: o snapshot `anterior` sobreposto pelas
+        movimentações entre os dois instantes, ou todo o histórico se não houver anterior.
+
+        :return: Quantidade de SKUs gravados.
+        """
+        com_snapshot = anterior is not None
+        stmt = self._get_cached_statement(
+            ("create_snapshot", com_snapshot), lambda: self._build_create_snapshot_statement(com_snapshot)
+        )
+        async with self.sql_client.make_session() as session:
+            async with session.begin():
+                result = await session.execute(stmt, {"b_as_of": tirado_em, "b_snapshot_em": anterior})
+        return result.rowcount
+
     def to_model(self, base: HistoricoEstoqueBase | None) -> HistoricoEstoque | None:
         """
         Override do método to_model para contornar problemas de versão do Pydantic.
@@ -80,6 +660,7 @@ class HistoricoEstoqueRepository(SQLAlchemyCrudRepository[HistoricoEstoque, Hist
     ) -> List[HistoricoEstoque]:
         """
         Busca registros de histórico por período e, opcionalmente, por seller_id.
+        O filtro em movimentado_em restringe a busca às partições dos meses do período.
         """
         async with self.sql_client.make_session() as session:
             stmt = select(self.entity_base_class).where(
@@ -94,4 +675,58 @@ class HistoricoEstoqueRepository(SQLAlchemyCrudRepository[HistoricoEstoque, Hist
             result = await session.execute(stmt)
             bases = result.scalars().all()
 
-            return [self.to_model(base) for base in bases]
\ No newline at end of file
+            return [self.to_model(base) for base in bases]
+
+    def _build_find_page_statement(self, filters: tuple[str, ...], after: bool):
+        base = self.entity_base_class
+        stmt = select(base).where(
+            base.seller_id == bindparam("b_seller_id"),
+            base.movimentado_em >= bindparam("b_start"),
+            base.movimentado_em <= bindparam("b_end"),
+        )
+        for field in filters:
+            stmt = stmt.where(getattr(base, field) == bindparam(f"b_{field}"))
+        if after:
+            # (movimentado_em, id) < cursor, escrito de forma que o limite em movimentado_em use o índice
+            stmt = stmt.where(
+                base.movimentado_em <= bindparam("b_after_movimentado_em"),
+                or_(
+                    base.movimentado_em < bindparam("b_after_movimentado_em"),
+                    base.id < bindparam("b_after_id"),
+                ),
+            )
+        return stmt.order_by(base.movimentado_em.desc(), base.id.desc()).limit(bindparam("b_limit"))
+
+    async def find_page_by_period(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        seller_id: str,
+        limit: int,
+        after: tuple[datetime, int] | None = None,
+        sku: str | None = None,
+        tipo_movimentacao: TipoMovimentacaoEnum | None = None,
+    ) -> List[HistoricoEstoque]:
+        """
+        Busca uma página do histórico de um vendedor no período, da movimentação mais recente
+        para a mais antiga, com paginação por chave em (movimentado_em, id). Com `sku`, a busca
+        usa o índice (seller_id, sku, movimentado_em); sem ele, o (seller_id, movimentado_em).
+
+        :param after: (movimentado_em, id) do último registro da página anterior.
+        """
+        params = {"b_seller_id": seller_id, "b_start": start_date, "b_end": end_date, "b_limit": limit}
+        if sku is not None:
+            params["b_sku"] = sku
+        if tipo_movimentacao is not None:
+            params["b_tipo_movimentacao"] = TipoMovimentacaoEnum(tipo_movimentacao).value
+        filters = tuple(field for field in ("sku", "tipo_movimentacao") if f"b_{field}" in params)
+        if after is not None:
+            params["b_after_movimentado_em"], params["b_after_id"] = after
+
+        stmt = self._get_cached_statement(
+            ("find_page", filters, after is not None),
+            lambda: self._build_find_page_statement(filters, after is not None),
+        )
+        async with self.sql_client.make_session() as session:
+            bases = (await session.execute(stmt, params)).scalars().all()
+        return [self.to_model(base) for base in bases]
\ No newline at end of file
@@ -0,0 +1,249 @@
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, bindparam, select, text, update
+
+from app.integrations.database.sqlalchemy_client import SQLAlchemyClient
+from app.models.estoque_model import Estoque
+from app.models.historico_estoque_model import HistoricoEstoque, TipoMovimentacaoEnum
+from app.models.reserva_estoque_model import ReservaEstoque, StatusReservaEnum
+
+from .base.sqlalchemy_crud_repository import SQLAlchemyCrudRepository
+from .base.sqlalchemy_entity_base import SellerIdSkuPersistableEntityBase
+from .estoque_repository import EstoqueBase
+from .historico_estoque_repository import HistoricoEstoqueRepository
+
+
+class ReservaEstoqueBase(SellerIdSkuPersistableEntityBase):
+    """
+    Entidade SQLAlchemy para a tabela pc_estoque_reserva.
+    """
+
+    __tablename__ = "pc_estoque_reserva"
+    __table_args__ = (
+        Index(
+            "idx_reserva_estoque_ativa_expira_em",
+            "expira_em",
+            postgresql_where=text("status = 'ATIVA'"),
+        ),
+    )
+
+    quantidade = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False, default=StatusReservaEnum.ATIVA.value)
+    expira_em = Column(DateTime(timezone=True), nullable=False)
+
+
+class ReservaEstoqueRepository(SQLAlchemyCrudRepository[ReservaEstoque, ReservaEstoqueBase]):
+    """
+    Repositório das reservas de estoque.
+
+    Cada operação altera a reserva e o contador `quantidade_reservada` de `pc_estoque`
+    na mesma transação, de modo que o disponível para venda (quantidade - quantidade_reservada)
+    seja sempre lido de uma única linha, sem agregar as reservas.
+    """
+
+    def __init__(self, sql_client: SQLAlchemyClient):
+        super().__init__(sql_client=sql_client, model_class=ReservaEstoque, entity_base_class=ReservaEstoqueBase)
+
+    def _to_estoque(self, base: EstoqueBase | None) -> Estoque | None:
+        base_dict = self.sql_client.to_dict(base)
+        if base_dict is None:
+            return None
+        return Estoque.model_validate(base_dict)
+
+    @staticmethod
+    def _build_hold_estoque_statement():
+        return (
+            update(EstoqueBase)
+            .where(
+                EstoqueBase.seller_id == bindparam("b_seller_id"),
+                EstoqueBase.sku == bindparam("b_sku"),
+                EstoqueBase.quantidade - EstoqueBase.quantidade_reservada >= bindparam("b_quantidade"),
+            )
+            .values(quantidade_reservada=EstoqueBase.quantidade_reservada + bindparam("b_quantidade"))
+            .returning(EstoqueBase.id)
+        )
+
+    def _build_close_reserva_statement(self, only_valid: bool):
+        base = self.entity_base_class
+        stmt = update(base).where(
+            base.id == bindparam("b_id"),
+            base.seller_id == bindparam("b_seller_id"),
+            base.status == StatusReservaEnum.ATIVA.value,
+        )
+        if only_valid:
+            # Uma reserva vencida não pode mais ser confirmada, ainda que a varredura não a tenha expirado
+            stmt = stmt.where(base.expira_em > bindparam("b_now"))
+        return stmt.values(status=bindparam("b_status"), updated_at=bindparam("b_now")).returning(base)
+
+    @staticmethod
+    def _build_consume_estoque_statement():
+        return (
+            update(EstoqueBase)
+            .where(
+                EstoqueBase.seller_id == bindparam("b_seller_id"),
+                EstoqueBase.sku == bindparam("b_sku"),
+                EstoqueBase.quantidade >= bindparam("b_quantidade"),
+            )
+            .values(
+                quantidade=EstoqueBase.quantidade - bindparam("b_quantidade"),
+                quantidade_reservada=EstoqueBase.quantidade_reservada - bindparam("b_quantidade"),
+                version=EstoqueBase.version + 1,
+                updated_at=bindparam("b_now"),
+            )
+            .returning(EstoqueBase)
+        )
+
+    @staticmethod
+    def _build_unhold_estoque_statement():
+        table = EstoqueBase.__table__
+        return (
+            update(table)
+            .where(table.c.seller_id == bindparam("b_seller_id"), table.c.sku == bindparam("b_sku"))
+            .values(quantidade_reservada=table.c.quantidade_reservada - bindparam("b_quantidade"))
+        )
+
+    async def find_by_id_and_seller_id(self, reserva_id: int, seller_id: str) -> ReservaEstoque | None:
+        """
+        Busca uma reserva pelo seu identificador, restrita ao vendedor.
+        """
+        base = self.entity_base_class
+        stmt = select(base).where(base.id == reserva_id, base.seller_id == seller_id)
+        async with self.sql_client.make_session() as session:
+            result = await session.execute(stmt)
+            return self.to_model(result.scalar_one_or_none())
+
+    async def reserve(self, reserva: ReservaEstoque) -> ReservaEstoque | None:
+        """
+        Retém a quantidade no contador do estoque e grava a reserva.
+
+        :return: A reserva criada ou None se o estoque não existe ou não tem disponível suficiente.
+        """
+        hold_stmt = self._get_cached_statement("hold_estoque", self._build_hold_estoque_statement)
+        params = {"b_seller_id": reserva.seller_id, "b_sku": reserva.sku, "b_quantidade": reserva.quantidade}
+        base = self.to_base(reserva)
+        base.status = reserva.status.value
+        async with self.sql_client.make_session() as session:
+            async with session.begin():
+                result = await session.execute(hold_stmt, params)
+                if result.scalar_one_or_none() is None:
+                    return None
+                session.add(base)
+        return self.to_model(base)
+
+    async def _close(
+        self,
+        reserva_id: int,
+        seller_id: str,
+        status: StatusReservaEnum,
+        now: datetime,
+        registrar_historico: bool = False,
+    ) -> tuple[ReservaEstoque, Estoque | None] | None:
+        only_valid = status == StatusReservaEnum.CONFIRMADA
+        close_stmt = self._get_cached_statement(
+            ("close_reserva", only_valid), lambda: self._build_close_reserva_statement(only_valid)
+        )
+        params = {"b_id": reserva_id, "b_seller_id": seller_id, "b_status": status.value, "b_now": now}
+        async with self.sql_client.make_session() as session:
+            async with session.begin():
+                result = await session.execute(close_stmt, params)
+                reserva_base = result.scalar_one_or_none()
+                if reserva_base is None:
+                    return None
+
+                estoque_params = {
+                    "b_seller_id": reserva_base.seller_id,
+                    "b_sku": reserva_base.sku,
+                    "b_quantidade": reserva_base.quantidade,
+                    "b_now": now,
+                }
+                estoque_base = None
+                if only_valid:
+                    consume_stmt = self._get_cached_statement("consume_estoque", self._build_consume_estoque_statement)
+                    estoque_base = (await session.execute(consume_stmt, estoque_params)).scalar_one_or_none()
+                    if estoque_base is None:
+                        # Estoque removido ou sem a quantidade: a reserva continua ativa
+                        reserva = self.to_model(reserva_base)
+                        await session.rollback()
+                        return reserva, None
+                    if registrar_historico:
+                        historico = HistoricoEstoque(
+                            seller_id=estoque_base.seller_id,
+                            sku=estoque_base.sku,
+                            quantidade_anterior=estoque_base.quantidade + reserva_base.quantidade,
+                            quantidade_nova=estoque_base.quantidade,
+                            tipo_movimentacao=TipoMovimentacaoEnum.CONFIRMACAO_RESERVA,
+                            movimentado_em=now,
+                        )
+                        HistoricoEstoqueRepository.stage_outbox(session, historico)
+                else:
+                    unhold_stmt = self._get_cached_statement("unhold_estoque", self._build_unhold_estoque_statement)
+                    await session.execute(unhold_stmt, estoque_params)
+        return self.to_model(reserva_base), self._to_estoque(estoque_base)
+
+    async def confirm(
+        self, reserva_id: int, seller_id: str, now: datetime, registrar_historico: bool = False
+    ) -> tuple[ReservaEstoque, Estoque | None] | None:
+        """
+        Confirma uma reserva ativa e não expirada, baixando a quantidade do estoque definitivamente.
+        Com `registrar_historico`, a movimentação é gravada no outbox na mesma transação.
+
+        :return: Tupla (reserva, estoque atualizado) ou None se a reserva não está mais ativa.
+                 Se o estoque não existe mais ou não tem a quantidade, nada é alterado e o estoque vem None.
+        """
+        return await self._close(reserva_id, seller_id, StatusReservaEnum.CONFIRMADA, now, registrar_historico)
+
+    async def release(self, reserva_id: int, seller_id: str, now: datetime) -> ReservaEstoque | None:
+        """
+        Libera uma reserva ativa, devolvendo a quantidade ao disponível para venda.
+
+        :return: A reserva liberada ou None se a reserva não está mais ativa.
+        """
+        closed = await self._close(reserva_id, seller_id, StatusReservaEnum.LIBERADA, now)
+        return closed[0] if closed else None
+
+    async def expire_due(self, now: datetime, limit: int) -> list[ReservaEstoque]:
+        """
+        Expira em lote as reservas ativas vencidas e devolve as quantidades aos estoques.
+
+        Usa FOR UPDATE SKIP LOCKED para que execuções concorrentes (ou um confirm em andamento)
+        não disputem as mesmas reservas.
+        """
+        base = self.entity_base_class
+        due_ids = (
+            select(base.id)
+            .where(base.status == StatusReservaEnum.ATIVA.value, base.expira_em <= now)
+            .order_by(base.expira_em)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        expire_stmt = (
+            update(base)
+            .where(base.id.in_(due_ids.scalar_subquery()))
+            .values(status=StatusReservaEnum.EXPIRADA.value, updated_at=now)
+            .returning(base)
+            .execution_options(synchronize_session=False)
+        )
+        async with self.sql_client.make_session() as session:
+            async with session.begin():
+                result = await session.execute(expire_stmt)
+                expired = result.scalars().all()
+                if not expired:
+                    return []
+
+                totals: dict[tuple[str, str], int] = defaultdict(int)
+                for reserva_base in expired:
+                    totals[(reserva_base.seller_id, reserva_base.sku)] += reserva_base.quantidade
+
+                unhold_stmt = self._get_cached_statement("unhold_estoque", self._build_unhold_estoque_statement)
+                await session.execute(
+                    unhold_stmt,
+                    [
+                        {"b_seller_id": seller_id, "b_sku": sku, "b_quantidade": quantidade}
+                        for (seller_id, sku), quantidade in totals.items()
+                    ],
+                )
+        return [self.to_model(reserva_base) for reserva_base in expired]
+
+
+__all__ = ["ReservaEstoqueRepository", "ReservaEstoqueBase"]
@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+from pclogging import LoggingBuilder
+
+from app.common.datetime import utcnow
+from app.common.exceptions.estoque_exceptions import EstoqueBadRequestException
+from app.integrations.notifications.notification_dispatcher import NotificationDispatcher
+from app.models.alerta_estoque_model import AlertaEstoque, EstoqueBaixo, LimitesEstoque
+from app.repositories.alerta_estoque_repository import LIMITE_SELLER, AlertaEstoqueRepository
+from app.settings import AppSettings
+
+logger = LoggingBuilder.get_logger(__name__)
+
+# Quanto antes da última verificação a próxima volta a olhar, cobrindo transações que
+# gravaram updated_at antes da marca mas só foram confirmadas depois dela
+ALERTA_SOBREPOSICAO = timedelta(minutes=5)
+
+
+class AlertaEstoqueService:
+    """
+    Limites e alertas de estoque baixo.
+
+    O limite de um SKU é o definido para ele, o definido para o vendedor ou, na falta
+    dos dois, o `low_stock_threshold` da aplicação.
+
+    Cada verificação compara ao limite apenas os estoques alterados desde a anterior, então
+    o custo acompanha o volume de alterações e não o tamanho do catálogo. Um SKU é alertado
+    uma vez ao cair para o limite ou menos e só volta a ser alertado depois de se recuperar.
+    Os alertas ainda não notificados são enviados em um digest por vendedor; os que não
+    forem entregues continuam pendentes e são reenviados na verificação seguinte.
+    """
+
+    def __init__(
+        self,
+        repository: AlertaEstoqueRepository,
+        notification_dispatcher: NotificationDispatcher,
+        settings: AppSettings,
+    ):
+        self.repository = repository
+        self.notification_dispatcher = notification_dispatcher
+        self.settings = settings
+
+    async def verificar_estoque_baixo(self) -> list[AlertaEstoque]:
+        """
+        Registra os SKUs que entraram em estoque baixo desde a última verificação e notifica
+        os alertas pendentes. Na primeira execução, ou se o limite mudou, todo o estoque é
+        verificado uma vez.
+        """
+        agora = utcnow()
+        limite = self.settings.low_stock_threshold
+        controle = await self.repository.get_controle()
+
+        desde = None
+        if controle is not None and controle[1] == limite:
+            desde = controle[0] - ALERTA_SOBREPOSICAO
+        else:
+            logger.info(f"WORKER: Verificando todo o estoque contra o limite de {limite} unidades.")
+
+        novos = await self.repository.sincronizar_alertas(desde, limite, agora)
+        if novos:
+            logger.warning(f"WORKER: {len(novos)} novos itens com estoque baixo.")
+        await self._notificar_pendentes()
+        return novos
+
+    async def _notificar_pendentes(self):
+        """
+        Notifica os alertas pendentes e marca como notificados os que foram entregues.
+        """
+        pendentes = await self.repository.find_alertas_pendentes()
+        if not pendentes:
+            return
+        falhas = await self.notification_dispatcher.despachar(pendentes)
+        nao_entregues = {(alerta.seller_id, alerta.sku) for digest in falhas for alerta in digest.itens}
+        entregues = [alerta for alerta in pendentes if (alerta.seller_id, alerta.sku) not in nao_entregues]
+        await self.repository.marcar_notificados(entregues)
+        if nao_entregues:
+            logger.warning(f"WORKER: {len(nao_entregues)} alertas continuam pendentes para a próxima verificação.")
+
+    async def listar_estoque_baixo(self, seller_id: str) -> list[EstoqueBaixo]:
+        """
+        Lista os SKUs do vendedor com quantidade igual ou abaixo do limite.
+        """
+        return await self.repository.find_estoque_baixo(seller_id, self.settings.low_stock_threshold)
+
+    async def listar_limites(self, seller_id: str) -> LimitesEstoque:
+        """
+        Retorna o limite que vale para o vendedor e os SKUs dele com limite próprio.
+        """
+        limites = await self.repository.find_limites(seller_id)
+        limite = limites.pop(LIMITE_SELLER, self.settings.low_stock_threshold)
+        return LimitesEstoque(seller_id=seller_id, limite=limite, limites_sku=limites)
+
+    async def definir_limite(self, seller_id: str, limite: int, sku: str | None = None):
+        """
+        Define o limite de estoque baixo de um SKU ou, sem `sku`, de todos os SKUs do vendedor.
+        """
+        if limite < 0:
+            raise EstoqueBadRequestException("O limite deve ser maior ou igual a zero.", "limite", limite)
+        await self.repository.set_limite(seller_id, sku, limite, utcnow())
+        logger.info(f"Limite de estoque baixo de seller_id={seller_id}, sku={sku} definido em {limite}")
+
+    async def remover_limite(self, seller_id: str, sku: str | None = None):
+        """
+        Remove o limite de um SKU ou do vendedor, voltando a valer o do nível acima.
+        """
+        await self.repository.set_limite(seller_id, sku, None, utcnow())
+        logger.info(f"Limite de estoque baixo de seller_id={seller_id}, sku={sku} removido")
+
+
+__all__ = ["AlertaEstoqueService", "ALERTA_SOBREPOSICAO"]
@@ -0,0 +1,142 @@
+from datetime import timedelta
+from uuid import uuid4
+
+from pclogging import LoggingBuilder
+
+from app.common.datetime import utcnow
+from app.common.exceptions.estoque_exceptions import (
+    EstoqueBadRequestException,
+    EstoqueContadorQuenteException,
+    EstoqueNotFoundException,
+)
+from app.integrations.kv_db.redis_hot_counter import RedisHotCounter
+from app.models.estoque_model import Estoque
+from app.repositories.contador_quente_repository import ContadorQuenteRepository
+from app.settings import AppSettings
+
+from .estoque_service import EstoqueServices
+
+logger = LoggingBuilder.get_logger(__name__)
+
+# Quantas vezes a desativação consolida e tenta remover o contador enquanto chegam novas baixas
+MAX_DISABLE_ATTEMPTS = 3
+
+
+class ContadorQuenteService:
+    """
+    Modo contador quente: SKUs designados têm as baixas feitas no Redis e o delta
+    líquido consolidado periodicamente no pc_estoque pelo worker.
+
+    A consolidação é segura contra quedas: o delta é separado no Redis sob um flush_id,
+    aplicado no banco junto com o registro desse flush_id e só então confirmado no Redis.
+    Se o worker cair no meio, a próxima execução reaplica o mesmo flush_id, que o banco
+    ignora caso já tenha sido gravado. A confirmação rebaseia o contador no valor do banco,
+    reconciliando alterações feitas por outros caminhos (ex.: reservas liberadas ou expiradas).
+    Um delta que deixaria a quantidade negativa não é aplicado: o flush falha e fica em voo.
+    """
+
+    def __init__(
+        self,
+        repository: ContadorQuenteRepository,
+        hot_counter: RedisHotCounter,
+        estoque_service: EstoqueServices,
+        settings: AppSettings,
+    ):
+        self.repository = repository
+        self.hot_counter = hot_counter
+        self.estoque_service = estoque_service
+        self.settings = settings
+
+    async def ativar(self, seller_id: str, sku: str) -> Estoque:
+        """
+        Coloca o SKU em modo contador quente, a partir da quantidade atual do banco.
+        """
+        if not self.settings.contador_quente_habilitado:
+            raise EstoqueBadRequestException("O modo contador quente está desabilitado.", "sku", sku)
+
+        estoque = await self.repository.find_by_seller_id_and_sku(seller_id, sku)
+        if estoque is None:
+            raise EstoqueNotFoundException(seller_id=seller_id, sku=sku)
+
+        if not await self.hot_counter.enable(seller_id, sku, estoque.quantidade, estoque.quantidade_reservada):
+            return estoque
+        logger.info(f"Contador quente ativado para seller_id={seller_id}, sku={sku}")
+
+        # Uma alteração pelo banco que passou pela validação antes da ativação pode ter sido
+        # gravada depois da leitura acima: relê o registro e rebaseia o contador nele
+        estoque = await self.repository.find_by_seller_id_and_sku(seller_id, sku)
+        if estoque is None:
+            await self._drop_orphan(seller_id, sku)
+            raise EstoqueNotFoundException(seller_id=seller_id, sku=sku)
+        await self.hot_counter.reconcile(seller_id, sku, estoque.quantidade, estoque.quantidade_reservada)
+        return estoque
+
+    async def desativar(self, seller_id: str, sku: str):
+        """
+        Consolida o que estiver pendente e retira o SKU do modo contador quente.
+        """
+        for _ in range(MAX_DISABLE_ATTEMPTS):
+            await self.flush_sku(seller_id, sku)
+            if await self.hot_counter.disable(seller_id, sku):
+                logger.info(f"Contador quente desativado para seller_id={seller_id}, sku={sku}")
+                await self.estoque_service.invalidate_cache(seller_id, sku)
+                return
+        raise EstoqueContadorQuenteException(
+            seller_id=seller_id,
+            sku=sku,
+            message="Há baixas pendentes de consolidação; tente novamente.",
+        )
+
+    async def flush_sku(self, seller_id: str, sku: str) -> bool:
+        """
+        Consolida no banco o delta pendente de um SKU.
+
+        :return: True se um delta foi aplicado ao estoque nesta chamada.
+        """
+        checkpoint = await self.hot_counter.checkpoint(seller_id, sku, str(uuid4()))
+        if checkpoint is None:
+            estoque = await self.repository.find_by_seller_id_and_sku(seller_id, sku)
+            if estoque is None:
+                await self._drop_orphan(seller_id, sku)
+            else:
+                await self.hot_counter.reconcile(seller_id, sku, estoque.quantidade, estoque.quantidade_reservada)
+            return False
+
+        flush_id, delta = checkpoint
+        estoque, aplicado = await self.repository.apply_delta(flush_id, seller_id, sku, delta, utcnow())
+        if estoque is None:
+            await self._drop_orphan(seller_id, sku)
+            return False
+
+        if not aplicado:
+            logger.warning(f"Flush {flush_id} de seller_id={seller_id}, sku={sku} já estava aplicado; confirmando")
+        await self.hot_counter.ack(seller_id, sku, flush_id, estoque.quantidade, estoque.quantidade_reservada)
+        await self.estoque_service.sincronizar_alteracao(estoque)
+        return aplicado
+
+    async def flush(self) -> int:
+        """
+        Consolida todos os contadores ativos e remove registros de flush antigos.
+        Ideal para ser usado por um worker/processo em background.
+        """
+        aplicados = 0
+        for seller_id, sku in await self.hot_counter.list_active():
+            try:
+                aplicados += await self.flush_sku(seller_id, sku)
+            except Exception as e:
+                logger.error(
+                    f"WORKER: Erro ao consolidar contador de seller_id={seller_id}, sku={sku}: {e}", exc_info=True
+                )
+
+        retencao = timedelta(hours=self.settings.contador_quente_retencao_flush_horas)
+        await self.repository.purge_flushes(utcnow() - retencao)
+        if aplicados:
+            logger.info(f"WORKER: {aplicados} contadores quentes consolidados no banco.")
+        return aplicados
+
+    async def _drop_orphan(self, seller_id: str, sku: str):
+        logger.warning(f"Estoque seller_id={seller_id}, sku={sku} não existe mais; descartando contador quente")
+        await self.hot_counter.disable(seller_id, sku, force=True)
+
+
+__all__ = ["ContadorQuenteService"]
@@ -2,8 +2,18 @@ from pclogging import LoggingBuilder
 
 from app.api.common.schemas.pagination import Paginator
 from app.common.datetime import utcnow
-from app.common.exceptions.estoque_exceptions import EstoqueBadRequestException, EstoqueNotFoundException
+from app.common.exceptions.estoque_exceptions import (
+    EstoqueBadRequestException,
+    EstoqueContadorQuenteException,
+    EstoqueIndisponivelException,
+    EstoqueNotFoundException,
+    EstoquePreconditionFailedException,
+    EstoqueReservadoException,
+    EstoqueVersionConflictException,
+)
+from app.common.tracing import trace_methods
 from app.integrations.kv_db.redis_asyncio_adapter import RedisAsyncioAdapter
+from app.integrations.kv_db.redis_hot_counter import CONTADOR_INATIVO, SALDO_INSUFICIENTE, RedisHotCounter
 from app.models.historico_estoque_model import HistoricoEstoque, TipoMovimentacaoEnum
 from app.repositories.historico_estoque_repository import HistoricoEstoqueRepository
 from app.settings import AppSettings
@@ -15,64 +25,84 @@ from .base import CrudService
 LoggingBuilder.init(log_level="DEBUG")
 
 logger = LoggingBuilder.get_logger(__name__)
+
+# Quantas vezes o update relê o estoque quando outra requisição alterou a versão no meio do caminho
+MAX_VERSION_CONFLICT_RETRIES = 3
+
+
+@trace_methods()
 class EstoqueServices(CrudService[Estoque, str]):
 
     repository: EstoqueRepository
     redis_adapter: RedisAsyncioAdapter
     historico_repository: HistoricoEstoqueRepository
     settings: AppSettings
+    hot_counter: RedisHotCounter | None
 
-    def __init__(self, repository: EstoqueRepository, redis_adapter: RedisAsyncioAdapter, historico_repository: HistoricoEstoqueRepository, settings: AppSettings):
+    def __init__(
+        self,
+        repository: EstoqueRepository,
+        redis_adapter: RedisAsyncioAdapter,
+        historico_repository: HistoricoEstoqueRepository,
+        settings: AppSettings,
+        hot_counter: RedisHotCounter | None = None,
+    ):
         super().__init__(repository)
         self.redis_adapter = redis_adapter
         self.historico_repository = historico_repository
         self.settings = settings
+        self.hot_counter = hot_counter
 
-    async def _check_low_stock_and_notify(self, estoque: Estoque):
+    @property
+    def _historico_outbox(self) -> bool:
+        """Histórico gravado no outbox, na mesma transação da alteração, e movido em lote pelo worker."""
+        return self.settings.historico_outbox_habilitado
+
+    @property
+    def _hot_counter_ativo(self) -> RedisHotCounter | None:
+        """Contador quente, quando configurado e habilitado; senão None."""
+        if self.hot_counter is not None and self.settings.contador_quente_habilitado:
+            return self.hot_counter
+        return None
+
+    async def validar_fora_do_contador_quente(self, seller_id: str, sku: str, message: str):
         """
-        Verifica se o estoque está abaixo do limite e loga um aviso.
+        Impede operações que alteram o estoque no banco por fora do contador quente: a
+        consolidação do worker sobrescreveria ou ressuscitaria o registro, e reservas
+        disputariam as mesmas unidades das baixas ainda pendentes no Redis.
         """
-        if estoque.quantidade <= self.settings.low_stock_threshold:
-            logger.warning(
-                f"ALERTA DE ESTOQUE BAIXO: O produto SKU '{estoque.sku}' "
-                f"do vendedor '{estoque.seller_id}' atingiu o nível de {estoque.quantidade} unidades."
-            )
+        hot_counter = self._hot_counter_ativo
+        if hot_counter is not None and await hot_counter.is_active(seller_id, sku):
+            raise EstoqueContadorQuenteException(seller_id=seller_id, sku=sku, message=message)
 
-    async def check_and_notify_all_low_stock(self):
+    @staticmethod
+    def _cache_key(seller_id: str, sku: str) -> str:
+        return f"estoque:{seller_id}:{sku}"
+
+    async def invalidate_cache(self, seller_id: str, sku: str):
         """
-        Busca todos os itens com estoque baixo no banco de dados e dispara
-        notificações para cada um deles.
-        Ideal para ser usado por um worker/processo em background.
+        Remove o estoque da cache Redis após qualquer alteração.
         """
-        logger.info("WORKER: Iniciando verificação periódica de estoque baixo...")
-        
-        try:
-            low_stock_items = await self.repository.find_all_below_threshold(
-                self.settings.low_stock_threshold
-            )
+        await self.redis_adapter.delete(self._cache_key(seller_id, sku))
 
-            if not low_stock_items:
-                logger.info("WORKER: Nenhum item com estoque baixo encontrado.")
-                return
+    async def registrar_movimentacao(self, estoque: Estoque, tipo: TipoMovimentacaoEnum, quantidade_anterior: int):
+        """
+        Registra uma alteração de quantidade feita fora do fluxo de update
+        (ex.: confirmação de reserva): histórico e cache.
+        """
+        await self._registrar_historico(estoque=estoque, tipo=tipo, quantidade_anterior=quantidade_anterior)
+        await self.sincronizar_alteracao(estoque)
 
-            logger.warning(f"WORKER: Encontrados {len(low_stock_items)} itens com estoque baixo. Enviando alertas...")
-            for item in low_stock_items:
-                # Reutiliza a mesma lógica de notificação individual
-                await self._check_low_stock_and_notify(item)
-        
-        except Exception as e:
-            logger.error(f"WORKER: Ocorreu um erro durante a verificação de estoque: {e}", exc_info=True)
-            
-        logger.info("WORKER: Verificação periódica de estoque baixo finalizada.")
+    async def sincronizar_alteracao(self, estoque: Estoque):
+        """
+        Invalidação da cache para uma alteração cujo histórico já foi gravado
+        (ex.: consolidação do contador quente).
+        """
+        await self.invalidate_cache(estoque.seller_id, estoque.sku)
 
-    async def _registrar_historico(
-        self,
-        estoque: Estoque,
-        tipo: TipoMovimentacaoEnum,
-        quantidade_anterior: int = 0
-    ):
-        """Método auxiliar para criar e salvar um registro de histórico."""
-        historico_entry = HistoricoEstoque(
+    @staticmethod
+    def _novo_historico(estoque: Estoque, tipo: TipoMovimentacaoEnum, quantidade_anterior: int = 0) -> HistoricoEstoque:
+        return HistoricoEstoque(
             seller_id=estoque.seller_id,
             sku=estoque.sku,
             quantidade_anterior=quantidade_anterior,
@@ -80,16 +110,45 @@ class EstoqueServices(CrudService[Estoque, str]):
             tipo_movimentacao=tipo,
             movimentado_em=utcnow()
         )
-        await self.historico_repository.create(historico_entry)
+
+    def _historico_para_outbox(self, estoque: Estoque, tipo: TipoMovimentacaoEnum, quantidade_anterior: int = 0):
+        """Histórico a ser gravado pelo repositório na transação da alteração, ou None fora do modo outbox."""
+        if not self._historico_outbox:
+            return None
+        return self._novo_historico(estoque, tipo, quantidade_anterior)
+
+    async def _registrar_historico(
+        self,
+        estoque: Estoque,
+        tipo: TipoMovimentacaoEnum,
+        quantidade_anterior: int = 0
+    ):
+        """Método auxiliar para criar e salvar um registro de histórico, fora do modo outbox."""
+        if self._historico_outbox:
+            return
+        await self.historico_repository.create(self._novo_historico(estoque, tipo, quantidade_anterior))
 
     async def get_by_seller_id_and_sku(self, seller_id: str, sku: str) -> Estoque:
         """
         Busca um estoque pelo seller_id e SKU.
+        Se o SKU estiver em modo contador quente, a quantidade vem do contador no Redis,
+        que ainda não foi consolidada no banco.
+        """
+        estoque = await self._get_estoque(seller_id, sku)
+        hot_counter = self._hot_counter_ativo
+        if hot_counter is not None:
+            contador = await hot_counter.get(seller_id, sku)
+            if contador is not None:
+                estoque.quantidade = contador["quantidade"]
+        return estoque
+
+    async def _get_estoque(self, seller_id: str, sku: str) -> Estoque:
+        """
         Caso o estoque esteja na cache Redis, retorna o valor da cache diretamente.
         Caso contrário, busca no banco de dados e atualiza a cache.
         """
         logger.debug(f"Buscando estoque na cache para seller_id={seller_id}, sku={sku}")
-        cache_key = f"estoque:{seller_id}:{sku}"
+        cache_key = self._cache_key(seller_id, sku)
         cached_estoque = await self.search_estoque_in_cache(seller_id, sku, cache_key)
         if cached_estoque is not None:
             logger.debug(f"Estoque encontrado na cache: {cached_estoque}")
@@ -120,7 +179,9 @@ class EstoqueServices(CrudService[Estoque, str]):
         self._validate_positive_estoque(estoque)
 
         estoque = Estoque(**estoque.model_dump())
-        created = await super().create(estoque)
+        created = await self.repository.create(
+            estoque, historico=self._historico_para_outbox(estoque, TipoMovimentacaoEnum.CRIACAO)
+        )
 
         await self._registrar_historico(
             estoque=created,
@@ -128,36 +189,60 @@ class EstoqueServices(CrudService[Estoque, str]):
             quantidade_anterior=0
         )
 
-        await self._check_low_stock_and_notify(created)
-
         logger.debug(f"Estoque criado com sucesso: {created}")
         return created
 
-    async def update(self, seller_id: str, sku: str, quantidade: int) -> Estoque:
+    async def update(self, seller_id: str, sku: str, quantidade: int, expected_version: int | None = None) -> Estoque:
         """
         Atualiza um estoque existente, modificando apenas a quantidade.
 
-        Recebe: seller_id, sku e quantidade.
+        Recebe: seller_id, sku, quantidade e, opcionalmente, a versão esperada (If-Match).
+
+        A gravação é condicional à versão lida (concorrência otimista). Sem versão esperada,
+        um conflito faz o estoque ser relido e a atualização reaplicada, para que o histórico
+        registre a quantidade anterior correta. Com versão esperada, a releitura detecta a divergência
+        e ela é devolvida ao cliente.
         """
         logger.info(f"Atualizando estoque seller_id={seller_id}, sku={sku} para quantidade={quantidade}")
-        estoque_found = await self.repository.find_by_seller_id_and_sku(seller_id, sku)
-        self._raise_not_found(seller_id, sku, estoque_found is None)
-
-        estoque_encontrado = Estoque.model_validate(estoque_found)
-        quantidade_anterior = estoque_encontrado.quantidade
-
-        estoque_encontrado.quantidade = quantidade
-        self._validate_positive_estoque(estoque_encontrado)
-        
-        temp_estoque = Estoque(**(dict(estoque_found) if isinstance(estoque_found, dict) else estoque_found.model_dump()))
-        temp_estoque.quantidade = quantidade
-        self._validate_positive_estoque(temp_estoque)
-        
-        updated_data = temp_estoque.model_dump()
-        updated_data["updated_at"] = utcnow()
-        
-        updated_entity = Estoque(**updated_data)
-        updated = await self.repository.update_by_seller_id_and_sku(seller_id, sku, updated_entity)
+        await self.validar_fora_do_contador_quente(
+            seller_id, sku, "Estoque em modo contador quente; desative o modo para ajustar a quantidade."
+        )
+        for tentativa in range(MAX_VERSION_CONFLICT_RETRIES + 1):
+            estoque_found = await self.repository.find_by_seller_id_and_sku(seller_id, sku)
+            self._raise_not_found(seller_id, sku, estoque_found is None)
+
+            estoque_encontrado = Estoque.model_validate(estoque_found)
+            self._validate_expected_version(estoque_encontrado, expected_version)
+            quantidade_anterior = estoque_encontrado.quantidade
+
+            estoque_encontrado.quantidade = quantidade
+            self._validate_positive_estoque(estoque_encontrado)
+            if quantidade < estoque_encontrado.quantidade_reservada:
+                raise EstoqueReservadoException(
+                    seller_id=seller_id,
+                    sku=sku,
+                    quantidade_reservada=estoque_encontrado.quantidade_reservada,
+                    message="A quantidade não pode ser menor que a quantidade reservada.",
+                )
+
+            updated = await self.repository.update_quantidade_by_version(
+                seller_id,
+                sku,
+                quantidade,
+                estoque_encontrado.version,
+                historico=self._historico_para_outbox(
+                    estoque_encontrado, TipoMovimentacaoEnum.ATUALIZACAO, quantidade_anterior
+                ),
+            )
+            if updated is not None:
+                break
+            logger.warning(
+                f"Conflito de versão ao atualizar estoque seller_id={seller_id}, sku={sku} "
+                f"(versão lida={estoque_encontrado.version}, tentativa={tentativa + 1})"
+            )
+        else:
+            logger.error(f"Conflito de versão persistente para seller_id={seller_id}, sku={sku}")
+            raise EstoqueVersionConflictException(seller_id=seller_id, sku=sku)
 
         await self._registrar_historico(
             estoque=updated,
@@ -165,14 +250,48 @@ class EstoqueServices(CrudService[Estoque, str]):
             quantidade_anterior=quantidade_anterior
         )
 
-        await self._check_low_stock_and_notify(updated)
-
         logger.debug(f"Estoque atualizado: {updated}")
 
         # remove a cache do estoque atualizado
-        cache_key = f"estoque:{seller_id}:{sku}"
-        await self.redis_adapter.delete(cache_key)
+        await self.invalidate_cache(seller_id, sku)
+
+        return updated
+
+    async def baixar(self, seller_id: str, sku: str, quantidade: int) -> Estoque:
+        """
+        Baixa `quantidade` unidades do estoque, se houver disponível suficiente.
 
+        SKUs em modo contador quente são baixados atomicamente no Redis (script Lua) e
+        consolidados no banco pelo worker; os demais com um UPDATE condicional.
+        """
+        logger.info(f"Baixando {quantidade} unidades de seller_id={seller_id}, sku={sku}")
+        if quantidade <= 0:
+            self._raise_bad_request("quantidade deve ser maior que zero.", "quantidade", quantidade)
+
+        hot_counter = self._hot_counter_ativo
+        if hot_counter is not None:
+            nova_quantidade = await hot_counter.decrement(seller_id, sku, quantidade)
+            if nova_quantidade == SALDO_INSUFICIENTE:
+                raise EstoqueIndisponivelException(seller_id=seller_id, sku=sku, quantidade=quantidade)
+            if nova_quantidade != CONTADOR_INATIVO:
+                estoque = await self._get_estoque(seller_id, sku)
+                estoque.quantidade = nova_quantidade
+                return estoque
+
+        updated = await self.repository.decrement_quantidade(
+            seller_id, sku, quantidade, registrar_historico=self._historico_outbox
+        )
+        if updated is None:
+            estoque_found = await self.repository.find_by_seller_id_and_sku(seller_id, sku)
+            self._raise_not_found(seller_id, sku, estoque_found is None)
+            logger.warning(f"Disponível insuficiente para baixar seller_id={seller_id}, sku={sku}")
+            raise EstoqueIndisponivelException(seller_id=seller_id, sku=sku, quantidade=quantidade)
+
+        await self.registrar_movimentacao(
+            estoque=updated,
+            tipo=TipoMovimentacaoEnum.BAIXA,
+            quantidade_anterior=updated.quantidade + quantidade,
+        )
         return updated
 
     async def delete(self, seller_id: str, sku: str):
@@ -180,9 +299,28 @@ class EstoqueServices(CrudService[Estoque, str]):
         Deleta um estoque existente.
         """
         logger.info(f"Deletando estoque seller_id={seller_id}, sku={sku}")
+        await self.validar_fora_do_contador_quente(
+            seller_id, sku, "Estoque em modo contador quente; desative o modo para removê-lo."
+        )
         estoque_found = await self.repository.find_by_seller_id_and_sku(seller_id, sku)
         self._raise_not_found(seller_id, sku, estoque_found is None)
-        deleted = await self.repository.delete_by_seller_id_and_sku(seller_id, sku)
+
+        estoque_deletado = Estoque.model_validate(estoque_found)
+        if estoque_deletado.quantidade_reservada > 0:
+            raise EstoqueReservadoException(
+                seller_id=seller_id,
+                sku=sku,
+                quantidade_reservada=estoque_deletado.quantidade_reservada,
+                message="Estoque com reservas ativas; confirme ou libere as reservas antes de removê-lo.",
+            )
+        quantidade_anterior = estoque_deletado.quantidade
+        estoque_deletado.quantidade = 0 # A quantidade final é 0
+
+        deleted = await self.repository.delete_by_seller_id_and_sku(
+            seller_id,
+            sku,
+            historico=self._historico_para_outbox(estoque_deletado, TipoMovimentacaoEnum.EXCLUSAO, quantidade_anterior),
+        )
         if not deleted:
             logger.error(f"Erro ao deletar estoque seller_id={seller_id}, sku={sku}")
             self._raise_bad_request(
@@ -192,10 +330,6 @@ class EstoqueServices(CrudService[Estoque, str]):
         else:
             logger.debug(f"Estoque deletado seller_id={seller_id}, sku={sku}")
 
-            estoque_deletado = Estoque.model_validate(estoque_found)
-            quantidade_anterior = estoque_deletado.quantidade
-            estoque_deletado.quantidade = 0 # A quantidade final é 0
-
             await self._registrar_historico(
                 estoque=estoque_deletado,
                 tipo=TipoMovimentacaoEnum.EXCLUSAO,
@@ -203,8 +337,7 @@ class EstoqueServices(CrudService[Estoque, str]):
             )
 
             # remove a cache do estoque atualizado
-            cache_key = f"estoque:{seller_id}:{sku}"
-            await self.redis_adapter.delete(cache_key)
+            await self.invalidate_cache(seller_id, sku)
 
             return True 
 
@@ -239,6 +372,23 @@ class EstoqueServices(CrudService[Estoque, str]):
             logger.warning(f"Quantidade inválida para estoque: {estoque.quantidade}")
             self._raise_bad_request("quantidade deve ser maior que zero.", "quantidade", estoque.quantidade)
 
+    @staticmethod
+    def _validate_expected_version(estoque: Estoque, expected_version: int | None):
+        """
+        Valida se a versão atual do estoque corresponde à versão informada pelo cliente (If-Match).
+        """
+        if expected_version is not None and estoque.version != expected_version:
+            logger.warning(
+                f"Versão divergente para seller_id={estoque.seller_id}, sku={estoque.sku}: "
+                f"esperada={expected_version}, atual={estoque.version}"
+            )
+            raise EstoquePreconditionFailedException(
+                seller_id=estoque.seller_id,
+                sku=estoque.sku,
+                expected_version=expected_version,
+                current_version=estoque.version,
+            )
+
     async def _validate_non_existent_estoque(self, seller_id: str, sku: str):
         """
         Verifica se já existe um estoque cadastrado para o seller_id e sku informados.
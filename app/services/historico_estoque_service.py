@@ -1,26 +1,286 @@
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import AsyncIterator, List
 
-from app.models.historico_estoque_model import HistoricoEstoque
+from pclogging import LoggingBuilder
+
+from app.common.datetime import add_months, month_start, utcnow
+from app.common.exceptions.estoque_exceptions import EstoqueBadRequestException
+from app.models.historico_estoque_model import HistoricoEstoque, TipoMovimentacaoEnum
+from app.models.posicao_estoque_model import PosicaoEstoque
+from app.models.resumo_historico_estoque_model import ResumoHistoricoEstoque
 from app.repositories.historico_estoque_repository import HistoricoEstoqueRepository
+from app.settings import AppSettings
+
+logger = LoggingBuilder.get_logger(__name__)
+
+# Registros movidos do outbox para o histórico por instrução
+DEFAULT_OUTBOX_BATCH_SIZE = 1000
+
+# Meses futuros com partição já criada, para que as gravações nunca caiam na partição default
+DEFAULT_PARTICOES_FUTURAS = 3
+
+# Horas antes da última marca de processamento que são resumidas de novo, para incluir
+# movimentações gravadas com atraso (ex.: aguardando no outbox)
+DEFAULT_RESUMO_JANELA_HORAS = 2
+
+# Tamanho de cada intervalo resumido por transação (relevante na carga inicial)
+RESUMO_LOTE = timedelta(days=1)
+
+# Registros lidos do banco por consulta ao transmitir o histórico (NDJSON)
+DEFAULT_STREAM_BATCH_SIZE = 500
+
+# Os snapshots são diários (meia-noite UTC) e só são gerados depois desse atraso,
+# para que as movimentações ainda no outbox já estejam no histórico. Se ainda houver
+# movimentações anteriores à meia-noite no outbox, o snapshot espera a próxima execução.
+SNAPSHOT_ATRASO = timedelta(hours=1)
+
+
+def periodo_semanal() -> tuple[datetime, datetime]:
+    """
+    Retorna o período dos últimos 7 dias.
+    """
+    end_date = datetime.now(timezone.utc)
+    return end_date - timedelta(days=7), end_date
+
+
+def periodo_diario() -> tuple[datetime, datetime]:
+    """
+    Retorna o período do dia atual, desde a meia-noite (UTC).
+    """
+    end_date = datetime.now(timezone.utc)
+    return end_date.replace(hour=0, minute=0, second=0, microsecond=0), end_date
 
 
 class HistoricoEstoqueService:
-    def __init__(self, historico_repository: HistoricoEstoqueRepository):
+    def __init__(self, historico_repository: HistoricoEstoqueRepository, settings: AppSettings):
         self.historico_repository = historico_repository
+        self.settings = settings
+
+    def periodo_consulta(self, start_date: datetime, end_date: datetime | None = None) -> tuple[datetime, datetime]:
+        """
+        Valida o período de uma consulta ao histórico. Datas sem fuso são tratadas como UTC
+        e o fim padrão é o momento atual.
+
+        :raises EstoqueBadRequestException: Se o período for invertido ou maior que historico_consulta_max_dias.
+        """
+        if start_date.tzinfo is None:
+            start_date = start_date.replace(tzinfo=timezone.utc)
+        if end_date is None:
+            end_date = datetime.now(timezone.utc)
+        elif end_date.tzinfo is None:
+            end_date = end_date.replace(tzinfo=timezone.utc)
+
+        if start_date >= end_date:
+            raise EstoqueBadRequestException(
+                "O início do período deve ser anterior ao fim.", "start", start_date.isoformat(), location="query"
+            )
+        max_dias = self.settings.historico_consulta_max_dias
+        if end_date - start_date > timedelta(days=max_dias):
+            raise EstoqueBadRequestException(
+                f"O período consultado não pode ser maior que {max_dias} dias.",
+                "end",
+                end_date.isoformat(),
+                location="query",
+            )
+        return start_date, end_date
+
+    async def drenar_outbox(self, batch_size: int = DEFAULT_OUTBOX_BATCH_SIZE) -> int:
+        """
+        Move os registros do outbox para o histórico, em lotes, até esvaziá-lo.
+        Ideal para ser usado por um worker/processo em background.
+        """
+        total = 0
+        while True:
+            moved = await self.historico_repository.move_from_outbox(batch_size)
+            total += moved
+            if moved < batch_size:
+                break
+        if total:
+            logger.info(f"WORKER: {total} registros de histórico movidos do outbox.")
+        return total
+
+    async def manter_particoes(
+        self, meses_a_frente: int = DEFAULT_PARTICOES_FUTURAS, retencao_meses: int = 0
+    ) -> tuple[List[str], List[str]]:
+        """
+        Cria as partições mensais do histórico do mês corrente até `meses_a_frente` meses à frente
+        e remove as anteriores aos últimos `retencao_meses` meses completos (0 mantém tudo),
+        junto com os snapshots anteriores ao corte. Ideal para ser usado por um worker/processo em background.
+
+        O histórico só é removido quando já existe um snapshot a partir do corte: sem ele, as
+        posições seriam reconstruídas a partir de um histórico incompleto.
+
+        :return: (partições criadas, partições removidas).
+        """
+        mes_atual = month_start(utcnow())
+        meses = [add_months(mes_atual, i) for i in range(meses_a_frente + 1)]
+        criadas = await self.historico_repository.create_partitions(meses)
+        if criadas:
+            logger.info(f"WORKER: partições de histórico criadas: {', '.join(criadas)}.")
+
+        removidas: List[str] = []
+        if retencao_meses > 0:
+            corte = add_months(mes_atual, -retencao_meses)
+            corte_em = datetime(corte.year, corte.month, corte.day, tzinfo=timezone.utc)
+            ultimo_snapshot = await self.historico_repository.find_snapshot_em()
+            if ultimo_snapshot is None or ultimo_snapshot < corte_em:
+                logger.warning(
+                    f"WORKER: nenhum snapshot a partir de {corte.isoformat()}; "
+                    "histórico anterior mantido até existir um."
+                )
+                return criadas, removidas
+
+            removidas = await self.historico_repository.drop_partitions_before(corte)
+            if removidas:
+                logger.info(f"WORKER: partições de histórico removidas pela retenção: {', '.join(removidas)}.")
+            if snapshots := await self.historico_repository.delete_snapshots_before(corte_em):
+                logger.info(f"WORKER: {snapshots} linhas de snapshot anteriores a {corte.isoformat()} removidas.")
+        return criadas, removidas
+
+    async def atualizar_resumos(self, janela_horas: int = DEFAULT_RESUMO_JANELA_HORAS) -> int:
+        """
+        Atualiza os resumos por hora e por dia a partir das movimentações gravadas desde a última
+        execução (menos `janela_horas`). Na primeira execução resume todo o histórico, um dia por vez.
+        Ideal para ser usado por um worker/processo em background.
+
+        :return: Quantidade de intervalos resumidos.
+        """
+        agora = utcnow()
+        processado_ate = await self.historico_repository.get_resumo_processado_ate()
+        if processado_ate is None:
+            processado_ate = await self.historico_repository.find_first_movimentado_em()
+            if processado_ate is None:
+                return 0
+
+        inicio = (processado_ate.astimezone(timezone.utc) - timedelta(hours=janela_horas)).replace(
+            minute=0, second=0, microsecond=0
+        )
+        lotes = 0
+        while inicio < agora:
+            fim = min(inicio + RESUMO_LOTE, agora)
+            await self.historico_repository.refresh_resumos(inicio, fim)
+            inicio = fim
+            lotes += 1
+        if lotes > 1:
+            logger.info(f"WORKER: {lotes} intervalos do histórico resumidos.")
+        return lotes
+
+    async def get_resumo_semanal(self, seller_id: str) -> List[ResumoHistoricoEstoque]:
+        """
+        Retorna os resumos por dia e sku dos últimos 7 dias, incluindo o dia atual.
+        """
+        end_date = datetime.now(timezone.utc)
+        start_date = end_date.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=6)
+        return await self.historico_repository.find_resumos_por_dia(start_date, end_date, seller_id)
+
+    async def get_resumo_diario(self, seller_id: str) -> List[ResumoHistoricoEstoque]:
+        """
+        Retorna os resumos por hora e sku do dia atual.
+        """
+        end_date = datetime.now(timezone.utc)
+        start_date = end_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        return await self.historico_repository.find_resumos_por_hora(start_date, end_date, seller_id)
+
+    async def get_posicao(self, seller_id: str, as_of: datetime, sku: str | None = None) -> List[PosicaoEstoque]:
+        """
+        Retorna a quantidade de cada SKU do vendedor (ou de um SKU) no instante `as_of`.
+        Datas sem fuso são tratadas como UTC.
+
+        Com retenção do histórico, só instantes a partir do snapshot mais antigo mantido podem
+        ser reconstruídos: antes dele, parte das movimentações pode já ter sido removida.
+
+        :raises EstoqueBadRequestException: Se `as_of` for anterior ao snapshot mais antigo mantido.
+        """
+        if as_of.tzinfo is None:
+            as_of = as_of.replace(tzinfo=timezone.utc)
+        if self.settings.historico_retencao_meses > 0:
+            inicio = await self.historico_repository.find_primeiro_snapshot_em()
+            if inicio is not None and as_of < inicio:
+                raise EstoqueBadRequestException(
+                    f"Posições disponíveis somente a partir de {inicio.isoformat()}.",
+                    "as_of",
+                    as_of.isoformat(),
+                    location="query",
+                )
+        return await self.historico_repository.find_posicoes_as_of(seller_id, as_of, sku)
+
+    async def gerar_snapshot(self) -> datetime | None:
+        """
+        Gera o snapshot da última meia-noite (UTC), a partir do snapshot anterior e das
+        movimentações desde então. Ideal para ser usado por um worker/processo em background.
+
+        :return: O instante do snapshot gerado, ou None se ele já existia ou se o outbox ainda
+                 tem movimentações anteriores a ele.
+        """
+        tirado_em = (utcnow() - SNAPSHOT_ATRASO).replace(hour=0, minute=0, second=0, microsecond=0)
+        anterior = await self.historico_repository.find_snapshot_em()
+        if anterior is not None and anterior >= tirado_em:
+            return None
+
+        # O snapshot é a base dos seguintes: movimentações que chegassem depois dele ficariam de fora de todos
+        pendente = await self.historico_repository.find_outbox_movimentado_em()
+        if pendente is not None and pendente <= tirado_em:
+            logger.warning(
+                f"WORKER: outbox com movimentações desde {pendente.isoformat()}; "
+                f"snapshot em {tirado_em.isoformat()} adiado."
+            )
+            return None
+
+        total = await self.historico_repository.create_snapshot(tirado_em, anterior)
+        logger.info(f"WORKER: snapshot do estoque em {tirado_em.isoformat()} gerado com {total} SKUs.")
+        return tirado_em
 
     async def get_relatorio_semanal(self, seller_id: str | None) -> List[HistoricoEstoque]:
         """
         Retorna o histórico de movimentações dos últimos 7 dias.
         """
-        end_date = datetime.now(timezone.utc)
-        start_date = end_date - timedelta(days=7)
+        start_date, end_date = periodo_semanal()
         return await self.historico_repository.find_by_period(start_date, end_date, seller_id)
 
     async def get_relatorio_diario(self, seller_id: str | None) -> List[HistoricoEstoque]:
         """
         Retorna o histórico de movimentações do dia atual.
         """
-        end_date = datetime.now(timezone.utc)
-        start_date = end_date.replace(hour=0, minute=0, second=0, microsecond=0)
-        return await self.historico_repository.find_by_period(start_date, end_date, seller_id)
\ No newline at end of file
+        start_date, end_date = periodo_diario()
+        return await self.historico_repository.find_by_period(start_date, end_date, seller_id)
+
+    async def get_pagina(
+        self,
+        seller_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        limit: int,
+        after: tuple[datetime, int] | None = None,
+        sku: str | None = None,
+        tipo_movimentacao: TipoMovimentacaoEnum | None = None,
+    ) -> List[HistoricoEstoque]:
+        """
+        Retorna uma página do histórico do período, a partir do registro seguinte a `after`.
+        """
+        return await self.historico_repository.find_page_by_period(
+            start_date, end_date, seller_id, limit, after=after, sku=sku, tipo_movimentacao=tipo_movimentacao
+        )
+
+    async def iter_movimentacoes(
+        self,
+        seller_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        sku: str | None = None,
+        tipo_movimentacao: TipoMovimentacaoEnum | None = None,
+        batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[HistoricoEstoque]:
+        """
+        Percorre todo o histórico do período, página a página, mantendo em memória
+        no máximo `batch_size` registros por vez.
+        """
+        after: tuple[datetime, int] | None = None
+        while True:
+            pagina = await self.get_pagina(
+                seller_id, start_date, end_date, batch_size, after=after, sku=sku, tipo_movimentacao=tipo_movimentacao
+            )
+            for historico in pagina:
+                yield historico
+            if len(pagina) < batch_size:
+                return
+            after = pagina[-1].chave_paginacao
\ No newline at end of file
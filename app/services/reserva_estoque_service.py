@@ -0,0 +1,156 @@
+from datetime import timedelta
+from typing import NoReturn
+
+from pclogging import LoggingBuilder
+
+from app.common.datetime import utcnow
+from app.common.exceptions.estoque_exceptions import (
+    EstoqueBadRequestException,
+    EstoqueIndisponivelException,
+    EstoqueNotFoundException,
+    ReservaNaoAtivaException,
+    ReservaNotFoundException,
+)
+from app.models.historico_estoque_model import TipoMovimentacaoEnum
+from app.models.reserva_estoque_model import ReservaEstoque
+from app.repositories.reserva_estoque_repository import ReservaEstoqueRepository
+from app.settings import AppSettings
+
+from .estoque_service import EstoqueServices
+
+logger = LoggingBuilder.get_logger(__name__)
+
+
+class ReservaEstoqueService:
+    """
+    Reservas temporárias de estoque (checkout).
+
+    A reserva retém unidades no contador `quantidade_reservada` sem alterar `quantidade`;
+    somente a confirmação baixa o estoque definitivamente. Reservas não confirmadas
+    expiram e são devolvidas pela varredura do worker.
+
+    SKUs em modo contador quente não aceitam reservar nem confirmar: as baixas pendentes
+    no Redis ainda não estão no banco e as duas operações venderiam as mesmas unidades.
+    """
+
+    def __init__(
+        self,
+        repository: ReservaEstoqueRepository,
+        estoque_service: EstoqueServices,
+        settings: AppSettings,
+    ):
+        self.repository = repository
+        self.estoque_service = estoque_service
+        self.settings = settings
+
+    async def reserve(
+        self, seller_id: str, sku: str, quantidade: int, ttl_seconds: int | None = None
+    ) -> ReservaEstoque:
+        """
+        Cria uma reserva de `quantidade` unidades, válida por `ttl_seconds` segundos.
+        """
+        ttl_seconds = ttl_seconds or self.settings.reserva_ttl_seconds
+        if quantidade <= 0:
+            raise EstoqueBadRequestException("quantidade deve ser maior que zero.", "quantidade", quantidade)
+        if ttl_seconds > self.settings.reserva_ttl_max_seconds:
+            raise EstoqueBadRequestException(
+                f"ttl_seconds deve ser no máximo {self.settings.reserva_ttl_max_seconds}.", "ttl_seconds", ttl_seconds
+            )
+
+        await self.estoque_service.validar_fora_do_contador_quente(
+            seller_id, sku, "Estoque em modo contador quente não aceita reservas."
+        )
+        logger.info(f"Reservando {quantidade} unidades de seller_id={seller_id}, sku={sku} por {ttl_seconds}s")
+        reserva = ReservaEstoque(
+            seller_id=seller_id,
+            sku=sku,
+            quantidade=quantidade,
+            expira_em=utcnow() + timedelta(seconds=ttl_seconds),
+        )
+        created = await self.repository.reserve(reserva)
+        if created is None:
+            await self._raise_estoque_indisponivel(seller_id, sku, quantidade)
+
+        await self.estoque_service.invalidate_cache(seller_id, sku)
+        return created
+
+    async def get(self, seller_id: str, reserva_id: int) -> ReservaEstoque:
+        """
+        Busca uma reserva do vendedor.
+        """
+        reserva = await self.repository.find_by_id_and_seller_id(reserva_id, seller_id)
+        if reserva is None:
+            raise ReservaNotFoundException(seller_id=seller_id, reserva_id=reserva_id)
+        return reserva
+
+    async def confirm(self, seller_id: str, reserva_id: int) -> ReservaEstoque:
+        """
+        Confirma a reserva, baixando a quantidade reservada do estoque.
+        """
+        logger.info(f"Confirmando reserva {reserva_id} de seller_id={seller_id}")
+        reserva = await self.get(seller_id, reserva_id)
+        await self.estoque_service.validar_fora_do_contador_quente(
+            seller_id, reserva.sku, "Estoque em modo contador quente; a reserva não pode ser confirmada."
+        )
+        outbox = self.settings.historico_outbox_habilitado
+        confirmed = await self.repository.confirm(reserva_id, seller_id, utcnow(), registrar_historico=outbox)
+        if confirmed is None:
+            await self._raise_not_active(seller_id, reserva_id)
+
+        reserva, estoque = confirmed
+        if estoque is None:
+            await self._raise_estoque_indisponivel(seller_id, reserva.sku, reserva.quantidade)
+        if outbox:
+            await self.estoque_service.sincronizar_alteracao(estoque)
+            return reserva
+        await self.estoque_service.registrar_movimentacao(
+            estoque=estoque,
+            tipo=TipoMovimentacaoEnum.CONFIRMACAO_RESERVA,
+            quantidade_anterior=estoque.quantidade + reserva.quantidade,
+        )
+        return reserva
+
+    async def release(self, seller_id: str, reserva_id: int) -> ReservaEstoque:
+        """
+        Libera a reserva, devolvendo as unidades ao disponível para venda.
+        """
+        logger.info(f"Liberando reserva {reserva_id} de seller_id={seller_id}")
+        reserva = await self.repository.release(reserva_id, seller_id, utcnow())
+        if reserva is None:
+            await self._raise_not_active(seller_id, reserva_id)
+
+        await self.estoque_service.invalidate_cache(reserva.seller_id, reserva.sku)
+        return reserva
+
+    async def expire_reservas(self) -> int:
+        """
+        Expira as reservas vencidas, em lotes, até não restar nenhuma.
+        Ideal para ser usado por um worker/processo em background.
+        """
+        batch_size = self.settings.reserva_expiracao_batch_size
+        total = 0
+        while True:
+            expired = await self.repository.expire_due(utcnow(), batch_size)
+            for sku_key in {(reserva.seller_id, reserva.sku) for reserva in expired}:
+                await self.estoque_service.invalidate_cache(*sku_key)
+            total += len(expired)
+            if len(expired) < batch_size:
+                break
+        if total:
+            logger.info(f"WORKER: {total} reservas expiradas devolvidas ao estoque.")
+        return total
+
+    async def _raise_estoque_indisponivel(self, seller_id: str, sku: str, quantidade: int) -> NoReturn:
+        # Distingue estoque inexistente de quantidade insuficiente
+        if await self.estoque_service.repository.find_by_seller_id_and_sku(seller_id, sku) is None:
+            raise EstoqueNotFoundException(seller_id=seller_id, sku=sku)
+        logger.warning(f"Quantidade insuficiente em seller_id={seller_id}, sku={sku} para {quantidade} unidades")
+        raise EstoqueIndisponivelException(seller_id=seller_id, sku=sku, quantidade=quantidade)
+
+    async def _raise_not_active(self, seller_id: str, reserva_id: int) -> NoReturn:
+        reserva = await self.get(seller_id, reserva_id)
+        logger.warning(f"Reserva {reserva_id} de seller_id={seller_id} não está ativa (status={reserva.status})")
+        raise ReservaNaoAtivaException(reserva_id=reserva_id, status=reserva.status.value)
+
+
+__all__ = ["ReservaEstoqueService"]
@@ -32,6 +32,19 @@ class ApiSettings(AppSettings):
         title="Caminho para o health check. A partir dele haverão dois recursos: ping e health",
     )
 
+    metrics_path: str = Field(
+        default="/metrics",
+        title="Caminho para exportar as métricas do Prometheus, deixar vazio para não exportar.",
+    )
+
+    slow_request_ms: int = Field(
+        default=1000,
+        title="Requisições mais demoradas que isso, em ms, são logadas com o tempo de cada fase (0 desliga)",
+    )
+    slow_request_sample_ratio: float = Field(
+        default=0.1, ge=0, le=1, title="Fração das requisições lentas que é logada"
+    )
+
     cors_origins: list[str] = Field(default=["*"], title="Origens permitidas para CORS")
 
     access_log_ignored_urls: set[str] | None = Field(
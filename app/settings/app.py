@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 
 import dotenv
 from pydantic import Field, HttpUrl, PostgresDsn, RedisDsn
@@ -19,10 +20,78 @@ class AppSettings(BaseSettings):
     disk_usage_max: int = Field(default=80, title="Limite máximo de 80% de uso de disco")
 
     low_stock_threshold: int = Field(default=15, title="Limite para notificação de estoque baixo")
+    notificacao_concorrencia: int = Field(
+        default=32, title="Quantidade máxima de notificações de estoque baixo enviadas ao mesmo tempo"
+    )
+    notificacao_max_tentativas: int = Field(default=3, title="Tentativas de entrega de cada notificação")
+    notificacao_backoff_segundos: float = Field(
+        default=0.5, title="Espera antes da segunda tentativa de entrega; dobra a cada nova tentativa"
+    )
+    notificacao_itens_por_digest: int = Field(
+        default=100, title="Quantidade máxima de SKUs em uma notificação; acima disso o vendedor recebe várias"
+    )
+
+    reserva_ttl_seconds: int = Field(default=900, title="Validade padrão, em segundos, de uma reserva de estoque")
+    reserva_ttl_max_seconds: int = Field(default=3600, title="Validade máxima, em segundos, de uma reserva de estoque")
+    reserva_expiracao_batch_size: int = Field(
+        default=500, title="Quantidade máxima de reservas expiradas por execução da varredura"
+    )
+
+    historico_outbox_habilitado: bool = Field(
+        default=False,
+        title="Grava o histórico no outbox, na transação da alteração, para ser movido em lote pelo worker",
+    )
+    historico_outbox_batch_size: int = Field(
+        default=1000, title="Quantidade máxima de registros movidos do outbox para o histórico por instrução"
+    )
+    historico_particoes_futuras: int = Field(
+        default=3, title="Quantidade de meses futuros com partição do histórico criada antecipadamente pelo worker"
+    )
+    historico_retencao_meses: int = Field(
+        default=0,
+        title="Meses completos de histórico mantidos; partições mais antigas são removidas (0 mantém tudo)",
+    )
+    historico_consulta_max_dias: int = Field(
+        default=31, title="Maior intervalo, em dias, aceito em uma consulta ao histórico por período"
+    )
+    historico_resumo_janela_horas: int = Field(
+        default=2, title="Horas já resumidas que o worker resume de novo para incluir movimentações atrasadas"
+    )
+
+    contador_quente_habilitado: bool = Field(
+        default=False, title="Habilita o modo contador quente (baixas no Redis) para SKUs designados"
+    )
+    contador_quente_retencao_flush_horas: int = Field(
+        default=24, title="Por quantas horas os registros de consolidação do contador quente são mantidos"
+    )
 
     app_db_url: PostgresDsn = Field(..., title="URI para o banco Postgresql")
 
+    app_db_prepared_statement_cache_size: int = Field(
+        default=500, title="Quantidade de prepared statements do asyncpg mantidos em cache por conexão"
+    )
+    app_db_slow_query_ms: int = Field(
+        default=200,
+        title="Consultas mais demoradas que isso, em ms, são logadas sem os valores dos parâmetros (0 desliga)",
+    )
+
     app_openid_wellknown: HttpUrl = Field(..., title="URL well-known do Keycloak")
+    auth_token_cache_size: int = Field(
+        default=10_000, title="Quantidade máxima de tokens validados mantidos em cache até expirarem"
+    )
+    auth_jwks_ttl_seconds: int = Field(default=600, title="Intervalo, em segundos, da renovação das chaves do IDP")
+    auth_jwks_refetch_min_seconds: int = Field(
+        default=30, title="Intervalo mínimo, em segundos, entre buscas de chaves causadas por kid desconhecido"
+    )
+
+    tracing_exporter: Literal["none", "console", "file", "otlp"] = Field(
+        default="none", title="Exportador dos spans do OpenTelemetry; none desliga o tracing"
+    )
+    tracing_file_path: str = Field(default="traces.jsonl", title="Arquivo dos spans com o exportador file")
+    tracing_otlp_endpoint: str | None = Field(
+        default=None, title="Endpoint OTLP/HTTP dos spans; vazio usa OTEL_EXPORTER_OTLP_TRACES_ENDPOINT"
+    )
+    tracing_sample_ratio: float = Field(default=1.0, ge=0, le=1, title="Fração das requisições rastreadas")
 
     pc_logging_level: str = Field("DEBUG", description="Nível do logging")
     pc_logging_env: str = Field("prod", description="Ambiente do logging (prod ou dev ou test)")
@@ -1,12 +1,69 @@
+from typing import Literal
+
 from pydantic import Field
 
 from .app import AppSettings
 
+# Tipos de job atendidos pelo worker (um stream do Redis por tipo)
+JOB_CONTADORES_QUENTES = "contadores_quentes"
+JOB_RESERVAS = "reservas"
+JOB_PARTICOES_HISTORICO = "particoes_historico"
+JOB_OUTBOX_HISTORICO = "outbox_historico"
+JOB_RESUMOS_HISTORICO = "resumos_historico"
+JOB_SNAPSHOT_ESTOQUE = "snapshot_estoque"
+JOB_ESTOQUE_BAIXO = "estoque_baixo"
+
+JOBS = {
+    JOB_CONTADORES_QUENTES,
+    JOB_RESERVAS,
+    JOB_PARTICOES_HISTORICO,
+    JOB_OUTBOX_HISTORICO,
+    JOB_RESUMOS_HISTORICO,
+    JOB_SNAPSHOT_ESTOQUE,
+    JOB_ESTOQUE_BAIXO,
+}
+
+# Agenda padrão de cada job: intervalo (`@every 30s`) ou cron de cinco campos, em UTC.
+# Jobs baratos rodam com frequência; a manutenção de partições, de madrugada.
+AGENDAS_PADRAO = {
+    JOB_CONTADORES_QUENTES: "@every 30s",
+    JOB_RESERVAS: "@every 1m",
+    JOB_PARTICOES_HISTORICO: "15 3 * * *",
+    JOB_OUTBOX_HISTORICO: "@every 15s",
+    JOB_RESUMOS_HISTORICO: "@every 5m",
+    JOB_SNAPSHOT_ESTOQUE: "@every 10m",
+    JOB_ESTOQUE_BAIXO: "@every 1m",
+}
+
 
 class WorkerSettings(AppSettings):
     enabled_workers: set[str] = Field(
-        default={"customer"},
-        title="Workers que devem ser inicializados",
+        default=JOBS,
+        title="Tipos de job consumidos (e agendados) por esta instância do worker",
+    )
+    worker_concorrencia: int = Field(default=4, title="Quantidade máxima de jobs executados ao mesmo tempo")
+    worker_agendas: dict[str, str] = Field(
+        default_factory=dict,
+        title="Agenda por tipo de job (ex.: {\"snapshot_estoque\": \"0 4 * * *\"}); sobrepõe AGENDAS_PADRAO",
+    )
+    worker_jitter_segundos: int = Field(
+        default=5, title="Atraso aleatório máximo de cada disparo, limitado a um quarto do período do job"
+    )
+    worker_politica_atraso: Literal["pular", "executar_uma"] = Field(
+        default="executar_uma",
+        title="Horários perdidos enquanto nenhuma réplica agendava: pular todos ou executar uma vez",
+    )
+    worker_max_tentativas: int = Field(default=5, title="Execuções de um job antes de movê-lo para o stream de falhas")
+    worker_visibilidade_segundos: int = Field(
+        default=300,
+        title="Tempo sem confirmação após o qual o job de um worker é assumido por outro",
+    )
+    worker_lease_segundos: int = Field(
+        default=30,
+        title="Prazo das leases de liderança e de execução de jobs; renovadas a cada terço do prazo",
+    )
+    worker_metrics_port: int = Field(
+        default=9464, title="Porta do servidor HTTP com as métricas do Prometheus do worker (0 desabilita)"
     )
 
 
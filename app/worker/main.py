@@ -2,49 +2,137 @@
 
 import asyncio
 import os
+import socket
 
 from pclogging import LoggingBuilder
+from prometheus_client import start_http_server
 
 from dotenv import load_dotenv
 load_dotenv(override=True)
 
 os.environ.setdefault("ENV", "dev")
 
-from app.container import Container
-from .tasks import run_low_stock_check_task
+from app.common.tracing import configure_tracing  # noqa: E402
+from app.container import Container  # noqa: E402
+from app.integrations.kv_db.redis_lease import RedisLease  # noqa: E402
+from app.settings import AppSettings, worker_settings  # noqa: E402
+from app.settings.worker import (  # noqa: E402
+    AGENDAS_PADRAO,
+    JOB_CONTADORES_QUENTES,
+    JOB_ESTOQUE_BAIXO,
+    JOB_OUTBOX_HISTORICO,
+    JOB_PARTICOES_HISTORICO,
+    JOB_RESERVAS,
+    JOB_RESUMOS_HISTORICO,
+    JOB_SNAPSHOT_ESTOQUE,
+)
+from .runtime import Handler, WorkerRuntime, run_as_leader  # noqa: E402
+from .schedule import JobSchedule, run_scheduler  # noqa: E402
+from .tasks import (  # noqa: E402
+    run_atualizar_resumos_historico_task,
+    run_drain_historico_outbox_task,
+    run_expire_reservas_task,
+    run_flush_contadores_quentes_task,
+    run_gerar_snapshot_estoque_task,
+    run_low_stock_check_task,
+    run_manter_particoes_historico_task,
+)
 
 LoggingBuilder.init(log_level="DEBUG")
 logger = LoggingBuilder.get_logger(__name__)
 
 
+def build_handlers(container: Container, settings: AppSettings) -> dict[str, Handler]:
+    """
+    Associa cada tipo de job à tarefa que o executa.
+    """
+    contador_quente_service = container.contador_quente_service()
+    reserva_estoque_service = container.reserva_estoque_service()
+    historico_estoque_service = container.historico_estoque_service()
+    alerta_estoque_service = container.alerta_estoque_service()
+
+    async def manter_particoes(payload: dict):
+        await run_manter_particoes_historico_task(
+            historico_estoque_service, settings.historico_particoes_futuras, settings.historico_retencao_meses
+        )
+
+    async def drenar_outbox(payload: dict):
+        await run_drain_historico_outbox_task(historico_estoque_service, settings.historico_outbox_batch_size)
+
+    async def atualizar_resumos(payload: dict):
+        await run_atualizar_resumos_historico_task(historico_estoque_service, settings.historico_resumo_janela_horas)
+
+    return {
+        JOB_CONTADORES_QUENTES: lambda payload: run_flush_contadores_quentes_task(contador_quente_service),
+        JOB_RESERVAS: lambda payload: run_expire_reservas_task(reserva_estoque_service),
+        JOB_PARTICOES_HISTORICO: manter_particoes,
+        JOB_OUTBOX_HISTORICO: drenar_outbox,
+        JOB_RESUMOS_HISTORICO: atualizar_resumos,
+        JOB_SNAPSHOT_ESTOQUE: lambda payload: run_gerar_snapshot_estoque_task(historico_estoque_service),
+        JOB_ESTOQUE_BAIXO: lambda payload: run_low_stock_check_task(alerta_estoque_service),
+    }
+
+
 async def worker_loop():
     """
     Função principal do worker.
-    Configura o container de dependências e executa a tarefa em um loop.
+    Configura o container de dependências, agenda os jobs periódicos e consome os
+    streams de jobs habilitados em `enabled_workers`.
     """
-    logger.info("Iniciando o loop do Worker de Estoque...")
-    
+    logger.info("Iniciando o Worker de Estoque...")
+
+    if worker_settings.worker_metrics_port:
+        start_http_server(worker_settings.worker_metrics_port)
+        logger.info(f"Métricas do worker expostas na porta {worker_settings.worker_metrics_port}.")
+
     container = Container()
     container.config.from_yaml("config.yml")
-    
+
     container.config.app_db_url.from_env("APP_DB_URL")
     container.config.app_redis_url.from_env("APP_REDIS_URL")
     container.config.app_openid_wellknown.from_env("APP_OPENID_WELLKNOWN")
-    
-    estoque_service = container.estoque_service()
-    
-    check_interval_seconds = 60
 
-    logger.info(f"O worker em background irá verificar o estoque a cada {check_interval_seconds} segundos.")
+    configure_tracing(container.settings())
+    handlers = build_handlers(container, container.settings())
+    desconhecidos = worker_settings.enabled_workers - handlers.keys()
+    if desconhecidos:
+        logger.warning(f"Tipos de job desconhecidos em enabled_workers ignorados: {sorted(desconhecidos)}")
+    handlers = {tipo: handler for tipo, handler in handlers.items() if tipo in worker_settings.enabled_workers}
+
+    queue = container.job_queue()
+    redis_adapter = container.redis_adapter()
+    consumer = f"{socket.gethostname()}-{os.getpid()}"
+    lease_segundos = worker_settings.worker_lease_segundos
+    runtime = WorkerRuntime(
+        queue,
+        handlers,
+        consumer=consumer,
+        concorrencia=worker_settings.worker_concorrencia,
+        max_tentativas=worker_settings.worker_max_tentativas,
+        visibilidade_ms=worker_settings.worker_visibilidade_segundos * 1000,
+        lease_factory=lambda tipo: RedisLease(redis_adapter, f"{queue.stream(tipo)}:lease", consumer, lease_segundos),
+    )
 
-    while True:
-        try:
-            await run_low_stock_check_task(estoque_service)
-        except Exception as e:
-            logger.error(f"Erro inesperado no loop principal do worker: {e}", exc_info=True)
-        
-        logger.info(f"Worker aguardando {check_interval_seconds} segundos para a próxima execução.")
-        await asyncio.sleep(check_interval_seconds)
+    # Cada tipo de job é agendado só pela réplica líder daquele tipo; as demais que também
+    # o consomem ficam de prontidão para assumir. Agenda inválida impede a subida do worker.
+    agendas = {**AGENDAS_PADRAO, **worker_settings.worker_agendas}
+    schedules = {tipo: JobSchedule(agendas[tipo]) for tipo in runtime.tipos}
+    lideres = [
+        run_as_leader(
+            RedisLease(redis_adapter, f"{queue.stream(tipo)}:lider", consumer, lease_segundos),
+            lambda tipo=tipo: run_scheduler(
+                queue,
+                tipo,
+                schedules[tipo],
+                worker_settings.worker_jitter_segundos,
+                worker_settings.worker_politica_atraso,
+            ),
+            lease_segundos / 3,
+        )
+        for tipo in runtime.tipos
+    ]
+    logger.info(f"Jobs periódicos agendados pela réplica líder de cada tipo: {[*schedules.values()]}.")
+    await asyncio.gather(*lideres, runtime.run())
 
 
 if __name__ == "__main__":
@@ -52,4 +140,4 @@ if __name__ == "__main__":
         print("Executando o worker de forma independente para teste...")
         asyncio.run(worker_loop()) 
     except KeyboardInterrupt:
-        logger.info("Worker independente interrompido pelo usuário.")
\ No newline at end of file
+        logger.info("Worker independente interrompido pelo usuário.")
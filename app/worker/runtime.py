@@ -0,0 +1,236 @@
+import asyncio
+import time
+from collections import defaultdict
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from pclogging import LoggingBuilder
+
+from app.common.datetime import utcnow
+from app.common.metrics import WORKER_JOB_DURATION
+from app.integrations.kv_db.redis_job_queue import Job, RedisJobQueue
+from app.integrations.kv_db.redis_lease import RedisLease
+
+logger = LoggingBuilder.get_logger(__name__)
+
+Handler = Callable[[dict], Awaitable[None]]
+LeaseFactory = Callable[[str], RedisLease]
+
+# Pausa antes de voltar a ler dos streams depois de um erro (ex.: Redis indisponível)
+ERRO_ESPERA_SEGUNDOS = 1
+
+# Intervalo entre as devoluções ao stream dos jobs adiados cujo backoff terminou
+PROMOCAO_INTERVALO_SEGUNDOS = 1
+
+
+@dataclass
+class MetricasJob:
+    """
+    Tempos das execuções de um tipo de job nesta réplica. `atraso` é o tempo entre o
+    horário agendado e o início da execução.
+    """
+
+    execucoes: int = 0
+    falhas: int = 0
+    descartes: int = 0
+    duracao_total: float = 0.0
+    duracao_maxima: float = 0.0
+    ultima_duracao: float | None = None
+    ultimo_atraso: float | None = None
+
+    def registrar(self, duracao: float, atraso: float | None, sucesso: bool):
+        self.execucoes += 1
+        if not sucesso:
+            self.falhas += 1
+        self.duracao_total += duracao
+        self.duracao_maxima = max(self.duracao_maxima, duracao)
+        self.ultima_duracao = duracao
+        self.ultimo_atraso = atraso
+
+
+class WorkerRuntime:
+    """
+    Consome jobs dos streams do Redis e os executa com concorrência limitada.
+
+    Só lê do Redis tantos jobs quantos couberem nas vagas livres, então o acúmulo fica no
+    stream e não na memória do worker. Várias réplicas dividem os jobs pelo consumer group
+    sem processar a mesma mensagem duas vezes; jobs de uma réplica que caiu são assumidos
+    pelas outras depois de `visibilidade_ms`. Enquanto um job executa, a réplica o renova a
+    cada terço desse tempo, então jobs longos não são assumidos por engano.
+
+    Com `lease_factory`, cada execução segura a lease do seu tipo de job: um job que chega
+    enquanto outro do mesmo tipo ainda executa (em qualquer réplica) é descartado, já que
+    a execução em andamento cobre o mesmo trabalho.
+    """
+
+    def __init__(
+        self,
+        queue: RedisJobQueue,
+        handlers: dict[str, Handler],
+        consumer: str,
+        concorrencia: int = 4,
+        max_tentativas: int = 5,
+        visibilidade_ms: int = 300_000,
+        bloqueio_ms: int = 5_000,
+        lease_factory: LeaseFactory | None = None,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.consumer = consumer
+        self.concorrencia = concorrencia
+        self.max_tentativas = max_tentativas
+        self.visibilidade_ms = visibilidade_ms
+        self.bloqueio_ms = bloqueio_ms
+        self.lease_factory = lease_factory
+        self._tasks: set[asyncio.Task] = set()
+        self._running = False
+        self._proximo_claim = 0.0
+        self._proxima_promocao = 0.0
+        self.metricas: dict[str, MetricasJob] = defaultdict(MetricasJob)
+
+    @property
+    def tipos(self) -> list[str]:
+        return sorted(self.handlers)
+
+    @property
+    def vagas(self) -> int:
+        return self.concorrencia - len(self._tasks)
+
+    async def run(self):
+        """
+        Executa até `stop()` ou cancelamento; ao sair, espera os jobs em andamento.
+        """
+        await self.queue.ensure_groups(self.tipos)
+        self._running = True
+        logger.info(f"Worker {self.consumer} consumindo {self.tipos} com concorrência {self.concorrencia}.")
+        try:
+            while self._running:
+                try:
+                    await self.poll()
+                except Exception as e:
+                    logger.error(f"Erro ao consumir os streams de jobs: {e}", exc_info=True)
+                    await asyncio.sleep(ERRO_ESPERA_SEGUNDOS)
+        finally:
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stop(self):
+        self._running = False
+
+    async def poll(self):
+        """
+        Espera uma vaga, assume jobs abandonados e devolve ao stream os jobs adiados
+        (periodicamente) e lê jobs novos.
+        """
+        if self.vagas <= 0:
+            await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+
+        if time.monotonic() >= self._proximo_claim:
+            self._proximo_claim = time.monotonic() + self.visibilidade_ms / 2000
+            for tipo in self.tipos:
+                if self.vagas <= 0:
+                    break
+                for job in await self.queue.claim_stale(self.consumer, tipo, self.visibilidade_ms, self.vagas):
+                    logger.warning(f"Job {job.tipo}/{job.id} abandonado por outro worker; assumindo.")
+                    self._dispatch(job)
+
+        if time.monotonic() >= self._proxima_promocao:
+            self._proxima_promocao = time.monotonic() + PROMOCAO_INTERVALO_SEGUNDOS
+            for tipo in self.tipos:
+                await self.queue.promover_adiados(tipo)
+
+        if self.vagas > 0:
+            for job in await self.queue.read(self.consumer, self.tipos, self.vagas, self.bloqueio_ms):
+                self._dispatch(job)
+
+    def _dispatch(self, job: Job):
+        task = asyncio.create_task(self._execute(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    def _atraso(job: Job) -> float | None:
+        agendado_em = job.payload.get("agendado_em")
+        if not agendado_em:
+            return None
+        return (utcnow() - datetime.fromisoformat(agendado_em)).total_seconds()
+
+    async def _run_with_heartbeat(self, job: Job, work: Callable[[], Awaitable[None]]):
+        """
+        Executa `work` renovando o job no stream a cada terço do tempo de visibilidade. Se
+        outro worker já assumiu o job, para de renovar e deixa `work` terminar.
+        """
+        task = asyncio.ensure_future(work())
+        renovando = True
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=self.visibilidade_ms / 3000)
+                if done:
+                    return task.result()
+                if not renovando:
+                    continue
+                try:
+                    renovando = await self.queue.heartbeat(self.consumer, job)
+                except Exception as e:
+                    logger.warning(f"Falha ao renovar o job {job.tipo}/{job.id}: {e}")
+                    continue
+                if not renovando:
+                    logger.warning(f"Job {job.tipo}/{job.id} assumido por outro worker durante a execução.")
+        finally:
+            if not task.done():
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+
+    async def _execute(self, job: Job):
+        handler = self.handlers.get(job.tipo)
+        metricas = self.metricas[job.tipo]
+        atraso = self._atraso(job)
+        inicio = time.monotonic()
+        try:
+            if handler is None:
+                raise LookupError(f"Nenhum handler para o tipo de job '{job.tipo}'")
+            if self.lease_factory is None:
+                await self._run_with_heartbeat(job, lambda: handler(job.payload))
+            else:
+                lease = self.lease_factory(job.tipo)
+                if not await lease.acquire():
+                    logger.info(f"Job {job.tipo} já em execução em outro worker; descartando {job.id}.")
+                    metricas.descartes += 1
+                    await self.queue.ack(job)
+                    return
+                await lease.run_while_held(lambda: self._run_with_heartbeat(job, lambda: handler(job.payload)))
+        except Exception as e:
+            duracao = time.monotonic() - inicio
+            metricas.registrar(duracao, atraso, sucesso=False)
+            WORKER_JOB_DURATION.labels(job.tipo, "falha").observe(duracao)
+            logger.error(f"Job {job.tipo}/{job.id} falhou (tentativa {job.tentativas + 1}): {e}", exc_info=True)
+            if not await self.queue.retry(job, self.max_tentativas):
+                logger.error(f"Job {job.tipo}/{job.id} esgotou as tentativas; movido para o stream de falhas.")
+            return
+        duracao = time.monotonic() - inicio
+        metricas.registrar(duracao, atraso, sucesso=True)
+        WORKER_JOB_DURATION.labels(job.tipo, "sucesso").observe(duracao)
+        atraso_log = f", atraso de {atraso:.3f}s" if atraso is not None else ""
+        logger.info(f"Job {job.tipo}/{job.id} concluído em {duracao:.3f}s{atraso_log}.")
+        await self.queue.ack(job)
+
+
+async def run_as_leader(lease: RedisLease, work: Callable[[], Awaitable[None]], espera_segundos: float):
+    """
+    Executa `work` somente enquanto esta instância for a líder (dona da lease). As demais
+    tentam assumir a cada `espera_segundos` e assumem se a líder cair ou perder a lease.
+    """
+    while True:
+        try:
+            if await lease.acquire():
+                logger.info(f"{lease.owner} assumiu a liderança ({lease.key}).")
+                await lease.run_while_held(work)
+        except Exception as e:
+            logger.warning(f"{lease.owner} deixou a liderança ({lease.key}): {e}")
+        await asyncio.sleep(espera_segundos)
+
+
+__all__ = ["Handler", "LeaseFactory", "MetricasJob", "WorkerRuntime", "run_as_leader"]
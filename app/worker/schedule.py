@@ -0,0 +1,162 @@
+import asyncio
+import random
+import re
+from datetime import datetime, timedelta, timezone
+
+from pclogging import LoggingBuilder
+
+from app.common.datetime import utcnow
+from app.integrations.kv_db.redis_job_queue import RedisJobQueue
+
+logger = LoggingBuilder.get_logger(__name__)
+
+# O que fazer com os horários perdidos enquanto nenhuma réplica agendava o job
+POLITICA_PULAR = "pular"
+POLITICA_EXECUTAR_UMA = "executar_uma"
+
+_EVERY_PATTERN = re.compile(r"^@every\s+(\d+)\s*([smhd])$")
+_UNIDADES = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# (nome, mínimo, máximo) de cada campo da expressão cron
+_CAMPOS = (("minuto", 0, 59), ("hora", 0, 23), ("dia", 1, 31), ("mes", 1, 12), ("dia_semana", 0, 6))
+
+
+def _parse_campo(valor: str, nome: str, minimo: int, maximo: int) -> frozenset[int]:
+    valores: set[int] = set()
+    for parte in valor.split(","):
+        faixa, _, passo = parte.partition("/")
+        if faixa == "*":
+            inicio, fim = minimo, maximo
+        elif "-" in faixa:
+            inicio, fim = (int(v) for v in faixa.split("-", 1))
+        else:
+            inicio = fim = int(faixa)
+        # No dia da semana, 7 também é domingo
+        if not minimo <= inicio <= fim <= (7 if nome == "dia_semana" else maximo):
+            raise ValueError(f"Campo {nome} fora do intervalo {minimo}-{maximo}: '{valor}'")
+        valores.update(range(inicio, fim + 1, int(passo) if passo else 1))
+    if nome == "dia_semana" and 7 in valores:
+        valores = (valores - {7}) | {0}
+    return frozenset(valores)
+
+
+class JobSchedule:
+    """
+    Agenda de um job periódico, em UTC: intervalo fixo (`@every 30s`, `@every 5m`) alinhado
+    ao relógio, ou expressão cron de cinco campos (`15 3 * * *`: todo dia às 03:15).
+    """
+
+    def __init__(self, spec: str):
+        self.spec = spec.strip()
+        self.intervalo: timedelta | None = None
+        self._campos: tuple[frozenset[int], ...] = ()
+        self._dia_restrito = self._dia_semana_restrito = False
+
+        every = _EVERY_PATTERN.match(self.spec)
+        if every:
+            self.intervalo = timedelta(seconds=int(every.group(1)) * _UNIDADES[every.group(2)])
+            if not self.intervalo:
+                raise ValueError(f"Intervalo inválido: '{spec}'")
+            return
+
+        partes = self.spec.split()
+        if len(partes) != len(_CAMPOS):
+            raise ValueError(f"Agenda inválida: '{spec}'. Use '@every <n><s|m|h|d>' ou cron de cinco campos.")
+        try:
+            self._campos = tuple(_parse_campo(valor, *campo) for valor, campo in zip(partes, _CAMPOS))
+        except ValueError as e:
+            raise ValueError(f"Agenda inválida: '{spec}'. {e}") from e
+        # Como no cron, se dia e dia da semana são restritos, basta um dos dois coincidir
+        self._dia_restrito, self._dia_semana_restrito = partes[2] != "*", partes[4] != "*"
+
+    def __repr__(self) -> str:
+        return f"JobSchedule({self.spec!r})"
+
+    def _dia_coincide(self, momento: datetime) -> bool:
+        _, _, dias, _, dias_semana = self._campos
+        dia = momento.day in dias
+        dia_semana = (momento.isoweekday() % 7) in dias_semana
+        if self._dia_restrito and self._dia_semana_restrito:
+            return dia or dia_semana
+        return dia and dia_semana
+
+    def next_after(self, momento: datetime) -> datetime:
+        """
+        Retorna o primeiro horário da agenda estritamente depois de `momento`.
+        """
+        momento = momento.astimezone(timezone.utc)
+        if self.intervalo is not None:
+            passo = self.intervalo.total_seconds()
+            return datetime.fromtimestamp((momento.timestamp() // passo + 1) * passo, tz=timezone.utc)
+
+        minutos, horas, _, meses, _ = self._campos
+        candidato = momento.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limite = candidato + timedelta(days=366 * 5)
+        while candidato < limite:
+            if candidato.month not in meses:
+                ano, mes = divmod(candidato.month, 12)
+                candidato = candidato.replace(year=candidato.year + ano, month=mes + 1, day=1, hour=0, minute=0)
+            elif not self._dia_coincide(candidato):
+                candidato = (candidato + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidato.hour not in horas:
+                candidato = (candidato + timedelta(hours=1)).replace(minute=0)
+            elif candidato.minute not in minutos:
+                candidato += timedelta(minutes=1)
+            else:
+                return candidato
+        raise ValueError(f"A agenda '{self.spec}' não tem horário nos próximos anos")
+
+    def periodo(self, horario: datetime) -> timedelta:
+        """
+        Distância entre `horario` e o horário seguinte da agenda.
+        """
+        return self.next_after(horario) - horario
+
+
+async def _agendar(queue: RedisJobQueue, tipo: str, agenda: JobSchedule, horario: datetime):
+    try:
+        ttl = max(int(agenda.periodo(horario).total_seconds()) * 2, 2)
+        agendado_em = horario.isoformat()
+        await queue.enqueue_once(tipo, agendado_em, ttl, {"agendado_em": agendado_em})
+        await queue.set_ultimo_agendamento(tipo, horario)
+    except Exception as e:
+        logger.error(f"Erro ao agendar o job {tipo} de {horario.isoformat()}: {e}", exc_info=True)
+
+
+async def run_scheduler(
+    queue: RedisJobQueue,
+    tipo: str,
+    agenda: JobSchedule,
+    jitter_segundos: float = 0,
+    politica_atraso: str = POLITICA_EXECUTAR_UMA,
+):
+    """
+    Enfileira o job `tipo` nos horários da agenda. Roda na réplica líder do tipo; a chave
+    do horário evita job duplicado quando a liderança troca.
+
+    Cada disparo espera um atraso aleatório de até `jitter_segundos` (limitado a um quarto
+    do período), para que jobs com a mesma agenda não disparem todos no mesmo instante.
+    O último horário agendado fica no Redis: se a nova líder encontrar horários perdidos,
+    `politica_atraso` decide entre pular todos ou executar uma única vez para recuperar.
+    """
+    ultimo = await queue.get_ultimo_agendamento(tipo)
+    proximo = agenda.next_after(ultimo or utcnow())
+    while True:
+        agora = utcnow()
+        # Com POLITICA_PULAR qualquer horário já passado é pulado, mesmo que seja um só; com
+        # POLITICA_EXECUTAR_UMA, um único horário atrasado é simplesmente agendado abaixo
+        if proximo <= agora and (politica_atraso == POLITICA_PULAR or agenda.next_after(proximo) <= agora):
+            logger.warning(f"Job {tipo} não foi agendado desde {proximo.isoformat()}; política '{politica_atraso}'.")
+            if politica_atraso == POLITICA_EXECUTAR_UMA:
+                await _agendar(queue, tipo, agenda, proximo)
+            proximo = agenda.next_after(agora)
+
+        jitter = random.uniform(0, min(jitter_segundos, agenda.periodo(proximo).total_seconds() / 4))
+        espera = (proximo - agora).total_seconds() + jitter
+        if espera > 0:
+            await asyncio.sleep(espera)
+        await _agendar(queue, tipo, agenda, proximo)
+        proximo = agenda.next_after(proximo)
+
+
+__all__ = ["JobSchedule", "POLITICA_PULAR", "POLITICA_EXECUTAR_UMA", "run_scheduler"]
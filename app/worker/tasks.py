@@ -1,14 +1,68 @@
 from pclogging import LoggingBuilder
 
-from app.services.estoque_service import EstoqueServices
+from app.services.alerta_estoque_service import AlertaEstoqueService
+from app.services.contador_quente_service import ContadorQuenteService
+from app.services.historico_estoque_service import HistoricoEstoqueService
+from app.services.reserva_estoque_service import ReservaEstoqueService
 
 logger = LoggingBuilder.get_logger(__name__)
 
 
-async def run_low_stock_check_task(estoque_service: EstoqueServices):
+async def run_low_stock_check_task(alerta_estoque_service: AlertaEstoqueService):
     """
-    Tarefa que busca todos os itens com estoque baixo no banco de dados e dispara
-    notificações para cada um deles.
+    Tarefa que verifica os estoques alterados desde a última execução e dispara
+    notificações para os itens que entraram em estoque baixo.
     """
     logger.info("Executando a tarefa de verificação de estoque baixo.")
-    await estoque_service.check_and_notify_all_low_stock()
\ No newline at end of file
+    await alerta_estoque_service.verificar_estoque_baixo()
+
+
+async def run_expire_reservas_task(reserva_estoque_service: ReservaEstoqueService):
+    """
+    Tarefa que expira as reservas vencidas, devolvendo as unidades ao disponível para venda.
+    """
+    logger.info("Executando a tarefa de expiração de reservas.")
+    await reserva_estoque_service.expire_reservas()
+
+
+async def run_flush_contadores_quentes_task(contador_quente_service: ContadorQuenteService):
+    """
+    Tarefa que consolida no banco as baixas acumuladas pelos contadores quentes do Redis.
+    """
+    logger.info("Executando a tarefa de consolidação dos contadores quentes.")
+    await contador_quente_service.flush()
+
+
+async def run_drain_historico_outbox_task(historico_estoque_service: HistoricoEstoqueService, batch_size: int):
+    """
+    Tarefa que move, em lotes, os registros de histórico do outbox para pc_estoque_historico.
+    """
+    logger.info("Executando a tarefa de drenagem do outbox de histórico.")
+    await historico_estoque_service.drenar_outbox(batch_size)
+
+
+async def run_manter_particoes_historico_task(
+    historico_estoque_service: HistoricoEstoqueService, meses_a_frente: int, retencao_meses: int
+):
+    """
+    Tarefa que cria antecipadamente as partições mensais do histórico e remove as que
+    saíram da retenção.
+    """
+    logger.info("Executando a tarefa de manutenção das partições do histórico.")
+    await historico_estoque_service.manter_particoes(meses_a_frente, retencao_meses)
+
+
+async def run_atualizar_resumos_historico_task(historico_estoque_service: HistoricoEstoqueService, janela_horas: int):
+    """
+    Tarefa que atualiza os resumos por hora e por dia do histórico de estoque.
+    """
+    logger.info("Executando a tarefa de atualização dos resumos do histórico.")
+    await historico_estoque_service.atualizar_resumos(janela_horas)
+
+
+async def run_gerar_snapshot_estoque_task(historico_estoque_service: HistoricoEstoqueService):
+    """
+    Tarefa que gera o snapshot diário das quantidades, usado nas consultas de posição em um instante.
+    """
+    logger.info("Executando a tarefa de geração do snapshot de estoque.")
+    await historico_estoque_service.gerar_snapshot()
@@ -3,8 +3,15 @@ from unittest.mock import AsyncMock
 import pytest
 
 from app.api.common.auth_handler import do_auth
+from app.common.context import AppContextScope, factory
 from app.common.exceptions import ForbiddenException, UnauthorizedException
-from app.integrations.auth.keycloak_adapter import OAuthException
+from app.integrations.auth.keycloak_adapter import OAuthException, TokenInfo
+
+
+def _fake_adapter(claims: dict) -> AsyncMock:
+    fake_adapter = AsyncMock()
+    fake_adapter.get_token_info.return_value = TokenInfo.from_claims(claims)
+    return fake_adapter
 
 
 @pytest.mark.asyncio
@@ -13,8 +20,7 @@ async def test_do_auth_sucesso():
     seller_id = "123"
     
     # Simula adapter retornando token válido com seller_id
-    fake_adapter = AsyncMock()
-    fake_adapter.validate_token.return_value = {"sellers": "123,456"}
+    fake_adapter = _fake_adapter({"sellers": "123,456"})
     
     await do_auth(token=token, seller_id=seller_id, openid_adapter=fake_adapter)
 
@@ -24,7 +30,7 @@ async def test_do_auth_token_invalido():
     seller_id = "123"
     
     fake_adapter = AsyncMock()
-    fake_adapter.validate_token.side_effect = OAuthException("token inválido")
+    fake_adapter.get_token_info.side_effect = OAuthException("token inválido")
 
     with pytest.raises(UnauthorizedException):
         await do_auth(token=token, seller_id=seller_id, openid_adapter=fake_adapter)
@@ -34,8 +40,27 @@ async def test_do_auth_seller_nao_autorizado():
     token = "fake-token"
     seller_id = "999"  # não está na lista
     
-    fake_adapter = AsyncMock()
-    fake_adapter.validate_token.return_value = {"sellers": "123,456"}
+    fake_adapter = _fake_adapter({"sellers": "123,456"})
     
     with pytest.raises(ForbiddenException):
         await do_auth(token=token, seller_id=seller_id, openid_adapter=fake_adapter)
+
+@pytest.mark.asyncio
+async def test_do_auth_sem_sellers_no_token():
+    fake_adapter = _fake_adapter({"sub": "user1"})
+
+    with pytest.raises(ForbiddenException):
+        await do_auth(token="fake-token", seller_id="123", openid_adapter=fake_adapter)
+
+@pytest.mark.asyncio
+async def test_do_auth_preenche_o_contexto():
+    fake_adapter = _fake_adapter({"sub": "user1", "azp": "portal", "sellers": "123,456"})
+
+    await do_auth(token="fake-token", seller_id="456", openid_adapter=fake_adapter)
+
+    context = factory.get_context()
+    assert context.tenant == "456"
+    assert context.sub == "user1"
+    assert context.azp == "portal"
+    assert context.scope == AppContextScope.SELLER
+    assert context.sellers == frozenset({"123", "456"})
@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.api.common.cursor import build_cursor, parse_cursor
+from app.common.exceptions import BadRequestException
+
+
+def test_build_e_parse_cursor():
+    movimentado_em = datetime(2026, 10, 19, 12, 30, 15, 123000, tzinfo=timezone.utc)
+
+    assert parse_cursor(build_cursor(movimentado_em, 42)) == (movimentado_em, 42)
+
+
+@pytest.mark.parametrize("cursor", [None, ""])
+def test_parse_cursor_ausente(cursor):
+    assert parse_cursor(cursor) is None
+
+
+@pytest.mark.parametrize("cursor", ["abc", "W1siYSJdXQ", "WyIyMDI2LTEwLTE5IiwgImEiXQ"])
+def test_parse_cursor_invalido(cursor):
+    with pytest.raises(BadRequestException):
+        parse_cursor(cursor)
@@ -1,5 +1,11 @@
 import pytest
-from app.common.exceptions.estoque_exceptions import EstoqueNotFoundException, EstoqueBadRequestException
+from app.common.exceptions.estoque_exceptions import (
+    EstoqueBadRequestException,
+    EstoqueNotFoundException,
+    EstoquePreconditionFailedException,
+    EstoqueReservadoException,
+    EstoqueVersionConflictException,
+)
 
 def test_estoque_not_found_exception_default():
     exc = EstoqueNotFoundException("seller1", "sku1")
@@ -11,4 +17,22 @@ def test_estoque_bad_request_exception_default():
     exc = EstoqueBadRequestException("mensagem de erro", field="sku", value="abc")
     assert isinstance(exc, EstoqueBadRequestException)
     assert "mensagem de erro" in str(exc)
-    assert "sku" in str(exc) or "abc" in str(exc)
\ No newline at end of file
+    assert "sku" in str(exc) or "abc" in str(exc)
+
+def test_estoque_version_conflict_exception_default():
+    exc = EstoqueVersionConflictException("seller1", "sku1")
+    assert exc.status_code == 409
+    assert exc.details[0].slug == "estoque_conflito_versao"
+
+
+def test_estoque_precondition_failed_exception_default():
+    exc = EstoquePreconditionFailedException("seller1", "sku1", expected_version=1, current_version=2)
+    assert exc.status_code == 412
+    assert exc.details[0].ctx["current_version"] == 2
+
+
+def test_estoque_reservado_exception_default():
+    exc = EstoqueReservadoException("seller1", "sku1", quantidade_reservada=3, message="Estoque reservado.")
+    assert exc.status_code == 409
+    assert exc.details[0].slug == "estoque_reservado"
+    assert exc.details[0].ctx["quantidade_reservada"] == 3
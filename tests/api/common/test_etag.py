@@ -0,0 +1,27 @@
+import pytest
+
+from app.api.common.etag import build_etag, parse_if_match
+from app.common.exceptions import BadRequestException
+
+
+def test_build_etag():
+    assert build_etag(3) == '"3"'
+
+
+@pytest.mark.parametrize(
+    "if_match, expected",
+    [
+        (None, None),
+        ("*", None),
+        ('"3"', 3),
+        ('W/"7"', 7),
+        ("12", 12),
+    ],
+)
+def test_parse_if_match(if_match, expected):
+    assert parse_if_match(if_match) == expected
+
+
+def test_parse_if_match_invalido():
+    with pytest.raises(BadRequestException):
+        parse_if_match('"abc"')
@@ -0,0 +1,70 @@
+from unittest.mock import MagicMock
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.common.metrics import medir_repositorio, registrar_pool, render_metrics
+from app.repositories.base.sqlalchemy_crud_repository import SQLAlchemyCrudRepository
+
+
+def _count(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(f"{name}_count", labels) or 0
+
+
+@pytest.mark.asyncio
+async def test_medir_repositorio_registra_inclusive_falhas():
+    labels = {"repository": "Teste", "method": "falha"}
+    antes = _count("db_query_duration_seconds", labels)
+
+    @medir_repositorio("Teste", "falha")
+    async def falha():
+        raise RuntimeError("erro")
+
+    with pytest.raises(RuntimeError):
+        await falha()
+
+    assert _count("db_query_duration_seconds", labels) == antes + 1
+
+
+@pytest.mark.asyncio
+async def test_repositorio_concreto_mede_metodos_proprios_e_herdados():
+    class MetricasRepository(SQLAlchemyCrudRepository):
+        async def find_especial(self):
+            return "ok"
+
+        async def _interno(self):
+            return "interno"
+
+    repository = MetricasRepository.__new__(MetricasRepository)
+    proprio = {"repository": "MetricasRepository", "method": "find_especial"}
+    interno = {"repository": "MetricasRepository", "method": "_interno"}
+    antes = _count("db_query_duration_seconds", proprio)
+
+    assert await repository.find_especial() == "ok"
+    assert await repository._interno() == "interno"
+
+    assert _count("db_query_duration_seconds", proprio) == antes + 1
+    assert _count("db_query_duration_seconds", interno) == 0
+    # Os métodos herdados também são medidos, com o nome do repositório concreto
+    assert MetricasRepository.delete_by_seller_id_and_sku is not SQLAlchemyCrudRepository.delete_by_seller_id_and_sku
+    assert hasattr(MetricasRepository.delete_by_seller_id_and_sku, "__wrapped__")
+
+
+def test_registrar_pool_reporta_conexoes_do_pool():
+    pool = MagicMock()
+    pool.checkedout.return_value = 3
+    pool.overflow.return_value = -2  # O QueuePool começa negativo até abrir todas as conexões
+
+    registrar_pool(pool)
+
+    assert REGISTRY.get_sample_value("db_pool_checked_out_connections") == 3
+    assert REGISTRY.get_sample_value("db_pool_overflow_connections") == 0
+    pool.overflow.return_value = 4
+    assert REGISTRY.get_sample_value("db_pool_overflow_connections") == 4
+
+
+def test_render_metrics_no_formato_do_prometheus():
+    content, media_type = render_metrics()
+
+    assert media_type.startswith("text/plain")
+    assert b"# TYPE http_request_duration_seconds histogram" in content
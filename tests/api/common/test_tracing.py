@@ -0,0 +1,114 @@
+import json
+
+import pytest
+from asgi_correlation_id import CorrelationIdMiddleware, correlation_id
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry import trace
+
+from app.api.middlewares.tracing_middleware import TracingMiddleware
+from app.common import tracing
+from app.common.tracing import ATTR_REQUEST_ID, configure_tracing, start_span, traced
+from app.settings import AppSettings
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry.sdk.trace import TracerProvider  # noqa: E402
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor  # noqa: E402
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def exporter():
+    """
+    Provider global de teste: o tracer de app.common.tracing delega para ele.
+    """
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    return exporter
+
+
+@pytest.fixture
+def spans(exporter, monkeypatch):
+    exporter.clear()
+    monkeypatch.setattr(tracing, "_habilitado", True)
+    yield exporter
+    exporter.clear()
+
+
+def _settings(**kwargs) -> AppSettings:
+    return AppSettings.model_construct(app_name="PC Estoque", version="1.0.0", **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_desligado_nao_cria_spans(exporter, monkeypatch):
+    monkeypatch.setattr(tracing, "_habilitado", False)
+    exporter.clear()
+
+    @traced("teste.desligado")
+    async def operacao():
+        return "ok"
+
+    with start_span("teste.nada"):
+        assert await operacao() == "ok"
+
+    assert exporter.get_finished_spans() == ()
+
+
+def test_configure_tracing_none_nao_instala_provider(monkeypatch):
+    monkeypatch.setattr(tracing, "_habilitado", False)
+
+    assert configure_tracing(_settings(tracing_exporter="none")) is False
+    assert tracing.tracing_habilitado() is False
+
+
+def test_configure_tracing_file_grava_spans_com_o_request_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "_habilitado", False)
+    providers = []
+    monkeypatch.setattr(trace, "set_tracer_provider", providers.append)
+    arquivo = tmp_path / "traces.jsonl"
+
+    assert configure_tracing(
+        _settings(tracing_exporter="file", tracing_file_path=str(arquivo), tracing_sample_ratio=1.0)
+    )
+
+    token = correlation_id.set("req-123")
+    try:
+        with providers[0].get_tracer("teste").start_as_current_span("teste.arquivo"):
+            pass
+    finally:
+        correlation_id.reset(token)
+    providers[0].shutdown()
+
+    span = json.loads(arquivo.read_text().splitlines()[0])
+    assert span["name"] == "teste.arquivo"
+    assert span["attributes"][ATTR_REQUEST_ID] == "req-123"
+    assert span["resource"]["attributes"]["service.name"] == "PC Estoque"
+
+
+def test_spans_da_requisicao_ficam_abaixo_do_span_da_rota(spans):
+    @traced("teste.servico")
+    async def servico():
+        with start_span("teste.redis"):
+            return {"ok": True}
+
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+    app.add_middleware(CorrelationIdMiddleware, header_name="X-Request-ID")
+
+    @app.get("/itens/{sku}")
+    async def get_item(sku: str):
+        return await servico()
+
+    response = TestClient(app).get("/itens/sku-1")
+
+    assert response.status_code == 200
+    por_nome = {span.name: span for span in spans.get_finished_spans()}
+    assert {"GET /itens/{sku}", "teste.servico", "teste.redis"} <= set(por_nome)
+    raiz = por_nome["GET /itens/{sku}"]
+    assert raiz.attributes["http.route"] == "/itens/{sku}"
+    assert raiz.attributes["http.response.status_code"] == 200
+    assert por_nome["teste.servico"].context.trace_id == raiz.context.trace_id
+    assert por_nome["teste.redis"].parent.span_id == por_nome["teste.servico"].context.span_id
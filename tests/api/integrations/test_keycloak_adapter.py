@@ -1,10 +1,20 @@
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 import jwt
 import pytest
+from prometheus_client import REGISTRY
 
-from app.integrations.auth.keycloak_adapter import InvalidTokenException, KeycloakAdapter, TokenExpiredException
+from app.integrations.auth import keycloak_adapter as module
+from app.integrations.auth.keycloak_adapter import (
+    InvalidTokenException,
+    KeycloakAdapter,
+    OAuthException,
+    TokenExpiredException,
+)
+from tests.fixtures.auth_fixture import local_issuer, local_keycloak_adapter  # noqa: F401
+from tests.fixtures.local_issuer import JWKS_PATH, LocalIssuer
 
 
 @pytest.fixture
@@ -12,16 +22,17 @@ def adapter():
     """Fixture que retorna uma instância do KeycloakAdapter com uma URL fake."""
     return KeycloakAdapter("https://fake-url.com/.well-known/openid-configuration")
 
-def test_get_authorization_endpoint(adapter):
+@pytest.mark.asyncio
+async def test_get_authorization_endpoint(adapter):
     """
     Testa se o método get_authorization_endpoint retorna o valor correto
     mockando o carregamento do well-known.
     """
-    with patch.object(adapter, "_load_well_known") as mock_load:
+    with patch.object(adapter, "_load_well_known", new_callable=AsyncMock) as mock_load:
         mock_load.return_value = {
             "authorization_endpoint": "https://example.com/auth"
         }
-        result = adapter.get_authorization_endpoint()
+        result = await adapter.get_authorization_endpoint()
         assert result == "https://example.com/auth"
 
 @pytest.mark.asyncio
@@ -59,6 +70,7 @@ async def test_get_alg_key_for_kid_not_found(adapter):
     quando o kid não é encontrado.
     """
     adapter.get_public_keys = AsyncMock(return_value=[{"kid": "xyz"}])
+    adapter.refresh_public_keys = AsyncMock(return_value=False)
     with pytest.raises(InvalidTokenException):
         await adapter.get_alg_key_for_kid("abc123")
 
@@ -121,7 +133,8 @@ async def test_validate_token_expired(adapter):
         with pytest.raises(TokenExpiredException, match="Token expirou"):
             await adapter.validate_token(token)
 
-def test_load_well_known_success(adapter):
+@pytest.mark.asyncio
+async def test_load_well_known_success(adapter):
     """
     Testa o carregamento do well-known com sucesso,
     mockando resposta HTTP válida.
@@ -133,13 +146,14 @@ def test_load_well_known_success(adapter):
     }
     fake_response.raise_for_status = MagicMock()
 
-    with patch("httpx.Client.get", return_value=fake_response) as mock_get:
-        result = adapter._load_well_known()
-        mock_get.assert_called_once_with(adapter.well_known_url, timeout=5)
+    with patch("httpx.AsyncClient.get", new_callable=AsyncMock, return_value=fake_response) as mock_get:
+        result = await adapter._load_well_known()
+        mock_get.assert_awaited_once_with(adapter.well_known_url, timeout=5)
         assert result["authorization_endpoint"] == "https://example.com/auth"
         assert result["jwks_uri"] == "https://example.com/jwks"
 
-def test_load_well_known_http_error(adapter):
+@pytest.mark.asyncio
+async def test_load_well_known_http_error(adapter):
     """
     Testa tratamento de erro HTTP ao carregar well-known,
     simulando um erro HTTPStatusError.
@@ -153,34 +167,235 @@ def test_load_well_known_http_error(adapter):
         response=fake_response
     )
 
-    with patch("httpx.Client.get", side_effect=http_error) as mock_get, \
-         patch("builtins.print") as mock_print:
-        result = adapter._load_well_known()
-        mock_get.assert_called_once_with(adapter.well_known_url, timeout=5)
-        mock_print.assert_called_with(f"Erro HTTP ao carregar well-known: 500 - Internal Server Error")
-        assert result is None
+    with patch("httpx.AsyncClient.get", new_callable=AsyncMock, side_effect=http_error) as mock_get, \
+         patch.object(module, "logger") as mock_logger:
+        with pytest.raises(OAuthException):
+            await adapter._load_well_known()
+        mock_get.assert_awaited_once_with(adapter.well_known_url, timeout=5)
+        mock_logger.error.assert_called_with("Erro HTTP ao carregar well-known: 500 - Internal Server Error")
 
-def test_load_well_known_request_error(adapter):
+@pytest.mark.asyncio
+async def test_load_well_known_request_error(adapter):
     """
     Testa tratamento de erro de conexão ao carregar well-known,
     simulando um RequestError.
     """
     request_error = httpx.RequestError("Network failure", request=MagicMock())
-    with patch("httpx.Client.get", side_effect=request_error) as mock_get, \
-         patch("builtins.print") as mock_print:
-        result = adapter._load_well_known()
-        mock_get.assert_called_once_with(adapter.well_known_url, timeout=5)
-        mock_print.assert_called_with("Erro de conexão ao carregar well-known: Network failure")
-        assert result is None
+    with patch("httpx.AsyncClient.get", new_callable=AsyncMock, side_effect=request_error) as mock_get, \
+         patch.object(module, "logger") as mock_logger:
+        with pytest.raises(OAuthException):
+            await adapter._load_well_known()
+        mock_get.assert_awaited_once_with(adapter.well_known_url, timeout=5)
+        mock_logger.error.assert_called_with("Erro de conexão ao carregar well-known: Network failure")
 
-def test_load_well_known_unexpected_error(adapter):
+@pytest.mark.asyncio
+async def test_load_well_known_unexpected_error(adapter):
     """
     Testa tratamento de erro inesperado ao carregar well-known,
     simulando uma exceção genérica.
     """
-    with patch("httpx.Client.get", side_effect=Exception("Unexpected")) as mock_get, \
-         patch("builtins.print") as mock_print:
-        result = adapter._load_well_known()
-        mock_get.assert_called_once_with(adapter.well_known_url, timeout=5)
-        mock_print.assert_called_with("Erro inesperado: Unexpected")
-        assert result is None
\ No newline at end of file
+    with patch("httpx.AsyncClient.get", new_callable=AsyncMock, side_effect=Exception("Unexpected")) as mock_get, \
+         patch.object(module, "logger") as mock_logger:
+        with pytest.raises(OAuthException):
+            await adapter._load_well_known()
+        mock_get.assert_awaited_once_with(adapter.well_known_url, timeout=5)
+        mock_logger.error.assert_called_with("Erro inesperado ao carregar well-known: Unexpected")
+
+@pytest.mark.asyncio
+async def test_falha_no_well_known_nao_fica_em_cache(adapter):
+    """
+    Testa que uma falha ao carregar o well-known não é guardada:
+    a chamada seguinte busca de novo e as chaves são carregadas.
+    """
+    fake_response = MagicMock()
+    fake_response.json.return_value = {"jwks_uri": "https://example.com/jwks"}
+    request_error = httpx.RequestError("Network failure", request=MagicMock())
+    with patch("httpx.AsyncClient.get", new_callable=AsyncMock, side_effect=[request_error, fake_response]):
+        with pytest.raises(OAuthException):
+            await adapter.get_well_known()
+        assert adapter._well_known is None
+        assert await adapter.get_well_known() == {"jwks_uri": "https://example.com/jwks"}
+
+@pytest.fixture(scope="module")
+def rsa_key():
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def _assinar(rsa_key, claims: dict, kid: str = "kid1") -> str:
+    return jwt.encode(claims, rsa_key, algorithm="RS256", headers={"kid": kid})
+
+
+def _jwk_publica(rsa_key, kid: str = "kid1") -> dict:
+    jwk = jwt.algorithms.RSAAlgorithm.to_jwk(rsa_key.public_key(), as_dict=True)
+    return {**jwk, "kid": kid, "alg": "RS256"}
+
+
+@pytest.mark.asyncio
+async def test_validate_token_reutiliza_token_validado(adapter, rsa_key):
+    """
+    Testa se um token já validado é devolvido do cache, sem buscar a chave nem
+    verificar a assinatura de novo.
+    """
+    token = _assinar(rsa_key, {"sub": "user123", "sellers": "luizalabs", "exp": time.time() + 300})
+    adapter.get_public_keys = AsyncMock(return_value=[_jwk_publica(rsa_key)])
+    hits = REGISTRY.get_sample_value("auth_token_cache_lookups_total", {"result": "hit"}) or 0
+    misses = REGISTRY.get_sample_value("auth_token_cache_lookups_total", {"result": "miss"}) or 0
+
+    primeiro = await adapter.validate_token(token)
+    with patch("jwt.decode") as mock_decode:
+        segundo = await adapter.validate_token(token)
+
+    assert segundo == primeiro
+    assert primeiro["sellers"] == "luizalabs"
+    mock_decode.assert_not_called()
+    adapter.get_public_keys.assert_awaited_once()
+    assert REGISTRY.get_sample_value("auth_token_cache_lookups_total", {"result": "hit"}) == hits + 1
+    assert REGISTRY.get_sample_value("auth_token_cache_lookups_total", {"result": "miss"}) == misses + 1
+
+
+@pytest.mark.asyncio
+async def test_validate_token_reutiliza_a_jwk_do_kid(adapter, rsa_key):
+    """
+    Testa se a PyJWK de um kid é construída uma única vez para tokens diferentes.
+    """
+    adapter.get_public_keys = AsyncMock(return_value=[_jwk_publica(rsa_key)])
+
+    with patch("jwt.PyJWK", wraps=jwt.PyJWK) as mock_pyjwk:
+        for sub in ("user1", "user2"):
+            await adapter.validate_token(_assinar(rsa_key, {"sub": sub, "exp": time.time() + 300}))
+
+    mock_pyjwk.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_validate_token_expirado_sai_do_cache(adapter, rsa_key, monkeypatch):
+    """
+    Testa se o token em cache deixa de ser aceito ao passar do exp.
+    """
+    agora = time.time()
+    token = _assinar(rsa_key, {"sub": "user123", "exp": agora + 60})
+    adapter.get_public_keys = AsyncMock(return_value=[_jwk_publica(rsa_key)])
+    await adapter.validate_token(token)
+
+    monkeypatch.setattr(time, "time", lambda: agora + 120)
+    with patch("jwt.decode", side_effect=jwt.ExpiredSignatureError("Token expirou")) as mock_decode, \
+         pytest.raises(TokenExpiredException):
+        await adapter.validate_token(token)
+    mock_decode.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_validate_token_assinatura_invalida_nao_vai_para_o_cache(adapter, rsa_key):
+    """
+    Testa se um token com assinatura inválida é recusado todas as vezes.
+    """
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    outra_chave = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    token = _assinar(outra_chave, {"sub": "user123", "exp": time.time() + 300})
+    adapter.get_public_keys = AsyncMock(return_value=[_jwk_publica(rsa_key)])
+
+    for _ in range(2):
+        with pytest.raises(InvalidTokenException):
+            await adapter.validate_token(token)
+
+
+@pytest.mark.asyncio
+async def test_kid_desconhecido_busca_as_chaves_de_novo(adapter, rsa_key, monkeypatch):
+    """
+    Testa se um kid desconhecido (chave rotacionada) força uma nova busca das chaves,
+    no máximo uma a cada jwks_refetch_min_seconds.
+    """
+    agora = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: agora)
+    adapter._fetch_public_keys = AsyncMock(side_effect=[[], [_jwk_publica(rsa_key, kid="nova")]])
+    await adapter.start()
+    token = _assinar(rsa_key, {"sub": "user1", "exp": time.time() + 300}, kid="nova")
+
+    with pytest.raises(InvalidTokenException):
+        await adapter.validate_token(token)
+    assert adapter._fetch_public_keys.await_count == 1
+
+    agora += adapter.jwks_refetch_min_seconds + 1
+    info = await adapter.validate_token(token)
+    assert info["sub"] == "user1"
+    assert adapter._fetch_public_keys.await_count == 2
+    await adapter.aclose()
+
+
+@pytest.mark.asyncio
+async def test_chaves_renovadas_apos_o_ttl(adapter, rsa_key, monkeypatch):
+    """
+    Testa se as chaves são buscadas de novo depois do TTL e se a remoção de uma chave
+    invalida os tokens em cache assinados com ela.
+    """
+    agora = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: agora)
+    adapter._fetch_public_keys = AsyncMock(side_effect=[[_jwk_publica(rsa_key)], []])
+    token = _assinar(rsa_key, {"sub": "user1", "exp": time.time() + 3600})
+    await adapter.validate_token(token)
+
+    agora += adapter.jwks_ttl_seconds + 1
+    assert await adapter.get_public_keys() == []
+    with pytest.raises(InvalidTokenException):
+        await adapter.validate_token(token)
+    assert adapter._fetch_public_keys.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_start_com_idp_fora_nao_impede_a_subida(adapter):
+    """
+    Testa se uma falha ao carregar as chaves na subida é apenas registrada.
+    """
+    adapter._fetch_public_keys = AsyncMock(side_effect=httpx.ConnectError("IDP fora"))
+
+    await adapter.start()
+
+    assert adapter._public_keys is None
+    assert adapter._refresh_task is not None
+    await adapter.aclose()
+    assert adapter._refresh_task is None
+
+
+@pytest.mark.asyncio
+async def test_get_token_info_separa_os_sellers_uma_vez(adapter, rsa_key):
+    """
+    Testa se os sellers do token são separados na validação e reaproveitados do cache.
+    """
+    token = _assinar(rsa_key, {"sub": "user1", "sellers": "123,456", "exp": time.time() + 300})
+    adapter.get_public_keys = AsyncMock(return_value=[_jwk_publica(rsa_key)])
+
+    token_info = await adapter.get_token_info(token)
+
+    assert token_info.sellers == frozenset({"123", "456"})
+    assert await adapter.get_token_info(token) is token_info
+
+
+@pytest.mark.asyncio
+async def test_validate_token_com_emissor_local(local_issuer, local_keycloak_adapter):
+    """
+    Testa a validação ponta a ponta, com well-known e JWKS servidos pelo emissor local.
+    """
+    info = await local_keycloak_adapter.validate_token(local_issuer.sign(sellers="123,456"))
+
+    assert info["sellers"] == "123,456"
+    assert info["iss"] == local_issuer.issuer
+
+
+@pytest.mark.asyncio
+async def test_rotacao_de_chave_no_emissor_local():
+    """
+    Testa se um token assinado com uma chave nova é aceito depois da rotação no IDP.
+    """
+    with LocalIssuer(kid="chave-1") as issuer:
+        adapter = KeycloakAdapter(issuer.well_known_url, jwks_refetch_min_seconds=0)
+        await adapter.start()
+        await adapter.validate_token(issuer.sign())
+
+        issuer.rotate("chave-2")
+        await adapter.validate_token(issuer.sign())
+
+        assert issuer.requests[JWKS_PATH] == 2
+        await adapter.aclose()
@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.integrations.notifications import notification_dispatcher as module
+from app.integrations.notifications import notification_sink
+from app.integrations.notifications.notification_dispatcher import NotificationDispatcher
+from app.integrations.notifications.notification_sink import LogNotificationSink
+from app.models.alerta_estoque_model import AlertaEstoque, DigestEstoqueBaixo
+from tests.fixtures.notification_fixture import FakeNotificationSink
+
+AGORA = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+SLEEP = asyncio.sleep
+
+
+def _alertas(sellers: int, skus: int) -> list[AlertaEstoque]:
+    return [
+        AlertaEstoque(seller_id=f"vendedor{s}", sku=f"sku{i}", quantidade=i, alertado_em=AGORA)
+        for i in range(skus)
+        for s in range(sellers)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def sem_espera(monkeypatch):
+    esperas = []
+
+    async def fake_sleep(seconds):
+        esperas.append(seconds)
+
+    monkeypatch.setattr(module.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(module.random, "uniform", lambda a, b: b)
+    monkeypatch.setattr(module, "logger", MagicMock())
+    return esperas
+
+
+def test_agrupa_por_vendedor_em_partes():
+    dispatcher = NotificationDispatcher(FakeNotificationSink(), itens_por_digest=2)
+
+    digests = dispatcher.agrupar(_alertas(sellers=2, skus=3))
+
+    assert [(d.seller_id, [item.sku for item in d.itens]) for d in digests] == [
+        ("vendedor0", ["sku0", "sku1"]),
+        ("vendedor0", ["sku2"]),
+        ("vendedor1", ["sku0", "sku1"]),
+        ("vendedor1", ["sku2"]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_entrega_um_digest_por_vendedor():
+    sink = FakeNotificationSink()
+    dispatcher = NotificationDispatcher(sink)
+
+    falhas = await dispatcher.despachar(_alertas(sellers=3, skus=2))
+
+    assert falhas == []
+    assert sorted(d.seller_id for d in sink.entregues) == ["vendedor0", "vendedor1", "vendedor2"]
+    assert all(len(d.itens) == 2 for d in sink.entregues)
+
+
+@pytest.mark.asyncio
+async def test_limita_os_envios_simultaneos(monkeypatch):
+    # Latência real aqui, para os envios de fato se sobreporem
+    monkeypatch.setattr(module.asyncio, "sleep", SLEEP)
+    sink = FakeNotificationSink(latencia_segundos=0.01)
+    dispatcher = NotificationDispatcher(sink, concorrencia=4)
+
+    await dispatcher.despachar(_alertas(sellers=20, skus=1))
+
+    assert len(sink.entregues) == 20
+    assert sink.max_em_andamento == 4
+
+
+@pytest.mark.asyncio
+async def test_repete_com_espera_exponencial(sem_espera):
+    sink = FakeNotificationSink(falhas=2)
+    dispatcher = NotificationDispatcher(sink, max_tentativas=3, backoff_segundos=0.5)
+
+    falhas = await dispatcher.despachar(_alertas(sellers=1, skus=1))
+
+    assert falhas == []
+    assert sink.tentativas == {"vendedor0": 3}
+    assert sem_espera == [0.5, 1.0]
+
+
+@pytest.mark.asyncio
+async def test_retorna_os_digests_nao_entregues():
+    sink = FakeNotificationSink(falhas=5)
+    dispatcher = NotificationDispatcher(sink, max_tentativas=3)
+
+    falhas = await dispatcher.despachar(_alertas(sellers=2, skus=1))
+
+    assert [d.seller_id for d in falhas] == ["vendedor0", "vendedor1"]
+    assert sink.tentativas == {"vendedor0": 3, "vendedor1": 3}
+    assert sink.entregues == []
+
+
+@pytest.mark.asyncio
+async def test_log_sink_registra_o_digest(monkeypatch):
+    mensagens = []
+    monkeypatch.setattr(notification_sink.logger, "warning", mensagens.append)
+    digest = DigestEstoqueBaixo(seller_id="vendedor1", itens=_alertas(sellers=1, skus=2))
+
+    await LogNotificationSink().enviar(digest)
+
+    assert len(mensagens) == 1
+    assert "'vendedor1'" in mensagens[0] and "'sku1' (1 un.)" in mensagens[0]
@@ -2,6 +2,8 @@ import pytest
 import json
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from prometheus_client import REGISTRY
+
 from app.integrations.kv_db.redis_asyncio_adapter import RedisAsyncioAdapter
 
 @pytest.fixture
@@ -74,6 +76,32 @@ class TestRedisAsyncioAdapter:
         result = await adapter.get_str("non-existent-key")
         assert result is None
 
+    @pytest.mark.asyncio
+    async def test_get_str_conta_hit_e_miss(self, adapter, redis_client_mock):
+        """
+        Cenário: Busca uma chave que existe e outra que não existe.
+        Resultado: Um hit e um miss são contados, e a duração de cada leitura registrada.
+        """
+        def valor(nome, labels):
+            return REGISTRY.get_sample_value(nome, labels) or 0
+
+        hit = {"operation": "get", "result": "hit"}
+        miss = {"operation": "get", "result": "miss"}
+        get = {"operation": "get"}
+        antes = (
+            valor("redis_cache_lookups_total", hit),
+            valor("redis_cache_lookups_total", miss),
+            valor("redis_operation_duration_seconds_count", get),
+        )
+
+        redis_client_mock.get.side_effect = [b"valor", None]
+        await adapter.get_str("existe")
+        await adapter.get_str("nao-existe")
+
+        assert valor("redis_cache_lookups_total", hit) == antes[0] + 1
+        assert valor("redis_cache_lookups_total", miss) == antes[1] + 1
+        assert valor("redis_operation_duration_seconds_count", get) == antes[2] + 2
+
     @pytest.mark.asyncio
     async def test_set_str_chama_set_do_cliente(self, adapter, redis_client_mock):
         """
@@ -133,4 +161,47 @@ class TestRedisAsyncioAdapter:
         data = {"id": 1, "name": "test"}
         await adapter.set_json("my-key", data, expires_in_seconds=60)
         expected_json_string = json.dumps(data)
-        set_str_mock.assert_awaited_once_with("my-key", expected_json_string, 60)
\ No newline at end of file
+        set_str_mock.assert_awaited_once_with("my-key", expected_json_string, 60)
+    @pytest.mark.asyncio
+    async def test_stream_create_group_ignora_grupo_existente(self, adapter, redis_client_mock):
+        """
+        Cenário: O consumer group já existe no stream.
+        Resultado: O erro BUSYGROUP é ignorado e o método retorna False.
+        """
+        from redis.exceptions import ResponseError
+
+        redis_client_mock.xgroup_create.side_effect = ResponseError("BUSYGROUP Consumer Group name already exists")
+        assert await adapter.stream_create_group("stream", "grupo") is False
+        redis_client_mock.xgroup_create.assert_awaited_once_with("stream", "grupo", id="0", mkstream=True)
+
+    @pytest.mark.asyncio
+    async def test_stream_read_group_decodifica_mensagens(self, adapter, redis_client_mock):
+        """
+        Cenário: Lê mensagens novas de um stream pelo consumer group.
+        Resultado: Stream, id e campos são devolvidos como str.
+        """
+        redis_client_mock.xreadgroup.return_value = [[b"stream", [(b"1-0", {b"tentativas": b"0"})]]]
+        result = await adapter.stream_read_group("grupo", "worker-1", ["stream"], 10, 1000)
+        assert result == [("stream", "1-0", {"tentativas": "0"})]
+        redis_client_mock.xreadgroup.assert_awaited_once_with(
+            "grupo", "worker-1", {"stream": ">"}, count=10, block=1000
+        )
+
+    @pytest.mark.asyncio
+    async def test_register_script_mede_cada_execucao(self, adapter, redis_client_mock):
+        """
+        Cenário: Executa duas vezes um script Lua registrado.
+        Resultado: O script recebe keys e args, e cada execução é medida como `evalsha`.
+        """
+        script = AsyncMock(return_value=1)
+        redis_client_mock.register_script = MagicMock(return_value=script)
+        evalsha = {"operation": "evalsha"}
+        antes = REGISTRY.get_sample_value("redis_operation_duration_seconds_count", evalsha) or 0
+
+        registrado = adapter.register_script("return 1")
+        assert await registrado(keys=["k"], args=[1]) == 1
+        await registrado(keys=["k"], args=[2])
+
+        redis_client_mock.register_script.assert_called_once_with("return 1")
+        script.assert_awaited_with(keys=["k"], args=[2], client=None)
+        assert REGISTRY.get_sample_value("redis_operation_duration_seconds_count", evalsha) == antes + 2
@@ -0,0 +1,131 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.integrations.kv_db.redis_hot_counter import (
+    ACK_SCRIPT,
+    CHECKPOINT_SCRIPT,
+    CONTADOR_INATIVO,
+    DECREMENT_SCRIPT,
+    DISABLE_SCRIPT,
+    ENABLE_SCRIPT,
+    RedisHotCounter,
+)
+
+
+@pytest.fixture
+def scripts():
+    return {
+        script: AsyncMock(name=name)
+        for script, name in [
+            (DECREMENT_SCRIPT, "decrement"),
+            (ENABLE_SCRIPT, "enable"),
+            (CHECKPOINT_SCRIPT, "checkpoint"),
+            (ACK_SCRIPT, "ack"),
+            (DISABLE_SCRIPT, "disable"),
+        ]
+    }
+
+
+@pytest.fixture
+def redis_adapter(scripts):
+    adapter = MagicMock()
+    adapter.register_script.side_effect = lambda script: scripts[script]
+    adapter.exists = AsyncMock()
+    adapter.get_hash = AsyncMock()
+    adapter.get_set_members = AsyncMock()
+    return adapter
+
+
+@pytest.fixture
+def counter(redis_adapter):
+    return RedisHotCounter(redis_adapter)
+
+
+@pytest.mark.asyncio
+async def test_decrement_executa_script_na_chave_do_sku(counter, scripts):
+    scripts[DECREMENT_SCRIPT].return_value = 7
+
+    result = await counter.decrement("seller1", "sku1", 3)
+
+    assert result == 7
+    scripts[DECREMENT_SCRIPT].assert_awaited_once_with(keys=["estoque:quente:seller1:sku1"], args=[3])
+
+
+@pytest.mark.asyncio
+async def test_decrement_contador_inativo(counter, scripts):
+    scripts[DECREMENT_SCRIPT].return_value = -1
+
+    assert await counter.decrement("seller1", "sku1", 3) == CONTADOR_INATIVO
+
+
+@pytest.mark.asyncio
+async def test_enable_registra_membro_no_conjunto_de_ativos(counter, scripts):
+    scripts[ENABLE_SCRIPT].return_value = 1
+
+    assert await counter.enable("seller1", "sku1", 10, 2) is True
+    scripts[ENABLE_SCRIPT].assert_awaited_once_with(
+        keys=["estoque:quente:seller1:sku1", "estoque:quente"],
+        args=[json.dumps(["seller1", "sku1"]), "seller1", "sku1", 10, 2],
+    )
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_sem_pendencias(counter, scripts):
+    scripts[CHECKPOINT_SCRIPT].return_value = []
+
+    assert await counter.checkpoint("seller1", "sku1", "novo-flush") is None
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_devolve_flush_em_voo(counter, scripts):
+    """Um flush não confirmado anteriormente é devolvido com o flush_id original."""
+    scripts[CHECKPOINT_SCRIPT].return_value = [b"flush-antigo", b"-5"]
+
+    assert await counter.checkpoint("seller1", "sku1", "novo-flush") == ("flush-antigo", -5)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_usa_ack_sem_flush_id(counter, scripts):
+    scripts[ACK_SCRIPT].return_value = 1
+
+    assert await counter.reconcile("seller1", "sku1", 40, 3) is True
+    scripts[ACK_SCRIPT].assert_awaited_once_with(keys=["estoque:quente:seller1:sku1"], args=["", 40, 3])
+
+
+@pytest.mark.asyncio
+async def test_disable_forcado(counter, scripts):
+    scripts[DISABLE_SCRIPT].return_value = 1
+
+    assert await counter.disable("seller1", "sku1", force=True) is True
+    args = scripts[DISABLE_SCRIPT].await_args.kwargs["args"]
+    assert args[1] == "1"
+
+
+@pytest.mark.asyncio
+async def test_get_converte_campos_para_inteiro(counter, redis_adapter):
+    redis_adapter.get_hash.return_value = {
+        "seller_id": "seller1",
+        "sku": "sku1",
+        "quantidade": "8",
+        "reservada": "1",
+        "pendente": "-2",
+        "em_voo": "0",
+    }
+
+    assert await counter.get("seller1", "sku1") == {"quantidade": 8, "reservada": 1, "pendente": -2, "em_voo": 0}
+
+
+@pytest.mark.asyncio
+async def test_get_contador_inexistente(counter, redis_adapter):
+    redis_adapter.get_hash.return_value = {}
+
+    assert await counter.get("seller1", "sku1") is None
+
+
+@pytest.mark.asyncio
+async def test_list_active(counter, redis_adapter):
+    redis_adapter.get_set_members.return_value = {json.dumps(["seller:2", "sku2"]), json.dumps(["seller1", "sku1"])}
+
+    assert await counter.list_active() == [("seller1", "sku1"), ("seller:2", "sku2")]
@@ -0,0 +1,127 @@
+import json
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.integrations.kv_db import redis_job_queue as module
+from app.integrations.kv_db.redis_job_queue import HEARTBEAT_SCRIPT, PROMOVER_SCRIPT, Job, RedisJobQueue
+
+
+@pytest.fixture
+def scripts():
+    return {HEARTBEAT_SCRIPT: AsyncMock(), PROMOVER_SCRIPT: AsyncMock()}
+
+
+@pytest.fixture
+def redis_adapter(scripts):
+    adapter = AsyncMock()
+    adapter.register_script = MagicMock(side_effect=lambda script: scripts[script])
+    return adapter
+
+
+@pytest.fixture
+def queue(redis_adapter):
+    return RedisJobQueue(redis_adapter, maxlen=100)
+
+
+@pytest.mark.asyncio
+async def test_enqueue_adiciona_no_stream_do_tipo(queue, redis_adapter):
+    await queue.enqueue("estoque_baixo", {"seller_id": "v1"})
+
+    redis_adapter.stream_add.assert_awaited_once_with(
+        "estoque:jobs:estoque_baixo", {"payload": json.dumps({"seller_id": "v1"}), "tentativas": "0"}, maxlen=100
+    )
+
+
+@pytest.mark.asyncio
+async def test_enqueue_once_nao_duplica(queue, redis_adapter):
+    redis_adapter.set_if_absent.return_value = False
+
+    assert await queue.enqueue_once("reservas", "100", 120) is None
+
+    redis_adapter.set_if_absent.assert_awaited_once_with("estoque:jobs:reservas:agendado:100", "1", 120)
+    redis_adapter.stream_add.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_read_converte_as_mensagens(queue, redis_adapter):
+    redis_adapter.stream_read_group.return_value = [
+        ("estoque:jobs:reservas", "1-0", {"payload": '{"a": 1}', "tentativas": "2"})
+    ]
+
+    jobs = await queue.read("worker-1", ["reservas", "estoque_baixo"], 5, 1000)
+
+    assert jobs == [Job(id="1-0", tipo="reservas", payload={"a": 1}, tentativas=2)]
+    redis_adapter.stream_read_group.assert_awaited_once_with(
+        RedisJobQueue.GROUP, "worker-1", ["estoque:jobs:reservas", "estoque:jobs:estoque_baixo"], 5, 1000
+    )
+
+
+@pytest.mark.asyncio
+async def test_retry_adia_pelo_backoff_e_confirma(queue, redis_adapter, monkeypatch):
+    monkeypatch.setattr(module.time, "time", lambda: 1000.0)
+    job = Job(id="1-0", tipo="reservas", payload={"a": 1}, tentativas=1)
+
+    assert await queue.retry(job, 3) is True
+
+    key, item, disponivel_em = redis_adapter.sorted_set_add.await_args.args
+    assert key == "estoque:jobs:reservas:adiados"
+    assert json.loads(item) == {"payload": '{"a": 1}', "tentativas": "2", "job_id": "1-0"}
+    assert disponivel_em == 1010.0
+    redis_adapter.stream_add.assert_not_awaited()
+    redis_adapter.stream_ack.assert_awaited_once_with("estoque:jobs:reservas", RedisJobQueue.GROUP, "1-0")
+
+
+def test_backoff_dobra_a_cada_tentativa_ate_o_maximo(queue):
+    assert [queue.backoff(tentativas) for tentativas in (1, 2, 3)] == [5, 10, 20]
+    assert queue.backoff(20) == queue.backoff_maximo_segundos
+
+
+@pytest.mark.asyncio
+async def test_promover_adiados_devolve_ao_stream(queue, scripts, monkeypatch):
+    monkeypatch.setattr(module.time, "time", lambda: 1000.0)
+    scripts[PROMOVER_SCRIPT].return_value = 2
+
+    assert await queue.promover_adiados("reservas") == 2
+
+    scripts[PROMOVER_SCRIPT].assert_awaited_once_with(
+        keys=["estoque:jobs:reservas:adiados", "estoque:jobs:reservas"], args=[1000.0, 100, 100]
+    )
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_renova_somente_o_job_do_consumidor(queue, scripts):
+    scripts[HEARTBEAT_SCRIPT].return_value = 0
+
+    assert await queue.heartbeat("worker-1", Job(id="1-0", tipo="reservas")) is False
+
+    scripts[HEARTBEAT_SCRIPT].assert_awaited_once_with(
+        keys=["estoque:jobs:reservas"], args=[RedisJobQueue.GROUP, "worker-1", "1-0"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_retry_esgotado_vai_para_o_stream_de_falhas(queue, redis_adapter):
+    job = Job(id="1-0", tipo="reservas", tentativas=2)
+
+    assert await queue.retry(job, 3) is False
+
+    stream, fields = redis_adapter.stream_add.await_args.args
+    assert stream == "estoque:jobs:reservas:falhas"
+    assert fields["job_id"] == "1-0"
+    redis_adapter.stream_ack.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_ultimo_agendamento(queue, redis_adapter):
+    horario = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+    redis_adapter.get_str.return_value = None
+    assert await queue.get_ultimo_agendamento("reservas") is None
+
+    await queue.set_ultimo_agendamento("reservas", horario)
+    redis_adapter.set_str.assert_awaited_once_with(
+        "estoque:jobs:reservas:ultimo_agendamento", "2024-05-01T12:00:00+00:00"
+    )
+    redis_adapter.get_str.return_value = "2024-05-01T12:00:00+00:00"
+    assert await queue.get_ultimo_agendamento("reservas") == horario
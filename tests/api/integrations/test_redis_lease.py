@@ -0,0 +1,75 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.integrations.kv_db.redis_lease import RELEASE_SCRIPT, RENEW_SCRIPT, LeaseLostException, RedisLease
+
+
+@pytest.fixture
+def scripts():
+    return {
+        RENEW_SCRIPT: AsyncMock(name="renew", return_value=1),
+        RELEASE_SCRIPT: AsyncMock(name="release", return_value=1),
+    }
+
+
+@pytest.fixture
+def redis_adapter(scripts):
+    adapter = MagicMock()
+    adapter.register_script.side_effect = lambda script: scripts[script]
+    adapter.set_if_absent = AsyncMock(return_value=True)
+    return adapter
+
+
+@pytest.fixture
+def lease(redis_adapter):
+    return RedisLease(redis_adapter, "estoque:lider", "worker-1", 3)
+
+
+@pytest.mark.asyncio
+async def test_acquire_grava_o_dono_com_prazo(lease, redis_adapter):
+    assert await lease.acquire() is True
+
+    redis_adapter.set_if_absent.assert_awaited_once_with("estoque:lider", "worker-1", 3)
+
+
+@pytest.mark.asyncio
+async def test_run_while_held_retorna_e_libera(lease, scripts):
+    work = AsyncMock(return_value="ok")
+
+    assert await lease.run_while_held(work) == "ok"
+
+    scripts[RELEASE_SCRIPT].assert_awaited_once_with(keys=["estoque:lider"], args=["worker-1"])
+
+
+@pytest.mark.asyncio
+async def test_run_while_held_renova_durante_a_execucao(lease, scripts):
+    lease.ttl_seconds = 0.03
+
+    async def work():
+        await asyncio.sleep(0.05)
+
+    await lease.run_while_held(work)
+
+    scripts[RENEW_SCRIPT].assert_awaited()
+    assert scripts[RENEW_SCRIPT].await_args.kwargs == {"keys": ["estoque:lider"], "args": ["worker-1", 0.03]}
+
+
+@pytest.mark.asyncio
+async def test_run_while_held_cancela_ao_perder_a_lease(lease, scripts):
+    lease.ttl_seconds = 0.03
+    scripts[RENEW_SCRIPT].return_value = 0
+    cancelado = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelado.set()
+            raise
+
+    with pytest.raises(LeaseLostException):
+        await lease.run_while_held(work)
+
+    assert cancelado.is_set()
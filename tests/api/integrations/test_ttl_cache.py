@@ -0,0 +1,34 @@
+import time
+
+from app.integrations.cache.ttl_cache import TTLCache
+
+
+def test_item_valido_ate_expirar(monkeypatch):
+    agora = 1000.0
+    monkeypatch.setattr(time, "time", lambda: agora)
+    cache = TTLCache(10)
+    cache.set("a", 1, expires_at=1060)
+
+    assert cache.get("a") == 1
+
+    agora = 1060.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_item_ja_expirado_nao_e_guardado():
+    cache = TTLCache(10)
+    cache.set("a", 1, expires_at=time.time() - 1)
+
+    assert cache.get("a") is None
+
+
+def test_cheio_descarta_o_usado_ha_mais_tempo():
+    cache = TTLCache(2)
+    expira = time.time() + 60
+    cache.set("a", 1, expira)
+    cache.set("b", 2, expira)
+    cache.get("a")
+    cache.set("c", 3, expira)
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
@@ -14,6 +14,8 @@ def mock_settings():
     """Retorna configurações mockadas com CORS liberado."""
     class Settings:
         cors_origins = ["*"]
+        slow_request_ms = 1000
+        slow_request_sample_ratio = 0.1
     return Settings()
 
 @pytest.fixture
@@ -34,6 +36,7 @@ def test_configure_middlewares_adds_middlewares(app, mock_settings):
         assert any("CORSMiddleware" in str(c) for c in calls), "CORSMiddleware não adicionado"
         assert any("CorrelationIdMiddleware" in str(c) for c in calls), "CorrelationIdMiddleware não adicionado"
         assert any("GZipMiddleware" in str(c) for c in calls), "GZipMiddleware não adicionado"
+        assert any("SlowRequestMiddleware" in str(c) for c in calls), "SlowRequestMiddleware não adicionado"
 
         correlation_call = [
             call for call in app.add_middleware.call_args_list
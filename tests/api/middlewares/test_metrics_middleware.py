@@ -0,0 +1,55 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.api.common.routers.metrics_routers import add_metrics_router
+from app.api.middlewares.metrics_middleware import ROTA_DESCONHECIDA, MetricsMiddleware
+
+
+def _count(labels: dict) -> float:
+    return REGISTRY.get_sample_value("http_request_duration_seconds_count", labels) or 0
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metricas-teste/{sku}")
+    async def get_sku(sku: str):
+        return {"sku": sku}
+
+    add_metrics_router(app)
+    return TestClient(app)
+
+
+def test_duracao_registrada_pelo_template_da_rota():
+    client = _client()
+    labels = {"method": "GET", "route": "/metricas-teste/{sku}", "status": "200"}
+    antes = _count(labels)
+
+    client.get("/metricas-teste/sku-1")
+    client.get("/metricas-teste/sku-2")
+
+    assert _count(labels) == antes + 2
+
+
+def test_rota_inexistente_usa_um_unico_label():
+    client = _client()
+    labels = {"method": "GET", "route": ROTA_DESCONHECIDA, "status": "404"}
+    antes = _count(labels)
+
+    client.get("/nao-existe/1")
+    client.get("/nao-existe/2")
+
+    assert _count(labels) == antes + 2
+
+
+def test_endpoint_metrics_expoe_as_metricas():
+    client = _client()
+    client.get("/metricas-teste/sku-1")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/metricas-teste/{sku}"' in response.text
@@ -0,0 +1,80 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.common.request_timing import FASE_AUTH, TimedRoute, medir_fase
+from app.api.middlewares import slow_request_middleware
+from app.api.middlewares.slow_request_middleware import SlowRequestMiddleware
+
+
+@pytest.fixture
+def mock_logger(monkeypatch):
+    logger = MagicMock()
+    monkeypatch.setattr(slow_request_middleware, "logger", logger)
+    return logger
+
+
+async def fake_auth():
+    with medir_fase(FASE_AUTH):
+        await asyncio.sleep(0.01)
+
+
+def _client(threshold_ms: int, sample_ratio: float = 1.0, sorteio: float = 0.0) -> TestClient:
+    router = APIRouter(dependencies=[Depends(fake_auth)], route_class=TimedRoute)
+
+    @router.get("/itens/{sku}")
+    async def get_item(sku: str):
+        await asyncio.sleep(0.02)
+        return {"sku": sku}
+
+    app = FastAPI()
+    app.add_middleware(
+        SlowRequestMiddleware, threshold_ms=threshold_ms, sample_ratio=sample_ratio, random_func=lambda: sorteio
+    )
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_requisicao_lenta_logada_com_as_fases(mock_logger):
+    response = _client(threshold_ms=1).get("/itens/sku-1")
+
+    assert response.status_code == 200
+    mensagem = mock_logger.warning.call_args.args[0]
+    assert mensagem.startswith("Requisição lenta: GET /itens/{sku} 200 em ")
+    assert "auth=" in mensagem
+    assert "service=" in mensagem
+    assert "serialization=" in mensagem
+
+
+def test_requisicao_rapida_nao_e_logada(mock_logger):
+    _client(threshold_ms=60_000).get("/itens/sku-1")
+
+    mock_logger.warning.assert_not_called()
+
+
+def test_requisicao_lenta_fora_da_amostra_nao_e_logada(mock_logger):
+    _client(threshold_ms=1, sample_ratio=0.1, sorteio=0.5).get("/itens/sku-1")
+
+    mock_logger.warning.assert_not_called()
+
+
+def test_fases_aninhadas_nao_sao_somadas_duas_vezes(monkeypatch):
+    from app.api.common import request_timing
+
+    agora = [0.0]
+    monkeypatch.setattr(request_timing.time, "perf_counter", lambda: agora[0])
+    timing = request_timing.RequestTiming()
+    token = request_timing._request_timing.set(timing)
+    try:
+        with medir_fase(FASE_AUTH):
+            agora[0] += 1
+            with medir_fase(FASE_AUTH):
+                agora[0] += 2
+    finally:
+        # Não deixa o timing vazar para os testes seguintes
+        request_timing._request_timing.reset(token)
+
+    assert timing.fases == {FASE_AUTH: 3}
@@ -0,0 +1,156 @@
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.integrations.database.sqlalchemy_client import SQLAlchemyClient
+from app.models.alerta_estoque_model import AlertaEstoque, EstoqueBaixo
+from app.repositories.alerta_estoque_repository import AlertaEstoqueRepository
+
+AGORA = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def session_mock():
+    mock = AsyncMock()
+    mock.begin = MagicMock()
+    return mock
+
+
+@pytest.fixture
+def repository(session_mock):
+    client = MagicMock(spec=SQLAlchemyClient)
+    session_manager = AsyncMock()
+    session_manager.__aenter__.return_value = session_mock
+    client.make_session.return_value = session_manager
+    return AlertaEstoqueRepository(sql_client=client)
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_sincronizar_incremental_filtra_por_updated_at(repository, session_mock):
+    inserted = MagicMock()
+    inserted.mappings.return_value.all.return_value = [
+        {"seller_id": "vendedor1", "sku": "sku1", "quantidade": 2, "alertado_em": AGORA}
+    ]
+    session_mock.execute.side_effect = [inserted, MagicMock(), MagicMock(), MagicMock()]
+    desde = datetime(2026, 10, 19, 11, 55, tzinfo=timezone.utc)
+
+    novos = await repository.sincronizar_alertas(desde, 5, AGORA)
+
+    assert novos == [AlertaEstoque(seller_id="vendedor1", sku="sku1", quantidade=2, alertado_em=AGORA)]
+    assert session_mock.execute.await_count == 4
+    session_mock.begin.assert_called_once()
+
+    insert_stmt, params = session_mock.execute.await_args_list[0].args
+    sql = _sql(insert_stmt)
+    assert "pc_estoque.updated_at > %(b_desde)s" in sql
+    # Estoques cujo limite (do SKU ou do vendedor) mudou também são reavaliados
+    assert "pc_estoque_limite.atualizado_em > %(b_desde)s" in sql
+    assert "coalesce(pc_estoque_limite_1.limite, pc_estoque_limite_2.limite, %(b_limite)s)" in sql
+    assert "ON CONFLICT (seller_id, sku) DO NOTHING" in sql
+    assert params == {"b_limite": 5, "b_agora": AGORA, "b_desde": desde}
+
+    recuperados_sql = _sql(session_mock.execute.await_args_list[1].args[0])
+    assert recuperados_sql.startswith("DELETE FROM pc_estoque_alerta USING")
+    assert "avaliados.quantidade > avaliados.limite" in recuperados_sql
+
+
+@pytest.mark.asyncio
+async def test_sincronizar_completo_nao_filtra_por_updated_at(repository, session_mock):
+    inserted = MagicMock()
+    inserted.mappings.return_value.all.return_value = []
+    session_mock.execute.side_effect = [inserted, MagicMock(), MagicMock(), MagicMock()]
+
+    assert await repository.sincronizar_alertas(None, 5, AGORA) == []
+
+    insert_stmt, params = session_mock.execute.await_args_list[0].args
+    assert "updated_at" not in _sql(insert_stmt)
+    assert "b_desde" not in params
+
+
+@pytest.mark.asyncio
+async def test_get_controle_sem_verificacao_anterior(repository, session_mock):
+    result = MagicMock()
+    result.one_or_none.return_value = None
+    session_mock.execute.return_value = result
+
+    assert await repository.get_controle() is None
+
+
+@pytest.mark.asyncio
+async def test_find_estoque_baixo_filtra_o_vendedor_no_banco(repository, session_mock):
+    result = MagicMock()
+    result.mappings.return_value.all.return_value = [
+        {"seller_id": "vendedor1", "sku": "sku1", "quantidade": 1, "limite": 3, "updated_at": AGORA}
+    ]
+    session_mock.execute.return_value = result
+
+    itens = await repository.find_estoque_baixo("vendedor1", 15)
+
+    assert itens == [EstoqueBaixo(seller_id="vendedor1", sku="sku1", quantidade=1, limite=3, updated_at=AGORA)]
+    stmt, params = session_mock.execute.await_args.args
+    assert params == {"b_seller_id": "vendedor1", "b_limite": 15}
+    sql = _sql(stmt)
+    assert "pc_estoque.seller_id = %(b_seller_id)s" in sql
+    assert "pc_estoque.quantidade <= coalesce((SELECT pc_estoque_limite.limite" in sql
+
+
+@pytest.mark.asyncio
+async def test_set_limite_do_vendedor_usa_sku_vazio(repository, session_mock):
+    await repository.set_limite("vendedor1", None, 7, AGORA)
+
+    stmt, params = session_mock.execute.await_args.args
+    assert params == {"b_seller_id": "vendedor1", "b_sku": "", "b_limite": 7, "b_agora": AGORA}
+    assert "ON CONFLICT (seller_id, sku) DO UPDATE" in _sql(stmt)
+
+
+@pytest.mark.asyncio
+async def test_find_limites_ignora_limites_removidos(repository, session_mock):
+    result = MagicMock()
+    result.all.return_value = [("", 7), ("sku1", 2)]
+    session_mock.execute.return_value = result
+
+    assert await repository.find_limites("vendedor1") == {"": 7, "sku1": 2}
+
+    stmt, params = session_mock.execute.await_args.args
+    assert params == {"b_seller_id": "vendedor1"}
+    assert "pc_estoque_limite.limite IS NOT NULL" in _sql(stmt)
+
+
+@pytest.mark.asyncio
+async def test_find_alertas_pendentes_somente_os_nao_notificados(repository, session_mock):
+    result = MagicMock()
+    result.mappings.return_value.all.return_value = [
+        {"seller_id": "vendedor1", "sku": "sku1", "quantidade": 2, "alertado_em": AGORA}
+    ]
+    session_mock.execute.return_value = result
+
+    pendentes = await repository.find_alertas_pendentes()
+
+    assert pendentes == [AlertaEstoque(seller_id="vendedor1", sku="sku1", quantidade=2, alertado_em=AGORA)]
+    assert "WHERE NOT pc_estoque_alerta.notificado" in _sql(session_mock.execute.await_args.args[0])
+
+
+@pytest.mark.asyncio
+async def test_marcar_notificados_pela_chave_do_alerta(repository, session_mock):
+    alerta = AlertaEstoque(seller_id="vendedor1", sku="sku1", quantidade=2, alertado_em=AGORA)
+
+    await repository.marcar_notificados([alerta])
+
+    stmt, params = session_mock.execute.await_args.args
+    assert params == {"b_chaves": [("vendedor1", "sku1", AGORA)]}
+    sql = _sql(stmt)
+    assert "UPDATE pc_estoque_alerta SET notificado=true" in sql
+    assert "(pc_estoque_alerta.seller_id, pc_estoque_alerta.sku, pc_estoque_alerta.alertado_em) IN" in sql
+
+
+@pytest.mark.asyncio
+async def test_marcar_notificados_sem_alertas_nao_executa(repository, session_mock):
+    await repository.marcar_notificados([])
+
+    session_mock.execute.assert_not_awaited()
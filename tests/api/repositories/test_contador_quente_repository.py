@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.common.exceptions.estoque_exceptions import EstoqueIndisponivelException
+from app.integrations.database.sqlalchemy_client import SQLAlchemyClient
+from app.repositories.contador_quente_repository import ContadorQuenteRepository
+
+AGORA = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def session_mock():
+    mock = AsyncMock()
+    mock.begin = MagicMock()
+    mock.add = MagicMock()
+    return mock
+
+
+@pytest.fixture
+def repository(session_mock):
+    client = MagicMock(spec=SQLAlchemyClient)
+    session_manager = AsyncMock()
+    session_manager.__aenter__.return_value = session_mock
+    client.make_session.return_value = session_manager
+    return ContadorQuenteRepository(sql_client=client)
+
+
+def _result(value):
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = value
+    return result
+
+
+def test_apply_delta_nao_deixa_a_quantidade_negativa(repository):
+    sql = str(repository._build_apply_delta_statement().compile(dialect=postgresql.dialect()))
+
+    assert "pc_estoque.quantidade + %(b_delta)s::INTEGER >= %(param_1)s::INTEGER" in sql
+
+
+@pytest.mark.asyncio
+async def test_apply_delta_sem_saldo_falha_sem_gravar(repository, session_mock):
+    # flush registrado, UPDATE barrado pelo piso e estoque ainda existente
+    session_mock.execute.side_effect = [_result("flush-1"), _result(None), _result(MagicMock())]
+
+    with pytest.raises(EstoqueIndisponivelException):
+        await repository.apply_delta("flush-1", "vendedor1", "sku1", -10, AGORA)
+
+    session_mock.add.assert_not_called()
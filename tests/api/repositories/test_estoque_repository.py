@@ -2,6 +2,8 @@ from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from sqlalchemy import delete
+from sqlalchemy.dialects import postgresql
 
 from app.models.estoque_model import Estoque
 from app.repositories.base.sqlalchemy_crud_repository import SQLAlchemyCrudRepository
@@ -139,6 +141,17 @@ async def test_delete_by_seller_id_and_sku_com_retorno(estoque_repository):
 
 # ---------------- Testes EstoqueBase ---------------- #
 
+def test_update_quantidade_by_version_exige_quantidade_acima_do_reservado(estoque_repository):
+    stmt = estoque_repository._build_update_quantidade_by_version_statement()
+    assert "quantidade_reservada <= %(b_quantidade)s" in str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_delete_nao_remove_estoque_com_reservas(estoque_repository, mock_sql_client):
+    mock_sql_client.init_delete_estoque.side_effect = delete
+    stmt = estoque_repository._build_delete_by_seller_id_sku_statement()
+    assert "quantidade_reservada = %(quantidade_reservada_1)s" in str(stmt.compile(dialect=postgresql.dialect()))
+
+
 def test_estoque_repository_herda_de_sqlalchemy_crud():
     repo = EstoqueRepository(sql_client=MagicMock())
     assert isinstance(repo, SQLAlchemyCrudRepository)
@@ -1,7 +1,12 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
-from datetime import datetime, timedelta
-from app.repositories.historico_estoque_repository import HistoricoEstoqueRepository, HistoricoEstoqueBase
+from datetime import date, datetime, timedelta
+from app.repositories.historico_estoque_repository import (
+    HistoricoEstoqueBase,
+    HistoricoEstoqueOutboxBase,
+    HistoricoEstoqueRepository,
+    HistoricoResumoDiaBase,
+)
 from app.models.historico_estoque_model import HistoricoEstoque, TipoMovimentacaoEnum
 from app.integrations.database.sqlalchemy_client import SQLAlchemyClient
 
@@ -146,4 +151,278 @@ class TestHistoricoEstoqueRepository:
         results = await repository.find_by_period(start_date, end_date)
 
         session_mock.execute.assert_called_once()
-        assert results == []
\ No newline at end of file
+        assert results == []
+
+    def test_stage_outbox_adiciona_registro_na_sessao(self, historico_pydantic_model):
+        """
+        Cenário: O histórico é preparado para o outbox na sessão da alteração do estoque.
+        Resultado Esperado: Uma entidade do outbox com os mesmos dados é adicionada à sessão.
+        """
+        session = MagicMock()
+
+        HistoricoEstoqueRepository.stage_outbox(session, historico_pydantic_model)
+
+        outbox = session.add.call_args.args[0]
+        assert isinstance(outbox, HistoricoEstoqueOutboxBase)
+        assert outbox.quantidade_nova == 60
+        assert outbox.tipo_movimentacao == "ATUALIZACAO"
+
+    @pytest.mark.asyncio
+    async def test_move_from_outbox_em_uma_instrucao(self, repository, session_mock):
+        """
+        Cenário: Move um lote do outbox para o histórico.
+        Resultado Esperado: Uma única instrução INSERT ... SELECT a partir do DELETE ... RETURNING.
+        """
+        session_mock.begin = MagicMock()
+        session_mock.execute.return_value = MagicMock(rowcount=42)
+
+        moved = await repository.move_from_outbox(500)
+
+        assert moved == 42
+        stmt, params = session_mock.execute.call_args.args
+        assert params == {"b_limit": 500}
+        sql = str(stmt)
+        assert "DELETE FROM pc_estoque_historico_outbox" in sql
+        assert "INSERT INTO pc_estoque_historico" in sql
+
+
+    def test_tabela_particionada_por_movimentado_em(self):
+        """
+        Cenário: Verifica o mapeamento da tabela particionada.
+        Resultado Esperado: Particionamento por faixa de movimentado_em, que compõe a chave primária.
+        """
+        table = HistoricoEstoqueBase.__table__
+
+        assert table.dialect_options["postgresql"]["partition_by"] == "RANGE (movimentado_em)"
+        assert {column.name for column in table.primary_key} == {"id", "movimentado_em"}
+
+    @pytest.mark.asyncio
+    async def test_list_partitions_ignora_default(self, repository, session_mock):
+        """
+        Cenário: O banco retorna as partições mensais e a partição default.
+        Resultado Esperado: Somente as mensais, ordenadas e indexadas pelo mês.
+        """
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = [
+            "pc_estoque_historico_p202608",
+            "pc_estoque_historico_default",
+            "pc_estoque_historico_p202607",
+        ]
+        session_mock.execute.return_value = mock_result
+
+        partitions = await repository.list_partitions()
+
+        assert partitions == {
+            date(2026, 7, 1): "pc_estoque_historico_p202607",
+            date(2026, 8, 1): "pc_estoque_historico_p202608",
+        }
+
+    @pytest.mark.asyncio
+    async def test_create_partitions_cria_somente_as_faltantes(self, repository, session_mock):
+        """
+        Cenário: Um dos meses pedidos já tem partição.
+        Resultado Esperado: Só o mês faltante é criado, com limites em UTC.
+        """
+        session_mock.begin = MagicMock()
+        session_mock.execute.return_value.scalar = MagicMock(return_value=False)
+        repository.list_partitions = AsyncMock(return_value={date(2026, 11, 1): "pc_estoque_historico_p202611"})
+
+        created = await repository.create_partitions([date(2026, 11, 1), date(2026, 12, 1)])
+
+        assert created == ["pc_estoque_historico_p202612"]
+        sql = str(session_mock.execute.call_args.args[0])
+        assert "CREATE TABLE IF NOT EXISTS pc_estoque_historico_p202612 PARTITION OF pc_estoque_historico" in sql
+        assert "FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')" in sql
+
+    @pytest.mark.asyncio
+    async def test_create_partitions_move_as_linhas_da_default(self, repository, session_mock):
+        """
+        Cenário: A partição default existe e pode ter linhas do mês a criar.
+        Resultado Esperado: A default é desanexada, as linhas do mês vão para a partição nova
+        e a default é anexada de volta, nessa ordem.
+        """
+        session_mock.begin = MagicMock()
+        session_mock.execute.return_value.scalar = MagicMock(return_value=True)
+        repository.list_partitions = AsyncMock(return_value={})
+
+        await repository.create_partitions([date(2026, 12, 1)])
+
+        statements = [str(call.args[0]) for call in session_mock.execute.call_args_list[1:]]
+        assert statements[0] == "ALTER TABLE pc_estoque_historico DETACH PARTITION pc_estoque_historico_default"
+        assert statements[1].startswith("CREATE TABLE IF NOT EXISTS pc_estoque_historico_p202612")
+        assert statements[2].startswith("WITH movidos AS (DELETE FROM pc_estoque_historico_default")
+        assert "movimentado_em >= '2026-12-01 00:00:00+00' AND movimentado_em < '2027-01-01" in statements[2]
+        assert "INSERT INTO pc_estoque_historico_p202612 (seller_id, " in statements[2]
+        assert statements[3] == (
+            "ALTER TABLE pc_estoque_historico ATTACH PARTITION pc_estoque_historico_default DEFAULT"
+        )
+
+    @pytest.mark.asyncio
+    async def test_drop_partitions_before_desanexa_e_remove(self, repository, session_mock):
+        """
+        Cenário: Existem partições anteriores e posteriores ao corte da retenção.
+        Resultado Esperado: Somente as anteriores são desanexadas e removidas.
+        """
+        session_mock.begin = MagicMock()
+        repository.list_partitions = AsyncMock(return_value={
+            date(2025, 9, 1): "pc_estoque_historico_p202509",
+            date(2025, 10, 1): "pc_estoque_historico_p202510",
+            date(2025, 11, 1): "pc_estoque_historico_p202511",
+        })
+
+        dropped = await repository.drop_partitions_before(date(2025, 11, 1))
+
+        assert dropped == ["pc_estoque_historico_p202509", "pc_estoque_historico_p202510"]
+        statements = [str(call.args[0]) for call in session_mock.execute.call_args_list]
+        assert statements == [
+            "ALTER TABLE pc_estoque_historico DETACH PARTITION pc_estoque_historico_p202509",
+            "DROP TABLE pc_estoque_historico_p202509",
+            "ALTER TABLE pc_estoque_historico DETACH PARTITION pc_estoque_historico_p202510",
+            "DROP TABLE pc_estoque_historico_p202510",
+        ]
+
+
+    @pytest.mark.asyncio
+    async def test_refresh_resumos_em_uma_transacao(self, repository, session_mock):
+        """
+        Cenário: Resume um intervalo do histórico.
+        Resultado Esperado: Resumo por hora, por dia e marca de processamento, nessa ordem, na mesma sessão.
+        """
+        session_mock.begin = MagicMock()
+        inicio = datetime(2026, 10, 19, 10)
+        fim = datetime(2026, 10, 19, 12, 30)
+
+        await repository.refresh_resumos(inicio, fim)
+
+        statements = [call.args for call in session_mock.execute.call_args_list]
+        assert len(statements) == 3
+        assert "INSERT INTO pc_estoque_historico_resumo_hora" in str(statements[0][0])
+        assert "INSERT INTO pc_estoque_historico_resumo_dia" in str(statements[1][0])
+        assert "INSERT INTO pc_estoque_historico_resumo_controle" in str(statements[2][0])
+        assert statements[0][1] == {"b_inicio": inicio, "b_fim": fim, "b_dia_inicio": datetime(2026, 10, 19)}
+
+    @pytest.mark.asyncio
+    async def test_find_resumos_por_dia_agrupa_os_tipos(self, repository, session_mock):
+        """
+        Cenário: O resumo diário de um SKU tem linhas de dois tipos de movimentação.
+        Resultado Esperado: Um único resumo com os totais somados e a contagem por tipo.
+        """
+        periodo = datetime(2026, 10, 19)
+        bases = [
+            HistoricoResumoDiaBase(
+                seller_id="seller-123", periodo=periodo, sku="SKU-1", tipo_movimentacao="BAIXA",
+                movimentacoes=4, delta_liquido=-8, quantidade_minima=12, quantidade_maxima=18,
+            ),
+            HistoricoResumoDiaBase(
+                seller_id="seller-123", periodo=periodo, sku="SKU-1", tipo_movimentacao="ATUALIZACAO",
+                movimentacoes=1, delta_liquido=10, quantidade_minima=20, quantidade_maxima=20,
+            ),
+        ]
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = bases
+        session_mock.execute.return_value = mock_result
+
+        resumos = await repository.find_resumos_por_dia(periodo, periodo, "seller-123")
+
+        assert "FROM pc_estoque_historico_resumo_dia" in str(session_mock.execute.call_args.args[0])
+        assert len(resumos) == 1
+        assert resumos[0].movimentacoes == 5
+        assert resumos[0].movimentacoes_por_tipo == {TipoMovimentacaoEnum.BAIXA: 4, TipoMovimentacaoEnum.ATUALIZACAO: 1}
+        assert resumos[0].delta_liquido == 2
+        assert (resumos[0].quantidade_minima, resumos[0].quantidade_maxima) == (12, 20)
+
+
+    @pytest.mark.asyncio
+    async def test_find_page_by_period_com_cursor_e_filtros(self, repository, session_mock, historico_sqlalchemy_base):
+        """
+        Cenário: Busca a página seguinte ao cursor, filtrando por SKU e tipo de movimentação.
+        Resultado Esperado: Filtros e condição de chave como parâmetros, ordenado por (movimentado_em, id) desc.
+        """
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = [historico_sqlalchemy_base]
+        session_mock.execute.return_value = mock_result
+        start_date, end_date = datetime(2026, 10, 12), datetime(2026, 10, 19)
+        after = (datetime(2026, 10, 18, 9, 30), 77)
+
+        results = await repository.find_page_by_period(
+            start_date, end_date, "seller-123", 51, after=after, sku="SKU-1", tipo_movimentacao=TipoMovimentacaoEnum.BAIXA
+        )
+
+        assert len(results) == 1
+        stmt, params = session_mock.execute.call_args.args
+        assert params == {
+            "b_seller_id": "seller-123", "b_start": start_date, "b_end": end_date, "b_limit": 51,
+            "b_sku": "SKU-1", "b_tipo_movimentacao": "BAIXA",
+            "b_after_movimentado_em": after[0], "b_after_id": 77,
+        }
+        sql = str(stmt)
+        assert "pc_estoque_historico.id < :b_after_id" in sql
+        assert "ORDER BY pc_estoque_historico.movimentado_em DESC, pc_estoque_historico.id DESC" in sql
+
+
+    @pytest.mark.asyncio
+    async def test_find_posicoes_as_of_parte_do_snapshot(self, repository, session_mock):
+        """
+        Cenário: Há um snapshot anterior ao instante consultado.
+        Resultado Esperado: DISTINCT ON sobre o snapshot unido às movimentações posteriores, sem exclusões.
+        """
+        snapshot_em = datetime(2026, 10, 1)
+        as_of = datetime(2026, 10, 15, 18)
+        snapshot_result = MagicMock()
+        snapshot_result.scalar.return_value = snapshot_em
+        posicoes_result = MagicMock()
+        posicoes_result.mappings.return_value.all.return_value = [
+            {
+                "seller_id": "seller-123", "sku": "SKU-1", "quantidade": 7,
+                "movimentado_em": as_of, "tipo_movimentacao": "BAIXA",
+            },
+            {
+                "seller_id": "seller-123", "sku": "SKU-2", "quantidade": 3,
+                "movimentado_em": snapshot_em, "tipo_movimentacao": None,
+            },
+        ]
+        session_mock.execute.side_effect = [snapshot_result, posicoes_result]
+
+        posicoes = await repository.find_posicoes_as_of("seller-123", as_of)
+
+        assert [(p.sku, p.quantidade, p.tipo_movimentacao) for p in posicoes] == [
+            ("SKU-1", 7, TipoMovimentacaoEnum.BAIXA),
+            ("SKU-2", 3, None),
+        ]
+        stmt, params = session_mock.execute.call_args.args
+        assert params["b_snapshot_em"] == snapshot_em and params["b_as_of"] == as_of
+        sql = str(stmt)
+        assert "DISTINCT ON" in sql or "DISTINCT" in sql
+        assert "FROM pc_estoque_snapshot" in sql and "UNION ALL" in sql
+
+    @pytest.mark.asyncio
+    async def test_create_snapshot_sem_anterior_usa_todo_o_historico(self, repository, session_mock):
+        """
+        Cenário: Primeiro snapshot, sem snapshot anterior.
+        Resultado Esperado: INSERT ... SELECT apenas a partir do histórico.
+        """
+        session_mock.begin = MagicMock()
+        session_mock.execute.return_value = MagicMock(rowcount=12)
+        tirado_em = datetime(2026, 10, 19)
+
+        assert await repository.create_snapshot(tirado_em) == 12
+
+        stmt, params = session_mock.execute.call_args.args
+        assert params == {"b_as_of": tirado_em, "b_snapshot_em": None}
+        sql = str(stmt)
+        assert "INSERT INTO pc_estoque_snapshot" in sql and "UNION ALL" not in sql
+
+    @pytest.mark.asyncio
+    async def test_delete_snapshots_before_remove_os_anteriores_ao_corte(self, repository, session_mock):
+        """
+        Cenário: Poda dos snapshots junto da retenção do histórico.
+        Resultado Esperado: DELETE dos snapshots tirados antes do corte, retornando a quantidade removida.
+        """
+        session_mock.begin = MagicMock()
+        session_mock.execute.return_value = MagicMock(rowcount=3)
+
+        assert await repository.delete_snapshots_before(datetime(2025, 10, 1)) == 3
+
+        sql = str(session_mock.execute.call_args.args[0])
+        assert "DELETE FROM pc_estoque_snapshot" in sql
+        assert "pc_estoque_snapshot.tirado_em <" in sql
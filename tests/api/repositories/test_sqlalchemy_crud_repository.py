@@ -199,4 +199,50 @@ async def test_find_with_valid_filters(repository, mock_sqlalchemy_client, mock_
     repository.to_model = MagicMock(return_value=estoque_model)
     filters = {"sku": "sku123"}
     result = await repository.find(filters)
-    assert result == [estoque_model]
\ No newline at end of file
+    assert result == [estoque_model]
+
+
+@pytest.mark.asyncio
+async def test_find_reutiliza_statement_em_cache(repository, mock_sqlalchemy_client, mock_session):
+    """Deve montar o statement uma única vez por formato de filtro e enviar os valores como parâmetros."""
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = []
+    mock_session.execute.return_value = mock_result
+
+    await repository.find({"sku": "sku123"}, limit=10, offset=0)
+    await repository.find({"sku": "sku456"}, limit=10, offset=10)
+
+    mock_sqlalchemy_client.init_select_estoque.assert_called_once()
+    first_call, second_call = mock_session.execute.call_args_list
+    assert first_call[0][0] is second_call[0][0]
+    assert second_call[0][1] == {"sku": "sku456", "_limit": 10, "_offset": 10}
+
+
+@pytest.mark.asyncio
+async def test_find_base_by_seller_id_sku_reutiliza_statement_em_cache(
+    repository, mock_sqlalchemy_client, mock_session
+):
+    """Deve reaproveitar o statement de busca por seller_id e sku entre chamadas."""
+    mock_session.execute.return_value = MagicMock()
+    await repository._find_base_by_seller_id_sku_on_session("vendedor123", "sku123", mock_session)
+    await repository._find_base_by_seller_id_sku_on_session("vendedor456", "sku456", mock_session)
+
+    mock_sqlalchemy_client.init_select_estoque.assert_called_once()
+    assert mock_session.execute.call_args[0][1] == {"seller_id": "vendedor456", "sku": "sku456"}
+
+
+@pytest.mark.asyncio
+async def test_find_com_filtro_none_usa_is_null(repository, mock_sqlalchemy_client, mock_session):
+    """Deve filtrar valores None com IS NULL, sem enviá-los como parâmetro."""
+    stmt = mock_sqlalchemy_client.init_select_estoque.return_value
+    stmt.where.return_value = stmt
+    stmt.limit.return_value.offset.return_value = stmt
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = []
+    mock_session.execute.return_value = mock_result
+    repository.entity_base_class = MagicMock()
+
+    await repository.find({"sku": "sku123", "quantidade": None})
+
+    repository.entity_base_class.quantidade.is_.assert_called_once_with(None)
+    assert mock_session.execute.call_args[0][1] == {"sku": "sku123", "_limit": 20, "_offset": 0}
@@ -0,0 +1,149 @@
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.common.exceptions.estoque_exceptions import EstoqueBadRequestException
+from app.models.alerta_estoque_model import AlertaEstoque, DigestEstoqueBaixo
+from app.services import alerta_estoque_service as module
+from app.services.alerta_estoque_service import ALERTA_SOBREPOSICAO, AlertaEstoqueService
+
+AGORA = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def mock_settings():
+    class Settings:
+        low_stock_threshold = 5
+
+    return Settings()
+
+
+@pytest.fixture
+def mock_repository():
+    repository = AsyncMock()
+    repository.sincronizar_alertas.return_value = []
+    repository.find_alertas_pendentes.return_value = []
+    return repository
+
+
+@pytest.fixture
+def mock_dispatcher():
+    dispatcher = AsyncMock()
+    dispatcher.despachar.return_value = []
+    return dispatcher
+
+
+@pytest.fixture
+def service(mock_repository, mock_dispatcher, mock_settings, monkeypatch):
+    monkeypatch.setattr(module, "utcnow", lambda: AGORA)
+    return AlertaEstoqueService(mock_repository, mock_dispatcher, mock_settings)
+
+
+@pytest.mark.asyncio
+async def test_primeira_verificacao_olha_todo_o_estoque(service, mock_repository):
+    mock_repository.get_controle.return_value = None
+
+    await service.verificar_estoque_baixo()
+
+    mock_repository.sincronizar_alertas.assert_awaited_once_with(None, 5, AGORA)
+
+
+@pytest.mark.asyncio
+async def test_verificacao_incremental_desde_a_ultima_marca(service, mock_repository):
+    ultima = datetime(2026, 10, 19, 11, 59, tzinfo=timezone.utc)
+    mock_repository.get_controle.return_value = (ultima, 5)
+
+    await service.verificar_estoque_baixo()
+
+    mock_repository.sincronizar_alertas.assert_awaited_once_with(ultima - ALERTA_SOBREPOSICAO, 5, AGORA)
+
+
+@pytest.mark.asyncio
+async def test_limite_alterado_refaz_a_verificacao_completa(service, mock_repository):
+    mock_repository.get_controle.return_value = (datetime(2026, 10, 19, 11, 59, tzinfo=timezone.utc), 10)
+
+    await service.verificar_estoque_baixo()
+
+    mock_repository.sincronizar_alertas.assert_awaited_once_with(None, 5, AGORA)
+
+
+@pytest.mark.asyncio
+async def test_notifica_os_alertas_pendentes(service, mock_repository, mock_dispatcher):
+    mock_repository.get_controle.return_value = (AGORA, 5)
+    alerta = AlertaEstoque(seller_id="vendedor1", sku="sku1", quantidade=3, alertado_em=AGORA)
+    mock_repository.sincronizar_alertas.return_value = [alerta]
+    mock_repository.find_alertas_pendentes.return_value = [alerta]
+
+    novos = await service.verificar_estoque_baixo()
+
+    assert novos == [alerta]
+    mock_dispatcher.despachar.assert_awaited_once_with([alerta])
+    mock_repository.marcar_notificados.assert_awaited_once_with([alerta])
+
+
+@pytest.mark.asyncio
+async def test_alertas_nao_entregues_continuam_pendentes(service, mock_repository, mock_dispatcher):
+    mock_repository.get_controle.return_value = (AGORA, 5)
+    entregue = AlertaEstoque(seller_id="vendedor1", sku="sku1", quantidade=3, alertado_em=AGORA)
+    falhou = AlertaEstoque(seller_id="vendedor2", sku="sku1", quantidade=1, alertado_em=AGORA)
+    mock_repository.find_alertas_pendentes.return_value = [entregue, falhou]
+    mock_dispatcher.despachar.return_value = [DigestEstoqueBaixo(seller_id="vendedor2", itens=[falhou])]
+
+    await service.verificar_estoque_baixo()
+
+    mock_repository.marcar_notificados.assert_awaited_once_with([entregue])
+
+
+@pytest.mark.asyncio
+async def test_sem_alertas_pendentes_nao_notifica(service, mock_repository, mock_dispatcher):
+    mock_repository.get_controle.return_value = (AGORA, 5)
+
+    await service.verificar_estoque_baixo()
+
+    mock_dispatcher.despachar.assert_not_awaited()
+    mock_repository.marcar_notificados.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_listar_estoque_baixo_usa_o_limite_padrao(service, mock_repository):
+    await service.listar_estoque_baixo("vendedor1")
+
+    mock_repository.find_estoque_baixo.assert_awaited_once_with("vendedor1", 5)
+
+
+@pytest.mark.asyncio
+async def test_listar_limites_com_limite_do_vendedor(service, mock_repository):
+    mock_repository.find_limites.return_value = {"": 7, "sku1": 2}
+
+    limites = await service.listar_limites("vendedor1")
+
+    assert limites.limite == 7
+    assert limites.limites_sku == {"sku1": 2}
+
+
+@pytest.mark.asyncio
+async def test_listar_limites_sem_limite_do_vendedor_usa_o_padrao(service, mock_repository):
+    mock_repository.find_limites.return_value = {}
+
+    limites = await service.listar_limites("vendedor1")
+
+    assert limites.limite == 5
+    assert limites.limites_sku == {}
+
+
+@pytest.mark.asyncio
+async def test_definir_e_remover_limite(service, mock_repository):
+    await service.definir_limite("vendedor1", 8, "sku1")
+    await service.remover_limite("vendedor1")
+
+    assert mock_repository.set_limite.await_args_list[0].args == ("vendedor1", "sku1", 8, AGORA)
+    assert mock_repository.set_limite.await_args_list[1].args == ("vendedor1", None, None, AGORA)
+
+
+@pytest.mark.asyncio
+async def test_definir_limite_negativo(service, mock_repository):
+    with pytest.raises(EstoqueBadRequestException):
+        await service.definir_limite("vendedor1", -1)
+
+    mock_repository.set_limite.assert_not_awaited()
@@ -0,0 +1,165 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.common.exceptions.estoque_exceptions import (
+    EstoqueBadRequestException,
+    EstoqueContadorQuenteException,
+    EstoqueNotFoundException,
+)
+from app.models.estoque_model import Estoque
+from app.services.contador_quente_service import MAX_DISABLE_ATTEMPTS, ContadorQuenteService
+
+
+@pytest.fixture
+def mock_settings():
+    class Settings:
+        contador_quente_habilitado = True
+        contador_quente_retencao_flush_horas = 24
+
+    return Settings()
+
+
+@pytest.fixture
+def mock_repository():
+    return AsyncMock()
+
+
+@pytest.fixture
+def mock_hot_counter():
+    return AsyncMock()
+
+
+@pytest.fixture
+def mock_estoque_service():
+    return AsyncMock()
+
+
+@pytest.fixture
+def service(mock_repository, mock_hot_counter, mock_estoque_service, mock_settings):
+    return ContadorQuenteService(mock_repository, mock_hot_counter, mock_estoque_service, mock_settings)
+
+
+@pytest.fixture
+def estoque():
+    return Estoque(id=1, seller_id="vendedor1", sku="sku1", quantidade=90, quantidade_reservada=2, version=5)
+
+
+@pytest.mark.asyncio
+async def test_ativar_carrega_quantidade_do_banco(service, mock_repository, mock_hot_counter, estoque):
+    mock_repository.find_by_seller_id_and_sku.return_value = estoque
+
+    await service.ativar("vendedor1", "sku1")
+
+    mock_hot_counter.enable.assert_awaited_once_with("vendedor1", "sku1", 90, 2)
+
+
+@pytest.mark.asyncio
+async def test_ativar_rebaseia_em_alteracao_gravada_depois_da_leitura(
+    service, mock_repository, mock_hot_counter, estoque
+):
+    alterado = estoque.model_copy(update={"quantidade": 40, "version": 6})
+    mock_repository.find_by_seller_id_and_sku.side_effect = [estoque, alterado]
+    mock_hot_counter.enable.return_value = True
+
+    assert await service.ativar("vendedor1", "sku1") == alterado
+
+    mock_hot_counter.enable.assert_awaited_once_with("vendedor1", "sku1", 90, 2)
+    mock_hot_counter.reconcile.assert_awaited_once_with("vendedor1", "sku1", 40, 2)
+
+
+@pytest.mark.asyncio
+async def test_ativar_ja_ativo_nao_rebaseia(service, mock_repository, mock_hot_counter, estoque):
+    mock_repository.find_by_seller_id_and_sku.return_value = estoque
+    mock_hot_counter.enable.return_value = False
+
+    await service.ativar("vendedor1", "sku1")
+
+    mock_repository.find_by_seller_id_and_sku.assert_awaited_once()
+    mock_hot_counter.reconcile.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_ativar_modo_desabilitado(service, mock_settings, mock_hot_counter):
+    mock_settings.contador_quente_habilitado = False
+
+    with pytest.raises(EstoqueBadRequestException):
+        await service.ativar("vendedor1", "sku1")
+    mock_hot_counter.enable.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_ativar_estoque_inexistente(service, mock_repository):
+    mock_repository.find_by_seller_id_and_sku.return_value = None
+
+    with pytest.raises(EstoqueNotFoundException):
+        await service.ativar("vendedor1", "sku1")
+
+
+@pytest.mark.asyncio
+async def test_flush_sku_aplica_delta_e_confirma(
+    service, mock_repository, mock_hot_counter, mock_estoque_service, estoque
+):
+    mock_hot_counter.checkpoint.return_value = ("flush-1", -10)
+    mock_repository.apply_delta.return_value = (estoque, True)
+
+    assert await service.flush_sku("vendedor1", "sku1") is True
+
+    args = mock_repository.apply_delta.await_args.args
+    assert args[:4] == ("flush-1", "vendedor1", "sku1", -10)
+    mock_hot_counter.ack.assert_awaited_once_with("vendedor1", "sku1", "flush-1", 90, 2)
+    mock_estoque_service.sincronizar_alteracao.assert_awaited_once_with(estoque)
+
+
+@pytest.mark.asyncio
+async def test_flush_sku_reaplica_flush_ja_gravado(service, mock_repository, mock_hot_counter, estoque):
+    """Worker caiu após o commit e antes da confirmação: o flush não é reaplicado, só confirmado."""
+    mock_hot_counter.checkpoint.return_value = ("flush-antigo", -10)
+    mock_repository.apply_delta.return_value = (estoque, False)
+
+    assert await service.flush_sku("vendedor1", "sku1") is False
+
+    mock_hot_counter.ack.assert_awaited_once_with("vendedor1", "sku1", "flush-antigo", 90, 2)
+
+
+@pytest.mark.asyncio
+async def test_flush_sku_sem_pendencias_reconcilia(service, mock_repository, mock_hot_counter, estoque):
+    mock_hot_counter.checkpoint.return_value = None
+    mock_repository.find_by_seller_id_and_sku.return_value = estoque
+
+    assert await service.flush_sku("vendedor1", "sku1") is False
+
+    mock_repository.apply_delta.assert_not_awaited()
+    mock_hot_counter.reconcile.assert_awaited_once_with("vendedor1", "sku1", 90, 2)
+
+
+@pytest.mark.asyncio
+async def test_flush_sku_estoque_removido_descarta_contador(service, mock_repository, mock_hot_counter):
+    mock_hot_counter.checkpoint.return_value = ("flush-1", -3)
+    mock_repository.apply_delta.return_value = (None, True)
+
+    await service.flush_sku("vendedor1", "sku1")
+
+    mock_hot_counter.disable.assert_awaited_once_with("vendedor1", "sku1", force=True)
+    mock_hot_counter.ack.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_flush_continua_apos_erro_em_um_sku(service, mock_repository, mock_hot_counter, estoque):
+    mock_hot_counter.list_active.return_value = [("vendedor1", "sku1"), ("vendedor1", "sku2")]
+    mock_hot_counter.checkpoint.side_effect = [Exception("falha"), ("flush-2", -1)]
+    mock_repository.apply_delta.return_value = (estoque, True)
+
+    assert await service.flush() == 1
+    mock_repository.purge_flushes.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_desativar_com_baixas_chegando(service, mock_repository, mock_hot_counter, estoque):
+    mock_hot_counter.checkpoint.return_value = None
+    mock_repository.find_by_seller_id_and_sku.return_value = estoque
+    mock_hot_counter.disable.return_value = False
+
+    with pytest.raises(EstoqueContadorQuenteException):
+        await service.desativar("vendedor1", "sku1")
+    assert mock_hot_counter.disable.await_count == MAX_DISABLE_ATTEMPTS
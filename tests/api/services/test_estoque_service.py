@@ -2,7 +2,15 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from app.common.exceptions.estoque_exceptions import EstoqueBadRequestException
+from app.common.exceptions.estoque_exceptions import (
+    EstoqueBadRequestException,
+    EstoqueContadorQuenteException,
+    EstoqueIndisponivelException,
+    EstoquePreconditionFailedException,
+    EstoqueReservadoException,
+    EstoqueVersionConflictException,
+)
+from app.integrations.kv_db.redis_hot_counter import CONTADOR_INATIVO, SALDO_INSUFICIENTE
 from app.models.estoque_model import Estoque
 from app.services.estoque_service import EstoqueServices
 
@@ -10,6 +18,7 @@ from app.services.estoque_service import EstoqueServices
 def mock_settings():
     class Settings:
         low_stock_threshold = 5
+        historico_outbox_habilitado = False
     return Settings()
 
 @pytest.fixture
@@ -75,17 +84,181 @@ async def test_create_estoque_funciona(service, mock_repository, mock_historico_
 @pytest.mark.asyncio
 async def test_update_estoque_funciona(service, mock_repository, mock_historico_repository, estoque_exemplo):
     mock_repository.find_by_seller_id_and_sku.return_value = estoque_exemplo.model_dump()
-    mock_repository.update_by_seller_id_and_sku.return_value = estoque_exemplo
+    mock_repository.update_quantidade_by_version.return_value = estoque_exemplo
     service._validate_positive_estoque = MagicMock()
 
     with patch("app.services.estoque_service.utcnow", return_value="2024-01-01T00:00:00Z"):
         result = await service.update("vendedor1", "sku1", 20)
 
     mock_repository.find_by_seller_id_and_sku.assert_awaited_once_with("vendedor1", "sku1")
-    mock_repository.update_by_seller_id_and_sku.assert_awaited_once()
+    mock_repository.update_quantidade_by_version.assert_awaited_once_with("vendedor1", "sku1", 20, 1, historico=None)
     mock_historico_repository.create.assert_awaited_once()
     assert result.quantidade == 10  # pois mock_repository retorna estoque_exemplo
 
+@pytest.mark.asyncio
+async def test_update_estoque_conflito_de_versao_rele_e_reaplica(
+    service, mock_repository, mock_historico_repository, estoque_exemplo
+):
+    concorrente = estoque_exemplo.model_copy(update={"quantidade": 7, "version": 2})
+    mock_repository.find_by_seller_id_and_sku.side_effect = [estoque_exemplo.model_dump(), concorrente.model_dump()]
+    atualizado = concorrente.model_copy(update={"quantidade": 20, "version": 3})
+    mock_repository.update_quantidade_by_version.side_effect = [None, atualizado]
+
+    result = await service.update("vendedor1", "sku1", 20)
+
+    assert result.version == 3
+    assert mock_repository.update_quantidade_by_version.await_args_list[1].args == ("vendedor1", "sku1", 20, 2)
+    historico = mock_historico_repository.create.await_args.args[0]
+    assert historico.quantidade_anterior == 7
+
+@pytest.mark.asyncio
+async def test_update_estoque_conflito_persistente(service, mock_repository, mock_historico_repository, estoque_exemplo):
+    mock_repository.find_by_seller_id_and_sku.return_value = estoque_exemplo.model_dump()
+    mock_repository.update_quantidade_by_version.return_value = None
+
+    with pytest.raises(EstoqueVersionConflictException):
+        await service.update("vendedor1", "sku1", 20)
+
+    mock_historico_repository.create.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_update_estoque_if_match_desatualizado(service, mock_repository, estoque_exemplo):
+    mock_repository.find_by_seller_id_and_sku.return_value = estoque_exemplo.model_dump()
+
+    with pytest.raises(EstoquePreconditionFailedException):
+        await service.update("vendedor1", "sku1", 20, expected_version=5)
+
+    mock_repository.update_quantidade_by_version.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_update_estoque_abaixo_do_reservado(service, mock_repository, estoque_exemplo):
+    reservado = estoque_exemplo.model_copy(update={"quantidade_reservada": 8})
+    mock_repository.find_by_seller_id_and_sku.return_value = reservado.model_dump()
+
+    with pytest.raises(EstoqueReservadoException):
+        await service.update("vendedor1", "sku1", 5)
+
+    mock_repository.update_quantidade_by_version.assert_not_awaited()
+
+@pytest.fixture
+def hot_service(mock_repository, mock_redis, mock_historico_repository):
+    class Settings:
+        low_stock_threshold = 5
+        contador_quente_habilitado = True
+        historico_outbox_habilitado = False
+    return EstoqueServices(mock_repository, mock_redis, mock_historico_repository, Settings(), hot_counter=AsyncMock())
+
+@pytest.mark.asyncio
+async def test_update_estoque_em_contador_quente(hot_service, mock_repository):
+    hot_service.hot_counter.is_active.return_value = True
+
+    with pytest.raises(EstoqueContadorQuenteException):
+        await hot_service.update("vendedor1", "sku1", 20)
+
+    mock_repository.update_quantidade_by_version.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_delete_estoque_em_contador_quente(hot_service, mock_repository):
+    hot_service.hot_counter.is_active.return_value = True
+
+    with pytest.raises(EstoqueContadorQuenteException):
+        await hot_service.delete("vendedor1", "sku1")
+
+    mock_repository.delete_by_seller_id_and_sku.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_baixar_estoque_no_banco(service, mock_repository, mock_historico_repository, estoque_exemplo):
+    estoque_exemplo.quantidade = 7
+    mock_repository.decrement_quantidade.return_value = estoque_exemplo
+
+    result = await service.baixar("vendedor1", "sku1", 3)
+
+    assert result.quantidade == 7
+    mock_repository.decrement_quantidade.assert_awaited_once_with("vendedor1", "sku1", 3, registrar_historico=False)
+    historico = mock_historico_repository.create.await_args.args[0]
+    assert historico.quantidade_anterior == 10
+    assert historico.quantidade_nova == 7
+
+@pytest.mark.asyncio
+async def test_baixar_estoque_indisponivel(service, mock_repository, estoque_exemplo):
+    mock_repository.decrement_quantidade.return_value = None
+    mock_repository.find_by_seller_id_and_sku.return_value = estoque_exemplo.model_dump()
+
+    with pytest.raises(EstoqueIndisponivelException):
+        await service.baixar("vendedor1", "sku1", 30)
+
+@pytest.mark.asyncio
+async def test_baixar_estoque_contador_quente(hot_service, mock_repository, mock_redis, estoque_exemplo):
+    hot_service.hot_counter.decrement.return_value = 4
+    mock_redis.get_json.return_value = estoque_exemplo.model_dump(mode="json")
+
+    result = await hot_service.baixar("vendedor1", "sku1", 6)
+
+    assert result.quantidade == 4
+    mock_repository.decrement_quantidade.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_baixar_estoque_contador_quente_sem_saldo(hot_service, mock_repository):
+    hot_service.hot_counter.decrement.return_value = SALDO_INSUFICIENTE
+
+    with pytest.raises(EstoqueIndisponivelException):
+        await hot_service.baixar("vendedor1", "sku1", 6)
+    mock_repository.decrement_quantidade.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_baixar_sku_fora_do_contador_quente_vai_ao_banco(hot_service, mock_repository, estoque_exemplo):
+    hot_service.hot_counter.decrement.return_value = CONTADOR_INATIVO
+    mock_repository.decrement_quantidade.return_value = estoque_exemplo
+
+    await hot_service.baixar("vendedor1", "sku1", 1)
+
+    mock_repository.decrement_quantidade.assert_awaited_once_with("vendedor1", "sku1", 1, registrar_historico=False)
+
+@pytest.mark.asyncio
+async def test_get_by_seller_id_and_sku_usa_quantidade_do_contador_quente(hot_service, mock_redis, estoque_exemplo):
+    mock_redis.get_json.return_value = estoque_exemplo.model_dump(mode="json")
+    hot_service.hot_counter.get.return_value = {"quantidade": 3, "reservada": 0, "pendente": -7, "em_voo": 0}
+
+    result = await hot_service.get_by_seller_id_and_sku("vendedor1", "sku1")
+
+    assert result.quantidade == 3
+
+@pytest.fixture
+def outbox_service(mock_repository, mock_redis, mock_historico_repository, mock_settings):
+    mock_settings.historico_outbox_habilitado = True
+    return EstoqueServices(mock_repository, mock_redis, mock_historico_repository, mock_settings)
+
+@pytest.mark.asyncio
+async def test_update_estoque_outbox_grava_historico_na_transacao(
+    outbox_service, mock_repository, mock_historico_repository, estoque_exemplo
+):
+    mock_repository.find_by_seller_id_and_sku.return_value = estoque_exemplo.model_dump()
+    mock_repository.update_quantidade_by_version.return_value = Estoque(
+        id=1, seller_id="vendedor1", sku="sku1", quantidade=20, version=2
+    )
+
+    await outbox_service.update("vendedor1", "sku1", 20)
+
+    historico = mock_repository.update_quantidade_by_version.await_args.kwargs["historico"]
+    assert historico.quantidade_anterior == 10
+    assert historico.quantidade_nova == 20
+    mock_historico_repository.create.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_create_e_delete_estoque_outbox(outbox_service, mock_repository, mock_historico_repository, estoque_exemplo):
+    mock_repository.find_by_seller_id_and_sku.side_effect = [None, estoque_exemplo.model_dump()]
+    mock_repository.create.return_value = estoque_exemplo
+    mock_repository.delete_by_seller_id_and_sku.return_value = True
+
+    await outbox_service.create(estoque_exemplo)
+    await outbox_service.delete("vendedor1", "sku1")
+
+    criacao = mock_repository.create.await_args.kwargs["historico"]
+    exclusao = mock_repository.delete_by_seller_id_and_sku.await_args.kwargs["historico"]
+    assert (criacao.quantidade_anterior, criacao.quantidade_nova) == (0, 10)
+    assert (exclusao.quantidade_anterior, exclusao.quantidade_nova) == (10, 0)
+    mock_historico_repository.create.assert_not_awaited()
+
 @pytest.mark.asyncio
 async def test_delete_estoque_funciona(service, mock_repository, mock_historico_repository, estoque_exemplo):
     mock_repository.find_by_seller_id_and_sku.return_value = estoque_exemplo.model_dump()
@@ -94,10 +267,20 @@ async def test_delete_estoque_funciona(service, mock_repository, mock_historico_
     result = await service.delete("vendedor1", "sku1")
 
     mock_repository.find_by_seller_id_and_sku.assert_awaited_once_with("vendedor1", "sku1")
-    mock_repository.delete_by_seller_id_and_sku.assert_awaited_once_with("vendedor1", "sku1")
+    mock_repository.delete_by_seller_id_and_sku.assert_awaited_once_with("vendedor1", "sku1", historico=None)
     mock_historico_repository.create.assert_awaited_once()
     assert result is True
 
+@pytest.mark.asyncio
+async def test_delete_estoque_com_reservas_ativas(service, mock_repository, estoque_exemplo):
+    reservado = estoque_exemplo.model_copy(update={"quantidade_reservada": 2})
+    mock_repository.find_by_seller_id_and_sku.return_value = reservado.model_dump()
+
+    with pytest.raises(EstoqueReservadoException):
+        await service.delete("vendedor1", "sku1")
+
+    mock_repository.delete_by_seller_id_and_sku.assert_not_awaited()
+
 @pytest.mark.asyncio
 async def test_list_estoques_funciona(service, mock_repository):
     paginator = FakePaginator(limit=10, offset=0)
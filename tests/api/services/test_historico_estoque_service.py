@@ -1,17 +1,27 @@
 import pytest
 from unittest.mock import AsyncMock
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 
+from app.common.exceptions.estoque_exceptions import EstoqueBadRequestException
+from app.models.historico_estoque_model import HistoricoEstoque
 from app.services.historico_estoque_service import HistoricoEstoqueService
 
+
 @pytest.fixture
 def mock_repository():
     repo = AsyncMock()
     return repo
 
+
+class Settings:
+    historico_consulta_max_dias = 31
+    historico_retencao_meses = 0
+
+
 @pytest.fixture
 def service(mock_repository):
-    return HistoricoEstoqueService(historico_repository=mock_repository)
+    return HistoricoEstoqueService(historico_repository=mock_repository, settings=Settings())
+
 
 @pytest.mark.asyncio
 async def test_get_relatorio_semanal(service, mock_repository):
@@ -24,6 +34,7 @@ async def test_get_relatorio_semanal(service, mock_repository):
     assert sid == seller_id
     assert (end_date - start_date).days == 7
 
+
 @pytest.mark.asyncio
 async def test_get_relatorio_diario(service, mock_repository):
     mock_repository.find_by_period.return_value = ["itemA"]
@@ -34,4 +45,213 @@ async def test_get_relatorio_diario(service, mock_repository):
     start_date, end_date, sid = args
     assert sid == seller_id
     assert start_date.hour == 0 and start_date.minute == 0 and start_date.second == 0 and start_date.microsecond == 0
-    assert end_date > start_date
\ No newline at end of file
+    assert end_date > start_date
+
+
+@pytest.mark.asyncio
+async def test_drenar_outbox_ate_esvaziar(service, mock_repository):
+    mock_repository.move_from_outbox.side_effect = [100, 100, 37]
+    total = await service.drenar_outbox(batch_size=100)
+    assert total == 237
+    assert mock_repository.move_from_outbox.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_manter_particoes_cria_futuras_e_remove_antigas(service, mock_repository, monkeypatch):
+    monkeypatch.setattr(
+        "app.services.historico_estoque_service.utcnow",
+        lambda: datetime(2026, 11, 20, 10, 0, tzinfo=timezone.utc),
+    )
+    mock_repository.create_partitions.return_value = ["pc_estoque_historico_p202702"]
+    mock_repository.drop_partitions_before.return_value = ["pc_estoque_historico_p202510"]
+    mock_repository.find_snapshot_em.return_value = datetime(2026, 11, 19, tzinfo=timezone.utc)
+
+    criadas, removidas = await service.manter_particoes(meses_a_frente=3, retencao_meses=12)
+
+    mock_repository.create_partitions.assert_awaited_once_with(
+        [date(2026, 11, 1), date(2026, 12, 1), date(2027, 1, 1), date(2027, 2, 1)]
+    )
+    mock_repository.drop_partitions_before.assert_awaited_once_with(date(2025, 11, 1))
+    mock_repository.delete_snapshots_before.assert_awaited_once_with(datetime(2025, 11, 1, tzinfo=timezone.utc))
+    assert criadas == ["pc_estoque_historico_p202702"]
+    assert removidas == ["pc_estoque_historico_p202510"]
+
+
+@pytest.mark.asyncio
+async def test_manter_particoes_sem_snapshot_apos_o_corte_nao_remove(service, mock_repository, monkeypatch):
+    monkeypatch.setattr(
+        "app.services.historico_estoque_service.utcnow",
+        lambda: datetime(2026, 11, 20, 10, 0, tzinfo=timezone.utc),
+    )
+    mock_repository.create_partitions.return_value = []
+    mock_repository.find_snapshot_em.return_value = datetime(2025, 10, 31, tzinfo=timezone.utc)
+
+    _, removidas = await service.manter_particoes(meses_a_frente=1, retencao_meses=12)
+
+    assert removidas == []
+    mock_repository.drop_partitions_before.assert_not_awaited()
+    mock_repository.delete_snapshots_before.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_manter_particoes_sem_retencao_nao_remove(service, mock_repository):
+    mock_repository.create_partitions.return_value = []
+
+    _, removidas = await service.manter_particoes(meses_a_frente=1, retencao_meses=0)
+
+    assert removidas == []
+    mock_repository.drop_partitions_before.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_atualizar_resumos_sem_historico_nao_faz_nada(service, mock_repository):
+    mock_repository.get_resumo_processado_ate.return_value = None
+    mock_repository.find_first_movimentado_em.return_value = None
+
+    assert await service.atualizar_resumos(janela_horas=2) == 0
+    mock_repository.refresh_resumos.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_atualizar_resumos_carga_inicial_em_lotes_diarios(service, mock_repository, monkeypatch):
+    agora = datetime(2026, 10, 19, 12, 30, tzinfo=timezone.utc)
+    monkeypatch.setattr("app.services.historico_estoque_service.utcnow", lambda: agora)
+    mock_repository.get_resumo_processado_ate.return_value = None
+    mock_repository.find_first_movimentado_em.return_value = datetime(2026, 10, 17, 14, 45, tzinfo=timezone.utc)
+
+    lotes = await service.atualizar_resumos(janela_horas=0)
+
+    assert lotes == 2
+    intervalos = [call.args for call in mock_repository.refresh_resumos.await_args_list]
+    assert intervalos == [
+        (datetime(2026, 10, 17, 14, tzinfo=timezone.utc), datetime(2026, 10, 18, 14, tzinfo=timezone.utc)),
+        (datetime(2026, 10, 18, 14, tzinfo=timezone.utc), agora),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_atualizar_resumos_reprocessa_a_janela(service, mock_repository, monkeypatch):
+    agora = datetime(2026, 10, 19, 12, 30, tzinfo=timezone.utc)
+    monkeypatch.setattr("app.services.historico_estoque_service.utcnow", lambda: agora)
+    mock_repository.get_resumo_processado_ate.return_value = datetime(2026, 10, 19, 12, 29, tzinfo=timezone.utc)
+
+    assert await service.atualizar_resumos(janela_horas=2) == 1
+    mock_repository.refresh_resumos.assert_awaited_once_with(datetime(2026, 10, 19, 10, tzinfo=timezone.utc), agora)
+
+
+@pytest.mark.asyncio
+async def test_get_resumo_semanal_inclui_o_dia_atual(service, mock_repository):
+    mock_repository.find_resumos_por_dia.return_value = ["resumo"]
+
+    assert await service.get_resumo_semanal("seller1") == ["resumo"]
+    start_date, end_date, seller_id = mock_repository.find_resumos_por_dia.call_args.args
+    assert seller_id == "seller1"
+    assert start_date.hour == 0 and (end_date - start_date).days == 6
+
+
+@pytest.mark.asyncio
+async def test_iter_movimentacoes_percorre_as_paginas(service, mock_repository):
+    primeira = [HistoricoEstoque(movimentado_em=datetime(2026, 10, 19, 12), id=i) for i in (5, 4)]
+    segunda = [HistoricoEstoque(movimentado_em=datetime(2026, 10, 19, 11), id=3)]
+    mock_repository.find_page_by_period.side_effect = [primeira, segunda]
+    start_date, end_date = datetime(2026, 10, 19), datetime(2026, 10, 20)
+
+    movimentacoes = [
+        m async for m in service.iter_movimentacoes("seller1", start_date, end_date, sku="sku1", batch_size=2)
+    ]
+
+    assert movimentacoes == primeira + segunda
+    chamadas = mock_repository.find_page_by_period.await_args_list
+    assert chamadas[0].kwargs["after"] is None
+    assert chamadas[1].kwargs["after"] == (datetime(2026, 10, 19, 12), 4)
+    assert chamadas[1].kwargs["sku"] == "sku1"
+
+
+def test_periodo_consulta_trata_datas_sem_fuso_como_utc(service):
+    start_date, end_date = service.periodo_consulta(datetime(2026, 10, 1), datetime(2026, 10, 19))
+
+    assert start_date == datetime(2026, 10, 1, tzinfo=timezone.utc)
+    assert end_date == datetime(2026, 10, 19, tzinfo=timezone.utc)
+
+
+def test_periodo_consulta_fim_padrao_e_agora(service):
+    start_date = datetime.now(timezone.utc) - timedelta(days=1)
+
+    _, end_date = service.periodo_consulta(start_date)
+
+    assert end_date > start_date
+
+
+@pytest.mark.parametrize(
+    "start_date, end_date",
+    [
+        (datetime(2026, 10, 19), datetime(2026, 10, 1)),
+        (datetime(2026, 1, 1), datetime(2026, 10, 1)),
+    ],
+)
+def test_periodo_consulta_invalido(service, start_date, end_date):
+    with pytest.raises(EstoqueBadRequestException) as exc_info:
+        service.periodo_consulta(start_date, end_date)
+    assert exc_info.value.details[0].location == "query"
+
+
+@pytest.mark.asyncio
+async def test_get_posicao_trata_as_of_sem_fuso_como_utc(service, mock_repository):
+    mock_repository.find_posicoes_as_of.return_value = ["posicao"]
+
+    assert await service.get_posicao("seller1", datetime(2026, 9, 30, 23, 59), "sku1") == ["posicao"]
+    mock_repository.find_posicoes_as_of.assert_awaited_once_with(
+        "seller1", datetime(2026, 9, 30, 23, 59, tzinfo=timezone.utc), "sku1"
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_posicao_com_retencao_rejeita_as_of_anterior_ao_primeiro_snapshot(service, mock_repository):
+    service.settings.historico_retencao_meses = 12
+    mock_repository.find_primeiro_snapshot_em.return_value = datetime(2025, 11, 1, tzinfo=timezone.utc)
+
+    with pytest.raises(EstoqueBadRequestException) as exc_info:
+        await service.get_posicao("seller1", datetime(2025, 10, 31, 12, 0, tzinfo=timezone.utc))
+
+    assert exc_info.value.details[0].location == "query"
+    mock_repository.find_posicoes_as_of.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_gerar_snapshot_a_partir_do_anterior(service, mock_repository, monkeypatch):
+    monkeypatch.setattr(
+        "app.services.historico_estoque_service.utcnow",
+        lambda: datetime(2026, 10, 19, 2, 0, tzinfo=timezone.utc),
+    )
+    anterior = datetime(2026, 10, 18, tzinfo=timezone.utc)
+    mock_repository.find_snapshot_em.return_value = anterior
+    mock_repository.find_outbox_movimentado_em.return_value = None
+    mock_repository.create_snapshot.return_value = 10
+
+    assert await service.gerar_snapshot() == datetime(2026, 10, 19, tzinfo=timezone.utc)
+    mock_repository.create_snapshot.assert_awaited_once_with(datetime(2026, 10, 19, tzinfo=timezone.utc), anterior)
+
+
+@pytest.mark.asyncio
+async def test_gerar_snapshot_aguarda_o_atraso_e_nao_repete(service, mock_repository, monkeypatch):
+    monkeypatch.setattr(
+        "app.services.historico_estoque_service.utcnow",
+        lambda: datetime(2026, 10, 19, 0, 30, tzinfo=timezone.utc),
+    )
+    mock_repository.find_snapshot_em.return_value = datetime(2026, 10, 18, tzinfo=timezone.utc)
+
+    assert await service.gerar_snapshot() is None
+    mock_repository.create_snapshot.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_gerar_snapshot_aguarda_o_outbox(service, mock_repository, monkeypatch):
+    monkeypatch.setattr(
+        "app.services.historico_estoque_service.utcnow",
+        lambda: datetime(2026, 10, 19, 2, 0, tzinfo=timezone.utc),
+    )
+    mock_repository.find_snapshot_em.return_value = datetime(2026, 10, 18, tzinfo=timezone.utc)
+    mock_repository.find_outbox_movimentado_em.return_value = datetime(2026, 10, 18, 23, 50, tzinfo=timezone.utc)
+
+    assert await service.gerar_snapshot() is None
+    mock_repository.create_snapshot.assert_not_awaited()
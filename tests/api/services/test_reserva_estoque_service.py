@@ -0,0 +1,207 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.common.exceptions.estoque_exceptions import (
+    EstoqueBadRequestException,
+    EstoqueContadorQuenteException,
+    EstoqueIndisponivelException,
+    EstoqueNotFoundException,
+    ReservaNaoAtivaException,
+    ReservaNotFoundException,
+)
+from app.models.estoque_model import Estoque
+from app.models.historico_estoque_model import TipoMovimentacaoEnum
+from app.models.reserva_estoque_model import ReservaEstoque, StatusReservaEnum
+from app.services.reserva_estoque_service import ReservaEstoqueService
+
+
+@pytest.fixture
+def mock_settings():
+    class Settings:
+        reserva_ttl_seconds = 900
+        reserva_ttl_max_seconds = 3600
+        reserva_expiracao_batch_size = 2
+        historico_outbox_habilitado = False
+
+    return Settings()
+
+
+@pytest.fixture
+def mock_repository():
+    return AsyncMock()
+
+
+@pytest.fixture
+def mock_estoque_service():
+    estoque_service = AsyncMock()
+    estoque_service.repository = AsyncMock()
+    return estoque_service
+
+
+@pytest.fixture
+def service(mock_repository, mock_estoque_service, mock_settings):
+    return ReservaEstoqueService(mock_repository, mock_estoque_service, mock_settings)
+
+
+def _reserva(status=StatusReservaEnum.ATIVA, quantidade=3, sku="sku1"):
+    return ReservaEstoque(
+        id=1,
+        seller_id="vendedor1",
+        sku=sku,
+        quantidade=quantidade,
+        status=status,
+        expira_em=datetime.now(timezone.utc) + timedelta(minutes=15),
+    )
+
+
+@pytest.mark.asyncio
+async def test_reserve_cria_reserva_com_ttl_padrao(service, mock_repository, mock_estoque_service):
+    mock_repository.reserve.side_effect = lambda reserva: reserva
+
+    antes = datetime.now(timezone.utc)
+    result = await service.reserve("vendedor1", "sku1", 3)
+
+    assert result.quantidade == 3
+    assert result.status == StatusReservaEnum.ATIVA
+    assert timedelta(seconds=899) <= result.expira_em - antes <= timedelta(seconds=901)
+    mock_estoque_service.invalidate_cache.assert_awaited_once_with("vendedor1", "sku1")
+
+
+@pytest.mark.asyncio
+async def test_reserve_ttl_acima_do_maximo(service, mock_repository):
+    with pytest.raises(EstoqueBadRequestException):
+        await service.reserve("vendedor1", "sku1", 3, ttl_seconds=7200)
+    mock_repository.reserve.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_reserve_estoque_inexistente(service, mock_repository, mock_estoque_service):
+    mock_repository.reserve.return_value = None
+    mock_estoque_service.repository.find_by_seller_id_and_sku.return_value = None
+
+    with pytest.raises(EstoqueNotFoundException):
+        await service.reserve("vendedor1", "sku1", 3)
+
+
+@pytest.mark.asyncio
+async def test_reserve_disponivel_insuficiente(service, mock_repository, mock_estoque_service):
+    mock_repository.reserve.return_value = None
+    mock_estoque_service.repository.find_by_seller_id_and_sku.return_value = Estoque(
+        id=1, seller_id="vendedor1", sku="sku1", quantidade=5, quantidade_reservada=4
+    )
+
+    with pytest.raises(EstoqueIndisponivelException):
+        await service.reserve("vendedor1", "sku1", 3)
+    mock_estoque_service.invalidate_cache.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_reserve_estoque_em_contador_quente(service, mock_repository, mock_estoque_service):
+    mock_estoque_service.validar_fora_do_contador_quente.side_effect = EstoqueContadorQuenteException(
+        seller_id="vendedor1", sku="sku1", message="contador quente"
+    )
+
+    with pytest.raises(EstoqueContadorQuenteException):
+        await service.reserve("vendedor1", "sku1", 3)
+    mock_repository.reserve.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_confirm_estoque_em_contador_quente(service, mock_repository, mock_estoque_service):
+    mock_repository.find_by_id_and_seller_id.return_value = _reserva()
+    mock_estoque_service.validar_fora_do_contador_quente.side_effect = EstoqueContadorQuenteException(
+        seller_id="vendedor1", sku="sku1", message="contador quente"
+    )
+
+    with pytest.raises(EstoqueContadorQuenteException):
+        await service.confirm("vendedor1", 1)
+    mock_estoque_service.validar_fora_do_contador_quente.assert_awaited_once()
+    assert mock_estoque_service.validar_fora_do_contador_quente.await_args.args[:2] == ("vendedor1", "sku1")
+    mock_repository.confirm.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_confirm_registra_movimentacao(service, mock_repository, mock_estoque_service):
+    reserva = _reserva(status=StatusReservaEnum.CONFIRMADA)
+    estoque = Estoque(id=1, seller_id="vendedor1", sku="sku1", quantidade=7, version=2)
+    mock_repository.confirm.return_value = (reserva, estoque)
+
+    result = await service.confirm("vendedor1", 1)
+
+    assert result is reserva
+    mock_estoque_service.registrar_movimentacao.assert_awaited_once_with(
+        estoque=estoque,
+        tipo=TipoMovimentacaoEnum.CONFIRMACAO_RESERVA,
+        quantidade_anterior=10,
+    )
+
+
+@pytest.mark.asyncio
+async def test_confirm_outbox_nao_grava_historico_fora_da_transacao(
+    service, mock_repository, mock_estoque_service, mock_settings
+):
+    mock_settings.historico_outbox_habilitado = True
+    estoque = Estoque(id=1, seller_id="vendedor1", sku="sku1", quantidade=7, version=2)
+    mock_repository.confirm.return_value = (_reserva(status=StatusReservaEnum.CONFIRMADA), estoque)
+
+    await service.confirm("vendedor1", 1)
+
+    assert mock_repository.confirm.await_args.kwargs["registrar_historico"] is True
+    mock_estoque_service.registrar_movimentacao.assert_not_awaited()
+    mock_estoque_service.sincronizar_alteracao.assert_awaited_once_with(estoque)
+
+
+@pytest.mark.asyncio
+async def test_confirm_estoque_removido(service, mock_repository, mock_estoque_service):
+    mock_repository.confirm.return_value = (_reserva(), None)
+    mock_estoque_service.repository.find_by_seller_id_and_sku.return_value = None
+
+    with pytest.raises(EstoqueNotFoundException):
+        await service.confirm("vendedor1", 1)
+    mock_estoque_service.registrar_movimentacao.assert_not_awaited()
+    mock_estoque_service.sincronizar_alteracao.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_confirm_estoque_sem_quantidade(service, mock_repository, mock_estoque_service):
+    mock_repository.confirm.return_value = (_reserva(), None)
+    mock_estoque_service.repository.find_by_seller_id_and_sku.return_value = {"quantidade": 1}
+
+    with pytest.raises(EstoqueIndisponivelException):
+        await service.confirm("vendedor1", 1)
+
+
+@pytest.mark.asyncio
+async def test_confirm_reserva_inexistente(service, mock_repository):
+    mock_repository.confirm.return_value = None
+    mock_repository.find_by_id_and_seller_id.return_value = None
+
+    with pytest.raises(ReservaNotFoundException):
+        await service.confirm("vendedor1", 1)
+
+
+@pytest.mark.asyncio
+async def test_release_reserva_nao_ativa(service, mock_repository, mock_estoque_service):
+    mock_repository.release.return_value = None
+    mock_repository.find_by_id_and_seller_id.return_value = _reserva(status=StatusReservaEnum.EXPIRADA)
+
+    with pytest.raises(ReservaNaoAtivaException):
+        await service.release("vendedor1", 1)
+    mock_estoque_service.invalidate_cache.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_expire_reservas_processa_em_lotes(service, mock_repository, mock_estoque_service):
+    mock_repository.expire_due.side_effect = [
+        [_reserva(sku="sku1"), _reserva(sku="sku1")],
+        [_reserva(sku="sku2")],
+    ]
+
+    total = await service.expire_reservas()
+
+    assert total == 3
+    assert mock_repository.expire_due.await_count == 2
+    invalidated = {call.args for call in mock_estoque_service.invalidate_cache.await_args_list}
+    assert invalidated == {("vendedor1", "sku1"), ("vendedor1", "sku2")}
@@ -1,4 +1,4 @@
-from unittest.mock import patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
@@ -28,3 +28,23 @@ def test_create_app_with_mocks(mock_health, mock_errors, mock_middlewares, mock_
     # Verifica se a documentação está disponível
     response = client.get("/api/docs")
     assert response.status_code == 200
+
+
+@patch("app.api.api_application.configure_middlewares")
+@patch("app.api.api_application.add_error_handlers")
+@patch("app.api.api_application.add_health_check_router")
+def test_lifespan_inicia_e_encerra_o_adapter_openid(
+    mock_health, mock_errors, mock_middlewares, mock_settings, mock_router
+):
+    """Testa se as chaves do IDP são carregadas na subida e o cliente HTTP fechado no encerramento."""
+    app = create_app(mock_settings, mock_router)
+    app.container = MagicMock()
+    openid_adapter = app.container.keycloak_adapter.return_value
+    openid_adapter.start = AsyncMock()
+    openid_adapter.aclose = AsyncMock()
+
+    with TestClient(app):
+        openid_adapter.start.assert_awaited_once()
+        openid_adapter.aclose.assert_not_awaited()
+
+    openid_adapter.aclose.assert_awaited_once()
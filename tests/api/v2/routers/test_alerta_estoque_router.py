@@ -0,0 +1,101 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.api.common.auth_handler import do_auth
+from app.common.datetime import utcnow
+from app.models.alerta_estoque_model import EstoqueBaixo
+from app.services.alerta_estoque_service import AlertaEstoqueService
+
+mock = AsyncMock(spec=AlertaEstoqueService)
+
+# ----------------------------
+# Fixtures
+# ----------------------------
+
+
+@pytest.fixture
+def app():
+    # Importado na execução para não criar a aplicação antes dos overrides de outros módulos de teste
+    from app.api_main import app
+
+    return app
+
+
+@pytest.fixture
+def mock_alerta_service(app):
+    mock.reset_mock(return_value=True, side_effect=True)
+    with app.container.alerta_estoque_service.override(mock):
+        yield mock
+
+
+@pytest.fixture
+def mock_do_auth(app):
+    app.dependency_overrides[do_auth] = lambda: None
+    yield
+    app.dependency_overrides.pop(do_auth, None)
+
+
+@pytest.fixture
+async def async_client(app):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://localhost:8000/seller/v2") as client:
+        yield client
+
+
+@pytest.fixture
+def header_seller_id():
+    return {"x-seller-id": "seller-123"}
+
+
+# ----------------------------
+# Testes
+# ----------------------------
+
+
+@pytest.mark.asyncio
+async def test_listar_estoque_baixo(async_client, mock_alerta_service, mock_do_auth, header_seller_id):
+    mock_alerta_service.listar_estoque_baixo.return_value = [
+        EstoqueBaixo(seller_id="seller-123", sku="ABC123", quantidade=2, limite=5, updated_at=utcnow())
+    ]
+
+    response = await async_client.get("/estoque_baixo", headers=header_seller_id)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["results"][0]["sku"] == "ABC123"
+    assert body["results"][0]["limite"] == 5
+    mock_alerta_service.listar_estoque_baixo.assert_awaited_once_with("seller-123")
+
+
+@pytest.mark.asyncio
+async def test_definir_limite_do_vendedor(async_client, mock_alerta_service, mock_do_auth, header_seller_id):
+    response = await async_client.put("/estoque_baixo/limite", json={"limite": 10}, headers=header_seller_id)
+
+    assert response.status_code == 204
+    mock_alerta_service.definir_limite.assert_awaited_once_with("seller-123", 10)
+
+
+@pytest.mark.asyncio
+async def test_definir_limite_de_um_sku(async_client, mock_alerta_service, mock_do_auth, header_seller_id):
+    response = await async_client.put("/estoque_baixo/limite/ABC123", json={"limite": 3}, headers=header_seller_id)
+
+    assert response.status_code == 204
+    mock_alerta_service.definir_limite.assert_awaited_once_with("seller-123", 3, "ABC123")
+
+
+@pytest.mark.asyncio
+async def test_definir_limite_negativo(async_client, mock_alerta_service, mock_do_auth, header_seller_id):
+    response = await async_client.put("/estoque_baixo/limite", json={"limite": -1}, headers=header_seller_id)
+
+    assert response.status_code == 422
+    mock_alerta_service.definir_limite.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_remover_limite_de_um_sku(async_client, mock_alerta_service, mock_do_auth, header_seller_id):
+    response = await async_client.delete("/estoque_baixo/limite/ABC123", headers=header_seller_id)
+
+    assert response.status_code == 204
+    mock_alerta_service.remover_limite.assert_awaited_once_with("seller-123", "ABC123")
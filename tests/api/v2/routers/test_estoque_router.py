@@ -151,6 +151,7 @@ async def test_buscar_estoque_por_sku(async_client, mock_estoque_service, mock_d
     data = resposta.json()
     assert data["sku"] == sku
     assert data["quantidade"] == 10
+    assert resposta.headers["ETag"] == '"1"'
     mock_estoque_service.get_by_seller_id_and_sku.assert_called_once_with("seller-123", sku)
 
 @pytest.mark.asyncio
@@ -246,7 +247,35 @@ async def test_atualizar_estoque(async_client, mock_estoque_service, mock_do_aut
     data = resposta.json()
     assert data["sku"] == sku
     assert data["quantidade"] == nova_quantidade
-    mock_estoque_service.update.assert_called_once_with("seller-123", sku, nova_quantidade)
+    assert resposta.headers["ETag"] == '"1"'
+    mock_estoque_service.update.assert_called_once_with("seller-123", sku, nova_quantidade, expected_version=None)
+
+@pytest.mark.asyncio
+async def test_atualizar_estoque_com_if_match(async_client, mock_estoque_service, mock_do_auth, header_seller_id):
+    """Deve repassar a versão do If-Match para o serviço e devolver o novo ETag."""
+    sku = "ABC123"
+    mock_estoque_service.update.reset_mock()
+    mock_estoque_service.update.return_value = Estoque(sku=sku, quantidade=30, seller_id="seller-123", version=4)
+
+    resposta = await async_client.patch(
+        f"/estoque/{sku}",
+        json={"quantidade": 30},
+        headers={**header_seller_id, "If-Match": '"3"'},
+    )
+
+    assert resposta.status_code == 200
+    assert resposta.headers["ETag"] == '"4"'
+    mock_estoque_service.update.assert_called_once_with("seller-123", sku, 30, expected_version=3)
+
+@pytest.mark.asyncio
+async def test_atualizar_estoque_if_match_invalido(async_client, mock_do_auth, header_seller_id):
+    """Deve retornar 400 se o If-Match não for um ETag da API."""
+    resposta = await async_client.patch(
+        "/estoque/ABC123",
+        json={"quantidade": 30},
+        headers={**header_seller_id, "If-Match": "abc"},
+    )
+    assert resposta.status_code == 400
 
 @pytest.mark.asyncio
 async def test_atualizar_estoque_quantidade_invalida(async_client, mock_do_auth, header_seller_id):
@@ -297,4 +326,24 @@ async def test_deletar_estoque_inexistente(async_client, mock_estoque_service, m
     mock_estoque_service.delete.return_value = None
 
     resposta = await async_client.delete(f"/estoque/{sku}", headers=header_seller_id)
-    assert resposta.status_code == 404   
\ No newline at end of file
+    assert resposta.status_code == 404   
+# ----------------------------
+# Testes: POST /estoque/{sku}/baixa
+# ----------------------------
+
+@pytest.mark.asyncio
+async def test_baixar_estoque(async_client, mock_estoque_service, mock_do_auth, header_seller_id):
+    """Testa a baixa de unidades de um estoque."""
+    mock_estoque_service.baixar.return_value = Estoque(sku="ABC123", quantidade=7, seller_id="seller-123")
+
+    resposta = await async_client.post("/estoque/ABC123/baixa", json={"quantidade": 3}, headers=header_seller_id)
+
+    assert resposta.status_code == 200
+    assert resposta.json()["quantidade"] == 7
+    mock_estoque_service.baixar.assert_called_once_with("seller-123", "ABC123", 3)
+
+@pytest.mark.asyncio
+async def test_baixar_estoque_quantidade_invalida(async_client, mock_do_auth, header_seller_id):
+    """Deve retornar 422 se a quantidade a baixar não for positiva."""
+    resposta = await async_client.post("/estoque/ABC123/baixa", json={"quantidade": 0}, headers=header_seller_id)
+    assert resposta.status_code == 422
@@ -1,11 +1,16 @@
+import json
+from datetime import datetime, timezone
 from unittest import mock
 import pytest
 from httpx import ASGITransport, AsyncClient
 from fastapi import status
 
 from app.api.common.auth_handler import do_auth
+from app.api.common.cursor import build_cursor, parse_cursor
 from app.api_main import app
 from app.container import Container
+from app.models.historico_estoque_model import HistoricoEstoque, TipoMovimentacaoEnum
+from app.models.posicao_estoque_model import PosicaoEstoque
 
 
 @pytest.fixture
@@ -14,11 +19,13 @@ def mock_estoque_service():
     yield mock
     Container.estoque_service.reset_override()
 
+
 @pytest.fixture
 def app_fixture():
     """Fixture que retorna a instância da aplicação FastAPI."""
     return app
 
+
 @pytest.fixture
 def mock_do_auth(app_fixture):
     """Fixture para desativar a autenticação durante os testes."""
@@ -26,6 +33,7 @@ def mock_do_auth(app_fixture):
     yield
     app_fixture.dependency_overrides.pop(do_auth, None)
 
+
 @pytest.fixture
 async def async_client(app_fixture):
     """Fixture para criar um cliente HTTP assíncrono para os testes."""
@@ -33,54 +41,270 @@ async def async_client(app_fixture):
     async with AsyncClient(transport=transport, base_url="http://localhost:8000/seller/v2") as client:
         yield client
 
+
 @pytest.fixture
 def auth_headers():
     """Fixture que retorna os headers necessários para as requisições."""
     return {"x-seller-id": "seller1", "Authorization": "Bearer fake-token"}
 
 
+def _movimentacao(seller_id, id=1, sku="sku1"):
+    return HistoricoEstoque(
+        id=id,
+        seller_id=seller_id,
+        sku=sku,
+        quantidade_anterior=1,
+        quantidade_nova=2,
+        tipo_movimentacao="CRIACAO",
+        movimentado_em=datetime(2024, 7, 8, tzinfo=timezone.utc),
+    )
+
+
 @pytest.mark.asyncio
 async def test_list_historico_estoque_semana_v2_200(async_client, mock_do_auth, monkeypatch, auth_headers):
     """Testa o status 200 OK para o relatório semanal."""
-    async def fake_get_relatorio_semanal(self, seller_id):
-        return [{"seller_id": seller_id, "sku": "sku1", "quantidade_anterior": 1, "quantidade_nova": 2, "tipo_movimentacao": "CRIACAO", "movimentado_em": "2024-07-08T00:00:00"}]
-    monkeypatch.setattr("app.services.historico_estoque_service.HistoricoEstoqueService.get_relatorio_semanal", fake_get_relatorio_semanal)
-    
+
+    async def fake_get_pagina(
+        self, seller_id, start_date, end_date, limit, after=None, sku=None, tipo_movimentacao=None
+    ):
+        return [_movimentacao(seller_id)]
+
+    monkeypatch.setattr("app.services.historico_estoque_service.HistoricoEstoqueService.get_pagina", fake_get_pagina)
+
     response = await async_client.get("/historico_estoque/semana", headers=auth_headers)
-    
+
     assert response.status_code == status.HTTP_200_OK
     assert len(response.json()) == 2
+    assert response.json()["meta"]["links"]["next"] is None
+
 
 @pytest.mark.asyncio
 async def test_list_historico_estoque_semana_v2_404(async_client, mock_do_auth, monkeypatch, auth_headers):
     """Testa o status 404 Not Found para o relatório semanal."""
-    async def fake_get_relatorio_semanal(self, seller_id):
+
+    async def fake_get_pagina(self, *args, **kwargs):
         return []
-    monkeypatch.setattr("app.services.historico_estoque_service.HistoricoEstoqueService.get_relatorio_semanal", fake_get_relatorio_semanal)
-    
+
+    monkeypatch.setattr("app.services.historico_estoque_service.HistoricoEstoqueService.get_pagina", fake_get_pagina)
+
     response = await async_client.get("/historico_estoque/semana", headers=auth_headers)
-    
+
     assert response.status_code == status.HTTP_404_NOT_FOUND
 
+
+@pytest.mark.asyncio
+async def test_list_historico_estoque_semana_v2_proxima_pagina(async_client, mock_do_auth, monkeypatch, auth_headers):
+    """Testa a paginação por chave: filtros repassados e cursor da próxima página a partir do último registro."""
+    chamadas = []
+
+    async def fake_get_pagina(
+        self, seller_id, start_date, end_date, limit, after=None, sku=None, tipo_movimentacao=None
+    ):
+        chamadas.append((limit, after, sku, tipo_movimentacao))
+        return [_movimentacao(seller_id, id=i, sku=sku) for i in (3, 2, 1)]
+
+    monkeypatch.setattr("app.services.historico_estoque_service.HistoricoEstoqueService.get_pagina", fake_get_pagina)
+
+    response = await async_client.get(
+        "/historico_estoque/semana",
+        params={"_limit": 2, "sku": "sku9", "tipo_movimentacao": "BAIXA"},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert [item["id"] for item in body["results"]] == [3, 2]
+    assert chamadas == [(3, None, "sku9", TipoMovimentacaoEnum.BAIXA)]
+    next_link = body["meta"]["links"]["next"]
+    assert "sku=sku9" in next_link and "tipo_movimentacao=BAIXA" in next_link
+    cursor = next_link.split("_cursor=")[1]
+    assert parse_cursor(cursor) == (datetime(2024, 7, 8, tzinfo=timezone.utc), 2)
+
+
+@pytest.mark.asyncio
+async def test_list_historico_estoque_semana_v2_pagina_seguinte_vazia(
+    async_client, mock_do_auth, monkeypatch, auth_headers
+):
+    """Testa que uma página seguinte sem registros é uma lista vazia, e não 404."""
+
+    async def fake_get_pagina(self, *args, **kwargs):
+        return []
+
+    monkeypatch.setattr("app.services.historico_estoque_service.HistoricoEstoqueService.get_pagina", fake_get_pagina)
+    cursor = build_cursor(datetime(2024, 7, 8, tzinfo=timezone.utc), 2)
+
+    response = await async_client.get("/historico_estoque/semana", params={"_cursor": cursor}, headers=auth_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["results"] == []
+    assert body["meta"]["page"]["count"] == 0
+    assert body["meta"]["links"]["next"] is None
+
+
+@pytest.mark.asyncio
+async def test_list_historico_estoque_semana_v2_cursor_invalido(async_client, mock_do_auth, auth_headers):
+    """Testa o status 400 Bad Request para um cursor inválido."""
+    response = await async_client.get("/historico_estoque/semana", params={"_cursor": "abc"}, headers=auth_headers)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_stream_historico_estoque_semana_v2_ndjson(async_client, mock_do_auth, monkeypatch, auth_headers):
+    """Testa a transmissão do relatório semanal em NDJSON, uma movimentação por linha."""
+
+    async def fake_iter_movimentacoes(self, seller_id, start_date, end_date, sku=None, tipo_movimentacao=None):
+        for i in (2, 1):
+            yield _movimentacao(seller_id, id=i)
+
+    monkeypatch.setattr(
+        "app.services.historico_estoque_service.HistoricoEstoqueService.iter_movimentacoes", fake_iter_movimentacoes
+    )
+
+    response = await async_client.get("/historico_estoque/semana/stream", headers=auth_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    linhas = [json.loads(linha) for linha in response.text.splitlines()]
+    assert [linha["id"] for linha in linhas] == [2, 1]
+    assert linhas[0]["seller_id"] == "seller1"
+
+
 @pytest.mark.asyncio
 async def test_list_historico_estoque_dia_v2_200(async_client, mock_do_auth, monkeypatch, auth_headers):
     """Testa o status 200 OK para o relatório diário."""
-    async def fake_get_relatorio_diario(self, seller_id):
-        return [{"seller_id": seller_id, "sku": "sku1", "quantidade_anterior": 1, "quantidade_nova": 2, "tipo_movimentacao": "CRIACAO", "movimentado_em": "2024-07-08T00:00:00"}]
-    monkeypatch.setattr("app.services.historico_estoque_service.HistoricoEstoqueService.get_relatorio_diario", fake_get_relatorio_diario)
-    
+
+    async def fake_get_pagina(
+        self, seller_id, start_date, end_date, limit, after=None, sku=None, tipo_movimentacao=None
+    ):
+        assert start_date.hour == 0 and start_date.minute == 0
+        return [_movimentacao(seller_id)]
+
+    monkeypatch.setattr("app.services.historico_estoque_service.HistoricoEstoqueService.get_pagina", fake_get_pagina)
+
     response = await async_client.get("/historico_estoque/dia", headers=auth_headers)
-    
+
     assert response.status_code == status.HTTP_200_OK
     assert len(response.json()) == 2
 
+
 @pytest.mark.asyncio
 async def test_list_historico_estoque_dia_v2_404(async_client, mock_do_auth, monkeypatch, auth_headers):
     """Testa o status 404 Not Found para o relatório diário."""
-    async def fake_get_relatorio_diario(self, seller_id):
+
+    async def fake_get_pagina(self, *args, **kwargs):
         return []
-    monkeypatch.setattr("app.services.historico_estoque_service.HistoricoEstoqueService.get_relatorio_diario", fake_get_relatorio_diario)
-    
+
+    monkeypatch.setattr("app.services.historico_estoque_service.HistoricoEstoqueService.get_pagina", fake_get_pagina)
+
     response = await async_client.get("/historico_estoque/dia", headers=auth_headers)
-    
-    assert response.status_code == status.HTTP_404_NOT_FOUND
\ No newline at end of file
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_list_historico_estoque_periodo_v2_por_sku(async_client, mock_do_auth, monkeypatch, auth_headers):
+    """Testa a consulta de um período arbitrário de um SKU, com o período mantido nos links."""
+    chamadas = []
+
+    async def fake_get_pagina(
+        self, seller_id, start_date, end_date, limit, after=None, sku=None, tipo_movimentacao=None
+    ):
+        chamadas.append((start_date, end_date, sku))
+        return [_movimentacao(seller_id, id=i, sku=sku) for i in (2, 1)]
+
+    monkeypatch.setattr("app.services.historico_estoque_service.HistoricoEstoqueService.get_pagina", fake_get_pagina)
+
+    response = await async_client.get(
+        "/historico_estoque",
+        params={"start": "2024-07-01T00:00:00Z", "end": "2024-07-10T00:00:00Z", "sku": "sku9", "_limit": 1},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert chamadas == [(datetime(2024, 7, 1, tzinfo=timezone.utc), datetime(2024, 7, 10, tzinfo=timezone.utc), "sku9")]
+    next_link = response.json()["meta"]["links"]["next"]
+    assert "start=2024-07-01T00%3A00%3A00%2B00%3A00" in next_link and "sku=sku9" in next_link
+
+
+@pytest.mark.asyncio
+async def test_list_historico_estoque_periodo_v2_periodo_longo_demais(async_client, mock_do_auth, auth_headers):
+    """Testa o status 400 Bad Request para um período maior que o permitido."""
+    response = await async_client.get(
+        "/historico_estoque",
+        params={"start": "2022-01-01T00:00:00Z", "end": "2024-07-10T00:00:00Z"},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_list_resumo_historico_estoque_semana_v2_200(async_client, mock_do_auth, monkeypatch, auth_headers):
+    """Testa o status 200 OK para o resumo semanal."""
+
+    async def fake_get_resumo_semanal(self, seller_id):
+        return [
+            {
+                "seller_id": seller_id,
+                "sku": "sku1",
+                "periodo": "2024-07-08T00:00:00Z",
+                "movimentacoes": 3,
+                "movimentacoes_por_tipo": {"BAIXA": 2, "ATUALIZACAO": 1},
+                "delta_liquido": -5,
+                "quantidade_minima": 10,
+                "quantidade_maxima": 15,
+            }
+        ]
+
+    monkeypatch.setattr(
+        "app.services.historico_estoque_service.HistoricoEstoqueService.get_resumo_semanal", fake_get_resumo_semanal
+    )
+
+    response = await async_client.get("/historico_estoque/resumo/semana", headers=auth_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    resumo = response.json()["results"][0]
+    assert resumo["movimentacoes_por_tipo"] == {"BAIXA": 2, "ATUALIZACAO": 1}
+    assert resumo["delta_liquido"] == -5
+
+
+@pytest.mark.asyncio
+async def test_list_resumo_historico_estoque_dia_v2_404(async_client, mock_do_auth, monkeypatch, auth_headers):
+    """Testa o status 404 Not Found para o resumo diário."""
+
+    async def fake_get_resumo_diario(self, seller_id):
+        return []
+
+    monkeypatch.setattr(
+        "app.services.historico_estoque_service.HistoricoEstoqueService.get_resumo_diario", fake_get_resumo_diario
+    )
+
+    response = await async_client.get("/historico_estoque/resumo/dia", headers=auth_headers)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_get_posicao_estoque_v2_200(async_client, mock_do_auth, monkeypatch, auth_headers):
+    """Testa a reconstrução da posição do estoque em um instante."""
+    chamadas = []
+
+    async def fake_get_posicao(self, seller_id, as_of, sku=None):
+        chamadas.append((seller_id, as_of, sku))
+        return [
+            PosicaoEstoque(
+                seller_id=seller_id, sku="sku1", quantidade=7, movimentado_em=as_of, tipo_movimentacao="BAIXA"
+            )
+        ]
+
+    monkeypatch.setattr("app.services.historico_estoque_service.HistoricoEstoqueService.get_posicao", fake_get_posicao)
+
+    response = await async_client.get(
+        "/historico_estoque/posicao", params={"as_of": "2024-06-30T23:59:59Z", "sku": "sku1"}, headers=auth_headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["results"][0]["quantidade"] == 7
+    assert chamadas == [("seller1", datetime(2024, 6, 30, 23, 59, 59, tzinfo=timezone.utc), "sku1")]
@@ -0,0 +1,120 @@
+from datetime import timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.api.common.auth_handler import do_auth
+from app.api_main import app
+from app.common.datetime import utcnow
+from app.common.exceptions.estoque_exceptions import EstoqueIndisponivelException, ReservaNaoAtivaException
+from app.models.reserva_estoque_model import ReservaEstoque, StatusReservaEnum
+from app.services.reserva_estoque_service import ReservaEstoqueService
+
+mock = AsyncMock(spec=ReservaEstoqueService)
+
+# ----------------------------
+# Fixtures
+# ----------------------------
+
+
+@pytest.fixture
+def mock_reserva_service():
+    mock.reset_mock(return_value=True, side_effect=True)
+    with app.container.reserva_estoque_service.override(mock):
+        yield mock
+
+
+@pytest.fixture
+def mock_do_auth():
+    app.dependency_overrides[do_auth] = lambda: None
+    yield
+    app.dependency_overrides.pop(do_auth, None)
+
+
+@pytest.fixture
+async def async_client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://localhost:8000/seller/v2") as client:
+        yield client
+
+
+@pytest.fixture
+def header_seller_id():
+    return {"x-seller-id": "seller-123"}
+
+
+def _reserva(status=StatusReservaEnum.ATIVA):
+    return ReservaEstoque(
+        id=7,
+        seller_id="seller-123",
+        sku="ABC123",
+        quantidade=2,
+        status=status,
+        expira_em=utcnow() + timedelta(minutes=15),
+    )
+
+
+# ----------------------------
+# Testes
+# ----------------------------
+
+
+@pytest.mark.asyncio
+async def test_criar_reserva(async_client, mock_reserva_service, mock_do_auth, header_seller_id):
+    """Testa a criação de uma reserva."""
+    mock_reserva_service.reserve.return_value = _reserva()
+
+    response = await async_client.post(
+        "/reserva_estoque", json={"sku": "ABC123", "quantidade": 2}, headers=header_seller_id
+    )
+
+    assert response.status_code == 201
+    assert response.json()["id"] == 7
+    assert response.json()["status"] == "ATIVA"
+    mock_reserva_service.reserve.assert_awaited_once_with("seller-123", "ABC123", 2, None)
+
+
+@pytest.mark.asyncio
+async def test_criar_reserva_quantidade_invalida(async_client, mock_reserva_service, mock_do_auth, header_seller_id):
+    """Testa que quantidade não positiva é rejeitada na validação do payload."""
+    response = await async_client.post(
+        "/reserva_estoque", json={"sku": "ABC123", "quantidade": 0}, headers=header_seller_id
+    )
+
+    assert response.status_code == 422
+    mock_reserva_service.reserve.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_criar_reserva_indisponivel(async_client, mock_reserva_service, mock_do_auth, header_seller_id):
+    """Testa o retorno 409 quando não há disponível suficiente."""
+    mock_reserva_service.reserve.side_effect = EstoqueIndisponivelException("seller-123", "ABC123", 2)
+
+    response = await async_client.post(
+        "/reserva_estoque", json={"sku": "ABC123", "quantidade": 2}, headers=header_seller_id
+    )
+
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_confirmar_reserva(async_client, mock_reserva_service, mock_do_auth, header_seller_id):
+    """Testa a confirmação de uma reserva."""
+    mock_reserva_service.confirm.return_value = _reserva(StatusReservaEnum.CONFIRMADA)
+
+    response = await async_client.post("/reserva_estoque/7/confirmar", headers=header_seller_id)
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "CONFIRMADA"
+    mock_reserva_service.confirm.assert_awaited_once_with("seller-123", 7)
+
+
+@pytest.mark.asyncio
+async def test_liberar_reserva_nao_ativa(async_client, mock_reserva_service, mock_do_auth, header_seller_id):
+    """Testa o retorno 409 ao liberar uma reserva que já expirou."""
+    mock_reserva_service.release.side_effect = ReservaNaoAtivaException(7, "EXPIRADA")
+
+    response = await async_client.post("/reserva_estoque/7/liberar", headers=header_seller_id)
+
+    assert response.status_code == 409
@@ -1,36 +1,99 @@
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock, MagicMock
+
+from app.settings.worker import JOB_ESTOQUE_BAIXO, JOB_OUTBOX_HISTORICO, JOB_PARTICOES_HISTORICO, JOBS
+from app.worker import main
+
+
+def test_build_handlers_cobre_todos_os_jobs():
+    handlers = main.build_handlers(MagicMock(), MagicMock())
+
+    assert set(handlers) == JOBS
+
 
 @pytest.mark.asyncio
-async def test_worker_loop_execucao_uma_vez(monkeypatch):
-    # Mock do logger para não poluir o output
-    mock_logger = MagicMock()
-    monkeypatch.setattr("app.worker.main.logger", mock_logger)
+async def test_build_handlers_chama_as_tarefas(monkeypatch):
+    container = MagicMock()
+    settings = MagicMock()
+    mock_low_stock = AsyncMock()
+    monkeypatch.setattr(main, "run_low_stock_check_task", mock_low_stock)
+    mock_outbox = AsyncMock()
+    monkeypatch.setattr(main, "run_drain_historico_outbox_task", mock_outbox)
+    mock_particoes = AsyncMock()
+    monkeypatch.setattr(main, "run_manter_particoes_historico_task", mock_particoes)
+
+    handlers = main.build_handlers(container, settings)
+    await handlers[JOB_ESTOQUE_BAIXO]({})
+    await handlers[JOB_OUTBOX_HISTORICO]({})
+    await handlers[JOB_PARTICOES_HISTORICO]({})
+
+    mock_low_stock.assert_awaited_once_with(container.alerta_estoque_service.return_value)
+    mock_outbox.assert_awaited_once_with(
+        container.historico_estoque_service.return_value, settings.historico_outbox_batch_size
+    )
+    mock_particoes.assert_awaited_once_with(
+        container.historico_estoque_service.return_value,
+        settings.historico_particoes_futuras,
+        settings.historico_retencao_meses,
+    )
+
 
-    # Mock do container e do estoque_service
+@pytest.mark.asyncio
+async def test_worker_loop_consome_somente_os_jobs_habilitados(monkeypatch):
+    monkeypatch.setattr(main, "logger", MagicMock())
     mock_container = MagicMock()
-    mock_estoque_service = MagicMock()
-    mock_container.estoque_service.return_value = mock_estoque_service
-    monkeypatch.setattr("app.worker.main.Container", lambda: mock_container)
-
-    # Mock da task de verificação
-    mock_task = AsyncMock()
-    monkeypatch.setattr("app.worker.main.run_low_stock_check_task", mock_task)
-
-    # Mock do asyncio.sleep para não esperar de verdade
-    sleep_calls = []
-    async def fake_sleep(seconds):
-        sleep_calls.append(seconds)
-        raise KeyboardInterrupt()  # Para sair do loop após uma iteração
-
-    monkeypatch.setattr("app.worker.main.asyncio.sleep", fake_sleep)
-
-    # Executa o loop (deve rodar só uma vez por causa do KeyboardInterrupt)
-    from app.worker import main
-    with pytest.raises(KeyboardInterrupt):
-        await main.worker_loop()
-
-    # Verifica se a task foi chamada
-    mock_task.assert_called_once_with(mock_estoque_service)
-    # Verifica se o sleep foi chamado com o intervalo correto
-    assert sleep_calls == [120]
\ No newline at end of file
+    monkeypatch.setattr(main, "Container", lambda: mock_container)
+
+    worker_settings = MagicMock()
+    worker_settings.enabled_workers = {JOB_ESTOQUE_BAIXO, "desconhecido"}
+    worker_settings.worker_concorrencia = 2
+    worker_settings.worker_max_tentativas = 3
+    worker_settings.worker_visibilidade_segundos = 30
+    worker_settings.worker_agendas = {JOB_ESTOQUE_BAIXO: "@every 2m"}
+    worker_settings.worker_jitter_segundos = 5
+    worker_settings.worker_politica_atraso = "pular"
+    worker_settings.worker_metrics_port = 9464
+    monkeypatch.setattr(main, "worker_settings", worker_settings)
+    mock_start_http_server = MagicMock()
+    monkeypatch.setattr(main, "start_http_server", mock_start_http_server)
+    mock_configure_tracing = MagicMock()
+    monkeypatch.setattr(main, "configure_tracing", mock_configure_tracing)
+
+    runtime = MagicMock()
+    runtime.tipos = [JOB_ESTOQUE_BAIXO]
+    runtime.run = AsyncMock()
+    mock_runtime_class = MagicMock(return_value=runtime)
+    monkeypatch.setattr(main, "WorkerRuntime", mock_runtime_class)
+    worker_settings.worker_lease_segundos = 30
+    mock_scheduler = AsyncMock()
+    monkeypatch.setattr(main, "run_scheduler", mock_scheduler)
+    mock_lease_class = MagicMock()
+    monkeypatch.setattr(main, "RedisLease", mock_lease_class)
+
+    async def fake_run_as_leader(lease, work, espera):
+        await work()
+
+    monkeypatch.setattr(main, "run_as_leader", fake_run_as_leader)
+
+    await main.worker_loop()
+
+    queue, handlers = mock_runtime_class.call_args.args
+    assert queue is mock_container.job_queue.return_value
+    assert set(handlers) == {JOB_ESTOQUE_BAIXO}
+    kwargs = mock_runtime_class.call_args.kwargs
+    assert kwargs["concorrencia"] == 2
+    assert kwargs["max_tentativas"] == 3
+    assert kwargs["visibilidade_ms"] == 30000
+    mock_scheduler.assert_awaited_once()
+    _, tipo, agenda, jitter, politica = mock_scheduler.await_args.args
+    assert (tipo, agenda.spec, jitter, politica) == (JOB_ESTOQUE_BAIXO, "@every 2m", 5, "pular")
+    runtime.run.assert_awaited_once()
+    mock_start_http_server.assert_called_once_with(9464)
+    mock_configure_tracing.assert_called_once_with(mock_container.settings.return_value)
+
+    # Lease de liderança do agendamento e lease de execução, por tipo de job
+    mock_lease_class.assert_called_once_with(
+        mock_container.redis_adapter.return_value, f"{queue.stream(JOB_ESTOQUE_BAIXO)}:lider", kwargs["consumer"], 30
+    )
+    kwargs["lease_factory"](JOB_ESTOQUE_BAIXO)
+    assert mock_lease_class.call_args.args[1] == f"{queue.stream(JOB_ESTOQUE_BAIXO)}:lease"
@@ -0,0 +1,215 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.integrations.kv_db.redis_job_queue import Job
+from app.worker import runtime as module
+from app.worker.runtime import WorkerRuntime
+
+
+@pytest.fixture
+def queue():
+    queue = AsyncMock()
+    queue.claim_stale.return_value = []
+    queue.read.return_value = []
+    queue.retry.return_value = True
+    queue.heartbeat.return_value = True
+    return queue
+
+
+def _runtime(queue, handlers, concorrencia=2):
+    return WorkerRuntime(queue, handlers, consumer="worker-1", concorrencia=concorrencia, max_tentativas=3)
+
+
+@pytest.mark.asyncio
+async def test_job_executado_com_sucesso_e_confirmado(queue):
+    handler = AsyncMock()
+    runtime = _runtime(queue, {"estoque_baixo": handler})
+    job = Job(id="1-0", tipo="estoque_baixo", payload={"a": 1})
+    queue.read.return_value = [job]
+
+    await runtime.poll()
+    await asyncio.gather(*runtime._tasks)
+
+    handler.assert_awaited_once_with({"a": 1})
+    queue.ack.assert_awaited_once_with(job)
+    queue.retry.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_job_com_falha_e_reenfileirado(queue):
+    handler = AsyncMock(side_effect=RuntimeError("banco fora"))
+    runtime = _runtime(queue, {"estoque_baixo": handler})
+    job = Job(id="1-0", tipo="estoque_baixo")
+    queue.read.return_value = [job]
+
+    await runtime.poll()
+    await asyncio.gather(*runtime._tasks)
+
+    queue.retry.assert_awaited_once_with(job, 3)
+    queue.ack.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_le_somente_as_vagas_livres(queue):
+    liberar = asyncio.Event()
+
+    async def lento(payload):
+        await liberar.wait()
+
+    runtime = _runtime(queue, {"estoque_baixo": lento}, concorrencia=3)
+    queue.read.return_value = [Job(id="1-0", tipo="estoque_baixo"), Job(id="2-0", tipo="estoque_baixo")]
+
+    await runtime.poll()
+    assert queue.read.await_args.args == ("worker-1", ["estoque_baixo"], 3, runtime.bloqueio_ms)
+
+    queue.read.return_value = []
+    await runtime.poll()
+    assert queue.read.await_args.args[2] == 1
+
+    liberar.set()
+    await asyncio.gather(*runtime._tasks)
+
+
+@pytest.mark.asyncio
+async def test_assume_jobs_abandonados(queue):
+    handler = AsyncMock()
+    runtime = _runtime(queue, {"estoque_baixo": handler})
+    job = Job(id="1-0", tipo="estoque_baixo", tentativas=1)
+    queue.claim_stale.return_value = [job]
+
+    await runtime.poll()
+    await asyncio.gather(*runtime._tasks)
+
+    queue.claim_stale.assert_awaited_once_with("worker-1", "estoque_baixo", runtime.visibilidade_ms, 2)
+    queue.ack.assert_awaited_once_with(job)
+
+
+@pytest.mark.asyncio
+async def test_devolve_os_jobs_adiados_antes_de_ler(queue):
+    runtime = _runtime(queue, {"estoque_baixo": AsyncMock(), "reservas": AsyncMock()})
+
+    await runtime.poll()
+    await runtime.poll()
+
+    # Uma devolução por tipo a cada PROMOCAO_INTERVALO_SEGUNDOS, não a cada leitura
+    assert [c.args for c in queue.promover_adiados.await_args_list] == [("estoque_baixo",), ("reservas",)]
+
+
+@pytest.mark.asyncio
+async def test_job_longo_e_renovado_enquanto_executa(queue):
+    liberar = asyncio.Event()
+
+    async def lento(payload):
+        await liberar.wait()
+
+    runtime = WorkerRuntime(queue, {"estoque_baixo": lento}, consumer="worker-1", visibilidade_ms=30)
+    job = Job(id="1-0", tipo="estoque_baixo")
+    queue.read.return_value = [job]
+
+    await runtime.poll()
+    await asyncio.sleep(0.05)
+    liberar.set()
+    await asyncio.gather(*runtime._tasks)
+
+    queue.heartbeat.assert_awaited_with("worker-1", job)
+    queue.ack.assert_awaited_once_with(job)
+
+
+@pytest.mark.asyncio
+async def test_registra_metricas_por_tipo_de_job(queue, monkeypatch):
+    monkeypatch.setattr(module, "utcnow", lambda: datetime(2024, 5, 1, 12, 0, 2, tzinfo=timezone.utc))
+    falha = AsyncMock(side_effect=RuntimeError("banco fora"))
+    runtime = _runtime(queue, {"estoque_baixo": AsyncMock(), "reservas": falha})
+    queue.read.return_value = [
+        Job(id="1-0", tipo="estoque_baixo", payload={"agendado_em": "2024-05-01T12:00:00+00:00"}),
+        Job(id="2-0", tipo="reservas"),
+    ]
+    sucesso = {"tipo": "estoque_baixo", "result": "sucesso"}
+    falhas = {"tipo": "reservas", "result": "falha"}
+    sucessos_antes = REGISTRY.get_sample_value("worker_job_duration_seconds_count", sucesso) or 0
+    falhas_antes = REGISTRY.get_sample_value("worker_job_duration_seconds_count", falhas) or 0
+
+    await runtime.poll()
+    await asyncio.gather(*runtime._tasks)
+
+    estoque_baixo = runtime.metricas["estoque_baixo"]
+    assert (estoque_baixo.execucoes, estoque_baixo.falhas) == (1, 0)
+    assert estoque_baixo.ultimo_atraso == 2.0
+    assert estoque_baixo.ultima_duracao is not None
+    reservas = runtime.metricas["reservas"]
+    assert (reservas.execucoes, reservas.falhas) == (1, 1)
+    assert reservas.ultimo_atraso is None
+    # As mesmas durações vão para o Prometheus
+    assert REGISTRY.get_sample_value("worker_job_duration_seconds_count", sucesso) == sucessos_antes + 1
+    assert REGISTRY.get_sample_value("worker_job_duration_seconds_count", falhas) == falhas_antes + 1
+
+
+def _lease(adquirida=True):
+    lease = AsyncMock()
+    lease.acquire.return_value = adquirida
+
+    async def run_while_held(work):
+        return await work()
+
+    lease.run_while_held.side_effect = run_while_held
+    return lease
+
+
+@pytest.mark.asyncio
+async def test_job_executa_segurando_a_lease_do_tipo(queue):
+    handler = AsyncMock()
+    lease = _lease()
+    runtime = WorkerRuntime(queue, {"estoque_baixo": handler}, consumer="worker-1", lease_factory=lambda tipo: lease)
+    job = Job(id="1-0", tipo="estoque_baixo")
+    queue.read.return_value = [job]
+
+    await runtime.poll()
+    await asyncio.gather(*runtime._tasks)
+
+    lease.run_while_held.assert_awaited_once()
+    handler.assert_awaited_once_with({})
+    queue.ack.assert_awaited_once_with(job)
+
+
+@pytest.mark.asyncio
+async def test_job_descartado_se_o_tipo_ja_executa_em_outro_worker(queue):
+    handler = AsyncMock()
+    runtime = WorkerRuntime(
+        queue, {"estoque_baixo": handler}, consumer="worker-1", lease_factory=lambda tipo: _lease(adquirida=False)
+    )
+    job = Job(id="1-0", tipo="estoque_baixo")
+    queue.read.return_value = [job]
+
+    await runtime.poll()
+    await asyncio.gather(*runtime._tasks)
+
+    handler.assert_not_awaited()
+    queue.ack.assert_awaited_once_with(job)
+    queue.retry.assert_not_awaited()
+    assert runtime.metricas["estoque_baixo"].descartes == 1
+
+
+@pytest.mark.asyncio
+async def test_run_as_leader_so_executa_com_a_lease(monkeypatch):
+    lease = _lease(adquirida=False)
+    work = AsyncMock()
+    esperas = []
+
+    async def fake_sleep(seconds):
+        esperas.append(seconds)
+        if len(esperas) == 1:
+            lease.acquire.return_value = True
+            return
+        raise asyncio.CancelledError()
+
+    monkeypatch.setattr(module.asyncio, "sleep", fake_sleep)
+
+    with pytest.raises(asyncio.CancelledError):
+        await module.run_as_leader(lease, work, 5)
+
+    work.assert_awaited_once()
+    assert esperas == [5, 5]
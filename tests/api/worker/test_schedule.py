@@ -0,0 +1,136 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.worker import schedule as module
+from app.worker.schedule import POLITICA_EXECUTAR_UMA, POLITICA_PULAR, JobSchedule, run_scheduler
+
+
+def _utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "spec, momento, esperado",
+    [
+        ("@every 30s", _utc(2024, 5, 1, 12, 0, 10), _utc(2024, 5, 1, 12, 0, 30)),
+        ("@every 5m", _utc(2024, 5, 1, 12, 5), _utc(2024, 5, 1, 12, 10)),
+        ("15 3 * * *", _utc(2024, 5, 1, 3, 15), _utc(2024, 5, 2, 3, 15)),
+        ("15 3 * * *", _utc(2024, 5, 1, 2, 0), _utc(2024, 5, 1, 3, 15)),
+        ("*/20 * * * *", _utc(2024, 5, 1, 12, 41, 30), _utc(2024, 5, 1, 13, 0)),
+        ("0 9-17/4 * * 1-5", _utc(2024, 5, 3, 17, 30), _utc(2024, 5, 6, 9, 0)),
+        ("0 0 1 1 *", _utc(2024, 12, 31, 23, 59), _utc(2025, 1, 1, 0, 0)),
+        # dia e dia da semana restritos: basta um coincidir (2024-05-05 é domingo)
+        ("0 0 10 * 0", _utc(2024, 5, 1), _utc(2024, 5, 5)),
+        ("0 0 * * 7", _utc(2024, 5, 1), _utc(2024, 5, 5)),
+        ("0 0 * * 6-7", _utc(2024, 5, 1), _utc(2024, 5, 4)),
+    ],
+)
+def test_next_after(spec, momento, esperado):
+    assert JobSchedule(spec).next_after(momento) == esperado
+
+
+@pytest.mark.parametrize("spec", ["", "@every 0s", "@every 10x", "* * * *", "60 * * * *", "0 0 31 2 *", "5-1 * * * *"])
+def test_agenda_invalida(spec):
+    with pytest.raises(ValueError):
+        JobSchedule(spec).next_after(_utc(2024, 5, 1))
+
+
+@pytest.fixture
+def queue():
+    queue = AsyncMock()
+    queue.get_ultimo_agendamento.return_value = None
+    return queue
+
+
+def _parar_no_sono(monkeypatch, esperas: list):
+    async def fake_sleep(seconds):
+        esperas.append(seconds)
+        if len(esperas) > 1:
+            raise asyncio.CancelledError()
+
+    monkeypatch.setattr(module.asyncio, "sleep", fake_sleep)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_enfileira_nos_horarios_da_agenda(queue, monkeypatch):
+    monkeypatch.setattr(module, "utcnow", lambda: _utc(2024, 5, 1, 12, 0, 30))
+    monkeypatch.setattr(module.random, "uniform", lambda a, b: b)
+    esperas = []
+    _parar_no_sono(monkeypatch, esperas)
+
+    with pytest.raises(asyncio.CancelledError):
+        await run_scheduler(queue, "estoque_baixo", JobSchedule("@every 1m"), jitter_segundos=5)
+
+    # espera até o horário mais o jitter (limitado a um quarto do período no segundo disparo)
+    assert esperas == [35.0, 95.0]
+    queue.enqueue_once.assert_awaited_once_with(
+        "estoque_baixo", "2024-05-01T12:01:00+00:00", 120, {"agendado_em": "2024-05-01T12:01:00+00:00"}
+    )
+    queue.set_ultimo_agendamento.assert_awaited_once_with("estoque_baixo", _utc(2024, 5, 1, 12, 1))
+
+
+@pytest.mark.asyncio
+async def test_jitter_limitado_a_um_quarto_do_periodo(queue, monkeypatch):
+    monkeypatch.setattr(module, "utcnow", lambda: _utc(2024, 5, 1, 12, 0, 0))
+    monkeypatch.setattr(module.random, "uniform", lambda a, b: b)
+    esperas = []
+    _parar_no_sono(monkeypatch, esperas)
+
+    with pytest.raises(asyncio.CancelledError):
+        await run_scheduler(queue, "outbox_historico", JobSchedule("@every 8s"), jitter_segundos=5)
+
+    assert esperas[0] == 10.0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("politica, recuperados", [(POLITICA_EXECUTAR_UMA, 1), (POLITICA_PULAR, 0)])
+async def test_horarios_perdidos_seguem_a_politica(queue, monkeypatch, politica, recuperados):
+    monkeypatch.setattr(module, "utcnow", lambda: _utc(2024, 5, 1, 12, 30, 10))
+    monkeypatch.setattr(module.random, "uniform", lambda a, b: 0)
+    queue.get_ultimo_agendamento.return_value = _utc(2024, 5, 1, 12, 0)
+    esperas = []
+    _parar_no_sono(monkeypatch, esperas)
+
+    with pytest.raises(asyncio.CancelledError):
+        await run_scheduler(queue, "resumos_historico", JobSchedule("@every 5m"), politica_atraso=politica)
+
+    chaves = [call.args[1] for call in queue.enqueue_once.await_args_list]
+    # um único disparo de recuperação para o primeiro horário perdido, depois a agenda normal
+    assert chaves == ["2024-05-01T12:05:00+00:00"] * recuperados + ["2024-05-01T12:35:00+00:00"]
+    assert esperas[0] == 290.0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("politica, recuperados", [(POLITICA_EXECUTAR_UMA, 1), (POLITICA_PULAR, 0)])
+async def test_um_unico_horario_perdido_segue_a_politica(queue, monkeypatch, politica, recuperados):
+    monkeypatch.setattr(module, "utcnow", lambda: _utc(2024, 5, 1, 12, 5, 10))
+    monkeypatch.setattr(module.random, "uniform", lambda a, b: 0)
+    queue.get_ultimo_agendamento.return_value = _utc(2024, 5, 1, 12, 0)
+    esperas = []
+    _parar_no_sono(monkeypatch, esperas)
+
+    with pytest.raises(asyncio.CancelledError):
+        await run_scheduler(queue, "resumos_historico", JobSchedule("@every 5m"), politica_atraso=politica)
+
+    chaves = [call.args[1] for call in queue.enqueue_once.await_args_list]
+    # pular agenda só o próximo horário futuro, sem disparar o de 12:05 atrasado
+    assert chaves == ["2024-05-01T12:05:00+00:00"] * recuperados + ["2024-05-01T12:10:00+00:00"]
+    assert esperas[0] == 290.0
+
+
+@pytest.mark.asyncio
+async def test_erro_ao_agendar_nao_para_o_scheduler(queue, monkeypatch):
+    monkeypatch.setattr(module, "utcnow", lambda: _utc(2024, 5, 1, 12, 0, 0))
+    monkeypatch.setattr(module, "logger", MagicMock())
+    queue.enqueue_once.side_effect = ConnectionError("redis fora")
+    esperas = []
+    _parar_no_sono(monkeypatch, esperas)
+
+    with pytest.raises(asyncio.CancelledError):
+        await run_scheduler(queue, "reservas", JobSchedule("@every 1m"))
+
+    assert len(esperas) == 2
+    queue.set_ultimo_agendamento.assert_not_awaited()
@@ -14,6 +14,76 @@ async def test_run_low_stock_check_task(monkeypatch):
     await tasks.run_low_stock_check_task(mock_service)
 
     # Verifica se o método foi chamado
-    mock_service.check_and_notify_all_low_stock.assert_awaited_once()
+    mock_service.verificar_estoque_baixo.assert_awaited_once()
     # Verifica se o log foi registrado
-    mock_logger.info.assert_any_call("Executando a tarefa de verificação de estoque baixo.")
\ No newline at end of file
+    mock_logger.info.assert_any_call("Executando a tarefa de verificação de estoque baixo.")
+
+
+@pytest.mark.asyncio
+async def test_run_expire_reservas_task(monkeypatch):
+    mock_logger = MagicMock()
+    monkeypatch.setattr(tasks, "logger", mock_logger)
+
+    mock_service = AsyncMock()
+    await tasks.run_expire_reservas_task(mock_service)
+
+    mock_service.expire_reservas.assert_awaited_once()
+    mock_logger.info.assert_any_call("Executando a tarefa de expiração de reservas.")
+
+
+@pytest.mark.asyncio
+async def test_run_flush_contadores_quentes_task(monkeypatch):
+    mock_logger = MagicMock()
+    monkeypatch.setattr(tasks, "logger", mock_logger)
+
+    mock_service = AsyncMock()
+    await tasks.run_flush_contadores_quentes_task(mock_service)
+
+    mock_service.flush.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_run_drain_historico_outbox_task(monkeypatch):
+    mock_logger = MagicMock()
+    monkeypatch.setattr(tasks, "logger", mock_logger)
+
+    mock_service = AsyncMock()
+    await tasks.run_drain_historico_outbox_task(mock_service, 500)
+
+    mock_service.drenar_outbox.assert_awaited_once_with(500)
+
+
+
+@pytest.mark.asyncio
+async def test_run_manter_particoes_historico_task(monkeypatch):
+    mock_logger = MagicMock()
+    monkeypatch.setattr(tasks, "logger", mock_logger)
+
+    mock_service = AsyncMock()
+    await tasks.run_manter_particoes_historico_task(mock_service, 3, 12)
+
+    mock_service.manter_particoes.assert_awaited_once_with(3, 12)
+
+
+
+@pytest.mark.asyncio
+async def test_run_atualizar_resumos_historico_task(monkeypatch):
+    mock_logger = MagicMock()
+    monkeypatch.setattr(tasks, "logger", mock_logger)
+
+    mock_service = AsyncMock()
+    await tasks.run_atualizar_resumos_historico_task(mock_service, 2)
+
+    mock_service.atualizar_resumos.assert_awaited_once_with(2)
+
+
+
+@pytest.mark.asyncio
+async def test_run_gerar_snapshot_estoque_task(monkeypatch):
+    mock_logger = MagicMock()
+    monkeypatch.setattr(tasks, "logger", mock_logger)
+
+    mock_service = AsyncMock()
+    await tasks.run_gerar_snapshot_estoque_task(mock_service)
+
+    mock_service.gerar_snapshot.assert_awaited_once()
@@ -0,0 +1,112 @@
+"""
+Benchmark da autenticação (KeycloakAdapter.validate_token e do_auth) contra o emissor
+local, com o cache de tokens frio (um token diferente a cada chamada) e quente (o mesmo
+token repetido).
+
+    ENV=test PYTHONPATH=. python -m tests.benchmarks.auth_benchmark --algorithm RS256 --key-size 2048
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable
+
+from app.api.common.auth_handler import do_auth
+from app.integrations.auth.keycloak_adapter import KeycloakAdapter
+from tests.fixtures.local_issuer import LocalIssuer
+
+SELLER_ID = "luizalabs"
+
+
+@dataclass
+class ResultadoBenchmark:
+    cenario: str
+    iteracoes: int
+    total_segundos: float
+
+    @property
+    def por_segundo(self) -> float:
+        return self.iteracoes / self.total_segundos if self.total_segundos else float("inf")
+
+    @property
+    def media_us(self) -> float:
+        return self.total_segundos / self.iteracoes * 1_000_000
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "por_segundo": round(self.por_segundo, 1), "media_us": round(self.media_us, 2)}
+
+
+async def _medir(cenario: str, chamadas: list[Callable[[], Awaitable]]) -> ResultadoBenchmark:
+    inicio = time.perf_counter()
+    for chamada in chamadas:
+        await chamada()
+    return ResultadoBenchmark(cenario, len(chamadas), time.perf_counter() - inicio)
+
+
+async def run_auth_benchmark(
+    algorithm: str = "RS256", key_size: int = 2048, iteracoes: int = 1000, sellers: int = 1
+) -> list[ResultadoBenchmark]:
+    """
+    Executa os cenários e retorna um resultado por cenário. `sellers` é a quantidade de
+    sellers no claim do token, para medir contas de plataforma com muitos sellers.
+    """
+    sellers_claim = ",".join([SELLER_ID, *(f"seller-{i}" for i in range(1, sellers))])
+    with LocalIssuer(algorithm=algorithm, key_size=key_size) as issuer:
+        adapter = KeycloakAdapter(issuer.well_known_url, token_cache_size=iteracoes * 2 + 1)
+        try:
+            # Primeira validação: busca o well-known e o JWKS no emissor
+            token = issuer.sign(sellers=sellers_claim)
+            resultados = [await _medir("primeira_validacao", [lambda: adapter.validate_token(token)])]
+
+            # Tokens assinados antes da medição; sub diferente => hash diferente => cache frio
+            frios = [issuer.sign(sellers=sellers_claim, sub=f"validate-{i}") for i in range(iteracoes)]
+            resultados.append(
+                await _medir("validate_token_frio", [lambda t=t: adapter.validate_token(t) for t in frios])
+            )
+            resultados.append(
+                await _medir("validate_token_quente", [lambda: adapter.validate_token(token)] * iteracoes)
+            )
+
+            frios = [issuer.sign(sellers=sellers_claim, sub=f"do_auth-{i}") for i in range(iteracoes)]
+            resultados.append(
+                await _medir(
+                    "do_auth_frio",
+                    [lambda t=t: do_auth(token=t, seller_id=SELLER_ID, openid_adapter=adapter) for t in frios],
+                )
+            )
+            resultados.append(
+                await _medir(
+                    "do_auth_quente",
+                    [lambda: do_auth(token=token, seller_id=SELLER_ID, openid_adapter=adapter)] * iteracoes,
+                )
+            )
+        finally:
+            await adapter.aclose()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da autenticação com emissor de tokens local")
+    parser.add_argument("--algorithm", default="RS256", help="RS256, RS384, RS512, PS256, ES256...")
+    parser.add_argument("--key-size", type=int, default=2048, help="Tamanho da chave RSA (ignorado em ES*)")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--sellers", type=int, default=1, help="Quantidade de sellers no claim do token")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    resultados = asyncio.run(run_auth_benchmark(args.algorithm, args.key_size, args.iterations, args.sellers))
+    if args.json:
+        print(json.dumps([resultado.as_dict() for resultado in resultados], indent=2))
+        return
+    print(f"{args.algorithm} ({args.key_size} bits), {args.sellers} seller(s) no token")
+    for resultado in resultados:
+        print(
+            f"{resultado.cenario:<22} {resultado.iteracoes:>7} it  "
+            f"{resultado.por_segundo:>12,.0f} /s  {resultado.media_us:>10,.1f} µs"
+        )
+
+
+if __name__ == "__main__":
+    main()
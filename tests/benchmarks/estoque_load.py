@@ -0,0 +1,312 @@
+"""
+Teste de carga das APIs v2 de estoque e de histórico.
+
+Popula N sellers x M SKUs e dispara uma carga mista (leitura, baixa, listagem e
+histórico) com concorrência fixa, reportando p50/p95/p99 e RPS por endpoint em JSON.
+Com `--baseline`, compara com um resultado anterior e termina com código 1 se algum
+endpoint regrediu além da tolerância.
+
+Sem `--base-url`, a API roda no próprio processo (ASGI) com o emissor de tokens local no
+lugar do Keycloak; o Postgres e o Redis vêm de APP_DB_URL e APP_REDIS_URL (ex.: os do
+docker-compose, com as migrações aplicadas). Com `--base-url`, a carga vai para uma API
+já no ar e o token é informado em `--token`.
+
+    ENV=test PYTHONPATH=. python -m tests.benchmarks.estoque_load --sellers 10 --skus 100 \\
+        --concurrency 32 --duration 30 --output resultado.json --baseline baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+import httpx
+
+API_PREFIX = "/seller/v2"
+QUANTIDADE_INICIAL = 1_000_000
+
+# Peso padrão de cada operação na carga mista
+MIX_PADRAO = {"leitura": 60, "baixa": 20, "listagem": 10, "historico": 10}
+
+# Endpoint (rota) de cada operação, usado como chave do relatório
+ENDPOINTS = {
+    "leitura": "GET /estoque/{sku}",
+    "baixa": "POST /estoque/{sku}/baixa",
+    "listagem": "GET /estoque",
+    "historico": "GET /historico_estoque",
+}
+
+
+@dataclass
+class LoadTestConfig:
+    sellers: int = 5
+    skus: int = 100
+    concurrency: int = 16
+    duration_seconds: float = 30.0
+    mix: dict[str, int] = field(default_factory=lambda: dict(MIX_PADRAO))
+    seed: int = 42
+
+    def seller(self, i: int) -> str:
+        return f"lt-seller-{i:04d}"
+
+    def sku(self, i: int) -> str:
+        return f"lt-sku-{i:06d}"
+
+
+def percentil(ordenados: list[float], p: float) -> float:
+    """Percentil pelo método do posto mais próximo, sobre uma lista já ordenada."""
+    if not ordenados:
+        return 0.0
+    posto = max(int(-(-p * len(ordenados) // 100)), 1)
+    return ordenados[min(posto, len(ordenados)) - 1]
+
+
+@dataclass
+class EndpointStats:
+    latencias_ms: list[float] = field(default_factory=list)
+    status: dict[str, int] = field(default_factory=dict)
+    erros: int = 0
+
+    def registrar(self, latencia_ms: float, status: int | None):
+        self.latencias_ms.append(latencia_ms)
+        chave = str(status) if status is not None else "erro"
+        self.status[chave] = self.status.get(chave, 0) + 1
+        if status is None or status >= 500:
+            self.erros += 1
+
+    def resumo(self, duracao_segundos: float) -> dict:
+        ordenados = sorted(self.latencias_ms)
+        total = len(ordenados)
+        return {
+            "requisicoes": total,
+            "erros": self.erros,
+            "status": dict(sorted(self.status.items())),
+            "rps": round(total / duracao_segundos, 2) if duracao_segundos else 0.0,
+            "p50_ms": round(percentil(ordenados, 50), 3),
+            "p95_ms": round(percentil(ordenados, 95), 3),
+            "p99_ms": round(percentil(ordenados, 99), 3),
+            "media_ms": round(sum(ordenados) / total, 3) if total else 0.0,
+            "max_ms": round(ordenados[-1], 3) if total else 0.0,
+        }
+
+
+class LoadTest:
+    """
+    Executa a carga com um cliente httpx já configurado para a API (in-process ou remota).
+    """
+
+    def __init__(self, client: httpx.AsyncClient, token: str, config: LoadTestConfig):
+        self.client = client
+        self.config = config
+        self.token = token
+        self.random = random.Random(config.seed)
+        self.stats: dict[str, EndpointStats] = {}
+
+    def _headers(self, seller_id: str) -> dict:
+        return {"Authorization": f"Bearer {self.token}", "x-seller-id": seller_id}
+
+    async def seed(self):
+        """
+        Cria (ou repõe) os SKUs de todos os sellers com uma quantidade que não se esgota
+        durante a carga. Pode ser executado de novo sobre os mesmos dados.
+        """
+        semaforo = asyncio.Semaphore(self.config.concurrency)
+
+        async def criar(seller_id: str, sku: str):
+            async with semaforo:
+                headers = self._headers(seller_id)
+                response = await self.client.post(
+                    f"{API_PREFIX}/estoque", json={"sku": sku, "quantidade": QUANTIDADE_INICIAL}, headers=headers
+                )
+                if response.status_code == 409:
+                    response = await self.client.patch(
+                        f"{API_PREFIX}/estoque/{sku}", json={"quantidade": QUANTIDADE_INICIAL}, headers=headers
+                    )
+                response.raise_for_status()
+
+        await asyncio.gather(
+            *(
+                criar(self.config.seller(s), self.config.sku(i))
+                for s in range(self.config.sellers)
+                for i in range(self.config.skus)
+            )
+        )
+
+    def _operacoes(self) -> dict[str, Callable[[str, str], Awaitable[httpx.Response]]]:
+        async def leitura(seller_id: str, sku: str):
+            return await self.client.get(f"{API_PREFIX}/estoque/{sku}", headers=self._headers(seller_id))
+
+        async def baixa(seller_id: str, sku: str):
+            return await self.client.post(
+                f"{API_PREFIX}/estoque/{sku}/baixa", json={"quantidade": 1}, headers=self._headers(seller_id)
+            )
+
+        async def listagem(seller_id: str, sku: str):
+            return await self.client.get(
+                f"{API_PREFIX}/estoque", params={"_limit": 50}, headers=self._headers(seller_id)
+            )
+
+        async def historico(seller_id: str, sku: str):
+            start = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+            return await self.client.get(
+                f"{API_PREFIX}/historico_estoque",
+                params={"start": start, "sku": sku, "_limit": 50},
+                headers=self._headers(seller_id),
+            )
+
+        return {"leitura": leitura, "baixa": baixa, "listagem": listagem, "historico": historico}
+
+    async def _worker(self, deadline: float, operacoes: dict, nomes: list[str], pesos: list[int]):
+        while time.perf_counter() < deadline:
+            nome = self.random.choices(nomes, pesos)[0]
+            seller_id = self.config.seller(self.random.randrange(self.config.sellers))
+            sku = self.config.sku(self.random.randrange(self.config.skus))
+            inicio = time.perf_counter()
+            status = None
+            try:
+                status = (await operacoes[nome](seller_id, sku)).status_code
+            except httpx.HTTPError:
+                pass
+            latencia_ms = (time.perf_counter() - inicio) * 1000
+            self.stats.setdefault(ENDPOINTS[nome], EndpointStats()).registrar(latencia_ms, status)
+
+    async def run(self) -> dict:
+        operacoes = self._operacoes()
+        nomes = [nome for nome, peso in self.config.mix.items() if peso > 0]
+        pesos = [self.config.mix[nome] for nome in nomes]
+        self.stats = {}
+        inicio = time.perf_counter()
+        deadline = inicio + self.config.duration_seconds
+        await asyncio.gather(*(self._worker(deadline, operacoes, nomes, pesos) for _ in range(self.config.concurrency)))
+        return build_report(self.stats, time.perf_counter() - inicio, self.config)
+
+
+def build_report(stats: dict[str, EndpointStats], duracao_segundos: float, config: LoadTestConfig) -> dict:
+    geral = EndpointStats()
+    for endpoint_stats in stats.values():
+        geral.latencias_ms.extend(endpoint_stats.latencias_ms)
+        geral.erros += endpoint_stats.erros
+        for status, total in endpoint_stats.status.items():
+            geral.status[status] = geral.status.get(status, 0) + total
+    return {
+        "config": {
+            "sellers": config.sellers,
+            "skus": config.skus,
+            "concurrency": config.concurrency,
+            "duration_seconds": config.duration_seconds,
+            "mix": config.mix,
+            "seed": config.seed,
+        },
+        "duracao_segundos": round(duracao_segundos, 3),
+        "total": geral.resumo(duracao_segundos),
+        "endpoints": {endpoint: stats[endpoint].resumo(duracao_segundos) for endpoint in sorted(stats)},
+    }
+
+
+def compare_with_baseline(report: dict, baseline: dict, tolerancia: float = 0.10) -> list[str]:
+    """
+    Compara p95, p99 e RPS de cada endpoint com a baseline.
+
+    :return: A descrição de cada regressão acima da tolerância (vazia se nenhuma).
+    """
+    regressoes = []
+    for endpoint, atual in report["endpoints"].items():
+        anterior = baseline.get("endpoints", {}).get(endpoint)
+        if not anterior:
+            continue
+        for metrica in ("p95_ms", "p99_ms"):
+            if anterior[metrica] and atual[metrica] > anterior[metrica] * (1 + tolerancia):
+                regressoes.append(f"{endpoint}: {metrica} {anterior[metrica]} -> {atual[metrica]}")
+        if anterior["rps"] and atual["rps"] < anterior["rps"] * (1 - tolerancia):
+            regressoes.append(f"{endpoint}: rps {anterior['rps']} -> {atual['rps']}")
+        if atual["erros"] > anterior["erros"]:
+            regressoes.append(f"{endpoint}: erros {anterior['erros']} -> {atual['erros']}")
+    return regressoes
+
+
+async def _run_in_process(config: LoadTestConfig, seed: bool) -> dict:
+    from tests.fixtures.local_issuer import LocalIssuer
+
+    with LocalIssuer() as issuer:
+        # As configurações da API são lidas no import de app.api_main
+        os.environ["APP_OPENID_WELLKNOWN"] = issuer.well_known_url
+        from app.api_main import app
+
+        token = issuer.sign(sellers=",".join(config.seller(i) for i in range(config.sellers)), expires_in=3600)
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=30) as client:
+            return await _executar(LoadTest(client, token, config), seed)
+
+
+async def _run_remote(base_url: str, token: str, config: LoadTestConfig, seed: bool) -> dict:
+    limits = httpx.Limits(max_connections=config.concurrency, max_keepalive_connections=config.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        return await _executar(LoadTest(client, token, config), seed)
+
+
+async def _executar(load_test: LoadTest, seed: bool) -> dict:
+    if seed:
+        await load_test.seed()
+    return await load_test.run()
+
+
+def _print_report(report: dict):
+    print(f"{'endpoint':<28} {'req':>8} {'erros':>6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for endpoint, resumo in [*report["endpoints"].items(), ("total", report["total"])]:
+        print(
+            f"{endpoint:<28} {resumo['requisicoes']:>8} {resumo['erros']:>6} {resumo['rps']:>9.1f} "
+            f"{resumo['p50_ms']:>9.2f} {resumo['p95_ms']:>9.2f} {resumo['p99_ms']:>9.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga das APIs v2 de estoque e histórico")
+    parser.add_argument("--sellers", type=int, default=5)
+    parser.add_argument("--skus", type=int, default=100, help="SKUs por seller")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="Duração da carga, em segundos")
+    parser.add_argument(
+        "--mix",
+        type=json.loads,
+        default=MIX_PADRAO,
+        help=f"Pesos das operações em JSON (padrão: {json.dumps(MIX_PADRAO)})",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Semente da escolha de operações e SKUs")
+    parser.add_argument("--skip-seed", action="store_true", help="Não popula o estoque antes da carga")
+    parser.add_argument("--base-url", help="URL de uma API já no ar; sem ela, a API roda no próprio processo")
+    parser.add_argument("--token", help="Token Bearer para --base-url, com todos os sellers no claim")
+    parser.add_argument("--output", help="Arquivo JSON com o resultado")
+    parser.add_argument("--baseline", help="Resultado anterior (JSON) para detectar regressões")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Piora aceita em relação à baseline")
+    args = parser.parse_args()
+
+    config = LoadTestConfig(args.sellers, args.skus, args.concurrency, args.duration, args.mix, args.seed)
+    if args.base_url:
+        if not args.token:
+            parser.error("--token é obrigatório com --base-url")
+        report = asyncio.run(_run_remote(args.base_url, args.token, config, not args.skip_seed))
+    else:
+        report = asyncio.run(_run_in_process(config, not args.skip_seed))
+
+    _print_report(report)
+    if args.output:
+        with open(args.output, "w") as arquivo:
+            json.dump(report, arquivo, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as arquivo:
+            regressoes = compare_with_baseline(report, json.load(arquivo), args.tolerance)
+        for regressao in regressoes:
+            print(f"REGRESSÃO {regressao}", file=sys.stderr)
+        if regressoes:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
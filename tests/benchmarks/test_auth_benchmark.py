@@ -0,0 +1,18 @@
+import pytest
+
+from tests.benchmarks.auth_benchmark import run_auth_benchmark
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("algorithm, key_size", [("RS256", 2048), ("ES256", 256)])
+async def test_auth_benchmark_executa_todos_os_cenarios(algorithm, key_size):
+    resultados = await run_auth_benchmark(algorithm=algorithm, key_size=key_size, iteracoes=5, sellers=10)
+
+    assert [resultado.cenario for resultado in resultados] == [
+        "primeira_validacao",
+        "validate_token_frio",
+        "validate_token_quente",
+        "do_auth_frio",
+        "do_auth_quente",
+    ]
+    assert all(resultado.as_dict()["por_segundo"] > 0 for resultado in resultados)
@@ -0,0 +1,66 @@
+import httpx
+import pytest
+
+from tests.benchmarks.estoque_load import LoadTest, LoadTestConfig, compare_with_baseline, percentil
+
+
+def _api_fake(criados: set):
+    def handler(request: httpx.Request) -> httpx.Response:
+        seller_id = request.headers["x-seller-id"]
+        if request.method == "POST" and request.url.path.endswith("/estoque"):
+            chave = (seller_id, request.read())
+            if chave in criados:
+                return httpx.Response(409)
+            criados.add(chave)
+            return httpx.Response(201, json={})
+        if request.url.path.endswith("/historico_estoque"):
+            return httpx.Response(404, json={})
+        return httpx.Response(200, json={})
+
+    return handler
+
+
+def test_percentil():
+    valores = [float(v) for v in range(1, 101)]
+
+    assert (percentil(valores, 50), percentil(valores, 95), percentil(valores, 99)) == (50.0, 95.0, 99.0)
+    assert percentil([], 95) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_carga_mista_reporta_por_endpoint():
+    criados = set()
+    config = LoadTestConfig(sellers=2, skus=3, concurrency=4, duration_seconds=0.2)
+    transport = httpx.MockTransport(_api_fake(criados))
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+        load_test = LoadTest(client, "token", config)
+        await load_test.seed()
+        # Popular de novo sobre os mesmos dados repõe as quantidades (409 -> PATCH)
+        await load_test.seed()
+        report = await load_test.run()
+
+    assert len(criados) == 6
+    assert set(report["endpoints"]) == {
+        "GET /estoque/{sku}",
+        "POST /estoque/{sku}/baixa",
+        "GET /estoque",
+        "GET /historico_estoque",
+    }
+    total = report["total"]
+    assert total["requisicoes"] == sum(e["requisicoes"] for e in report["endpoints"].values())
+    assert total["erros"] == 0
+    assert total["p50_ms"] <= total["p95_ms"] <= total["p99_ms"]
+    assert set(report["endpoints"]["GET /historico_estoque"]["status"]) == {"404"}
+
+
+def test_compare_with_baseline_detecta_regressoes():
+    baseline = {"endpoints": {"GET /estoque": {"p95_ms": 10.0, "p99_ms": 20.0, "rps": 1000.0, "erros": 0}}}
+    igual = {"endpoints": {"GET /estoque": {"p95_ms": 10.5, "p99_ms": 21.0, "rps": 950.0, "erros": 0}}}
+    pior = {"endpoints": {"GET /estoque": {"p95_ms": 15.0, "p99_ms": 20.0, "rps": 800.0, "erros": 2}}}
+
+    assert compare_with_baseline(igual, baseline) == []
+    assert compare_with_baseline(pior, baseline) == [
+        "GET /estoque: p95_ms 10.0 -> 15.0",
+        "GET /estoque: rps 1000.0 -> 800.0",
+        "GET /estoque: erros 0 -> 2",
+    ]
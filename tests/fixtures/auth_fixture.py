@@ -1,5 +1,8 @@
 from pytest import fixture
 
+from app.integrations.auth.keycloak_adapter import KeycloakAdapter
+from tests.fixtures.local_issuer import LocalIssuer
+
 
 @fixture
 def mock_do_auth():
@@ -13,3 +16,23 @@ def mock_do_auth():
     yield
     # Limpando o override
     app.dependency_overrides[do_auth] = {}
+
+
+@fixture(scope="session")
+def local_issuer():
+    """
+    Emissor de tokens local (well-known + JWKS) no lugar do Keycloak.
+    """
+    with LocalIssuer() as issuer:
+        yield issuer
+
+
+@fixture
+async def local_keycloak_adapter(local_issuer):
+    """
+    KeycloakAdapter real apontando para o emissor local, já com as chaves carregadas.
+    """
+    adapter = KeycloakAdapter(local_issuer.well_known_url)
+    await adapter.start()
+    yield adapter
+    await adapter.aclose()
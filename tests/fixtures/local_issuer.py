@@ -0,0 +1,128 @@
+"""
+Emissor de tokens local, no lugar do Keycloak, para testes e benchmarks de autenticação.
+
+Serve o well-known e o JWKS em um servidor HTTP local e assina tokens com o algoritmo e
+o tamanho de chave escolhidos, sem depender de um IDP de verdade.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+WELL_KNOWN_PATH = "/realms/local/.well-known/openid-configuration"
+JWKS_PATH = "/realms/local/protocol/openid-connect/certs"
+
+_CURVAS = {"ES256": ec.SECP256R1(), "ES384": ec.SECP384R1(), "ES512": ec.SECP521R1()}
+
+
+def _gerar_chave(algorithm: str, key_size: int):
+    if algorithm in _CURVAS:
+        return ec.generate_private_key(_CURVAS[algorithm])
+    if algorithm[:2] in ("RS", "PS"):
+        return rsa.generate_private_key(public_exponent=65537, key_size=key_size)
+    raise ValueError(f"Algoritmo não suportado pelo emissor local: {algorithm}")
+
+
+class LocalIssuer:
+    """
+    Emissor local: `with LocalIssuer() as issuer:` sobe o servidor e `issuer.well_known_url`
+    é a URL a entregar ao KeycloakAdapter. `rotate()` troca a chave de assinatura.
+    """
+
+    def __init__(self, algorithm: str = "RS256", key_size: int = 2048, kid: str = "local-1"):
+        self.algorithm = algorithm
+        self.key_size = key_size
+        self.kid = kid
+        self._private_key = _gerar_chave(algorithm, key_size)
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+        self.requests: dict[str, int] = {WELL_KNOWN_PATH: 0, JWKS_PATH: 0}
+
+    @property
+    def base_url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("Servidor do emissor local não iniciado")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def issuer(self) -> str:
+        return f"{self.base_url}/realms/local"
+
+    @property
+    def well_known_url(self) -> str:
+        return f"{self.base_url}{WELL_KNOWN_PATH}"
+
+    def well_known(self) -> dict:
+        return {
+            "issuer": self.issuer,
+            "authorization_endpoint": f"{self.issuer}/protocol/openid-connect/auth",
+            "token_endpoint": f"{self.issuer}/protocol/openid-connect/token",
+            "jwks_uri": f"{self.base_url}{JWKS_PATH}",
+        }
+
+    def jwks(self) -> dict:
+        algorithm = jwt.get_algorithm_by_name(self.algorithm)
+        jwk = algorithm.to_jwk(self._private_key.public_key(), as_dict=True)
+        return {"keys": [{**jwk, "kid": self.kid, "alg": self.algorithm, "use": "sig"}]}
+
+    def rotate(self, kid: str):
+        """Passa a assinar com uma chave nova, publicada no JWKS no lugar da anterior."""
+        self.kid = kid
+        self._private_key = _gerar_chave(self.algorithm, self.key_size)
+
+    def sign(self, sellers: str | None = "luizalabs", expires_in: int = 300, **claims) -> str:
+        agora = int(time.time())
+        payload = {"sub": "vendedor1", "azp": "pc-estoque", "iat": agora, "exp": agora + expires_in, **claims}
+        if sellers is not None:
+            payload["sellers"] = sellers
+        if self._server is not None:
+            payload.setdefault("iss", self.issuer)
+        return jwt.encode(payload, self._private_key, algorithm=self.algorithm, headers={"kid": self.kid})
+
+    def _handler(self):
+        issuer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == WELL_KNOWN_PATH:
+                    body = issuer.well_known()
+                elif self.path == JWKS_PATH:
+                    body = issuer.jwks()
+                else:
+                    self.send_error(404)
+                    return
+                issuer.requests[self.path] += 1
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "LocalIssuer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "LocalIssuer":
+        return self if self._server is not None else self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,32 @@
+import asyncio
+
+from app.integrations.notifications.notification_sink import NotificationSink
+from app.models.alerta_estoque_model import DigestEstoqueBaixo
+
+
+class FakeNotificationSink(NotificationSink):
+    """
+    Sink em memória para testes: guarda os digests entregues e pode falhar as primeiras
+    `falhas` entregas de cada vendedor ou simular a latência de um destino remoto.
+    """
+
+    def __init__(self, falhas: int = 0, latencia_segundos: float = 0):
+        self.falhas = falhas
+        self.latencia_segundos = latencia_segundos
+        self.entregues: list[DigestEstoqueBaixo] = []
+        self.tentativas: dict[str, int] = {}
+        self.em_andamento = 0
+        self.max_em_andamento = 0
+
+    async def enviar(self, digest: DigestEstoqueBaixo):
+        self.tentativas[digest.seller_id] = self.tentativas.get(digest.seller_id, 0) + 1
+        self.em_andamento += 1
+        self.max_em_andamento = max(self.max_em_andamento, self.em_andamento)
+        try:
+            if self.latencia_segundos:
+                await asyncio.sleep(self.latencia_segundos)
+            if self.tentativas[digest.seller_id] <= self.falhas:
+                raise ConnectionError(f"Destino fora do ar para {digest.seller_id}")
+            self.entregues.append(digest)
+        finally:
+            self.em_andamento -= 1